@@ -142,3 +142,175 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
 }
+
+# 缓存设置（默认使用进程内locmem，多进程部署时可切换为redis等共享后端）
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'novel-platform-default',
+    }
+}
+
+# 认证用户信息缓存：进程内缓存TTL较短，共享缓存由管理员操作主动失效
+AUTH_PRINCIPAL_CACHE = {
+    'ENABLED': True,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAX_ENTRIES': 10000,
+    'SHARED_TTL': 300,
+    'CACHE_ALIAS': 'default',
+}
+
+# 榜单引擎：run_ranking_engine 命令每轮写入的榜单长度、快照保留天数及常驻模式的默认间隔
+RANKING_ENGINE = {
+    'DISPLAY_LIMIT': 100,
+    'RETENTION_DAYS': 30,
+    'INTERVAL_SECONDS': 600,
+}
+
+# 操作日志写入：ASYNC 时用户操作日志入队由后台线程批量写入，队列满时等待 ENQUEUE_TIMEOUT 秒后丢弃；
+# 管理员操作日志默认仍在请求内同步写入（ADMIN_SYNC）
+AUDIT_LOG = {
+    'ASYNC': True,
+    'ADMIN_SYNC': True,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 1.0,
+    'ENQUEUE_TIMEOUT': 0.0,
+    'MAX_RETRIES': 3,
+    'SHUTDOWN_TIMEOUT': 5.0,
+}
+
+# 站内信：作品更新默认以广播形式每章存一行并在读取时合并（broadcast），fanout 为逐个读者写入 messages
+MESSAGES = {
+    'WORK_UPDATE_DELIVERY': 'broadcast',
+}
+
+# 附加表核对：每个进程首次连接数据库时检查一次迁移 0013 创建的表，缺失时按需补建（请求路径不再执行DDL）
+SCHEMA_BOOTSTRAP = {
+    'VERIFY_ON_CONNECT': True,
+    'CREATE_MISSING': True,
+}
+
+# 权限与管控策略缓存：用户权限、作品管控的进程内/共享缓存时长（秒），管理端修改时主动失效
+POLICY_CACHE = {
+    'ENABLED': True,
+    'LOCAL_TTL': 10,
+    'LOCAL_MAX_ENTRIES': 20000,
+    'SHARED_TTL': 600,
+    'CACHE_ALIAS': 'default',
+}
+
+# 未读消息角标：广播未读数的进程内/共享缓存时长（秒），个人消息未读数直接读 user_message_counters
+MESSAGE_COUNTERS = {
+    'BROADCAST_LOCAL_TTL': 2,
+    'BROADCAST_SHARED_TTL': 30,
+    'CACHE_ALIAS': 'default',
+}
+
+# 通知扇出：run_notification_worker 每批写入的消息条数、轮询间隔、事件租约时长与最大重试次数
+NOTIFICATIONS = {
+    'BATCH_SIZE': 1000,
+    'POLL_INTERVAL': 2,
+    'LEASE_SECONDS': 300,
+    'MAX_ATTEMPTS': 5,
+}
+
+# 用户偏好画像：得分半衰期（天）、低分裁剪阈值、保留标签数，decay_preference_profiles 命令的批量与间隔
+PREFERENCE_PROFILES = {
+    'HALF_LIFE_DAYS': 60,
+    'MIN_SCORE': 0.01,
+    'MAX_TAGS': 200,
+    'MAX_RETRIES': 3,
+    'DECAY_BATCH_SIZE': 500,
+    'DECAY_INTERVAL_SECONDS': 86400,
+}
+
+# 推荐反馈保留期：prune_recommendation_feedback 命令分批删除过期记录；TIMER_ENABLED 时改由 Web 进程内的定时线程执行
+FEEDBACK_RETENTION = {
+    'RETENTION_DAYS': 180,
+    'BATCH_SIZE': 1000,
+    'BATCH_PAUSE': 0.05,
+    'INTERVAL_SECONDS': 3600,
+    'TIMER_ENABLED': False,
+}
+
+# 首页推荐缓存：FRESH_TTL 内直接返回，过期或有新反馈后在 STALE_TTL 内先返回旧结果并由后台线程刷新
+RECOMMENDATION_CACHE = {
+    'ENABLED': True,
+    'FRESH_TTL': 120,
+    'STALE_TTL': 1800,
+    'LOCAL_MAX_ENTRIES': 5000,
+    'CACHE_ALIAS': 'default',
+    'REFRESH_WORKERS': 2,
+    'REFRESH_LOCK_TTL': 30,
+    'COMPUTE_WAIT_TIMEOUT': 10,
+}
+
+# 推荐候选打分：按热度预取 CANDIDATE_POOL 部候选作品的打分列，整池向量化打分
+RECOMMENDATION_SCORING = {
+    'CANDIDATE_POOL': 20000,
+}
+
+# 相似作品（读过的人也在读）：build_work_neighbors 命令按共同读者离线计算，每部作品保留 TOP_K 个；
+# WORKERS 为并行进程数（None 为 CPU 核数），PAIR_CHUNK 控制分片阶段单个进程的峰值内存
+CO_READING = {
+    'TOP_K': 20,
+    'MIN_CO_READERS': 2,
+    'SHRINKAGE': 10.0,
+    'MAX_WORKS_PER_READER': 200,
+    'WORKERS': None,
+    'READER_SHARDS': 16,
+    'BUCKETS': 16,
+    'PAIR_CHUNK': 8000000,
+    'INTERVAL_SECONDS': 86400,
+}
+
+# 进程内作品目录：上架作品的卡片字段常驻内存，每 REFRESH_SECONDS 按 update_time 水位增量刷新，
+# 每 FULL_RELOAD_SECONDS 全量重载一次；ENABLED 为 False 时推荐候选回退到 SQL 查询
+WORK_CATALOG = {
+    'ENABLED': True,
+    'REFRESH_SECONDS': 30,
+    'FULL_RELOAD_SECONDS': 1800,
+    'WATERMARK_OVERLAP_SECONDS': 5,
+    'LOAD_BATCH_SIZE': 5000,
+    'WARM_ON_START': False,
+}
+
+# 章节目录缓存：目录只含章节元数据，按作品缓存；章节增删改后递增目录版本号失效
+CHAPTER_TOC = {
+    'ENABLED': True,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAX_ENTRIES': 2000,
+    'SHARED_TTL': 3600,
+    'CACHE_ALIAS': 'default',
+}
+
+# 章节正文存储：正文压缩后存放在 chapter_bodies 表（STORAGE='table'）或 MEDIA_ROOT 下按内容哈希命名的文件
+# （STORAGE='files'，可开启 MMAP_READS）；CODEC 为 'zstd' 时需要安装 zstandard，未安装时回退为 zlib
+CHAPTER_BODY_STORE = {
+    'CODEC': 'zlib',
+    'LEVEL': None,
+    'STORAGE': 'table',
+    'DIRECTORY': 'chapter_bodies',
+    'MMAP_READS': False,
+    'MIN_COMPRESS_BYTES': 256,
+}
+
+# 离线下载包：章节范围内可读章节的 gzip NDJSON，按 BATCH_SIZE 分批读取正文边压缩边发送；
+# 相同内容的下载包缓存在 MEDIA_ROOT/DIRECTORY 下，超过 MAX_AGE_SECONDS 未使用的由 prune_offline_bundles 清理
+OFFLINE_BUNDLE = {
+    'DIRECTORY': 'offline_bundles',
+    'CACHE_ENABLED': True,
+    'MAX_CHAPTERS': 2000,
+    'BATCH_SIZE': 50,
+    'COMPRESS_LEVEL': 6,
+    'MAX_AGE_SECONDS': 7 * 24 * 3600,
+}
+
+# 作品全文检索索引（SQLite FTS5），通过 rebuild_search_index 命令构建，未构建时搜索退回 LIKE 查询
+SEARCH_INDEX = {
+    'ENABLED': True,
+    'PATH': BASE_DIR / 'search_index.sqlite3',
+    'MAX_CANDIDATES': 1000,
+    'BATCH_SIZE': 1000,
+}
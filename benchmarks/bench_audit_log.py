@@ -0,0 +1,102 @@
+"""操作日志写入基准：对比同步 INSERT 与异步批量写入时 get_work_detail 的单请求延迟
+
+用法：
+    python benchmarks/bench_audit_log.py --user-id 1 --work-id 1 --requests 2000 --threads 8
+
+需要已初始化的 MySQL 数据库。每个请求会写入一条 user_action_logs，
+输出同步/异步两种模式下的 p50/p99 延迟及两者差值，异步模式结束后等待队列刷写完成再统计写入条数。
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from _django import setup
+
+setup()
+
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+from novel_platform import views  # noqa: E402
+from novel_platform.services.audit_log import (  # noqa: E402
+    _AUDIT_LOG_DEFAULTS,
+    audit_log_stats,
+    flush_audit_logs,
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def count_logs(user_id):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM user_action_logs WHERE user_id = %s", [user_id])
+        return cursor.fetchone()[0]
+
+
+def worker(factory, token, work_id, total_requests, timings):
+    for _ in range(total_requests):
+        request = factory.get(f'/api/works/{work_id}/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        started = time.perf_counter()
+        response = views.get_work_detail(request, work_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise SystemExit(f'unexpected status {response.status_code}: {response.data}')
+    connection.close()
+
+
+def run_round(factory, token, args, async_enabled):
+    config = dict(_AUDIT_LOG_DEFAULTS, ASYNC=async_enabled)
+    with override_settings(AUDIT_LOG=config):
+        per_thread = max(1, args.requests // args.threads)
+        timings = []
+        threads = [
+            threading.Thread(target=worker, args=(factory, token, args.work_id, per_thread, timings))
+            for _ in range(args.threads)
+        ]
+        logs_before = count_logs(args.user_id)
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        flush_audit_logs(timeout=30)
+        logs_written = count_logs(args.user_id) - logs_before
+    return timings, elapsed, logs_written
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--role', type=int, default=1)
+    parser.add_argument('--work-id', type=int, required=True)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    token = views.generate_token(args.user_id, args.role)
+    factory = RequestFactory()
+
+    results = {}
+    for label, async_enabled in (('sync', False), ('async', True)):
+        timings, elapsed, logs_written = run_round(factory, token, args, async_enabled)
+        results[label] = timings
+        print(
+            f'{label:>6}: p50 {statistics.median(timings):7.2f} ms   '
+            f'p99 {percentile(timings, 99):7.2f} ms   '
+            f'{len(timings) / elapsed:8.1f} req/s   logs written {logs_written}'
+        )
+
+    for pct in (50, 99):
+        saved = percentile(results['sync'], pct) - percentile(results['async'], pct)
+        print(f'p{pct} latency removed from the request path: {saved:.2f} ms')
+    print('writer stats:', audit_log_stats()['user_action_logs'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""JWT认证用户缓存基准：对比开启/关闭缓存时 get_categories 的每秒请求数
+
+用法：
+    python benchmarks/bench_auth_cache.py --user-id 1 --requests 5000
+
+需要已初始化的 MySQL 数据库，且 user_id 对应的账号状态正常。
+"""
+import argparse
+import time
+
+from _django import setup
+
+setup()
+
+from django.db import connection, reset_queries  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from novel_platform import views  # noqa: E402
+from novel_platform.authentication import get_principal_cache  # noqa: E402
+
+
+def run_round(factory, token, total_requests, enabled):
+    config = {
+        'ENABLED': enabled,
+        'LOCAL_TTL': 5,
+        'LOCAL_MAX_ENTRIES': 10000,
+        'SHARED_TTL': 300,
+        'CACHE_ALIAS': 'default',
+    }
+    get_principal_cache().clear_local()
+    with override_settings(AUTH_PRINCIPAL_CACHE=config):
+        # 预热一次，保证缓存命中场景下测的是稳态
+        request = factory.get('/api/categories/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        views.get_categories(request)
+
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            for _ in range(total_requests):
+                request = factory.get('/api/categories/', HTTP_AUTHORIZATION=f'Bearer {token}')
+                response = views.get_categories(request)
+                if response.status_code != 200:
+                    raise SystemExit(f'unexpected status {response.status_code}: {response.data}')
+            elapsed = time.perf_counter() - started
+        reset_queries()
+
+    return total_requests / elapsed, len(ctx.captured_queries) / total_requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--role', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    token = views.generate_token(args.user_id, args.role)
+    factory = RequestFactory()
+
+    # DRF 在 initial() 中会主动执行认证，即使视图是 AllowAny 也会走到 JWTAuthentication
+    for label, enabled in (('without cache', False), ('with cache', True)):
+        rps, queries = run_round(factory, token, args.requests, enabled)
+        print(f'{label:>14}: {rps:9.1f} req/s, {queries:.2f} queries/request')
+
+
+if __name__ == '__main__':
+    main()
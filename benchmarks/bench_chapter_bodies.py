@@ -0,0 +1,127 @@
+"""章节正文存储基准：中文正文在各编码下的压缩比，以及表内/文件/mmap 三种读取方式的单章解码延迟
+
+用法：
+    python benchmarks/bench_chapter_bodies.py --chapters 500 --chars 3000
+    python benchmarks/bench_chapter_bodies.py --corpus /path/to/novel.txt --chars 3000
+
+不依赖 MySQL：表内存储只测解码（不含数据库往返），文件存储写入临时目录后测 读文件+解码。
+未指定 --corpus 时按常用词频率合成小说体中文（含对话、标点与分段）；
+合成文本的用词重复度高于真实小说，压缩比会偏高，有条件时请用真实语料（UTF-8 文本，按 --chars 切分为章节）。
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from _django import setup
+
+setup()
+
+from django.test import override_settings  # noqa: E402
+
+from novel_platform.services import chapter_bodies  # noqa: E402
+
+WORDS = (
+    '的 了 是 在 他 她 我 你 们 这 那 一 个 不 有 人 来 去 说 道 着 过 也 就 都 而 又 还 没有 什么 自己 已经 '
+    '时候 知道 看着 突然 一道 身影 剑光 师兄 师妹 宗门 长老 弟子 修为 灵力 丹药 阵法 山门 大殿 天地 风云 '
+    '目光 心中 微微 一笑 冷哼 一声 眉头 皱起 缓缓 开口 转身 离开 脚步 停下 远处 传来 声音 夜色 月光 城中 '
+    '客栈 掌柜 少年 少女 老者 青衣 白衣 长剑 刀锋 血迹 伤口 呼吸 沉默 片刻 终于 明白 原来 如此 不可能 '
+    '怎么 为什么 如果 但是 然而 于是 因为 所以 只是 仿佛 似乎 竟然 果然 顿时 随即 立刻 慢慢 轻轻 狠狠 '
+    '秘境 传承 功法 境界 突破 金丹 元婴 渡劫 雷劫 灵石 储物戒 法宝 符箓 妖兽 魔修 正道 江湖 朝廷 皇城 '
+    '公主 将军 皇帝 大臣 书生 先生 学堂 考试 城门 街道 雨水 雪花 春天 秋风 花开 树叶 山峰 河流 大海'
+).split()
+
+
+def synthesize_chapters(count, chars, seed):
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(WORDS))]
+    chapters = []
+    for _ in range(count):
+        paragraphs = []
+        size = 0
+        while size < chars:
+            sentences = []
+            for _ in range(rng.randint(1, 5)):
+                sentence = ''.join(rng.choices(WORDS, weights, k=rng.randint(4, 18)))
+                if rng.random() < 0.3:
+                    sentence = f'“{sentence}{rng.choice("？！。")}”'
+                else:
+                    sentence += rng.choice('，。。！？')
+                sentences.append(sentence)
+            paragraph = '　　' + ''.join(sentences)
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+        chapters.append('\n'.join(paragraphs)[:chars])
+    return chapters
+
+
+def load_corpus(path, count, chars):
+    with open(path, encoding='utf-8') as handle:
+        text = handle.read()
+    chapters = [text[start:start + chars] for start in range(0, len(text), chars)]
+    return [chapter for chapter in chapters if len(chapter) >= chars // 2][:count]
+
+
+def measure(func, items, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        timings.append((time.perf_counter() - started) * 1e6 / max(1, len(items)))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chapters', type=int, default=500)
+    parser.add_argument('--chars', type=int, default=3000, help='每章字数')
+    parser.add_argument('--corpus', help='真实语料文件（UTF-8）')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=13)
+    args = parser.parse_args()
+
+    if args.corpus:
+        chapters = load_corpus(args.corpus, args.chapters, args.chars)
+        source = args.corpus
+    else:
+        chapters = synthesize_chapters(args.chapters, args.chars, args.seed)
+        source = '合成中文'
+    raw_bytes = sum(len(chapter.encode('utf-8')) for chapter in chapters)
+    print(f'语料：{source}，{len(chapters)} 章 × {args.chars} 字，原文 {raw_bytes / 1048576:.1f}MB')
+
+    codecs = [('raw', None), ('zlib', 1), ('zlib', 6), ('zlib', 9)]
+    if chapter_bodies.zstandard is not None:
+        codecs += [('zstd', 3), ('zstd', 9)]
+    else:
+        print('未安装 zstandard，跳过 zstd')
+
+    print(f"{'编码':<10} {'压缩比':>7} {'编码(µs/章)':>12} {'表内解码(µs/章)':>16} {'文件(µs/章)':>12} {'mmap(µs/章)':>12}")
+    for codec, level in codecs:
+        encoded = []
+        started = time.perf_counter()
+        for chapter in chapters:
+            actual, blob, _, content_hash = chapter_bodies.encode(chapter, codec, level, min_compress_bytes=0)
+            encoded.append((actual, blob, content_hash))
+        encode_us = (time.perf_counter() - started) * 1e6 / len(chapters)
+        stored_bytes = sum(len(blob) for _, blob, _ in encoded)
+
+        table_us = measure(lambda item: chapter_bodies.decode(item[0], item[1]), encoded, args.repeat)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            paths = []
+            for actual, blob, content_hash in encoded:
+                path = chapter_bodies.body_path(content_hash, actual)
+                chapter_bodies._write_file(path, blob)
+                paths.append((path, actual))
+            file_us = measure(lambda item: chapter_bodies._read_file(item[0], item[1], False), paths, args.repeat)
+            mmap_us = measure(lambda item: chapter_bodies._read_file(item[0], item[1], True), paths, args.repeat)
+
+        label = codec if level is None else f'{codec}-{level}'
+        print(f'{label:<10} {raw_bytes / stored_bytes:>7.2f} {encode_us:>12.1f} {table_us:>16.1f} '
+              f'{file_us:>12.1f} {mmap_us:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""章节目录基准：对比作者端章节列表带正文的旧查询与只含元数据的目录（未命中/命中缓存）的响应大小和耗时
+
+用法：
+    python benchmarks/bench_chapter_toc.py --chapters 2000 --chars 3000 --repeat 5
+
+不依赖 MySQL：章节表建在内存 SQLite 中（参数占位符转换为 ?），耗时包含查询、组装与 JSON 序列化。
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from _django import setup
+
+setup()
+
+from novel_platform.services import chapter_toc  # noqa: E402
+from novel_platform.views import calculate_chapter_cost  # noqa: E402
+
+WORK_ID = 1
+_LEGACY_SQL = """
+    SELECT chapter_id, title, content, intro, word_count, is_free, status,
+           chapter_order, create_time, publish_time
+    FROM chapters
+    WHERE work_id = ?
+    ORDER BY chapter_order ASC, create_time ASC
+"""
+
+
+class SQLiteCursor:
+    """把 %s 占位符转换为 sqlite3 的 ?"""
+
+    def __init__(self, connection):
+        self.cursor = connection.cursor()
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql.replace('%s', '?'), params)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+
+def build_database(chapters, chars, seed):
+    rng = random.Random(seed)
+    connection = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+    connection.execute("""
+        CREATE TABLE chapters (
+            chapter_id INTEGER PRIMARY KEY, work_id INTEGER, title TEXT, content TEXT, intro TEXT,
+            word_count INTEGER, is_free INTEGER, status INTEGER, chapter_order INTEGER,
+            create_time TIMESTAMP, publish_time TIMESTAMP
+        )
+    """)
+    connection.execute("CREATE INDEX idx_work ON chapters (work_id, chapter_order)")
+    base = datetime(2025, 1, 1)
+    rows = []
+    for order in range(1, chapters + 1):
+        created = base + timedelta(hours=order)
+        status_value = 1 if order < chapters - 5 else 0
+        rows.append((
+            order, WORK_ID, f'第{order}章', '正' * chars, f'第{order}章简介', chars,
+            1 if order <= 20 else 0, status_value, order, created,
+            created + timedelta(minutes=rng.randint(1, 60)) if status_value == 1 else None,
+        ))
+    connection.executemany("INSERT INTO chapters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    connection.commit()
+    return connection
+
+
+def legacy_payload(cursor):
+    cursor.execute(_LEGACY_SQL, [WORK_ID])
+    chapters = []
+    for row in cursor.fetchall():
+        chapters.append({
+            'chapter_id': row[0],
+            'title': row[1],
+            'content': row[2],
+            'intro': row[3],
+            'word_count': row[4] or 0,
+            'is_free': bool(row[5]),
+            'status': row[6],
+            'chapter_order': row[7],
+            'create_time': row[8].isoformat() if row[8] else None,
+            'publish_time': row[9].isoformat() if row[9] else None,
+            'cost': calculate_chapter_cost(row[4] or 0),
+            'is_subscribed': True,
+        })
+    return json.dumps({'success': True, 'chapters': chapters}, ensure_ascii=False).encode('utf-8')
+
+
+def toc_payload(cursor):
+    version, toc = chapter_toc.get_toc(cursor, WORK_ID, include_unpublished=True)
+    chapters = []
+    for entry in toc:
+        chapter = dict(entry)
+        chapter['cost'] = calculate_chapter_cost(chapter['word_count'])
+        chapter['is_subscribed'] = True
+        chapters.append(chapter)
+    return json.dumps({'success': True, 'chapters': chapters, 'toc_version': version},
+                      ensure_ascii=False).encode('utf-8')
+
+
+def measure(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chapters', type=int, default=2000)
+    parser.add_argument('--chars', type=int, default=3000, help='每章正文字数')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    cursor = SQLiteCursor(build_database(args.chapters, args.chars, args.seed))
+
+    legacy_ms, legacy_body = measure(lambda: legacy_payload(cursor), args.repeat)
+
+    def cold():
+        chapter_toc.invalidate(WORK_ID)
+        return toc_payload(cursor)
+
+    cold_ms, toc_body = measure(cold, args.repeat)
+    warm_ms, _ = measure(lambda: toc_payload(cursor), args.repeat)
+
+    print(f'{args.chapters} 章 × {args.chars} 字')
+    print(f"{'方式':<14} {'响应大小':>12} {'耗时(ms)':>10}")
+    print(f"{'旧列表(含正文)':<14} {len(legacy_body) / 1024:>10.1f}KB {legacy_ms:>10.1f}")
+    print(f"{'目录(未命中)':<14} {len(toc_body) / 1024:>10.1f}KB {cold_ms:>10.1f}")
+    print(f"{'目录(命中)':<14} {len(toc_body) / 1024:>10.1f}KB {warm_ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""相似作品构建基准：合成读者×作品交互，测量 build_neighbors 的耗时与峰值内存
+
+用法：
+    python benchmarks/bench_co_reading.py --readers 1000000 --works 100000 --mean-works 8 --workers 4
+
+不依赖 MySQL：交互数据直接在内存中生成，作品热度服从 Zipf 分布，每位读者读过的作品数服从几何分布。
+峰值内存取 ru_maxrss，主进程与子进程分别统计（子进程为各自峰值中的最大值）。
+"""
+import argparse
+import resource
+import sys
+import time
+
+import numpy as np
+
+from _django import setup
+
+setup()
+
+from novel_platform.services.co_reading import build_neighbors  # noqa: E402
+
+
+def peak_memory_mb():
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def synthesize(readers, works, mean_works, zipf_exponent, seed):
+    rng = np.random.default_rng(seed)
+    per_reader = rng.geometric(1.0 / mean_works, size=readers)
+    reader_ids = np.repeat(np.arange(1, readers + 1, dtype=np.int64), per_reader)
+    weights = 1.0 / np.arange(1, works + 1, dtype=np.float64) ** zipf_exponent
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    work_ids = np.searchsorted(cdf, rng.random(reader_ids.size)).astype(np.int64) + 1
+    return reader_ids, work_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=1000000)
+    parser.add_argument('--works', type=int, default=100000)
+    parser.add_argument('--mean-works', type=float, default=8.0, help='每位读者平均读过的作品数')
+    parser.add_argument('--zipf', type=float, default=0.9, help='作品热度 Zipf 指数')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    reader_ids, work_ids = synthesize(args.readers, args.works, args.mean_works, args.zipf, args.seed)
+    generate_seconds = time.perf_counter() - started
+    own_mb, _ = peak_memory_mb()
+    print(f'合成交互 {reader_ids.size} 条（{args.readers} 读者 × {args.works} 作品），'
+          f'耗时 {generate_seconds:.1f}s，内存 {own_mb:.0f}MB')
+
+    started = time.perf_counter()
+    work_col, _, _, co_col, _ = build_neighbors(reader_ids, work_ids, top_k=args.top_k, workers=args.workers)
+    build_seconds = time.perf_counter() - started
+    own_mb, children_mb = peak_memory_mb()
+
+    covered = np.unique(work_col).size
+    print(f'相似作品 {work_col.size} 行，覆盖作品 {covered} 部，平均共同读者 {co_col.mean() if co_col.size else 0:.1f}')
+    print(f'构建耗时 {build_seconds:.1f}s，峰值内存 主进程 {own_mb:.0f}MB / 子进程 {children_mb:.0f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""条件请求基准：同一读者重复打开章节时，完整读取与 304 短路两条路径的响应大小和每次请求耗时
+
+用法：
+    python benchmarks/bench_conditional_get.py --chapters 200 --chars 3000 --views 2000
+
+不依赖 MySQL：章节、正文存储与订阅表建在内存 SQLite 中（参数占位符转换为 ?）。
+两条路径都执行 章节元数据查询 + 订阅校验；完整读取额外读取并解码正文、组装与 JSON 序列化，
+304 路径只计算校验值并生成空响应。耗时不含网络传输，节省的带宽见响应大小一列。
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from _django import setup
+
+setup()
+
+from django.test import RequestFactory  # noqa: E402
+
+from novel_platform.services import chapter_bodies, conditional  # noqa: E402
+
+WORK_ID = 1
+USER_ID = 7
+
+_META_SQL = """
+    SELECT ch.chapter_id, ch.title, ch.intro, ch.word_count, ch.is_free, ch.status,
+           ch.chapter_order, ch.create_time, ch.publish_time, ch.update_time, cb.content_hash
+    FROM chapters ch
+    LEFT JOIN chapter_bodies cb ON cb.chapter_id = ch.chapter_id
+    WHERE ch.chapter_id = %s AND ch.work_id = %s
+"""
+_SUBSCRIPTION_SQL = """
+    SELECT 1 FROM subscriptions
+    WHERE reader_id = %s AND work_id = %s AND (chapter_id = %s OR chapter_id IS NULL)
+    LIMIT 1
+"""
+
+
+class SQLiteCursor:
+    """把 %s 占位符转换为 sqlite3 的 ?"""
+
+    def __init__(self, connection):
+        self.cursor = connection.cursor()
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql.replace('%s', '?'), params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+
+def build_database(chapters, chars, seed):
+    rng = random.Random(seed)
+    connection = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+    connection.executescript("""
+        CREATE TABLE chapters (
+            chapter_id INTEGER PRIMARY KEY, work_id INTEGER, title TEXT, content TEXT, intro TEXT,
+            word_count INTEGER, is_free INTEGER, status INTEGER, chapter_order INTEGER,
+            create_time TIMESTAMP, publish_time TIMESTAMP, update_time TIMESTAMP
+        );
+        CREATE TABLE chapter_bodies (
+            chapter_id INTEGER PRIMARY KEY, codec TEXT, storage INTEGER, body BLOB,
+            content_hash TEXT, raw_size INTEGER, stored_size INTEGER, update_time TIMESTAMP
+        );
+        CREATE TABLE subscriptions (
+            subscription_id INTEGER PRIMARY KEY, reader_id INTEGER, work_id INTEGER, chapter_id INTEGER
+        );
+        CREATE INDEX idx_sub ON subscriptions (reader_id, work_id, chapter_id);
+    """)
+    cursor = SQLiteCursor(connection)
+    base = datetime(2025, 1, 1)
+    alphabet = '天地玄黄宇宙洪荒日月盈昃辰宿列张寒来暑往秋收冬藏，。！？'
+    for order in range(1, chapters + 1):
+        created = base + timedelta(hours=order)
+        content = ''.join(rng.choice(alphabet) for _ in range(chars))
+        connection.execute(
+            "INSERT INTO chapters VALUES (?, ?, ?, '', ?, ?, ?, 1, ?, ?, ?, ?)",
+            (order, WORK_ID, f'第{order}章', f'第{order}章简介', chars, 1 if order <= 20 else 0,
+             order, created, created, created)
+        )
+        codec, blob, raw_size, content_hash = chapter_bodies.encode(content)
+        connection.execute(
+            "INSERT INTO chapter_bodies VALUES (?, ?, 0, ?, ?, ?, ?, ?)",
+            (order, codec, blob, content_hash, raw_size, len(blob), created)
+        )
+        # 读者订阅了一半的付费章节
+        if order > 20 and order % 2 == 0:
+            cursor.execute("INSERT INTO subscriptions (reader_id, work_id, chapter_id) VALUES (%s, %s, %s)",
+                           [USER_ID, WORK_ID, order])
+    connection.commit()
+    return cursor
+
+
+def read_chapter(cursor, request, chapter_id):
+    """与 update_chapter 的 GET 分支相同的步骤，返回 (状态码, 响应字节数)"""
+    cursor.execute(_META_SQL, [chapter_id, WORK_ID])
+    row = cursor.fetchone()
+    is_free = bool(row[4])
+    is_subscribed = False
+    if not is_free:
+        cursor.execute(_SUBSCRIPTION_SQL, [USER_ID, WORK_ID, chapter_id])
+        is_subscribed = cursor.fetchone() is not None
+    can_read = is_free or is_subscribed
+
+    etag = conditional.make_etag('chapter', chapter_id, row[9].isoformat(), row[10] or '', False, can_read, is_subscribed)
+    last_modified = row[9] if is_free else None
+    if request is not None:
+        cached = conditional.not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached.status_code, 0
+
+    payload = {
+        'success': True,
+        'chapter': {
+            'chapter_id': row[0],
+            'title': row[1],
+            'content': chapter_bodies.load_body(cursor, chapter_id) if can_read else '',
+            'intro': row[2],
+            'word_count': row[3],
+            'is_free': is_free,
+            'status': row[5],
+            'chapter_order': row[6],
+            'create_time': row[7].isoformat(),
+            'publish_time': row[8].isoformat(),
+        },
+        'is_author': False,
+        'is_subscribed': is_subscribed,
+        'can_read': can_read,
+    }
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    return 200, len(body), etag
+
+
+def measure(func, views, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = [func(chapter_id) for chapter_id in views]
+        timings.append((time.perf_counter() - started) * 1e6 / max(1, len(views)))
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chapters', type=int, default=200)
+    parser.add_argument('--chars', type=int, default=3000, help='每章正文字数')
+    parser.add_argument('--views', type=int, default=2000, help='重复打开章节的次数')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    cursor = build_database(args.chapters, args.chars, args.seed)
+    rng = random.Random(args.seed)
+    # 重复阅读集中在最近追读的少数章节
+    recent = list(range(max(1, args.chapters - 20), args.chapters + 1))
+    views = [rng.choice(recent) for _ in range(args.views)]
+
+    full_us, full_results = measure(lambda chapter_id: read_chapter(cursor, None, chapter_id), views, args.repeat)
+    etags = {chapter_id: result[2] for chapter_id, result in zip(views, full_results)}
+
+    factory = RequestFactory()
+    requests = {
+        chapter_id: factory.get(f'/api/works/{WORK_ID}/chapters/{chapter_id}/', HTTP_IF_NONE_MATCH=etag)
+        for chapter_id, etag in etags.items()
+    }
+    cached_us, cached_results = measure(
+        lambda chapter_id: read_chapter(cursor, requests[chapter_id], chapter_id), views, args.repeat
+    )
+
+    full_bytes = sum(result[1] for result in full_results)
+    not_modified = sum(1 for result in cached_results if result[0] == 304)
+    print(f'{args.chapters} 章 × {args.chars} 字，重复打开 {args.views} 次（304 命中 {not_modified} 次）')
+    print(f"{'方式':<12} {'响应体合计':>12} {'每次耗时(µs)':>14}")
+    print(f"{'完整读取':<12} {full_bytes / 1048576:>10.1f}MB {full_us:>14.1f}")
+    print(f"{'304 短路':<12} {0:>10.1f}MB {cached_us:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
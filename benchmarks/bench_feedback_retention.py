@@ -0,0 +1,114 @@
+"""推荐反馈写入基准：对比写路径内联删除过期记录与改由后台分批清理时 record_recommendation_feedback 的吞吐
+
+用法：
+    python benchmarks/bench_feedback_retention.py --user-id 1 --work-id 1 --requests 2000 --history 5000
+
+需要已初始化的 MySQL 数据库。脚本先为该用户写入 --history 条超过保留期的反馈（work_id 取自现有作品），
+inline 轮在每次请求后执行原实现的范围删除，background 轮只做 upsert，最后用 prune_expired_feedback 清理并输出删除行数。
+"""
+import argparse
+import time
+
+from _django import setup
+
+setup()
+
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from novel_platform import views  # noqa: E402
+from novel_platform.services.feedback_retention import (  # noqa: E402
+    feedback_retention_config,
+    prune_expired_feedback,
+    retention_cutoff,
+)
+
+SEED_BATCH = 1000
+
+
+def seed_expired(cursor, user_id, total, retention_days):
+    cursor.execute("SELECT work_id FROM works ORDER BY work_id LIMIT %s", [total])
+    work_ids = [row[0] for row in cursor.fetchall()]
+    if not work_ids:
+        raise SystemExit('works 表为空，无法生成反馈记录')
+    expired_time = retention_cutoff(retention_days + 1)
+    rows = []
+    # 唯一键为 (user_id, work_id, event_type)，作品不足时轮换事件类型
+    for index in range(total):
+        rows.append((user_id, work_ids[index % len(work_ids)], 1 + (index // len(work_ids)) % 6, expired_time))
+    rows = list(dict.fromkeys(rows))
+    for start in range(0, len(rows), SEED_BATCH):
+        chunk = rows[start:start + SEED_BATCH]
+        cursor.execute(
+            f"""
+            INSERT IGNORE INTO user_recommendation_feedback (user_id, work_id, event_type, weight, event_time)
+            VALUES {', '.join(['(%s, %s, %s, 1, %s)'] * len(chunk))}
+            """,
+            [value for row in chunk for value in row]
+        )
+    return len(rows)
+
+
+def legacy_delete(user_id, retention_days):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM user_recommendation_feedback WHERE user_id = %s AND event_time < %s",
+            [user_id, retention_cutoff(retention_days)]
+        )
+
+
+def run_round(factory, token, args, inline_delete):
+    retention_days = int(feedback_retention_config()['RETENTION_DAYS'])
+    with connection.cursor() as cursor:
+        seeded = seed_expired(cursor, args.user_id, args.history, retention_days)
+
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            request = factory.post(
+                '/api/recommendations/feedback/',
+                {'work_id': args.work_id, 'event': 'click'},
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+            response = views.record_recommendation_feedback(request)
+            if response.status_code != 200:
+                raise SystemExit(f'unexpected status {response.status_code}: {response.data}')
+            if inline_delete:
+                legacy_delete(args.user_id, retention_days)
+        elapsed = time.perf_counter() - started
+    return seeded, elapsed, len(ctx.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--role', type=int, default=1)
+    parser.add_argument('--work-id', type=int, required=True)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--history', type=int, default=5000)
+    args = parser.parse_args()
+
+    token = views.generate_token(args.user_id, args.role)
+    factory = RequestFactory()
+
+    results = {}
+    for label, inline_delete in (('inline', True), ('background', False)):
+        seeded, elapsed, queries = run_round(factory, token, args, inline_delete)
+        results[label] = args.requests / elapsed
+        print(
+            f'{label:>10}: {results[label]:8.1f} req/s   '
+            f'{queries / args.requests:5.2f} queries/req   seeded {seeded} expired rows'
+        )
+
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        pruned, batches = prune_expired_feedback(cursor)
+    elapsed = time.perf_counter() - started
+    print(f'prune job : {pruned} rows in {batches} batches, {elapsed:.2f} s')
+    print(f'throughput gained on the feedback endpoint: {results["background"] / results["inline"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
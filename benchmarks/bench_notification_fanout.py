@@ -0,0 +1,129 @@
+"""章节更新通知扇出基准：对比逐条 INSERT 与事件入队 + 分批写入的耗时
+
+用法：
+    python benchmarks/bench_notification_fanout.py --work-id 1 --followers 100000
+
+需要已初始化的 MySQL 数据库，--work-id 对应已存在的作品。脚本会创建 bench_fanout_ 前缀的临时读者并收藏该作品，
+结束后删除这些账号（级联删除收藏与消息）。输出：
+  - legacy：原实现在作者请求内逐个读者调用 _create_message 的耗时（--skip-legacy 可跳过）
+  - enqueue：新实现作者请求内登记事件的耗时
+  - worker：后台按批写入全部消息的耗时与吞吐
+"""
+import argparse
+import time
+
+from _django import setup
+
+setup()
+
+from django.db import connection  # noqa: E402
+
+from novel_platform import views  # noqa: E402
+from novel_platform.services.notifications import (  # noqa: E402
+    deliver_event,
+    enqueue_chapter_published,
+    notifications_config,
+)
+
+USERNAME_PREFIX = 'bench_fanout_'
+SEED_BATCH = 2000
+
+
+def seed_followers(cursor, work_id, total):
+    for start in range(0, total, SEED_BATCH):
+        names = [f'{USERNAME_PREFIX}{index}' for index in range(start, min(start + SEED_BATCH, total))]
+        cursor.execute(
+            f"INSERT INTO users (username, password, role, status) VALUES {', '.join(['(%s, %s, 1, 1)'] * len(names))}",
+            [value for name in names for value in (name, 'x')]
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO readers (reader_id, nickname)
+            SELECT user_id, username FROM users WHERE username IN ({', '.join(['%s'] * len(names))})
+            """,
+            names
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO collections (reader_id, work_id)
+            SELECT user_id, %s FROM users WHERE username IN ({', '.join(['%s'] * len(names))})
+            """,
+            [work_id] + names
+        )
+    cursor.execute("SELECT user_id FROM users WHERE username LIKE %s ORDER BY user_id", [USERNAME_PREFIX + '%'])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def cleanup(cursor, event_ids):
+    if event_ids:
+        cursor.execute(
+            f"DELETE FROM notification_events WHERE event_id IN ({', '.join(['%s'] * len(event_ids))})",
+            event_ids
+        )
+    while True:
+        cursor.execute("DELETE FROM users WHERE username LIKE %s LIMIT 5000", [USERNAME_PREFIX + '%'])
+        if cursor.rowcount == 0:
+            break
+
+
+def delete_messages(cursor, content):
+    while True:
+        cursor.execute("DELETE FROM messages WHERE content = %s LIMIT 10000", [content])
+        if cursor.rowcount == 0:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--work-id', type=int, required=True)
+    parser.add_argument('--followers', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--skip-legacy', action='store_true')
+    args = parser.parse_args()
+    batch_size = args.batch_size or int(notifications_config()['BATCH_SIZE'])
+    lease_seconds = int(notifications_config()['LEASE_SECONDS'])
+    content = f'benchmark fan-out for work {args.work_id}'
+    event_ids = []
+
+    with connection.cursor() as cursor:
+        try:
+            started = time.perf_counter()
+            follower_ids = seed_followers(cursor, args.work_id, args.followers)
+            print(f'seeded {len(follower_ids)} followers in {time.perf_counter() - started:.1f} s')
+
+            if not args.skip_legacy:
+                started = time.perf_counter()
+                for recipient_id in follower_ids:
+                    views._create_message(
+                        recipient_id=recipient_id,
+                        message_type=views.MESSAGE_TYPE_WORK_UPDATE,
+                        content=content,
+                        related_type=3
+                    )
+                elapsed = time.perf_counter() - started
+                print(f'legacy : {elapsed:8.2f} s in the author request ({len(follower_ids) / elapsed:9.0f} msg/s)')
+                delete_messages(cursor, content)
+
+            started = time.perf_counter()
+            cursor.execute("START TRANSACTION")
+            event_id = enqueue_chapter_published(
+                cursor, args.work_id, None, content, views.MESSAGE_TYPE_WORK_UPDATE
+            )
+            cursor.execute("COMMIT")
+            event_ids.append(event_id)
+            print(f'enqueue: {(time.perf_counter() - started) * 1000:8.2f} ms in the author request')
+
+            started = time.perf_counter()
+            delivered = deliver_event(cursor, event_id, batch_size, lease_seconds)
+            elapsed = time.perf_counter() - started
+            print(
+                f'worker : {elapsed:8.2f} s in background, {delivered} messages, '
+                f'batch {batch_size} ({delivered / elapsed:9.0f} msg/s)'
+            )
+            delete_messages(cursor, content)
+        finally:
+            cleanup(cursor, event_ids)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""离线下载包基准：对比一次性组装整个下载包与分批流式生成的峰值内存、生成耗时，以及命中缓存文件时的发送耗时
+
+用法：
+    python benchmarks/bench_offline_bundles.py --chapters 1000 --chars 3000 --batch-size 50
+
+不依赖 MySQL：章节正文存储建在内存 SQLite 中（参数占位符转换为 ?），生成器使用的数据库连接替换为该 SQLite 连接。
+峰值内存由 tracemalloc 统计（开启后耗时偏高，耗时单独测量）。
+"""
+import argparse
+import gzip
+import json
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from _django import setup
+
+setup()
+
+from django.test import override_settings  # noqa: E402
+
+from novel_platform.services import chapter_bodies, offline_bundles  # noqa: E402
+
+WORK_ID = 1
+
+
+class SQLiteCursor:
+    """把 %s 占位符转换为 sqlite3 的 ?，并支持 with 语句"""
+
+    def __init__(self, connection):
+        self.cursor = connection.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql.replace('%s', '?'), params)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+
+class SQLiteConnection:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def cursor(self):
+        return SQLiteCursor(self.connection)
+
+
+def build_database(chapters, chars, seed):
+    rng = random.Random(seed)
+    connection = sqlite3.connect(':memory:')
+    connection.execute("""
+        CREATE TABLE chapter_bodies (
+            chapter_id INTEGER PRIMARY KEY, codec TEXT, storage INTEGER, body BLOB,
+            content_hash TEXT, raw_size INTEGER, stored_size INTEGER, update_time TIMESTAMP
+        )
+    """)
+    alphabet = '天地玄黄宇宙洪荒日月盈昃辰宿列张寒来暑往秋收冬藏，。！？'
+    toc = []
+    for order in range(1, chapters + 1):
+        content = ''.join(rng.choice(alphabet) for _ in range(chars))
+        codec, blob, raw_size, content_hash = chapter_bodies.encode(content)
+        connection.execute(
+            "INSERT INTO chapter_bodies VALUES (?, ?, 0, ?, ?, ?, ?, NULL)",
+            (order, codec, blob, content_hash, raw_size, len(blob))
+        )
+        toc.append({
+            'chapter_id': order, 'title': f'第{order}章', 'chapter_order': order,
+            'word_count': chars, 'is_free': order <= 20, 'publish_time': None,
+        })
+    connection.commit()
+    return connection, toc
+
+
+def buffered_bundle(connection, header, chapters):
+    """旧做法：一次读取全部正文，在内存中拼出完整的 NDJSON 再整体压缩"""
+    with connection.cursor() as cursor:
+        bodies = chapter_bodies.load_bodies(cursor, [chapter['chapter_id'] for chapter in chapters])
+    lines = [json.dumps(header, ensure_ascii=False)]
+    for chapter in chapters:
+        lines.append(json.dumps({'type': 'chapter', **chapter, 'content': bodies[chapter['chapter_id']]},
+                                ensure_ascii=False))
+    return gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'), compresslevel=6)
+
+
+def streamed_bundle(header, chapters, batch_size):
+    size = 0
+    for chunk in offline_bundles.generate_bundle(header, chapters, batch_size=batch_size):
+        size += len(chunk)
+    return size
+
+
+def cached_bundle(path):
+    size = 0
+    with offline_bundles.open_cached_bundle(path) as handle:
+        while True:
+            block = handle.read(8192)
+            if not block:
+                return size
+            size += len(block)
+
+
+def profile(func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chapters', type=int, default=1000)
+    parser.add_argument('--chars', type=int, default=3000, help='每章正文字数')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    connection, toc = build_database(args.chapters, args.chars, args.seed)
+    offline_bundles.connection = SQLiteConnection(connection)
+    header = {'type': 'work', 'work_id': WORK_ID, 'chapter_count': len(toc)}
+
+    print(f'{args.chapters} 章 × {args.chars} 字，每批 {args.batch_size} 章')
+    print(f"{'方式':<14} {'下载包大小':>10} {'耗时(ms)':>10} {'峰值内存':>10}")
+
+    buffered_ms, buffered_peak, buffered = profile(
+        lambda: buffered_bundle(offline_bundles.connection, header, toc)
+    )
+    print(f"{'一次性组装':<14} {len(buffered) / 1048576:>8.1f}MB {buffered_ms:>10.1f} "
+          f"{buffered_peak / 1048576:>8.1f}MB")
+
+    streamed_ms, streamed_peak, streamed_size = profile(lambda: streamed_bundle(header, toc, args.batch_size))
+    print(f"{'分批流式生成':<14} {streamed_size / 1048576:>8.1f}MB {streamed_ms:>10.1f} "
+          f"{streamed_peak / 1048576:>8.1f}MB")
+
+    with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+        path = offline_bundles.bundle_path(WORK_ID, 'bench')
+        for _ in offline_bundles.caching_stream(offline_bundles.generate_bundle(header, toc), path):
+            pass
+        cached_ms, cached_peak, cached_size = profile(lambda: cached_bundle(path))
+    print(f"{'命中缓存文件':<14} {cached_size / 1048576:>8.1f}MB {cached_ms:>10.1f} "
+          f"{cached_peak / 1048576:>8.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""推荐候选打分基准：逐条字典打分（原 _score_work_for_preferences）与列式向量化打分的耗时对比
+
+用法：
+    python benchmarks/bench_rec_scoring.py --pools 60,1000,10000,50000 --repeat 5
+
+不依赖 MySQL：候选作品在内存中合成。逐条路径的输入是推荐卡片字典（与 _serialize_work_row 一致），
+向量化路径分别统计由数据库行构造列（from_rows，对应 fetch_candidate_columns 的查询结果）
+与由同一批字典构造列（from_works）两种情况。
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from _django import setup
+
+setup()
+
+from novel_platform.services.rec_scoring import CandidateColumns, score_candidates, top_work_ids  # noqa: E402
+from novel_platform.services.tags import normalize_tag  # noqa: E402
+
+TAG_POOL = ['玄幻', '仙侠', '都市', '历史', '科幻', '悬疑', '言情', '游戏', '武侠', '轻小说', '系统', '重生',
+            'Fantasy', 'Romance', 'Mystery', 'LitRPG']
+LIMIT = 9
+
+
+def legacy_score(work, category_scores, tag_scores):
+    """原 views._score_work_for_preferences 的实现"""
+    score = category_scores.get(int(work.get('category_id') or 0), 0.0)
+    tag_score = 0.0
+    for tag in work.get('tags') or []:
+        normalized = normalize_tag(tag)
+        if normalized in tag_scores:
+            tag_score += tag_scores[normalized]
+    score += tag_score
+
+    score += min(work.get('vote_count', 0) / 5.0, 20)
+    score += min(work.get('collect_count', 0) / 10.0, 15)
+    score += min(work.get('read_count', 0) / 2000.0, 15)
+
+    if work.get('update_time'):
+        try:
+            update_dt = datetime.fromisoformat(work['update_time'])
+            age_days = (datetime.utcnow() - update_dt).days
+            freshness_bonus = max(0, 10 - age_days)
+            score += freshness_bonus
+        except ValueError:
+            pass
+
+    return score
+
+
+def legacy_rank(works, category_scores, tag_scores):
+    scored = [(legacy_score(work, category_scores, tag_scores), work) for work in works]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [work['work_id'] for _, work in scored[:LIMIT]]
+
+
+def synthesize(size, seed):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    works, rows, tag_pairs = [], [], []
+    for work_id in range(1, size + 1):
+        tags = rng.sample(TAG_POOL, rng.randint(0, 4))
+        update_time = now - timedelta(seconds=rng.randint(0, 60 * 86400))
+        work = {
+            'work_id': work_id,
+            'category_id': rng.randint(1, 12),
+            'tags': tags,
+            'read_count': rng.randint(0, 200000),
+            'collect_count': rng.randint(0, 3000),
+            'vote_count': rng.randint(0, 500),
+            'update_time': update_time.isoformat(),
+        }
+        works.append(work)
+        # 数据库路径由 SQL 直接返回距上次更新的秒数
+        rows.append((work_id, work['category_id'], work['read_count'], work['collect_count'],
+                     work['vote_count'], (now - update_time).total_seconds()))
+        tag_pairs.extend((work_id, normalize_tag(tag)) for tag in tags)
+    category_scores = {category_id: rng.uniform(0, 30) for category_id in rng.sample(range(1, 13), 4)}
+    tag_scores = {normalize_tag(tag): rng.uniform(0, 15) for tag in rng.sample(TAG_POOL, 6)}
+    return works, rows, tag_pairs, category_scores, tag_scores
+
+
+def measure(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pools', default='60,1000,10000,50000', help='候选池大小，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{'候选数':>8} {'逐条(ms)':>10} {'列式-行(ms)':>12} {'列式-字典(ms)':>14} {'仅打分(ms)':>11} {'加速':>7}  结果一致")
+    for size in [int(value) for value in args.pools.split(',') if value.strip()]:
+        works, rows, tag_pairs, category_scores, tag_scores = synthesize(size, args.seed)
+
+        legacy_ms, legacy_ids = measure(lambda: legacy_rank(works, category_scores, tag_scores), args.repeat)
+
+        def vector_from_rows():
+            columns = CandidateColumns.from_rows(rows, tag_pairs)
+            return top_work_ids(columns, score_candidates(columns, category_scores, tag_scores), LIMIT)
+
+        def vector_from_works():
+            # 与逐条实现一致，按 UTC 当前时间计算更新天数
+            columns = CandidateColumns.from_works(works, normalize_tag, now=datetime.utcnow())
+            return top_work_ids(columns, score_candidates(columns, category_scores, tag_scores), LIMIT)
+
+        rows_ms, vector_ids = measure(vector_from_rows, args.repeat)
+        works_ms, _ = measure(vector_from_works, args.repeat)
+        prepared = CandidateColumns.from_rows(rows, tag_pairs)
+        score_ms, _ = measure(lambda: score_candidates(prepared, category_scores, tag_scores), args.repeat)
+
+        print(f"{size:>8} {legacy_ms:>10.2f} {rows_ms:>12.2f} {works_ms:>14.2f} {score_ms:>11.2f} "
+              f"{legacy_ms / rows_ms:>6.1f}x  {'是' if vector_ids == legacy_ids else '否'}")
+
+
+if __name__ == '__main__':
+    main()
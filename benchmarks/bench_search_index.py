@@ -0,0 +1,172 @@
+"""作品检索基准：对比 FTS5 倒排索引与四列 LIKE '%kw%' 扫描的 p50/p99 延迟
+
+用法：
+    python benchmarks/bench_search_index.py --works 100000 --queries 300
+
+不依赖 MySQL：作品表建在 SQLite 中（注册了与 MySQL 同名的 FIELD 函数）。
+LIKE 路径执行 COUNT + 分页查询；索引路径计时包含 search_works 的全部查询：
+FTS5 取候选、按候选筛选本页、候选内 COUNT、按 FIELD 排序取本页数据。
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from _django import ROOT_DIR
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from novel_platform.services.search_index import SearchIndex, build_document  # noqa: E402
+
+CHAR_POOL = (
+    '天地玄黄宇宙洪荒日月盈昃辰宿列张寒来暑往秋收冬藏龙虎风云剑仙魔神帝王'
+    '星辰大海山河万古长生逍遥修真问道凡人传说都市重生系统无敌少年江湖侠客'
+    '青云灵气丹药符箓阵法妖兽秘境宗门弟子掌门长老师父红尘情缘岁月浮生梦影'
+)
+TAG_POOL = ['玄幻', '仙侠', '都市', '历史', '科幻', '悬疑', '言情', '游戏', '武侠', '轻小说', '系统', '重生']
+PAGE_SIZE = 20
+
+
+def random_text(rng, min_len, max_len):
+    return ''.join(rng.choice(CHAR_POOL) for _ in range(rng.randint(min_len, max_len)))
+
+
+def build_corpus(total, seed):
+    rng = random.Random(seed)
+    authors = [random_text(rng, 2, 4) for _ in range(max(1, total // 20))]
+    corpus = []
+    for work_id in range(1, total + 1):
+        corpus.append((
+            work_id,
+            random_text(rng, 4, 10),
+            random_text(rng, 60, 200),
+            rng.choice(authors),
+            rng.sample(TAG_POOL, rng.randint(1, 3)),
+        ))
+    return corpus
+
+
+def build_queries(corpus, total, seed):
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(total):
+        _, title, intro, author, tags = rng.choice(corpus)
+        source = rng.choice((title, title, intro, author))
+        length = min(len(source), rng.randint(2, 4))
+        start = rng.randint(0, len(source) - length)
+        queries.append(source[start:start + length])
+    return queries
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def field(value, *candidates):
+    """MySQL FIELD()：返回 value 在候选中的位置（从 1 开始），不存在时为 0"""
+    try:
+        return candidates.index(value) + 1
+    except ValueError:
+        return 0
+
+
+def bench_like(conn, queries):
+    timings = []
+    for keyword in queries:
+        like_keyword = f'%{keyword}%'
+        params = [like_keyword] * 4
+        where = "status IN (1, 2) AND (title LIKE ? OR intro LIKE ? OR author LIKE ? OR tags LIKE ?)"
+        started = time.perf_counter()
+        conn.execute(f"SELECT COUNT(*) FROM works WHERE {where}", params).fetchone()
+        conn.execute(
+            f"SELECT work_id FROM works WHERE {where} ORDER BY update_time DESC LIMIT ?",
+            params + [PAGE_SIZE]
+        ).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def bench_index(index, conn, queries, max_candidates):
+    timings = []
+    for keyword in queries:
+        started = time.perf_counter()
+        candidates = index.search(keyword, limit=max_candidates + 1)[:max_candidates]
+        if candidates:
+            in_clause = f"work_id IN ({', '.join(['?'] * len(candidates))})"
+            kept = {
+                row[0] for row in conn.execute(
+                    f"SELECT work_id FROM works WHERE status IN (1, 2) AND {in_clause}", candidates
+                ).fetchall()
+            }
+            page_ids = [work_id for work_id in candidates if work_id in kept][:PAGE_SIZE + 1]
+            conn.execute(f"SELECT COUNT(*) FROM works WHERE status IN (1, 2) AND {in_clause}", candidates).fetchone()
+            if page_ids:
+                placeholders = ', '.join(['?'] * len(page_ids))
+                conn.execute(
+                    f"SELECT work_id, title, intro FROM works WHERE status IN (1, 2) AND work_id IN ({placeholders}) "
+                    f"ORDER BY FIELD(work_id, {placeholders}) LIMIT ?",
+                    page_ids + page_ids + [len(page_ids)]
+                ).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label, timings):
+    print(
+        f'{label:>6}: p50 {statistics.median(timings):8.2f} ms   '
+        f'p99 {percentile(timings, 99):8.2f} ms   '
+        f'mean {statistics.fmean(timings):8.2f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--works', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--max-candidates', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=20240601)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.works, args.seed)
+    queries = build_queries(corpus, args.queries, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        like_conn = sqlite3.connect(os.path.join(tmpdir, 'works.sqlite3'))
+        like_conn.execute(
+            "CREATE TABLE works (work_id INTEGER PRIMARY KEY, title TEXT, intro TEXT, author TEXT, tags TEXT, "
+            "status INTEGER, update_time INTEGER)"
+        )
+        like_conn.executemany(
+            "INSERT INTO works VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (work_id, title, intro, author, ','.join(tags), 0 if work_id % 10 == 0 else 1, work_id)
+                for work_id, title, intro, author, tags in corpus
+            ]
+        )
+        like_conn.commit()
+        like_conn.create_function('FIELD', -1, field, deterministic=True)
+
+        index = SearchIndex(os.path.join(tmpdir, 'search_index.sqlite3'))
+        started = time.perf_counter()
+        index.rebuild([
+            [(work_id, build_document(title, intro, [author], tags)) for work_id, title, intro, author, tags in corpus]
+        ])
+        build_seconds = time.perf_counter() - started
+
+        print(f'corpus: {args.works} works, {len(queries)} queries, index build {build_seconds:.1f} s')
+        report('like', bench_like(like_conn, queries))
+        report('fts5', bench_index(index, like_conn, queries, args.max_candidates))
+
+        like_conn.close()
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
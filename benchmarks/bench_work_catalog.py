@@ -0,0 +1,128 @@
+"""作品目录基准：测量进程内目录每部作品的内存占用、全量载入与增量刷新的耗时，以及内存查询的延迟
+
+用法：
+    python benchmarks/bench_work_catalog.py --works 100000 --changes 100,1000,10000 --repeat 5
+
+不依赖 MySQL：查询结果行在内存中合成（列与 work_catalog._CARD_COLUMNS 一致），
+载入耗时只包含目录构建，不含数据库往返。内存分别给出 tracemalloc 实测值（逐行生成并载入，
+只统计目录保留下来的部分）和 memory_bytes 估算值。
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from _django import setup
+
+setup()
+
+from novel_platform.services.work_catalog import WorkCatalog  # noqa: E402
+
+TAG_POOL = ['玄幻', '仙侠', '都市', '历史', '科幻', '悬疑', '言情', '游戏', '武侠', '轻小说', '系统', '重生']
+
+
+def iter_rows(size, authors, categories, intro_chars, seed):
+    """逐行生成，字符串每行各自分配，与数据库驱动返回的结果一致"""
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1)
+    for work_id in range(1, size + 1):
+        category_id = rng.randint(1, categories)
+        author_id = rng.randint(1, authors)
+        yield (
+            work_id, rng.choice((1, 1, 1, 2)), f'作品标题{work_id}', f'/media/covers/{work_id}.jpg',
+            f'{work_id}' + '简' * intro_chars, json.dumps(rng.sample(TAG_POOL, rng.randint(0, 4)), ensure_ascii=False),
+            category_id, f'分类{category_id}', author_id, f'作者{author_id}',
+            rng.randint(0, 200000), rng.randint(0, 3000), rng.randint(0, 500),
+            base + timedelta(seconds=rng.randint(0, 200 * 86400)),
+        )
+
+
+def changed_rows(rows, count, seed):
+    """模拟一个刷新周期内的变化：多数为阅读数增长，每 50 部中有一部下架"""
+    rng = random.Random(seed)
+    watermark = max(row[-1] for row in rows)
+    changes = []
+    for index, row in enumerate(rng.sample(rows, min(count, len(rows)))):
+        row = list(row)
+        row[10] += rng.randint(1, 50)
+        if index % 50 == 0:
+            row[1] = 0
+        row[-1] = watermark + timedelta(seconds=index % 30)
+        changes.append(tuple(row))
+    return changes
+
+
+def _load(rows):
+    catalog = WorkCatalog()
+    catalog.apply_rows(rows)
+    return catalog
+
+
+def measure(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--works', type=int, default=100000)
+    parser.add_argument('--authors', type=int, default=20000)
+    parser.add_argument('--categories', type=int, default=12)
+    parser.add_argument('--intro-chars', type=int, default=120, help='每部作品简介的字数')
+    parser.add_argument('--changes', default='100,1000,10000', help='每次增量刷新变化的作品数，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    catalog = WorkCatalog()
+    catalog.apply_rows(iter_rows(args.works, args.authors, args.categories, args.intro_chars, args.seed))
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = list(iter_rows(args.works, args.authors, args.categories, args.intro_chars, args.seed))
+    load_ms, catalog = measure(lambda: _load(rows), max(1, args.repeat // 2))
+
+    size = len(catalog)
+    estimated = catalog.memory_bytes()
+    print(f'上架作品 {size} 部（简介 {args.intro_chars} 字），全量构建 {load_ms:.0f}ms')
+    print(f'内存 实测 {traced / 1048576:.1f}MB（{traced / size:.0f} B/部），'
+          f'估算 {estimated / 1048576:.1f}MB（{estimated / size:.0f} B/部）')
+
+    rank_ms, _ = measure(lambda: (setattr(catalog, '_ranked', None), catalog._ranking()), args.repeat)
+    print(f'热度排行计算 {rank_ms:.1f}ms（每个快照一次）')
+
+    top_ms, _ = measure(lambda: catalog.top_work_ids(None, limit=9, exclude_ids={1, 2, 3}), args.repeat * 20)
+    cat_ms, _ = measure(lambda: catalog.top_work_ids([1, 2, 3], limit=9), args.repeat * 20)
+    pop_ms, _ = measure(lambda: catalog.top_categories(3), args.repeat * 20)
+    ids = catalog.top_work_ids(None, limit=30)
+    cards_ms, _ = measure(lambda: catalog.cards(ids), args.repeat * 20)
+    print(f'查询 全站热门 {top_ms:.3f}ms / 三个分类热门 {cat_ms:.3f}ms / 分类热度 {pop_ms:.3f}ms / '
+          f'30 张卡片 {cards_ms:.3f}ms')
+
+    print(f"{'变化作品':>8} {'复制(ms)':>9} {'应用(ms)':>9} {'重排(ms)':>9} {'合计(ms)':>9}")
+    for count in [int(value) for value in args.changes.split(',') if value.strip()]:
+        changes = changed_rows(rows, count, args.seed + count)
+        copy_ms, _ = measure(catalog.copy, args.repeat)
+
+        def apply_changes():
+            updated = catalog.copy()
+            updated.apply_rows(changes)
+            return updated
+
+        apply_ms, updated = measure(apply_changes, args.repeat)
+        apply_ms -= copy_ms
+        rerank_ms, _ = measure(lambda: (setattr(updated, '_ranked', None), updated._ranking()), args.repeat)
+        print(f'{count:>8} {copy_ms:>9.1f} {apply_ms:>9.1f} {rerank_ms:>9.1f} {copy_ms + apply_ms + rerank_ms:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
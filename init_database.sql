@@ -18,7 +18,8 @@ CREATE TABLE users (
     last_login_time DATETIME,
     INDEX idx_username (username),
     INDEX idx_phone (phone),
-    INDEX idx_email (email)
+    INDEX idx_email (email),
+    INDEX idx_user_create_time (create_time)
 );
 
 -- 管理员信息表
@@ -102,7 +103,8 @@ CREATE TABLE works (
     INDEX idx_author (author_id),
     INDEX idx_category (category_id),
     INDEX idx_status (status),
-    INDEX idx_create_time (create_time)
+    INDEX idx_create_time (create_time),
+    INDEX idx_update_time (update_time)
 );
 
 -- 作品管控记录表
@@ -121,6 +123,33 @@ CREATE TABLE work_moderations (
     FOREIGN KEY (updated_by) REFERENCES users(user_id) ON DELETE SET NULL
 );
 
+-- 作品标签索引表（由 works.tags 拆分，按规范化标签检索）
+CREATE TABLE work_tags (
+    tag_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    work_id BIGINT NOT NULL,
+    tag_norm VARCHAR(64) NOT NULL,
+    tag_display VARCHAR(64) NOT NULL,
+    UNIQUE KEY uniq_work_tag (work_id, tag_norm),
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    INDEX idx_work_tags_norm (tag_norm, work_id)
+);
+
+-- 相似作品表（build_work_neighbors 命令按共同读者离线计算，每部作品保留 Top-K）
+CREATE TABLE work_neighbors (
+    neighbor_row_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    work_id BIGINT NOT NULL,
+    neighbor_id BIGINT NOT NULL,
+    score DOUBLE NOT NULL,
+    co_readers INT NOT NULL DEFAULT 0,
+    position SMALLINT NOT NULL DEFAULT 0,
+    build_time DATETIME NOT NULL,
+    UNIQUE KEY uniq_work_neighbor (work_id, neighbor_id),
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    FOREIGN KEY (neighbor_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    INDEX idx_work_neighbors_rank (work_id, position),
+    INDEX idx_work_neighbors_build (build_time)
+);
+
 -- 管理员操作日志
 CREATE TABLE admin_action_logs (
     log_id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -136,7 +165,8 @@ CREATE TABLE admin_action_logs (
     FOREIGN KEY (admin_id) REFERENCES users(user_id) ON DELETE CASCADE,
     INDEX idx_admin_time (admin_id, create_time),
     INDEX idx_target (target_type, target_id),
-    INDEX idx_action_time (action, create_time)
+    INDEX idx_action_time (action, create_time),
+    INDEX idx_admin_log_create_time (create_time)
 );
 
 CREATE TABLE user_action_logs (
@@ -153,7 +183,8 @@ CREATE TABLE user_action_logs (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     INDEX idx_user_time (user_id, create_time),
     INDEX idx_action_time (action, create_time),
-    INDEX idx_target (target_type, target_id)
+    INDEX idx_target (target_type, target_id),
+    INDEX idx_user_log_create_time (create_time)
 );
 
 DELIMITER //
@@ -186,6 +217,20 @@ CREATE TABLE chapters (
     INDEX idx_status (status)
 );
 
+-- 章节正文表（压缩后与 chapters 元数据行分离存放；storage=1 时正文在 MEDIA_ROOT 下按内容哈希命名的文件中）
+CREATE TABLE chapter_bodies (
+    chapter_id BIGINT PRIMARY KEY,
+    codec VARCHAR(16) NOT NULL COMMENT 'zlib/zstd/raw',
+    storage TINYINT NOT NULL DEFAULT 0 COMMENT '0=表内，1=文件',
+    body LONGBLOB,
+    content_hash CHAR(64) NOT NULL COMMENT '原文 UTF-8 字节的 SHA-256',
+    raw_size INT NOT NULL DEFAULT 0,
+    stored_size INT NOT NULL DEFAULT 0,
+    update_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (chapter_id) REFERENCES chapters(chapter_id) ON DELETE CASCADE,
+    INDEX idx_chapter_bodies_hash (content_hash)
+);
+
 -- 收藏记录表
 CREATE TABLE collections (
     collection_id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -194,7 +239,8 @@ CREATE TABLE collections (
     collect_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     UNIQUE KEY unique_collection (reader_id, work_id),
     FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
-    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    INDEX idx_collection_work_reader (work_id, reader_id)
 );
 
 -- 阅读记录表
@@ -220,7 +266,8 @@ CREATE TABLE subscriptions (
     amount DECIMAL(8,2) NOT NULL,
     FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
     FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
-    FOREIGN KEY (chapter_id) REFERENCES chapters(chapter_id) ON DELETE SET NULL
+    FOREIGN KEY (chapter_id) REFERENCES chapters(chapter_id) ON DELETE SET NULL,
+    INDEX idx_subscription_work_reader (work_id, reader_id)
 );
 
 -- 投票记录表
@@ -238,6 +285,23 @@ CREATE TABLE votes (
     INDEX idx_work_time (work_id, vote_time)
 );
 
+-- 作品统计汇总表（由写路径增量维护，可通过 rebuild_work_stats 命令重建）
+CREATE TABLE work_stats (
+    work_id BIGINT PRIMARY KEY,
+    total_reads BIGINT NOT NULL DEFAULT 0 COMMENT '阅读记录数',
+    unique_readers INT NOT NULL DEFAULT 0 COMMENT '去重读者数',
+    collect_count INT NOT NULL DEFAULT 0 COMMENT '收藏数',
+    subscription_count INT NOT NULL DEFAULT 0 COMMENT '去重订阅读者数',
+    subscription_income DECIMAL(12,2) NOT NULL DEFAULT 0 COMMENT '订阅收入',
+    vote_count INT NOT NULL DEFAULT 0 COMMENT '月票数',
+    chapter_count INT NOT NULL DEFAULT 0 COMMENT '章节总数',
+    published_chapter_count INT NOT NULL DEFAULT 0 COMMENT '已发布章节数',
+    total_words BIGINT NOT NULL DEFAULT 0 COMMENT '已发布章节总字数',
+    update_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    INDEX idx_total_words (total_words)
+);
+
 -- 点券交易记录表
 CREATE TABLE point_transactions (
     transaction_id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -250,6 +314,17 @@ CREATE TABLE point_transactions (
     INDEX idx_user_time (user_id, create_time)
 );
 
+-- 月票钱包表
+CREATE TABLE user_tickets (
+    user_id BIGINT PRIMARY KEY,
+    ticket_balance INT NOT NULL DEFAULT 0,
+    progress DECIMAL(12,2) NOT NULL DEFAULT 0,
+    total_earned INT NOT NULL DEFAULT 0,
+    total_spent INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
 -- 搜索记录表
 CREATE TABLE search_records (
     search_id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -259,7 +334,8 @@ CREATE TABLE search_records (
     click_work_id BIGINT,
     search_type TINYINT NOT NULL DEFAULT 1 COMMENT '1=作品搜索，2=作者搜索，3=标签搜索',
     FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
-    FOREIGN KEY (click_work_id) REFERENCES works(work_id) ON DELETE SET NULL
+    FOREIGN KEY (click_work_id) REFERENCES works(work_id) ON DELETE SET NULL,
+    INDEX idx_reader_time (reader_id, search_time)
 );
 
 -- 用户推荐反馈表
@@ -274,10 +350,25 @@ CREATE TABLE user_recommendation_feedback (
     UNIQUE KEY uniq_user_work_event (user_id, work_id, event_type),
     INDEX idx_feedback_user_time (user_id, event_time),
     INDEX idx_feedback_user_event (user_id, event_type, event_time),
+    INDEX idx_feedback_event_time (event_time),
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE
 );
 
+-- 用户偏好画像表（分类/标签得分按半衰期衰减，写路径增量更新，decay_preference_profiles 命令定期落盘衰减）
+CREATE TABLE user_preference_profiles (
+    user_id BIGINT PRIMARY KEY,
+    category_scores TEXT NOT NULL COMMENT '分类得分(JSON)',
+    tag_scores TEXT NOT NULL COMMENT '标签得分(JSON)',
+    tag_labels TEXT NOT NULL COMMENT '标签原始写法(JSON)',
+    signal_count INT NOT NULL DEFAULT 0,
+    decayed_at DATETIME NOT NULL COMMENT '得分对应的衰减基准时间',
+    version INT NOT NULL DEFAULT 0,
+    update_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_profile_decayed_at (decayed_at)
+);
+
 -- 读者画像表
 CREATE TABLE reader_behavior_summary (
     summary_id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -319,7 +410,21 @@ CREATE TABLE comments (
     FOREIGN KEY (chapter_id) REFERENCES chapters(chapter_id) ON DELETE SET NULL,
     FOREIGN KEY (parent_id) REFERENCES comments(comment_id) ON DELETE CASCADE,
     INDEX idx_work (work_id),
-    INDEX idx_chapter (chapter_id)
+    INDEX idx_chapter (chapter_id),
+    INDEX idx_work_time (work_id, create_time)
+);
+
+-- 评论点赞表
+CREATE TABLE comment_likes (
+    like_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    comment_id BIGINT NOT NULL,
+    reader_id BIGINT NOT NULL,
+    like_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_comment_reader (comment_id, reader_id),
+    FOREIGN KEY (comment_id) REFERENCES comments(comment_id) ON DELETE CASCADE,
+    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
+    INDEX idx_comment (comment_id),
+    INDEX idx_reader (reader_id)
 );
 
 -- 签约信息表
@@ -376,6 +481,7 @@ CREATE TABLE ranking_details (
     score DECIMAL(10,2) NOT NULL,
     source_data TEXT NOT NULL,
     UNIQUE KEY unique_ranking (ranking_id, work_id, stat_date),
+    INDEX idx_ranking_date_rank (ranking_id, stat_date, `rank`),
     FOREIGN KEY (ranking_id) REFERENCES rankings(ranking_id) ON DELETE CASCADE,
     FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE
 );
@@ -395,7 +501,75 @@ CREATE TABLE messages (
     FOREIGN KEY (sender_id) REFERENCES users(user_id) ON DELETE SET NULL,
     FOREIGN KEY (recipient_id) REFERENCES users(user_id) ON DELETE CASCADE,
     INDEX idx_recipient (recipient_id),
-    INDEX idx_type (message_type)
+    INDEX idx_type (message_type),
+    INDEX idx_recipient_time (recipient_id, send_time)
+);
+
+-- 用户消息计数表（写路径增量维护，可通过 reconcile_message_counters 命令重新统计）
+CREATE TABLE user_message_counters (
+    counter_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    message_type INT NOT NULL,
+    total_count INT NOT NULL DEFAULT 0,
+    unread_count INT NOT NULL DEFAULT 0,
+    UNIQUE KEY unique_user_message_type (user_id, message_type),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- 作品更新广播表（每个章节更新只存一行，读取消息时按收藏/订阅关系合并）
+CREATE TABLE broadcast_messages (
+    broadcast_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    work_id BIGINT NOT NULL,
+    chapter_id BIGINT,
+    sender_id BIGINT,
+    message_type INT NOT NULL,
+    content TEXT NOT NULL,
+    send_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    INDEX idx_work_send_time (work_id, send_time)
+);
+
+-- 用户广播已读水位线（broadcast_id 不超过水位线的广播视为已读）
+CREATE TABLE user_broadcast_state (
+    user_id BIGINT PRIMARY KEY,
+    read_watermark BIGINT NOT NULL DEFAULT 0,
+    update_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- 用户对单条广播的已读/删除回执
+CREATE TABLE user_broadcast_receipts (
+    receipt_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    broadcast_id BIGINT NOT NULL,
+    is_read TINYINT NOT NULL DEFAULT 1,
+    is_deleted TINYINT NOT NULL DEFAULT 0,
+    UNIQUE KEY unique_user_broadcast (user_id, broadcast_id),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (broadcast_id) REFERENCES broadcast_messages(broadcast_id) ON DELETE CASCADE
+);
+
+-- 通知扇出事件表（写路径登记，run_notification_worker 按读者ID游标分批生成站内信）
+CREATE TABLE notification_events (
+    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL,
+    work_id BIGINT NOT NULL,
+    message_type INT NOT NULL,
+    content TEXT NOT NULL,
+    related_type TINYINT,
+    related_id BIGINT,
+    sender_id BIGINT,
+    exclude_ids TEXT COMMENT '不接收通知的用户ID列表(JSON)',
+    status TINYINT NOT NULL DEFAULT 0 COMMENT '0=待处理，1=处理中，2=已完成，3=失败',
+    last_recipient_id BIGINT NOT NULL DEFAULT 0 COMMENT '已投递到的读者ID游标',
+    delivered_count INT NOT NULL DEFAULT 0,
+    attempts INT NOT NULL DEFAULT 0,
+    locked_until DATETIME,
+    last_error TEXT,
+    create_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finish_time DATETIME,
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE,
+    INDEX idx_status_event (status, event_id)
 );
 
 -- 插入初始数据
@@ -4,3 +4,11 @@ class NovelPlatformConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'novel_platform'
 
+    def ready(self):
+        from .services.feedback_retention import start_pruning_timer
+        from .services.schema import install_schema_check
+        from .services.work_catalog import start_warmup
+
+        install_schema_check()
+        start_pruning_timer()
+        start_warmup()
@@ -4,6 +4,8 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.db import connection
 
+from .services.cache import TieredCache
+
 class User:
     """简单的用户类，用于Django REST Framework认证"""
     def __init__(self, user_id, username, role, status):
@@ -14,40 +16,104 @@ class User:
         self.is_authenticated = True
         self.is_anonymous = False
 
+
+_PRINCIPAL_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAX_ENTRIES': 10000,
+    'SHARED_TTL': 300,
+    'CACHE_ALIAS': 'default',
+}
+
+_principal_cache = None
+
+
+def _principal_cache_config():
+    config = dict(_PRINCIPAL_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'AUTH_PRINCIPAL_CACHE', {}) or {})
+    return config
+
+
+def get_principal_cache():
+    global _principal_cache
+    if _principal_cache is None:
+        config = _principal_cache_config()
+        _principal_cache = TieredCache(
+            'auth_principal',
+            local_ttl=config['LOCAL_TTL'],
+            local_max_entries=config['LOCAL_MAX_ENTRIES'],
+            shared_ttl=config['SHARED_TTL'],
+            cache_alias=config['CACHE_ALIAS'],
+        )
+    return _principal_cache
+
+
+def invalidate_cached_principal(user_id):
+    # 账号被禁用或权限调整后需要立即失效，避免继续使用旧的认证信息
+    if not user_id:
+        return
+    get_principal_cache().delete(int(user_id))
+
+
+def _load_principal(user_id):
+    # 使用原生SQL查询用户信息
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT user_id, username, role, status
+            FROM users
+            WHERE user_id = %s
+        """, [user_id])
+        return cursor.fetchone()
+
+
+def _get_principal(user_id):
+    if not _principal_cache_config()['ENABLED']:
+        return _load_principal(user_id)
+
+    try:
+        cache_key = int(user_id)
+    except (TypeError, ValueError):
+        return _load_principal(user_id)
+
+    cache = get_principal_cache()
+    user_data = cache.get(cache_key)
+    if user_data is not None:
+        return user_data
+
+    user_data = _load_principal(user_id)
+    if user_data:
+        # 只缓存存在的用户，禁用状态同样缓存以减少无效请求的查询
+        cache.set(cache_key, tuple(user_data))
+    return user_data
+
+
 class JWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
         token = request.META.get('HTTP_AUTHORIZATION')
         if not token:
             return None
-        
+
         if token.startswith('Bearer '):
             token = token[7:]
-        
+
         try:
             payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
             user_id = payload.get('user_id')
             if not user_id:
                 raise AuthenticationFailed('Invalid token')
-            
-            # 使用原生SQL查询用户信息
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT user_id, username, role, status 
-                    FROM users 
-                    WHERE user_id = %s
-                """, [user_id])
-                user_data = cursor.fetchone()
-                
-                if not user_data:
-                    raise AuthenticationFailed('User not found')
-                
-                if user_data[3] != 1:  # status != 1
-                    raise AuthenticationFailed('User account disabled')
-                
-                # 创建用户对象
-                user = User(user_data[0], user_data[1], user_data[2], user_data[3])
-                return (user, token)
-                
+
+            user_data = _get_principal(user_id)
+
+            if not user_data:
+                raise AuthenticationFailed('User not found')
+
+            if user_data[3] != 1:  # status != 1
+                raise AuthenticationFailed('User account disabled')
+
+            # 创建用户对象
+            user = User(user_data[0], user_data[1], user_data[2], user_data[3])
+            return (user, token)
+
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed('Token expired')
         except jwt.InvalidTokenError:
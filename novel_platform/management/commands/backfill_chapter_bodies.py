@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.chapter_bodies import backfill_chapter_bodies, prune_orphan_files
+
+
+class Command(BaseCommand):
+    help = '把 chapters.content 中的正文压缩迁移到正文存储（上线后执行一次，之后由章节创建/编辑接口写入）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='每批迁移的章节数量')
+        parser.add_argument('--clear-source', action='store_true',
+                            help='迁移后清空 chapters.content，释放元数据行占用的空间')
+        parser.add_argument('--prune-files', action='store_true',
+                            help='迁移结束后删除不再被引用的正文文件（STORAGE 为 files 时）')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        last_id = 0
+        migrated = raw_total = stored_total = 0
+
+        with connection.cursor() as cursor:
+            while True:
+                last_id, count, raw_size, stored_size = backfill_chapter_bodies(
+                    cursor, last_id, batch_size, clear_source=options['clear_source']
+                )
+                if last_id is None:
+                    break
+                migrated += count
+                raw_total += raw_size
+                stored_total += stored_size
+                self.stdout.write(f'chapter_bodies: 已处理至章节 ID {last_id}，迁移 {migrated} 章')
+
+            removed = prune_orphan_files(cursor) if options['prune_files'] else 0
+
+        ratio = raw_total / stored_total if stored_total else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'chapter_bodies 迁移完成，共 {migrated} 章，原文 {raw_total / 1048576:.1f}MB，'
+            f'存储 {stored_total / 1048576:.1f}MB（压缩比 {ratio:.2f}），删除孤立文件 {removed} 个'
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.policy import backfill_user_permissions, backfill_work_moderations
+
+
+class Command(BaseCommand):
+    help = '为缺少记录的用户和作品补齐默认的 user_permissions / work_moderations 行（已有记录不会被修改）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='每批处理的用户或作品数量')
+        parser.add_argument('--skip-users', action='store_true', help='不处理用户权限')
+        parser.add_argument('--skip-works', action='store_true', help='不处理作品管控')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        with connection.cursor() as cursor:
+            if not options['skip_users']:
+                inserted = self._run(cursor, backfill_user_permissions, batch_size, 'user_permissions')
+                self.stdout.write(self.style.SUCCESS(f'user_permissions 补齐 {inserted} 行'))
+            if not options['skip_works']:
+                inserted = self._run(cursor, backfill_work_moderations, batch_size, 'work_moderations')
+                self.stdout.write(self.style.SUCCESS(f'work_moderations 补齐 {inserted} 行'))
+
+    def _run(self, cursor, backfill, batch_size, table):
+        last_id = 0
+        total = 0
+        while True:
+            last_id, inserted = backfill(cursor, last_id, batch_size)
+            if last_id is None:
+                break
+            total += inserted
+            self.stdout.write(f'{table}: 已处理至 ID {last_id}，新增 {total} 行')
+        return total
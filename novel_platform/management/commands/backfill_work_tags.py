@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.work_tags import backfill_work_tags
+
+
+class Command(BaseCommand):
+    help = '按 works.tags 重建 work_tags 标签索引（上线后执行一次，之后由作品创建/编辑接口维护）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='每批处理的作品数量')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        last_id = 0
+        total = 0
+
+        with connection.cursor() as cursor:
+            while True:
+                last_id, inserted = backfill_work_tags(cursor, last_id, batch_size)
+                if last_id is None:
+                    break
+                total += inserted
+                self.stdout.write(f'work_tags: 已处理至作品 ID {last_id}，写入 {total} 行')
+
+        self.stdout.write(self.style.SUCCESS(f'work_tags 重建完成，共写入 {total} 行'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.work_stats import iter_work_id_batches, refresh_total_words
+
+
+class Command(BaseCommand):
+    help = '回填 work_stats.total_words（已发布章节总字数）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批回填的作品数量')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        total = 0
+        with connection.cursor() as cursor:
+            for batch in iter_work_id_batches(cursor, batch_size):
+                refresh_total_words(cursor, batch)
+                total += len(batch)
+                self.stdout.write(f'已处理 {total} 部作品（work_id <= {batch[-1]}）')
+
+        self.stdout.write(self.style.SUCCESS(f'总字数回填完成，共 {total} 部作品'))
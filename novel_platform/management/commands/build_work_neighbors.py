@@ -0,0 +1,50 @@
+import resource
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from novel_platform.services.co_reading import co_reading_config, run_co_reading
+
+
+def _peak_memory_mb():
+    # ru_maxrss 在 Linux 下单位为 KB，macOS 下为字节；子进程取各自峰值中的最大值
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / scale, children / scale
+
+
+class Command(BaseCommand):
+    help = '按收藏、订阅与阅读记录的共同读者计算相似作品，写入 work_neighbors，可通过 --loop 常驻定时运行'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='并行进程数，默认取 CO_READING 配置或 CPU 核数')
+        parser.add_argument('--top-k', type=int, default=None, help='每部作品保留的相似作品数')
+        parser.add_argument('--loop', action='store_true', help='常驻运行，按 --interval 间隔重复计算')
+        parser.add_argument('--interval', type=int, default=None, help='常驻模式下两轮计算的间隔秒数')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or int(co_reading_config()['INTERVAL_SECONDS'])
+
+        while True:
+            started = time.monotonic()
+            try:
+                stats = run_co_reading(workers=options['workers'], top_k=options['top_k'])
+                own_mb, children_mb = _peak_memory_mb()
+                self.stdout.write(self.style.SUCCESS(
+                    f"相似作品已更新：交互 {stats['interactions']} 条，作品 {stats['works']} 部，写入 {stats['rows']} 行；"
+                    f"读取 {stats['load_seconds']:.1f}s，计算 {stats['build_seconds']:.1f}s，写入 {stats['store_seconds']:.1f}s；"
+                    f"峰值内存 主进程 {own_mb:.0f}MB / 子进程 {children_mb:.0f}MB"
+                ))
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'相似作品计算失败：{exc}')
+            finally:
+                close_old_connections()
+
+            if not options['loop']:
+                break
+            time.sleep(max(1, interval - (time.monotonic() - started)))
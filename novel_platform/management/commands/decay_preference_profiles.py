@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from novel_platform.services.preference_profiles import decay_profiles, preference_profiles_config
+
+
+class Command(BaseCommand):
+    help = '把用户偏好画像的时间衰减写回 user_preference_profiles 并裁剪低分标签，可通过 --loop 常驻运行'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='常驻运行，按 --interval 间隔重复执行')
+        parser.add_argument('--interval', type=float, default=None, help='常驻模式下两轮之间的间隔秒数')
+        parser.add_argument('--batch-size', type=int, default=None, help='每批处理的画像数量')
+        parser.add_argument('--min-age', type=int, default=None, help='只处理超过该秒数未衰减的画像')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or float(preference_profiles_config()['DECAY_INTERVAL_SECONDS'])
+
+        while True:
+            started = time.monotonic()
+            try:
+                with connection.cursor() as cursor:
+                    updated = decay_profiles(cursor, options['batch_size'], options['min_age'])
+                elapsed = time.monotonic() - started
+                self.stdout.write(self.style.SUCCESS(f'已衰减 {updated} 个用户画像，耗时 {elapsed:.2f} 秒'))
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'画像衰减失败：{exc}')
+            finally:
+                close_old_connections()
+
+            if not options['loop']:
+                break
+            time.sleep(max(1.0, interval - (time.monotonic() - started)))
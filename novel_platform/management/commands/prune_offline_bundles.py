@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from novel_platform.services.offline_bundles import offline_bundle_config, prune_bundles
+
+
+class Command(BaseCommand):
+    help = '删除超过保留时间未被下载的离线下载包缓存文件（建议每天执行一次）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-hours', type=float, default=None,
+                            help='保留时间（小时），默认使用 OFFLINE_BUNDLE.MAX_AGE_SECONDS')
+
+    def handle(self, *args, **options):
+        if options['max_age_hours'] is None:
+            max_age_seconds = offline_bundle_config()['MAX_AGE_SECONDS']
+        else:
+            max_age_seconds = int(options['max_age_hours'] * 3600)
+        removed = prune_bundles(max_age_seconds)
+        self.stdout.write(self.style.SUCCESS(f'offline_bundles: 删除过期下载包 {removed} 个'))
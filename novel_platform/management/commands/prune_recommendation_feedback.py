@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from novel_platform.services.feedback_retention import feedback_retention_config, prune_expired_feedback
+
+
+class Command(BaseCommand):
+    help = '按保留期分批删除 user_recommendation_feedback 中的过期记录，可通过 --loop 常驻运行'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='常驻运行，按 --interval 间隔重复清理')
+        parser.add_argument('--interval', type=float, default=None, help='常驻模式下两轮之间的间隔秒数')
+        parser.add_argument('--retention-days', type=int, default=None, help='保留天数，默认读取 FEEDBACK_RETENTION 配置')
+        parser.add_argument('--batch-size', type=int, default=None, help='每批删除的行数')
+        parser.add_argument('--max-batches', type=int, default=None, help='每轮最多删除的批次数')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or float(feedback_retention_config()['INTERVAL_SECONDS'])
+
+        while True:
+            started = time.monotonic()
+            try:
+                with connection.cursor() as cursor:
+                    pruned, batches = prune_expired_feedback(
+                        cursor,
+                        retention_days=options['retention_days'],
+                        batch_size=options['batch_size'],
+                        max_batches=options['max_batches'],
+                    )
+                elapsed = time.monotonic() - started
+                rate = pruned / elapsed if elapsed > 0 else 0
+                self.stdout.write(self.style.SUCCESS(
+                    f'已删除 {pruned} 条过期推荐反馈（{batches} 批），耗时 {elapsed:.2f} 秒，{rate:.0f} 行/秒'
+                ))
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'推荐反馈清理失败：{exc}')
+            finally:
+                close_old_connections()
+
+            if not options['loop']:
+                break
+            time.sleep(max(1.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.message_counters import iter_user_id_batches
+from novel_platform.services.preference_profiles import rebuild_profile
+
+
+class Command(BaseCommand):
+    help = '根据收藏、阅读、投票、订阅与推荐反馈历史重建 user_preference_profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批读取的用户数量')
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids', help='仅重建指定用户，可重复传入')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        user_ids = options.get('user_ids')
+
+        with connection.cursor() as cursor:
+            if user_ids:
+                for user_id in user_ids:
+                    rebuild_profile(cursor, user_id)
+                self.stdout.write(self.style.SUCCESS(f'已重建 {len(user_ids)} 个用户画像'))
+                return
+
+            total = 0
+            for batch in iter_user_id_batches(cursor, batch_size):
+                for user_id in batch:
+                    rebuild_profile(cursor, user_id)
+                total += len(batch)
+                self.stdout.write(f'已处理 {total} 个用户（user_id <= {batch[-1]}）')
+
+        self.stdout.write(self.style.SUCCESS(f'用户画像重建完成，共 {total} 个用户'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.work_stats import iter_work_id_batches, refresh_work_stats
+
+
+class Command(BaseCommand):
+    help = '根据阅读、收藏、订阅、投票和章节数据全量重建 work_stats 统计表'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批重建的作品数量')
+        parser.add_argument('--work-id', type=int, action='append', dest='work_ids', help='仅重建指定作品，可重复传入')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        work_ids = options.get('work_ids')
+
+        with connection.cursor() as cursor:
+            if work_ids:
+                refresh_work_stats(cursor, work_ids)
+                self.stdout.write(self.style.SUCCESS(f'已重建 {len(work_ids)} 部作品的统计数据'))
+                return
+
+            total = 0
+            for batch in iter_work_id_batches(cursor, batch_size):
+                refresh_work_stats(cursor, batch)
+                total += len(batch)
+                self.stdout.write(f'已处理 {total} 部作品（work_id <= {batch[-1]}）')
+
+        self.stdout.write(self.style.SUCCESS(f'work_stats 重建完成，共 {total} 部作品'))
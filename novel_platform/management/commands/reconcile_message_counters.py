@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from novel_platform.services.message_counters import iter_user_id_batches, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = '根据 messages 表重新统计 user_message_counters 中的消息总数与未读数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批核对的用户数量')
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids', help='仅核对指定用户，可重复传入')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        user_ids = options.get('user_ids')
+
+        with connection.cursor() as cursor:
+            if user_ids:
+                reconcile_counters(cursor, user_ids)
+                self.stdout.write(self.style.SUCCESS(f'已核对 {len(user_ids)} 个用户的消息计数'))
+                return
+
+            total = 0
+            for batch in iter_user_id_batches(cursor, batch_size):
+                reconcile_counters(cursor, batch)
+                total += len(batch)
+                self.stdout.write(f'已处理 {total} 个用户（user_id <= {batch[-1]}）')
+
+        self.stdout.write(self.style.SUCCESS(f'消息计数核对完成，共 {total} 个用户'))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from novel_platform.services.notifications import notifications_config, process_pending_events
+
+
+class Command(BaseCommand):
+    help = '投递 notification_events 中的待处理通知，按读者分批写入站内信，可通过 --loop 常驻运行'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='常驻运行，按 --interval 间隔轮询新事件')
+        parser.add_argument('--interval', type=float, default=None, help='常驻模式下两轮轮询的间隔秒数')
+        parser.add_argument('--max-events', type=int, default=100, help='每轮最多处理的事件数')
+        parser.add_argument('--batch-size', type=int, default=None, help='每批写入的消息条数')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or float(notifications_config()['POLL_INTERVAL'])
+
+        while True:
+            started = time.monotonic()
+            try:
+                events_done, messages_sent = process_pending_events(options['max_events'], options['batch_size'])
+                if events_done or not options['loop']:
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(self.style.SUCCESS(
+                        f'已处理 {events_done} 个通知事件，发送 {messages_sent} 条消息，耗时 {elapsed:.2f} 秒'
+                    ))
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'通知投递失败：{exc}')
+            finally:
+                close_old_connections()
+
+            if not options['loop']:
+                break
+            time.sleep(max(0.1, interval - (time.monotonic() - started)))
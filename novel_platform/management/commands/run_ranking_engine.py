@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from novel_platform.services.ranking_engine import (
+    RANKING_PERIODS,
+    RANKING_TYPES,
+    ranking_engine_config,
+    run_ranking_engine,
+)
+
+
+class Command(BaseCommand):
+    help = '计算日/周/月/总榜快照并写入 ranking_details，可通过 --loop 常驻定时运行'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', action='append', dest='ranking_types', choices=RANKING_TYPES, help='仅计算指定榜单类型，可重复传入')
+        parser.add_argument('--period', action='append', dest='periods', choices=list(RANKING_PERIODS), help='仅计算指定周期，可重复传入')
+        parser.add_argument('--loop', action='store_true', help='常驻运行，按 --interval 间隔重复计算')
+        parser.add_argument('--interval', type=int, default=None, help='常驻模式下两轮计算的间隔秒数')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or int(ranking_engine_config()['INTERVAL_SECONDS'])
+
+        while True:
+            started = time.monotonic()
+            try:
+                boards = run_ranking_engine(options['ranking_types'], options['periods'])
+                elapsed = time.monotonic() - started
+                self.stdout.write(self.style.SUCCESS(f'榜单快照已更新：{boards} 个榜单，耗时 {elapsed:.2f} 秒'))
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'榜单计算失败：{exc}')
+            finally:
+                close_old_connections()
+
+            if not options['loop']:
+                break
+            time.sleep(max(1, interval - (time.monotonic() - started)))
@@ -0,0 +1,31 @@
+# Generated manually for work statistics rollup
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0005_expand_message_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkStats',
+            fields=[
+                ('work', models.OneToOneField(db_column='work_id', on_delete=models.CASCADE, primary_key=True, serialize=False, to='novel_platform.work')),
+                ('total_reads', models.BigIntegerField(default=0)),
+                ('unique_readers', models.IntegerField(default=0)),
+                ('collect_count', models.IntegerField(default=0)),
+                ('subscription_count', models.IntegerField(default=0)),
+                ('subscription_income', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('vote_count', models.IntegerField(default=0)),
+                ('chapter_count', models.IntegerField(default=0)),
+                ('published_chapter_count', models.IntegerField(default=0)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'work_stats',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated manually for ranking snapshot lookups
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0006_work_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rankingdetail',
+            index=models.Index(fields=['ranking_id', 'stat_date', 'rank'], name='idx_ranking_date_rank'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated manually for maintained work word counts
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0007_ranking_detail_snapshot_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workstats',
+            name='total_words',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='workstats',
+            index=models.Index(fields=['total_words'], name='idx_total_words'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated manually for keyset pagination indexes
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0008_work_stats_total_words'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['create_time'], name='idx_user_create_time'),
+        ),
+        migrations.AddIndex(
+            model_name='work',
+            index=models.Index(fields=['update_time'], name='idx_update_time'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['work_id', 'create_time'], name='idx_work_time'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['recipient_id', 'send_time'], name='idx_recipient_time'),
+        ),
+        migrations.AddIndex(
+            model_name='adminactionlog',
+            index=models.Index(fields=['create_time'], name='idx_admin_log_create_time'),
+        ),
+        migrations.AddIndex(
+            model_name='useractionlog',
+            index=models.Index(fields=['create_time'], name='idx_user_log_create_time'),
+        ),
+    ]
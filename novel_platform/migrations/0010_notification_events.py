@@ -0,0 +1,47 @@
+# Generated manually for batched notification fan-out
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0009_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(max_length=50)),
+                ('work', models.ForeignKey(db_column='work_id', on_delete=models.CASCADE, to='novel_platform.work')),
+                ('message_type', models.IntegerField()),
+                ('content', models.TextField()),
+                ('related_type', models.SmallIntegerField(blank=True, null=True)),
+                ('related_id', models.BigIntegerField(blank=True, null=True)),
+                ('sender_id', models.BigIntegerField(blank=True, null=True)),
+                ('exclude_ids', models.TextField(blank=True, null=True)),
+                ('status', models.SmallIntegerField(default=0)),
+                ('last_recipient_id', models.BigIntegerField(default=0)),
+                ('delivered_count', models.IntegerField(default=0)),
+                ('attempts', models.IntegerField(default=0)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('create_time', models.DateTimeField(auto_now_add=True)),
+                ('finish_time', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'notification_events',
+                'indexes': [models.Index(fields=['status', 'event_id'], name='idx_status_event')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['work_id', 'reader_id'], name='idx_collection_work_reader'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['work_id', 'reader_id'], name='idx_subscription_work_reader'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated manually for broadcast work-update messages
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0010_notification_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastMessage',
+            fields=[
+                ('broadcast_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('work', models.ForeignKey(db_column='work_id', on_delete=models.CASCADE, to='novel_platform.work')),
+                ('chapter_id', models.BigIntegerField(blank=True, null=True)),
+                ('sender_id', models.BigIntegerField(blank=True, null=True)),
+                ('message_type', models.IntegerField()),
+                ('content', models.TextField()),
+                ('send_time', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'broadcast_messages',
+                'indexes': [models.Index(fields=['work', 'send_time'], name='idx_work_send_time')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserBroadcastState',
+            fields=[
+                ('user', models.OneToOneField(db_column='user_id', on_delete=models.CASCADE, primary_key=True, serialize=False, to='novel_platform.user')),
+                ('read_watermark', models.BigIntegerField(default=0)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_broadcast_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserBroadcastReceipt',
+            fields=[
+                ('receipt_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField()),
+                ('broadcast', models.ForeignKey(db_column='broadcast_id', on_delete=models.CASCADE, to='novel_platform.broadcastmessage')),
+                ('is_read', models.SmallIntegerField(default=1)),
+                ('is_deleted', models.SmallIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'user_broadcast_receipts',
+                'unique_together': {('user_id', 'broadcast')},
+            },
+        ),
+    ]
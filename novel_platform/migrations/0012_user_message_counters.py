@@ -0,0 +1,27 @@
+# Generated manually for per-user message counters
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0011_broadcast_messages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMessageCounter',
+            fields=[
+                ('counter_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=models.CASCADE, to='novel_platform.user')),
+                ('message_type', models.IntegerField()),
+                ('total_count', models.IntegerField(default=0)),
+                ('unread_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'user_message_counters',
+                'unique_together': {('user', 'message_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,191 @@
+# Generated manually for tables previously created on the request path
+
+from django.db import migrations, models
+
+# 建表语句在此固定一份，services/schema.py 中的登记表以后修改不会改变本迁移执行的内容
+RUNTIME_TABLE_SQL = {
+    'point_transactions': """
+CREATE TABLE IF NOT EXISTS point_transactions (
+    transaction_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    transaction_type VARCHAR(50) NOT NULL,
+    amount DECIMAL(12,2) NOT NULL,
+    description VARCHAR(255),
+    create_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_user_time (user_id, create_time)
+)
+""",
+    'user_tickets': """
+CREATE TABLE IF NOT EXISTS user_tickets (
+    user_id BIGINT PRIMARY KEY,
+    ticket_balance INT NOT NULL DEFAULT 0,
+    progress DECIMAL(12,2) NOT NULL DEFAULT 0,
+    total_earned INT NOT NULL DEFAULT 0,
+    total_spent INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+)
+""",
+    'comment_likes': """
+CREATE TABLE IF NOT EXISTS comment_likes (
+    like_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    comment_id BIGINT NOT NULL,
+    reader_id BIGINT NOT NULL,
+    like_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_comment_reader (comment_id, reader_id),
+    FOREIGN KEY (comment_id) REFERENCES comments(comment_id) ON DELETE CASCADE,
+    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
+    INDEX idx_comment (comment_id),
+    INDEX idx_reader (reader_id)
+)
+""",
+    'search_records': """
+CREATE TABLE IF NOT EXISTS search_records (
+    search_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    reader_id BIGINT NOT NULL,
+    keyword VARCHAR(100) NOT NULL,
+    search_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    search_type TINYINT NOT NULL DEFAULT 1 COMMENT '1=作品搜索，2=作者搜索，3=标签搜索',
+    click_work_id BIGINT,
+    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
+    FOREIGN KEY (click_work_id) REFERENCES works(work_id) ON DELETE SET NULL,
+    INDEX idx_reader_time (reader_id, search_time)
+)
+""",
+    'user_recommendation_feedback': """
+CREATE TABLE IF NOT EXISTS user_recommendation_feedback (
+    feedback_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    work_id BIGINT NOT NULL,
+    event_type TINYINT NOT NULL,
+    weight DECIMAL(10,4) NOT NULL DEFAULT 1.0,
+    event_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    metadata TEXT,
+    UNIQUE KEY uniq_user_work_event (user_id, work_id, event_type),
+    INDEX idx_feedback_user_time (user_id, event_time),
+    INDEX idx_feedback_user_event (user_id, event_type, event_time),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE
+)
+""",
+}
+
+RUNTIME_MODELS = {
+    'point_transactions': 'PointTransaction',
+    'user_tickets': 'UserTicket',
+    'comment_likes': 'CommentLike',
+    'search_records': 'SearchRecord',
+    'user_recommendation_feedback': 'UserRecommendationFeedback',
+}
+
+
+def create_runtime_tables(apps, schema_editor):
+    # 表可能已由 init_database.sql 或旧版本的请求路径创建：MySQL 下执行 IF NOT EXISTS 建表语句，其他数据库按模型建表
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        for sql in RUNTIME_TABLE_SQL.values():
+            schema_editor.execute(sql)
+        return
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+    for table, model_name in RUNTIME_MODELS.items():
+        if table not in existing:
+            schema_editor.create_model(apps.get_model('novel_platform', model_name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0012_user_message_counters'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PointTransaction',
+                    fields=[
+                        ('transaction_id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('user_id', models.BigIntegerField()),
+                        ('transaction_type', models.CharField(max_length=50)),
+                        ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                        ('description', models.CharField(blank=True, max_length=255, null=True)),
+                        ('create_time', models.DateTimeField(auto_now_add=True)),
+                    ],
+                    options={
+                        'db_table': 'point_transactions',
+                        'indexes': [models.Index(fields=['user_id', 'create_time'], name='idx_user_time')],
+                    },
+                ),
+                migrations.CreateModel(
+                    name='UserTicket',
+                    fields=[
+                        ('user_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('ticket_balance', models.IntegerField(default=0)),
+                        ('progress', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                        ('total_earned', models.IntegerField(default=0)),
+                        ('total_spent', models.IntegerField(default=0)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                    ],
+                    options={
+                        'db_table': 'user_tickets',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='CommentLike',
+                    fields=[
+                        ('like_id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('comment_id', models.BigIntegerField()),
+                        ('reader_id', models.BigIntegerField()),
+                        ('like_time', models.DateTimeField(auto_now_add=True)),
+                    ],
+                    options={
+                        'db_table': 'comment_likes',
+                        'unique_together': {('comment_id', 'reader_id')},
+                        'indexes': [
+                            models.Index(fields=['comment_id'], name='idx_comment'),
+                            models.Index(fields=['reader_id'], name='idx_reader'),
+                        ],
+                    },
+                ),
+                migrations.CreateModel(
+                    name='SearchRecord',
+                    fields=[
+                        ('search_id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('reader_id', models.BigIntegerField()),
+                        ('keyword', models.CharField(max_length=100)),
+                        ('search_time', models.DateTimeField(auto_now_add=True)),
+                        ('search_type', models.SmallIntegerField(default=1)),
+                        ('click_work_id', models.BigIntegerField(blank=True, null=True)),
+                    ],
+                    options={
+                        'db_table': 'search_records',
+                        'indexes': [models.Index(fields=['reader_id', 'search_time'], name='idx_reader_time')],
+                    },
+                ),
+                migrations.CreateModel(
+                    name='UserRecommendationFeedback',
+                    fields=[
+                        ('feedback_id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('user_id', models.BigIntegerField()),
+                        ('work_id', models.BigIntegerField()),
+                        ('event_type', models.SmallIntegerField()),
+                        ('weight', models.DecimalField(decimal_places=4, default=1.0, max_digits=10)),
+                        ('event_time', models.DateTimeField(auto_now_add=True)),
+                        ('metadata', models.TextField(blank=True, null=True)),
+                    ],
+                    options={
+                        'db_table': 'user_recommendation_feedback',
+                        'unique_together': {('user_id', 'work_id', 'event_type')},
+                        'indexes': [
+                            models.Index(fields=['user_id', 'event_time'], name='idx_feedback_user_time'),
+                            models.Index(fields=['user_id', 'event_type', 'event_time'], name='idx_feedback_user_event'),
+                        ],
+                    },
+                ),
+            ],
+        ),
+        # 回滚时保留数据
+        migrations.RunPython(create_runtime_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated manually for materialized user preference profiles
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0013_runtime_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPreferenceProfile',
+            fields=[
+                ('user', models.OneToOneField(db_column='user_id', on_delete=models.CASCADE, primary_key=True, serialize=False, to='novel_platform.user')),
+                ('category_scores', models.TextField()),
+                ('tag_scores', models.TextField()),
+                ('tag_labels', models.TextField()),
+                ('signal_count', models.IntegerField(default=0)),
+                ('decayed_at', models.DateTimeField()),
+                ('version', models.IntegerField(default=0)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_preference_profiles',
+                'indexes': [models.Index(fields=['decayed_at'], name='idx_profile_decayed_at')],
+            },
+        ),
+    ]
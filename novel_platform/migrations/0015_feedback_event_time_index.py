@@ -0,0 +1,17 @@
+# Generated manually for batched recommendation feedback pruning
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0014_user_preference_profiles'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userrecommendationfeedback',
+            index=models.Index(fields=['event_time'], name='idx_feedback_event_time'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated manually for the normalized work tag index
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0015_feedback_event_time_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkTag',
+            fields=[
+                ('tag_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('work', models.ForeignKey(db_column='work_id', on_delete=models.CASCADE, to='novel_platform.work')),
+                ('tag_norm', models.CharField(max_length=64)),
+                ('tag_display', models.CharField(max_length=64)),
+            ],
+            options={
+                'db_table': 'work_tags',
+                'unique_together': {('work', 'tag_norm')},
+                'indexes': [models.Index(fields=['tag_norm', 'work'], name='idx_work_tags_norm')],
+            },
+        ),
+    ]
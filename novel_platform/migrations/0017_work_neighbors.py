@@ -0,0 +1,33 @@
+# Generated manually for offline co-reading work neighbours
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0016_work_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkNeighbor',
+            fields=[
+                ('neighbor_row_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('work', models.ForeignKey(db_column='work_id', on_delete=models.CASCADE, related_name='neighbor_rows', to='novel_platform.work')),
+                ('neighbor', models.ForeignKey(db_column='neighbor_id', on_delete=models.CASCADE, related_name='+', to='novel_platform.work')),
+                ('score', models.FloatField()),
+                ('co_readers', models.IntegerField(default=0)),
+                ('position', models.SmallIntegerField(default=0)),
+                ('build_time', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'work_neighbors',
+                'unique_together': {('work', 'neighbor')},
+                'indexes': [
+                    models.Index(fields=['work', 'position'], name='idx_work_neighbors_rank'),
+                    models.Index(fields=['build_time'], name='idx_work_neighbors_build'),
+                ],
+            },
+        ),
+    ]
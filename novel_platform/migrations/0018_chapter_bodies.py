@@ -0,0 +1,30 @@
+# Generated manually for the compressed chapter body store
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0017_work_neighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChapterBody',
+            fields=[
+                ('chapter', models.OneToOneField(db_column='chapter_id', on_delete=models.CASCADE, primary_key=True, serialize=False, to='novel_platform.chapter')),
+                ('codec', models.CharField(max_length=16)),
+                ('storage', models.SmallIntegerField(default=0)),
+                ('body', models.BinaryField(null=True)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('raw_size', models.IntegerField(default=0)),
+                ('stored_size', models.IntegerField(default=0)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'chapter_bodies',
+                'indexes': [models.Index(fields=['content_hash'], name='idx_chapter_bodies_hash')],
+            },
+        ),
+    ]
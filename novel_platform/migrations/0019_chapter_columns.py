@@ -0,0 +1,59 @@
+# Generated manually to bring the chapters table in line with the Chapter model
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def sync_chapter_columns(apps, schema_editor):
+    # 由 init_database.sql 建库时这些列已存在，只有按 0001_initial 建出的表需要改名和补列
+    connection = schema_editor.connection
+    chapter_model = apps.get_model('novel_platform', 'Chapter')
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, 'chapters')}
+
+    if 'chapter_order' not in columns and 'sort_num' in columns:
+        old_field = models.IntegerField()
+        old_field.set_attributes_from_name('sort_num')
+        old_field.model = chapter_model
+        schema_editor.alter_field(chapter_model, old_field, chapter_model._meta.get_field('chapter_order'))
+
+    for name in ('intro', 'create_time', 'update_time'):
+        if name not in columns:
+            schema_editor.add_field(chapter_model, chapter_model._meta.get_field(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0018_chapter_bodies'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='chapter',
+                    old_name='sort_num',
+                    new_name='chapter_order',
+                ),
+                migrations.AddField(
+                    model_name='chapter',
+                    name='intro',
+                    field=models.TextField(blank=True),
+                ),
+                migrations.AddField(
+                    model_name='chapter',
+                    name='create_time',
+                    field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+                    preserve_default=False,
+                ),
+                migrations.AddField(
+                    model_name='chapter',
+                    name='update_time',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+            ],
+        ),
+        # 回滚时保留列
+        migrations.RunPython(sync_chapter_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated manually for the default keyset sort of the works list
+
+from django.db import migrations, models
+
+
+def add_create_time_index(apps, schema_editor):
+    # init_database.sql 建库时已有 idx_create_time，只有按迁移建出的表需要补建
+    connection = schema_editor.connection
+    work_model = apps.get_model('novel_platform', 'Work')
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, 'works')
+    if any(info['index'] and info['columns'] == ['create_time'] for info in constraints.values()):
+        return
+    schema_editor.add_index(work_model, models.Index(fields=['create_time'], name='idx_create_time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0019_chapter_columns'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='work',
+                    index=models.Index(fields=['create_time'], name='idx_create_time'),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_create_time_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated manually to add columns that init_database.sql has and the migrations lacked
+
+from django.db import migrations, models
+
+MISSING_COLUMNS = {
+    'Work': ('read_count', 'collect_count', 'vote_count'),
+    'Vote': ('message',),
+}
+
+
+def add_missing_columns(apps, schema_editor):
+    # 由 init_database.sql 建库时这些列已存在，只补建按迁移建出的表缺少的列
+    connection = schema_editor.connection
+    for model_name, field_names in MISSING_COLUMNS.items():
+        model = apps.get_model('novel_platform', model_name)
+        with connection.cursor() as cursor:
+            columns = {
+                column.name for column in connection.introspection.get_table_description(cursor, model._meta.db_table)
+            }
+        for name in field_names:
+            if name not in columns:
+                schema_editor.add_field(model, model._meta.get_field(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('novel_platform', '0020_work_create_time_index'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='work',
+                    name='read_count',
+                    field=models.BigIntegerField(default=0),
+                ),
+                migrations.AddField(
+                    model_name='work',
+                    name='collect_count',
+                    field=models.IntegerField(default=0),
+                ),
+                migrations.AddField(
+                    model_name='work',
+                    name='vote_count',
+                    field=models.IntegerField(default=0),
+                ),
+                migrations.AddField(
+                    model_name='vote',
+                    name='message',
+                    field=models.CharField(blank=True, default='', max_length=500, null=True),
+                ),
+            ],
+        ),
+        # 回滚时保留列
+        migrations.RunPython(add_missing_columns, migrations.RunPython.noop),
+    ]
@@ -14,6 +14,9 @@ class User(models.Model):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['create_time'], name='idx_user_create_time'),
+        ]
 
 # 读者信息表
 class Reader(models.Model):
@@ -67,11 +70,18 @@ class Work(models.Model):
     tags = models.JSONField(default=list)
     status = models.SmallIntegerField(default=0)  # 0=草稿，1=连载中，2=完结，3=下架
     is_signed = models.SmallIntegerField(default=0)  # 0=未签约，1=已签约
+    read_count = models.BigIntegerField(default=0)
+    collect_count = models.IntegerField(default=0)
+    vote_count = models.IntegerField(default=0)
     create_time = models.DateTimeField(auto_now_add=True)
     update_time = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'works'
+        indexes = [
+            models.Index(fields=['create_time'], name='idx_create_time'),
+            models.Index(fields=['update_time'], name='idx_update_time'),
+        ]
 
 # 章节表
 class Chapter(models.Model):
@@ -91,6 +101,24 @@ class Chapter(models.Model):
     class Meta:
         db_table = 'chapters'
 
+
+# 章节正文表：正文压缩后与章节元数据分离存放，storage=1 时正文在 MEDIA_ROOT 下的文件中
+class ChapterBody(models.Model):
+    chapter = models.OneToOneField(Chapter, on_delete=models.CASCADE, primary_key=True, db_column='chapter_id')
+    codec = models.CharField(max_length=16)
+    storage = models.SmallIntegerField(default=0)  # 0=表内，1=文件
+    body = models.BinaryField(null=True)
+    content_hash = models.CharField(max_length=64)
+    raw_size = models.IntegerField(default=0)
+    stored_size = models.IntegerField(default=0)
+    update_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'chapter_bodies'
+        indexes = [
+            models.Index(fields=['content_hash'], name='idx_chapter_bodies_hash'),
+        ]
+
 # 收藏记录表
 class Collection(models.Model):
     collection_id = models.BigAutoField(primary_key=True)
@@ -101,6 +129,9 @@ class Collection(models.Model):
     class Meta:
         db_table = 'collections'
         unique_together = ('reader_id', 'work_id')
+        indexes = [
+            models.Index(fields=['work_id', 'reader_id'], name='idx_collection_work_reader'),
+        ]
 
 # 阅读记录表
 class ReadingRecord(models.Model):
@@ -125,6 +156,9 @@ class Subscription(models.Model):
 
     class Meta:
         db_table = 'subscriptions'
+        indexes = [
+            models.Index(fields=['work_id', 'reader_id'], name='idx_subscription_work_reader'),
+        ]
 
 # 投票记录表
 class Vote(models.Model):
@@ -134,6 +168,7 @@ class Vote(models.Model):
     vote_type = models.SmallIntegerField()  # 1=月票，2=推荐票
     vote_time = models.DateField()
     count = models.IntegerField(default=1)
+    message = models.CharField(max_length=500, blank=True, null=True, default='')
 
     class Meta:
         db_table = 'votes'
@@ -152,6 +187,9 @@ class Comment(models.Model):
 
     class Meta:
         db_table = 'comments'
+        indexes = [
+            models.Index(fields=['work_id', 'create_time'], name='idx_work_time'),
+        ]
 
 # 消息表
 class Message(models.Model):
@@ -168,6 +206,103 @@ class Message(models.Model):
 
     class Meta:
         db_table = 'messages'
+        indexes = [
+            models.Index(fields=['recipient_id', 'send_time'], name='idx_recipient_time'),
+        ]
+
+
+# 用户偏好画像表
+class UserPreferenceProfile(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, db_column='user_id')
+    category_scores = models.TextField()
+    tag_scores = models.TextField()
+    tag_labels = models.TextField()
+    signal_count = models.IntegerField(default=0)
+    decayed_at = models.DateTimeField()
+    version = models.IntegerField(default=0)
+    update_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_preference_profiles'
+        indexes = [
+            models.Index(fields=['decayed_at'], name='idx_profile_decayed_at'),
+        ]
+
+
+# 用户消息计数表
+class UserMessageCounter(models.Model):
+    counter_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id')
+    message_type = models.IntegerField()
+    total_count = models.IntegerField(default=0)
+    unread_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'user_message_counters'
+        unique_together = ('user', 'message_type')
+
+# 作品更新广播表
+class BroadcastMessage(models.Model):
+    broadcast_id = models.BigAutoField(primary_key=True)
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, db_column='work_id')
+    chapter_id = models.BigIntegerField(null=True, blank=True)
+    sender_id = models.BigIntegerField(null=True, blank=True)
+    message_type = models.IntegerField()
+    content = models.TextField()
+    send_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'broadcast_messages'
+        indexes = [
+            models.Index(fields=['work', 'send_time'], name='idx_work_send_time'),
+        ]
+
+
+class UserBroadcastState(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, db_column='user_id')
+    read_watermark = models.BigIntegerField(default=0)
+    update_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_broadcast_state'
+
+
+class UserBroadcastReceipt(models.Model):
+    receipt_id = models.BigAutoField(primary_key=True)
+    user_id = models.BigIntegerField()
+    broadcast = models.ForeignKey(BroadcastMessage, on_delete=models.CASCADE, db_column='broadcast_id')
+    is_read = models.SmallIntegerField(default=1)
+    is_deleted = models.SmallIntegerField(default=0)
+
+    class Meta:
+        db_table = 'user_broadcast_receipts'
+        unique_together = ('user_id', 'broadcast')
+
+# 通知扇出事件表
+class NotificationEvent(models.Model):
+    event_id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=50)
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, db_column='work_id')
+    message_type = models.IntegerField()
+    content = models.TextField()
+    related_type = models.SmallIntegerField(null=True, blank=True)
+    related_id = models.BigIntegerField(null=True, blank=True)
+    sender_id = models.BigIntegerField(null=True, blank=True)
+    exclude_ids = models.TextField(null=True, blank=True)
+    status = models.SmallIntegerField(default=0)  # 0=待处理，1=处理中，2=已完成，3=失败
+    last_recipient_id = models.BigIntegerField(default=0)
+    delivered_count = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    create_time = models.DateTimeField(auto_now_add=True)
+    finish_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notification_events'
+        indexes = [
+            models.Index(fields=['status', 'event_id'], name='idx_status_event'),
+        ]
 
 class Admin(models.Model):
     admin_id = models.BigIntegerField(primary_key=True)
@@ -208,6 +343,60 @@ class WorkModeration(models.Model):
         db_table = 'work_moderations'
 
 
+# 作品标签索引表，由 works.tags 拆分维护
+class WorkTag(models.Model):
+    tag_id = models.BigAutoField(primary_key=True)
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, db_column='work_id')
+    tag_norm = models.CharField(max_length=64)
+    tag_display = models.CharField(max_length=64)
+
+    class Meta:
+        db_table = 'work_tags'
+        unique_together = ('work', 'tag_norm')
+        indexes = [
+            models.Index(fields=['tag_norm', 'work'], name='idx_work_tags_norm'),
+        ]
+
+
+# 相似作品表，由 build_work_neighbors 命令按共同读者离线生成
+class WorkNeighbor(models.Model):
+    neighbor_row_id = models.BigAutoField(primary_key=True)
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, db_column='work_id', related_name='neighbor_rows')
+    neighbor = models.ForeignKey(Work, on_delete=models.CASCADE, db_column='neighbor_id', related_name='+')
+    score = models.FloatField()
+    co_readers = models.IntegerField(default=0)
+    position = models.SmallIntegerField(default=0)
+    build_time = models.DateTimeField()
+
+    class Meta:
+        db_table = 'work_neighbors'
+        unique_together = ('work', 'neighbor')
+        indexes = [
+            models.Index(fields=['work', 'position'], name='idx_work_neighbors_rank'),
+            models.Index(fields=['build_time'], name='idx_work_neighbors_build'),
+        ]
+
+
+class WorkStats(models.Model):
+    work = models.OneToOneField(Work, on_delete=models.CASCADE, primary_key=True, db_column='work_id')
+    total_reads = models.BigIntegerField(default=0)
+    unique_readers = models.IntegerField(default=0)
+    collect_count = models.IntegerField(default=0)
+    subscription_count = models.IntegerField(default=0)
+    subscription_income = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    vote_count = models.IntegerField(default=0)
+    chapter_count = models.IntegerField(default=0)
+    published_chapter_count = models.IntegerField(default=0)
+    total_words = models.BigIntegerField(default=0)
+    update_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'work_stats'
+        indexes = [
+            models.Index(fields=['total_words'], name='idx_total_words'),
+        ]
+
+
 class AdminActionLog(models.Model):
     log_id = models.BigAutoField(primary_key=True)
     admin_id = models.BigIntegerField()
@@ -222,6 +411,9 @@ class AdminActionLog(models.Model):
 
     class Meta:
         db_table = 'admin_action_logs'
+        indexes = [
+            models.Index(fields=['create_time'], name='idx_admin_log_create_time'),
+        ]
 
 
 class UserActionLog(models.Model):
@@ -238,6 +430,9 @@ class UserActionLog(models.Model):
 
     class Meta:
         db_table = 'user_action_logs'
+        indexes = [
+            models.Index(fields=['create_time'], name='idx_user_log_create_time'),
+        ]
 
 # 榜单表
 class Ranking(models.Model):
@@ -268,4 +463,89 @@ class RankingDetail(models.Model):
     class Meta:
         db_table = 'ranking_details'
         unique_together = ('ranking_id', 'work_id', 'stat_date')
+        indexes = [
+            models.Index(fields=['ranking_id', 'stat_date', 'rank'], name='idx_ranking_date_rank'),
+        ]
+
+
+
+# 以下附加表由迁移 0013_runtime_tables 按 services/schema.py 中的建表语句创建
+# 点券交易记录表
+class PointTransaction(models.Model):
+    transaction_id = models.BigAutoField(primary_key=True)
+    user_id = models.BigIntegerField()
+    transaction_type = models.CharField(max_length=50)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    description = models.CharField(max_length=255, null=True, blank=True)
+    create_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'point_transactions'
+        indexes = [
+            models.Index(fields=['user_id', 'create_time'], name='idx_user_time'),
+        ]
+
+
+# 月票钱包表
+class UserTicket(models.Model):
+    user_id = models.BigIntegerField(primary_key=True)
+    ticket_balance = models.IntegerField(default=0)
+    progress = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_earned = models.IntegerField(default=0)
+    total_spent = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_tickets'
+
+
+# 评论点赞表
+class CommentLike(models.Model):
+    like_id = models.BigAutoField(primary_key=True)
+    comment_id = models.BigIntegerField()
+    reader_id = models.BigIntegerField()
+    like_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'comment_likes'
+        unique_together = ('comment_id', 'reader_id')
+        indexes = [
+            models.Index(fields=['comment_id'], name='idx_comment'),
+            models.Index(fields=['reader_id'], name='idx_reader'),
+        ]
 
+
+# 搜索记录表
+class SearchRecord(models.Model):
+    search_id = models.BigAutoField(primary_key=True)
+    reader_id = models.BigIntegerField()
+    keyword = models.CharField(max_length=100)
+    search_time = models.DateTimeField(auto_now_add=True)
+    search_type = models.SmallIntegerField(default=1)  # 1=作品搜索，2=作者搜索，3=标签搜索
+    click_work_id = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'search_records'
+        indexes = [
+            models.Index(fields=['reader_id', 'search_time'], name='idx_reader_time'),
+        ]
+
+
+# 用户推荐反馈表
+class UserRecommendationFeedback(models.Model):
+    feedback_id = models.BigAutoField(primary_key=True)
+    user_id = models.BigIntegerField()
+    work_id = models.BigIntegerField()
+    event_type = models.SmallIntegerField()
+    weight = models.DecimalField(max_digits=10, decimal_places=4, default=1.0)
+    event_time = models.DateTimeField(auto_now_add=True)
+    metadata = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'user_recommendation_feedback'
+        unique_together = ('user_id', 'work_id', 'event_type')
+        indexes = [
+            models.Index(fields=['user_id', 'event_time'], name='idx_feedback_user_time'),
+            models.Index(fields=['user_id', 'event_type', 'event_time'], name='idx_feedback_user_event'),
+            models.Index(fields=['event_time'], name='idx_feedback_event_time'),
+        ]
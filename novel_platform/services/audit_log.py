@@ -0,0 +1,243 @@
+# 操作日志异步写入：请求线程只入队，后台线程按批量/时间阈值合并为多行 INSERT
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_AUDIT_LOG_DEFAULTS = {
+    'ASYNC': True,
+    'ADMIN_SYNC': True,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 1.0,
+    'ENQUEUE_TIMEOUT': 0.0,
+    'MAX_RETRIES': 3,
+    'SHUTDOWN_TIMEOUT': 5.0,
+}
+
+USER_ACTION_COLUMNS = (
+    'user_id', 'action', 'target_type', 'target_id', 'detail',
+    'extra_data', 'ip_address', 'user_agent', 'create_time',
+)
+ADMIN_ACTION_COLUMNS = (
+    'admin_id', 'target_type', 'target_id', 'action', 'detail',
+    'extra_data', 'ip_address', 'user_agent', 'create_time',
+)
+
+_STOP = object()
+
+
+def audit_log_config():
+    config = dict(_AUDIT_LOG_DEFAULTS)
+    config.update(getattr(settings, 'AUDIT_LOG', {}) or {})
+    return config
+
+
+def log_timestamp():
+    # 入队时取时间，避免批量写入延迟改变日志时间；与 NOW() 一致按本地时区存储不带时区的时间
+    return timezone.localtime().replace(tzinfo=None, microsecond=0)
+
+
+def insert_rows(cursor, table, columns, rows):
+    """单条多行 INSERT 写入一批日志"""
+    if not rows:
+        return 0
+    row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    params = []
+    for row in rows:
+        params.extend(row)
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_placeholder] * len(rows))}",
+        params
+    )
+    return len(rows)
+
+
+class BufferedLogWriter:
+    """有界队列 + 后台刷写线程；队列满时最多等待 ENQUEUE_TIMEOUT 秒，仍满则丢弃并计数"""
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._counters = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def _ensure_started(self):
+        # 进程 fork 后线程不会被继承，按 pid 重新创建队列和线程
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            config = audit_log_config()
+            self._config = config
+            self._queue = queue.Queue(maxsize=max(1, int(config['QUEUE_SIZE'])))
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._queue,),
+                name=f'audit-log-{self.table}',
+                daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, row):
+        """返回 False 表示因队列已满被丢弃"""
+        self._ensure_started()
+        timeout = float(self._config['ENQUEUE_TIMEOUT'])
+        try:
+            if timeout > 0:
+                self._queue.put(row, timeout=timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            dropped = self._count('dropped')
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning('audit log queue for %s is full, %d rows dropped so far', self.table, dropped)
+            return False
+        self._count('enqueued')
+        return True
+
+    def flush(self, timeout=None):
+        """等待当前已入队的日志全部写入，返回是否在超时前完成"""
+        if self._queue is None or self._pid != os.getpid():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout=None):
+        if self._queue is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning('audit log queue for %s still full at shutdown', self.table)
+            return
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+            return self._counters[name]
+
+    def _run(self, log_queue):
+        batch_size = max(1, int(self._config['BATCH_SIZE']))
+        flush_interval = max(0.01, float(self._config['FLUSH_INTERVAL']))
+        batch = []
+        waiters = []
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = log_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + flush_interval
+
+            if batch and (len(batch) >= batch_size or stopping or waiters or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+                deadline = None
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+        connection.close()
+
+    def _write(self, batch):
+        retries = max(0, int(self._config['MAX_RETRIES']))
+        batch_size = max(1, int(self._config['BATCH_SIZE']))
+        for attempt in range(retries + 1):
+            try:
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    for start in range(0, len(batch), batch_size):
+                        insert_rows(cursor, self.table, self.columns, batch[start:start + batch_size])
+                self._count('written', len(batch))
+                self._count('batches')
+                return
+            except Exception:
+                # 连接可能已失效，关闭后重试
+                connection.close()
+                if attempt == retries:
+                    self._count('failed', len(batch))
+                    logger.exception('failed to write %d rows to %s', len(batch), self.table)
+                else:
+                    time.sleep(min(2 ** attempt * 0.1, 2.0))
+
+
+user_action_writer = BufferedLogWriter('user_action_logs', USER_ACTION_COLUMNS)
+admin_action_writer = BufferedLogWriter('admin_action_logs', ADMIN_ACTION_COLUMNS)
+
+
+def _write_sync(table, columns, row):
+    with connection.cursor() as cursor:
+        insert_rows(cursor, table, columns, [row])
+
+
+def record_user_action_row(row, sync=False):
+    if sync or not audit_log_config()['ASYNC']:
+        _write_sync('user_action_logs', USER_ACTION_COLUMNS, row)
+        return
+    user_action_writer.submit(row)
+
+
+def record_admin_action_row(row, sync=None):
+    config = audit_log_config()
+    if sync is None:
+        sync = config['ADMIN_SYNC']
+    if sync or not config['ASYNC']:
+        _write_sync('admin_action_logs', ADMIN_ACTION_COLUMNS, row)
+        return
+    admin_action_writer.submit(row)
+
+
+def flush_audit_logs(timeout=None):
+    user_done = user_action_writer.flush(timeout)
+    admin_done = admin_action_writer.flush(timeout)
+    return user_done and admin_done
+
+
+def audit_log_stats():
+    return {
+        'user_action_logs': user_action_writer.stats(),
+        'admin_action_logs': admin_action_writer.stats(),
+    }
+
+
+@atexit.register
+def _shutdown():
+    timeout = float(audit_log_config()['SHUTDOWN_TIMEOUT'])
+    user_action_writer.stop(timeout)
+    admin_action_writer.stop(timeout)
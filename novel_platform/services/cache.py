@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class LocalTTLCache:
+    """进程内带过期时间的LRU缓存"""
+
+    def __init__(self, max_entries=10000, ttl=30):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        effective_ttl = self.ttl if ttl is None else float(ttl)
+        if effective_ttl <= 0:
+            return
+        expires_at = time.monotonic() + effective_ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """两级缓存：进程内LRU + Django缓存框架（可配置为locmem/redis等共享后端）"""
+
+    def __init__(self, namespace, local_ttl=5, local_max_entries=10000, shared_ttl=300, cache_alias='default'):
+        self.namespace = namespace
+        self.local = LocalTTLCache(max_entries=local_max_entries, ttl=local_ttl)
+        self.shared_ttl = shared_ttl
+        self.cache_alias = cache_alias
+
+    def _shared(self):
+        if not self.cache_alias:
+            return None
+        try:
+            return caches[self.cache_alias]
+        except Exception:
+            return None
+
+    def _shared_key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        shared = self._shared()
+        if shared is None:
+            return default
+        try:
+            value = shared.get(self._shared_key(key), _MISSING)
+        except Exception:
+            return default
+        if value is _MISSING:
+            return default
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        shared = self._shared()
+        if shared is None:
+            return
+        try:
+            shared.set(self._shared_key(key), value, self.shared_ttl)
+        except Exception:
+            pass
+
+    def delete(self, key):
+        self.local.delete(key)
+        shared = self._shared()
+        if shared is None:
+            return
+        try:
+            shared.delete(self._shared_key(key))
+        except Exception:
+            pass
+
+    def clear_local(self):
+        self.local.clear()
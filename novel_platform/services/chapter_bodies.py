@@ -0,0 +1,252 @@
+# 章节正文存储：正文压缩后存放在 chapter_bodies 表或 MEDIA_ROOT 下按内容寻址的文件中，与 chapters 元数据行分离
+#
+# 元数据查询不再读取正文，chapters.content 只在迁移期间作为尚未回填章节的兜底来源。
+# 压缩编码：zlib（标准库）或 zstd（需要安装 zstandard，未安装时写入回退为 zlib）；
+# 很短的正文压缩收益有限，按 raw 原样保存。
+import hashlib
+import logging
+import mmap
+import os
+import time
+import zlib
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:  # zstd 为可选依赖
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_CHAPTER_BODY_DEFAULTS = {
+    # zlib 或 zstd
+    'CODEC': 'zlib',
+    # 压缩级别，None 时 zlib 为 6、zstd 为 3
+    'LEVEL': None,
+    # table：正文存 chapter_bodies.body；files：存 MEDIA_ROOT/DIRECTORY 下按内容哈希命名的文件
+    'STORAGE': 'table',
+    'DIRECTORY': 'chapter_bodies',
+    # files 存储时用 mmap 读取文件，避免额外的缓冲区复制
+    'MMAP_READS': False,
+    'MIN_COMPRESS_BYTES': 256,
+}
+
+STORAGE_TABLE = 0
+STORAGE_FILE = 1
+
+_INSERT_COLUMNS = """
+    (chapter_id, codec, storage, body, content_hash, raw_size, stored_size, update_time)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+"""
+
+_warned_zstd = False
+
+
+def chapter_body_config():
+    config = dict(_CHAPTER_BODY_DEFAULTS)
+    config.update(getattr(settings, 'CHAPTER_BODY_STORE', {}) or {})
+    return config
+
+
+def _resolve_codec(codec):
+    global _warned_zstd
+    if codec == 'zstd' and zstandard is None:
+        if not _warned_zstd:
+            logger.warning('zstandard is not installed, chapter bodies fall back to zlib')
+            _warned_zstd = True
+        return 'zlib'
+    if codec not in ('zlib', 'zstd', 'raw'):
+        raise ValueError(f'unsupported chapter body codec: {codec}')
+    return codec
+
+
+def encode(text, codec=None, level=None, min_compress_bytes=None):
+    """返回 (实际编码, 编码后字节, 原文字节数, 内容哈希)"""
+    config = chapter_body_config()
+    raw = (text or '').encode('utf-8')
+    content_hash = hashlib.sha256(raw).hexdigest()
+    min_compress_bytes = config['MIN_COMPRESS_BYTES'] if min_compress_bytes is None else min_compress_bytes
+    codec = 'raw' if len(raw) < int(min_compress_bytes) else _resolve_codec(codec or config['CODEC'])
+    level = config['LEVEL'] if level is None else level
+
+    if codec == 'zlib':
+        blob = zlib.compress(raw, 6 if level is None else int(level))
+    elif codec == 'zstd':
+        blob = zstandard.ZstdCompressor(level=3 if level is None else int(level)).compress(raw)
+    else:
+        blob = raw
+    return codec, blob, len(raw), content_hash
+
+
+def decode(codec, blob):
+    if codec == 'zlib':
+        raw = zlib.decompress(blob)
+    elif codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('读取 zstd 压缩的章节正文需要安装 zstandard')
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = bytes(blob)
+    return raw.decode('utf-8')
+
+
+def body_path(content_hash, codec, directory=None):
+    directory = directory or chapter_body_config()['DIRECTORY']
+    return os.path.join(settings.MEDIA_ROOT, directory, content_hash[:2], content_hash[2:4], f'{content_hash}.{codec}')
+
+
+def _write_file(path, blob):
+    # 内容寻址：同一哈希的文件内容相同，已存在时直接复用
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as handle:
+        handle.write(blob)
+    os.replace(temp_path, path)
+
+
+def _read_file(path, codec, use_mmap):
+    with open(path, 'rb') as handle:
+        if use_mmap and os.fstat(handle.fileno()).st_size:
+            # 压缩数据直接从映射区解码，解码结果不引用映射区，可以立即关闭
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return decode(codec, mapped)
+        return decode(codec, handle.read())
+
+
+def save_body(cursor, chapter_id, content, codec=None, storage=None, replace=True):
+    """写入章节正文，返回 (编码, 原文字节数, 存储字节数)；replace 为 False 时不覆盖已有正文（回填用）"""
+    config = chapter_body_config()
+    storage = storage or config['STORAGE']
+    codec, blob, raw_size, content_hash = encode(content, codec)
+    stored_size = len(blob)
+
+    if storage == 'files':
+        _write_file(body_path(content_hash, codec), blob)
+        storage_flag, body = STORAGE_FILE, None
+    else:
+        storage_flag, body = STORAGE_TABLE, blob
+
+    params = [chapter_id, codec, storage_flag, body, content_hash, raw_size, stored_size]
+    if not replace:
+        cursor.execute(f"INSERT IGNORE INTO chapter_bodies {_INSERT_COLUMNS}", params)
+        return codec, raw_size, stored_size
+    cursor.execute(
+        f"""
+        INSERT INTO chapter_bodies {_INSERT_COLUMNS}
+        ON DUPLICATE KEY UPDATE
+            codec = VALUES(codec),
+            storage = VALUES(storage),
+            body = VALUES(body),
+            content_hash = VALUES(content_hash),
+            raw_size = VALUES(raw_size),
+            stored_size = VALUES(stored_size),
+            update_time = NOW()
+        """,
+        params
+    )
+    return codec, raw_size, stored_size
+
+
+def _decode_row(codec, storage, body, content_hash, use_mmap):
+    if storage == STORAGE_FILE:
+        return _read_file(body_path(content_hash, codec), codec, use_mmap)
+    return decode(codec, body)
+
+
+def load_bodies(cursor, chapter_ids):
+    """批量读取正文，返回 {chapter_id: 正文}；尚未回填到正文存储的章节从 chapters.content 兜底读取"""
+    chapter_ids = list(dict.fromkeys(chapter_ids))
+    if not chapter_ids:
+        return {}
+    use_mmap = bool(chapter_body_config()['MMAP_READS'])
+    placeholders = ', '.join(['%s'] * len(chapter_ids))
+    cursor.execute(
+        f"""
+        SELECT chapter_id, codec, storage, body, content_hash
+        FROM chapter_bodies
+        WHERE chapter_id IN ({placeholders})
+        """,
+        chapter_ids
+    )
+    bodies = {
+        row[0]: _decode_row(row[1], row[2], row[3], row[4], use_mmap)
+        for row in cursor.fetchall()
+    }
+
+    missing = [chapter_id for chapter_id in chapter_ids if chapter_id not in bodies]
+    if missing:
+        cursor.execute(
+            f"SELECT chapter_id, content FROM chapters WHERE chapter_id IN ({', '.join(['%s'] * len(missing))})",
+            missing
+        )
+        for chapter_id, content in cursor.fetchall():
+            bodies[chapter_id] = content or ''
+    return bodies
+
+
+def load_body(cursor, chapter_id):
+    return load_bodies(cursor, [chapter_id]).get(chapter_id, '')
+
+
+def backfill_chapter_bodies(cursor, start_id=0, batch_size=200, clear_source=False):
+    """把 chapters.content 中尚未迁移的正文写入正文存储，每批一个事务；
+    返回 (本批最大章节ID, 迁移章节数, 原文字节数, 存储字节数)，没有剩余章节时章节ID为 None"""
+    cursor.execute(
+        """
+        SELECT ch.chapter_id, ch.content
+        FROM chapters ch
+        LEFT JOIN chapter_bodies cb ON cb.chapter_id = ch.chapter_id
+        WHERE ch.chapter_id > %s AND cb.chapter_id IS NULL
+        ORDER BY ch.chapter_id
+        LIMIT %s
+        """,
+        [start_id, batch_size]
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return None, 0, 0, 0
+
+    raw_total = stored_total = 0
+    cursor.execute("START TRANSACTION")
+    try:
+        for chapter_id, content in rows:
+            # 与作者编辑并发时以编辑写入的正文为准
+            _, raw_size, stored_size = save_body(cursor, chapter_id, content or '', replace=False)
+            raw_total += raw_size
+            stored_total += stored_size
+        if clear_source:
+            cursor.execute(
+                f"UPDATE chapters SET content = '', update_time = update_time "
+                f"WHERE chapter_id IN ({', '.join(['%s'] * len(rows))})",
+                [row[0] for row in rows]
+            )
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    return rows[-1][0], len(rows), raw_total, stored_total
+
+
+def prune_orphan_files(cursor, directory=None, min_age_seconds=3600):
+    """删除不再被任何章节引用的正文文件，返回删除的文件数；
+    新写入的文件可能属于尚未提交的事务，修改时间在 min_age_seconds 内的文件保留"""
+    root = os.path.join(settings.MEDIA_ROOT, directory or chapter_body_config()['DIRECTORY'])
+    if not os.path.isdir(root):
+        return 0
+    cursor.execute("SELECT DISTINCT content_hash, codec FROM chapter_bodies WHERE storage = %s", [STORAGE_FILE])
+    referenced = {f'{content_hash}.{codec}' for content_hash, codec in cursor.fetchall()}
+    cutoff = time.time() - max(0, min_age_seconds)
+    removed = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename in referenced:
+                continue
+            path = os.path.join(dirpath, filename)
+            if os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+    return removed
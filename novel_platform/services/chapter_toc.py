@@ -0,0 +1,127 @@
+# 章节目录：只读取章节元数据（不含正文），按作品缓存；章节增删改后递增作品的目录版本号使缓存失效
+#
+# 缓存条目记录生成时读到的版本号，读取时与当前版本比较，不一致即重建；
+# 先读版本再查询，保证与写入并发生成的旧目录不会在失效之后被当作新结果使用
+import time
+
+from django.conf import settings
+
+from .cache import TieredCache
+
+_CHAPTER_TOC_DEFAULTS = {
+    'ENABLED': True,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAX_ENTRIES': 2000,
+    'SHARED_TTL': 3600,
+    'CACHE_ALIAS': 'default',
+}
+
+_TOC_SQL = """
+    SELECT chapter_id, title, intro, word_count, is_free, status,
+           chapter_order, create_time, publish_time
+    FROM chapters
+    WHERE work_id = %s
+    ORDER BY chapter_order ASC, create_time ASC, chapter_id ASC
+"""
+
+_entry_cache = None
+_version_cache = None
+
+
+def chapter_toc_config():
+    config = dict(_CHAPTER_TOC_DEFAULTS)
+    config.update(getattr(settings, 'CHAPTER_TOC', {}) or {})
+    return config
+
+
+def _caches():
+    global _entry_cache, _version_cache
+    if _entry_cache is None:
+        config = chapter_toc_config()
+        _entry_cache = TieredCache(
+            'chapter_toc',
+            local_ttl=config['LOCAL_TTL'],
+            local_max_entries=config['LOCAL_MAX_ENTRIES'],
+            shared_ttl=config['SHARED_TTL'],
+            cache_alias=config['CACHE_ALIAS'],
+        )
+        # 版本号的本地层只缓冲 1 秒，失效需要尽快在各进程间可见
+        _version_cache = TieredCache(
+            'chapter_toc_version',
+            local_ttl=1,
+            local_max_entries=config['LOCAL_MAX_ENTRIES'],
+            shared_ttl=config['SHARED_TTL'],
+            cache_alias=config['CACHE_ALIAS'],
+        )
+    return _entry_cache, _version_cache
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def current_version(work_id):
+    """作品当前的目录版本号；未启用缓存时为 None"""
+    if not chapter_toc_config()['ENABLED']:
+        return None
+    _, version_cache = _caches()
+    version = version_cache.get(int(work_id))
+    if version is None:
+        version = _new_version()
+        version_cache.set(int(work_id), version)
+    return version
+
+
+def invalidate(work_id):
+    """章节新增、修改、删除或状态变化提交后调用"""
+    if not work_id:
+        return
+    _, version_cache = _caches()
+    version_cache.set(int(work_id), _new_version())
+
+
+def load_toc(cursor, work_id):
+    """返回 (全部章节, 已发布章节)；已发布章节按读者端的顺序排列且不含创建时间"""
+    cursor.execute(_TOC_SQL, [work_id])
+    chapters = []
+    for row in cursor.fetchall():
+        chapters.append({
+            'chapter_id': row[0],
+            'title': row[1],
+            'intro': row[2],
+            'word_count': row[3] or 0,
+            'is_free': bool(row[4]),
+            'status': row[5],
+            'chapter_order': row[6],
+            'create_time': row[7].isoformat() if row[7] else None,
+            'publish_time': row[8].isoformat() if row[8] else None,
+        })
+
+    # 读者端按 章节序号、发布时间、章节ID 排序；发布时间为空的排在前面，与 MySQL 的 NULL 顺序一致
+    published = sorted(
+        (chapter for chapter in chapters if chapter['status'] == 1),
+        key=lambda chapter: (chapter['chapter_order'], chapter['publish_time'] or '', chapter['chapter_id'])
+    )
+    published = [
+        {key: value for key, value in chapter.items() if key != 'create_time'}
+        for chapter in published
+    ]
+    return chapters, published
+
+
+def get_toc(cursor, work_id, include_unpublished=False):
+    """返回 (版本号, 章节元数据列表)；include_unpublished 为作者视角，包含草稿与下架章节"""
+    config = chapter_toc_config()
+    if not config['ENABLED']:
+        chapters, published = load_toc(cursor, work_id)
+        return None, chapters if include_unpublished else published
+
+    work_id = int(work_id)
+    entry_cache, _ = _caches()
+    version = current_version(work_id)
+    entry = entry_cache.get(work_id)
+    if entry is None or entry['version'] != version:
+        chapters, published = load_toc(cursor, work_id)
+        entry = {'version': version, 'chapters': chapters, 'published': published}
+        entry_cache.set(work_id, entry)
+    return version, entry['chapters'] if include_unpublished else entry['published']
@@ -0,0 +1,332 @@
+# “读过这本的人也读过”：按读者分片统计作品共现，离线生成每部作品的 Top-K 相似作品
+#
+# 计算分两阶段，均可多进程并行：
+#   1. 按读者分片：每个读者的作品两两成对，键为 行作品 * 作品数 + 列作品，分块去重计数后按行作品分桶落盘；
+#   2. 按桶归并：合并各分片同一桶的计数，计算相似度并保留每行得分最高的 K 个。
+# 相似度为余弦相似度乘以收缩系数 co / (co + SHRINKAGE)，共同读者很少的作品对会被压低。
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, connections
+from django.utils import timezone
+
+_CO_READING_DEFAULTS = {
+    'TOP_K': 20,
+    'MIN_CO_READERS': 2,
+    'SHRINKAGE': 10.0,
+    # 每位读者最多参与计数的作品数，避免个别重度读者产生平方级的作品对
+    'MAX_WORKS_PER_READER': 200,
+    # 并行进程数，None 表示 CPU 核数
+    'WORKERS': None,
+    'READER_SHARDS': 16,
+    'BUCKETS': 16,
+    # 单次去重计数的作品对数量上限，决定分片阶段每个进程的峰值内存
+    'PAIR_CHUNK': 8000000,
+    'READER_BATCH_SIZE': 50000,
+    'WRITE_BATCH_SIZE': 1000,
+    'INTERVAL_SECONDS': 86400,
+}
+
+# 收藏、订阅与阅读记录都视为一次“读过”，同一读者同一作品只计一次
+_INTERACTION_SQL = """
+    SELECT reader_id, work_id FROM collections WHERE reader_id > %s AND reader_id <= %s
+    UNION
+    SELECT reader_id, work_id FROM subscriptions WHERE reader_id > %s AND reader_id <= %s
+    UNION
+    SELECT rr.reader_id, ch.work_id
+    FROM reading_records rr
+    JOIN chapters ch ON rr.chapter_id = ch.chapter_id
+    WHERE rr.reader_id > %s AND rr.reader_id <= %s
+"""
+
+
+def co_reading_config():
+    config = dict(_CO_READING_DEFAULTS)
+    config.update(getattr(settings, 'CO_READING', {}) or {})
+    return config
+
+
+def load_interactions(cursor, batch_size=None):
+    """按读者ID区间分批读取 (reader_id, work_id)，返回两个等长的 int64 数组"""
+    batch_size = max(1, int(batch_size or co_reading_config()['READER_BATCH_SIZE']))
+    cursor.execute("SELECT COALESCE(MAX(reader_id), 0) FROM readers")
+    max_reader_id = int(cursor.fetchone()[0] or 0)
+
+    readers, works = [], []
+    low = 0
+    while low < max_reader_id:
+        high = low + batch_size
+        cursor.execute(_INTERACTION_SQL, [low, high] * 3)
+        rows = cursor.fetchall()
+        if rows:
+            batch = np.array(rows, dtype=np.int64)
+            readers.append(batch[:, 0])
+            works.append(batch[:, 1])
+        low = high
+
+    if not readers:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(readers), np.concatenate(works)
+
+
+def _group_bounds(sorted_keys):
+    """已排序数组中每组的起始位置与长度"""
+    if sorted_keys.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+    sizes = np.diff(np.concatenate((starts, [sorted_keys.size])))
+    return starts, sizes
+
+
+def _sum_by_key(keys, counts):
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    counts = counts[order]
+    starts, _ = _group_bounds(keys)
+    if starts.size == 0:
+        return keys, counts
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+def _flush_pairs(buffer, n_works, buckets, path):
+    keys = np.concatenate(buffer)
+    buffer.clear()
+    keys, counts = np.unique(keys, return_counts=True)
+    counts = counts.astype(np.int32)
+    bucket_of = (keys // n_works) % buckets
+    arrays = {}
+    for bucket in range(buckets):
+        mask = bucket_of == bucket
+        arrays[f'k{bucket}'] = keys[mask]
+        arrays[f'c{bucket}'] = counts[mask]
+    np.savez(path, **arrays)
+    return path
+
+
+def _count_reader_shard(task):
+    """分片阶段：统计一组读者内的作品共现，返回落盘文件列表"""
+    reader_index, work_index, n_works, buckets, max_per_reader, pair_chunk, workdir, shard_no = task
+    starts, sizes = _group_bounds(reader_index)
+
+    # 截断重度读者的作品列表
+    if sizes.size and sizes.max() > max_per_reader:
+        offsets = np.arange(reader_index.size) - np.repeat(starts, sizes)
+        keep = offsets < max_per_reader
+        reader_index = reader_index[keep]
+        work_index = work_index[keep]
+        starts, sizes = _group_bounds(reader_index)
+
+    files = []
+    buffer = []
+    buffered = 0
+    for size in np.unique(sizes):
+        if size < 2:
+            continue
+        group_starts = starts[sizes == size]
+        left_pos, right_pos = np.triu_indices(int(size), 1)
+        pairs_per_reader = left_pos.size * 2
+        step = max(1, pair_chunk // pairs_per_reader)
+        for offset in range(0, group_starts.size, step):
+            block = work_index[group_starts[offset:offset + step, None] + np.arange(size)]
+            left = block[:, left_pos].ravel()
+            right = block[:, right_pos].ravel()
+            # 两个方向都要保留，归并阶段每行才能拿到完整的候选列表
+            buffer.append(left * n_works + right)
+            buffer.append(right * n_works + left)
+            buffered += pairs_per_reader * block.shape[0]
+            if buffered >= pair_chunk:
+                files.append(_flush_pairs(buffer, n_works, buckets, os.path.join(workdir, f's{shard_no}_{len(files)}.npz')))
+                buffered = 0
+    if buffer:
+        files.append(_flush_pairs(buffer, n_works, buckets, os.path.join(workdir, f's{shard_no}_{len(files)}.npz')))
+    return files
+
+
+def _reduce_bucket(task):
+    """归并阶段：合并一个桶内的共现计数，计算相似度并保留每行 Top-K"""
+    bucket, files, popularity, n_works, top_k, min_co, shrinkage = task
+    key_parts, count_parts = [], []
+    for path in files:
+        with np.load(path) as data:
+            key_parts.append(data[f'k{bucket}'])
+            count_parts.append(data[f'c{bucket}'])
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+             np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int32))
+    if not key_parts:
+        return empty
+
+    keys, co = _sum_by_key(np.concatenate(key_parts), np.concatenate(count_parts).astype(np.int64))
+    keep = co >= min_co
+    keys, co = keys[keep], co[keep]
+    if keys.size == 0:
+        return empty
+
+    rows = keys // n_works
+    cols = keys % n_works
+    co_float = co.astype(np.float64)
+    scores = co_float / np.sqrt(popularity[rows] * popularity[cols]) * (co_float / (co_float + shrinkage))
+
+    order = np.lexsort((-scores, rows))
+    rows, cols, scores, co = rows[order], cols[order], scores[order], co[order]
+    starts, sizes = _group_bounds(rows)
+    rank = np.arange(rows.size) - np.repeat(starts, sizes)
+    keep = rank < top_k
+    return rows[keep], cols[keep], scores[keep].astype(np.float32), co[keep].astype(np.int32)
+
+
+def _map(pool, func, tasks):
+    if pool is None:
+        return [func(task) for task in tasks]
+    return pool.map(func, tasks, chunksize=1)
+
+
+def build_neighbors(reader_ids, work_ids, top_k=None, workers=None, shards=None, buckets=None,
+                    min_co_readers=None, shrinkage=None, max_works_per_reader=None, pair_chunk=None):
+    """根据 (reader_id, work_id) 交互计算每部作品的相似作品
+
+    返回 (work_id, neighbor_id, score, co_readers, position) 五个等长数组，position 从 0 开始按得分排列。
+    """
+    config = co_reading_config()
+    top_k = int(top_k or config['TOP_K'])
+    workers = int(workers or config['WORKERS'] or os.cpu_count() or 1)
+    shards = max(1, int(shards or config['READER_SHARDS']))
+    buckets = max(1, int(buckets or config['BUCKETS']))
+    min_co_readers = int(min_co_readers if min_co_readers is not None else config['MIN_CO_READERS'])
+    shrinkage = float(shrinkage if shrinkage is not None else config['SHRINKAGE'])
+    max_works_per_reader = int(max_works_per_reader or config['MAX_WORKS_PER_READER'])
+    pair_chunk = int(pair_chunk or config['PAIR_CHUNK'])
+
+    reader_ids = np.asarray(reader_ids, dtype=np.int64)
+    work_ids = np.asarray(work_ids, dtype=np.int64)
+    # 作品映射为连续下标；同一读者同一作品只保留一条
+    work_keys, work_index = np.unique(work_ids, return_inverse=True)
+    n_works = int(work_keys.size)
+    _, reader_index = np.unique(reader_ids, return_inverse=True)
+    pair_keys = np.unique(reader_index.astype(np.int64) * max(1, n_works) + work_index)
+    reader_index = pair_keys // max(1, n_works)
+    work_index = pair_keys % max(1, n_works)
+    del pair_keys
+
+    result_columns = (np.int64, np.int64, np.float32, np.int32, np.int16)
+    if n_works < 2:
+        return tuple(np.empty(0, dtype=dtype) for dtype in result_columns)
+
+    popularity = np.bincount(work_index, minlength=n_works).astype(np.float64)
+
+    # 按读者边界切分，同一读者的记录不会落在两个分片
+    bounds = np.linspace(0, reader_index.size, shards + 1).astype(np.int64)
+    for i in range(1, shards):
+        position = bounds[i]
+        if 0 < position < reader_index.size:
+            bounds[i] = np.searchsorted(reader_index, reader_index[position], side='left')
+
+    workdir = tempfile.mkdtemp(prefix='co_reading_')
+    pool = None
+    try:
+        if workers > 1:
+            # 子进程不使用数据库，先关闭连接避免 fork 后共享同一套接字
+            connections.close_all()
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            pool = context.Pool(workers)
+
+        shard_tasks = [
+            (reader_index[bounds[i]:bounds[i + 1]], work_index[bounds[i]:bounds[i + 1]],
+             n_works, buckets, max_works_per_reader, pair_chunk, workdir, i)
+            for i in range(shards) if bounds[i + 1] > bounds[i]
+        ]
+        files = [path for shard_files in _map(pool, _count_reader_shard, shard_tasks) for path in shard_files]
+
+        reduce_tasks = [
+            (bucket, files, popularity, n_works, top_k, min_co_readers, shrinkage)
+            for bucket in range(buckets)
+        ]
+        parts = _map(pool, _reduce_bucket, reduce_tasks)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    rows = np.concatenate([part[0] for part in parts])
+    cols = np.concatenate([part[1] for part in parts])
+    scores = np.concatenate([part[2] for part in parts])
+    co = np.concatenate([part[3] for part in parts])
+    order = np.lexsort((-scores, rows))
+    rows, cols, scores, co = rows[order], cols[order], scores[order], co[order]
+    starts, sizes = _group_bounds(rows)
+    positions = (np.arange(rows.size) - np.repeat(starts, sizes)).astype(np.int16)
+    return work_keys[rows], work_keys[cols], scores, co, positions
+
+
+def store_neighbors(cursor, neighbors, build_time, batch_size=None):
+    """按作品分批替换 work_neighbors，最后删除本次构建未覆盖的旧行，返回写入行数"""
+    batch_size = max(1, int(batch_size or co_reading_config()['WRITE_BATCH_SIZE']))
+    work_col, neighbor_col, score_col, co_col, position_col = neighbors
+    starts, sizes = _group_bounds(work_col)
+    written = 0
+    for offset in range(0, starts.size, batch_size):
+        first = int(starts[offset])
+        last_group = min(offset + batch_size, starts.size) - 1
+        end = int(starts[last_group] + sizes[last_group])
+        batch_work_ids = [int(value) for value in work_col[starts[offset:last_group + 1]]]
+        rows = [
+            (int(work_col[i]), int(neighbor_col[i]), round(float(score_col[i]), 6), int(co_col[i]), int(position_col[i]))
+            for i in range(first, end)
+        ]
+        params = []
+        for row in rows:
+            params.extend(row)
+            params.append(build_time)
+
+        cursor.execute("START TRANSACTION")
+        try:
+            cursor.execute(
+                f"DELETE FROM work_neighbors WHERE work_id IN ({', '.join(['%s'] * len(batch_work_ids))})",
+                batch_work_ids
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO work_neighbors (work_id, neighbor_id, score, co_readers, position, build_time)
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(rows))}
+                """,
+                params
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        written += len(rows)
+
+    cursor.execute("DELETE FROM work_neighbors WHERE build_time < %s", [build_time])
+    return written
+
+
+def run_co_reading(workers=None, top_k=None):
+    """读取交互、计算并写入相似作品，返回统计信息"""
+    build_time = timezone.localtime().replace(tzinfo=None, microsecond=0)
+    stats = {}
+    started = time.monotonic()
+    with connection.cursor() as cursor:
+        reader_ids, work_ids = load_interactions(cursor)
+    stats['interactions'] = int(reader_ids.size)
+    stats['load_seconds'] = time.monotonic() - started
+
+    started = time.monotonic()
+    neighbors = build_neighbors(reader_ids, work_ids, top_k=top_k, workers=workers)
+    stats['build_seconds'] = time.monotonic() - started
+    stats['works'] = int(np.unique(neighbors[0]).size)
+    del reader_ids, work_ids
+
+    started = time.monotonic()
+    with connection.cursor() as cursor:
+        stats['rows'] = store_neighbors(cursor, neighbors, build_time)
+    stats['store_seconds'] = time.monotonic() - started
+    return stats
@@ -0,0 +1,106 @@
+# 推荐反馈保留期：过期记录由后台任务按批删除，写路径只做一次 upsert
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_FEEDBACK_RETENTION_DEFAULTS = {
+    'RETENTION_DAYS': 180,
+    'BATCH_SIZE': 1000,
+    # 两批之间的停顿，给在线写入让出锁和复制带宽
+    'BATCH_PAUSE': 0.05,
+    'INTERVAL_SECONDS': 3600,
+    # 为 True 时在 Web 进程内启动定时清理线程；部署了定时命令时保持关闭
+    'TIMER_ENABLED': False,
+}
+
+_timer_lock = threading.Lock()
+_timer_pid = None
+
+
+def feedback_retention_config():
+    config = dict(_FEEDBACK_RETENTION_DEFAULTS)
+    config.update(getattr(settings, 'FEEDBACK_RETENTION', {}) or {})
+    return config
+
+
+def retention_cutoff(retention_days):
+    # event_time 由 NOW() 写入，按本地时区的无时区时间比较
+    return timezone.localtime().replace(tzinfo=None, microsecond=0) - timedelta(days=retention_days)
+
+
+def prune_expired_feedback(cursor, retention_days=None, batch_size=None, max_batches=None, pause=None):
+    """按 event_time 索引分批删除过期反馈，每批单独提交，返回 (删除行数, 批次数)"""
+    config = feedback_retention_config()
+    retention_days = int(retention_days or config['RETENTION_DAYS'])
+    batch_size = max(1, int(batch_size or config['BATCH_SIZE']))
+    pause = float(config['BATCH_PAUSE'] if pause is None else pause)
+    cutoff = retention_cutoff(retention_days)
+
+    pruned = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        cursor.execute(
+            """
+            SELECT feedback_id FROM user_recommendation_feedback
+            WHERE event_time < %s
+            ORDER BY event_time
+            LIMIT %s
+            """,
+            [cutoff, batch_size]
+        )
+        feedback_ids = [row[0] for row in cursor.fetchall()]
+        if not feedback_ids:
+            break
+        cursor.execute(
+            f"DELETE FROM user_recommendation_feedback WHERE feedback_id IN ({', '.join(['%s'] * len(feedback_ids))})",
+            feedback_ids
+        )
+        pruned += cursor.rowcount
+        batches += 1
+        if len(feedback_ids) < batch_size:
+            break
+        if pause > 0:
+            time.sleep(pause)
+    return pruned, batches
+
+
+def _timer_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            with connection.cursor() as cursor:
+                pruned, batches = prune_expired_feedback(cursor)
+            if pruned:
+                logger.info('pruned %d expired recommendation feedback rows in %d batches', pruned, batches)
+        except Exception:
+            logger.exception('recommendation feedback pruning failed')
+        finally:
+            connection.close()
+
+
+def start_pruning_timer():
+    """在 AppConfig.ready 中调用：TIMER_ENABLED 时每个进程启动一个守护线程定期清理"""
+    global _timer_pid
+    config = feedback_retention_config()
+    if not config['TIMER_ENABLED']:
+        return False
+    with _timer_lock:
+        if _timer_pid == os.getpid():
+            return False
+        _timer_pid = os.getpid()
+        thread = threading.Thread(
+            target=_timer_loop,
+            args=(max(60.0, float(config['INTERVAL_SECONDS'])),),
+            name='feedback-retention',
+            daemon=True
+        )
+        thread.start()
+    return True
@@ -0,0 +1,216 @@
+# 混合收件箱：个人消息写入 messages，作品更新以广播形式每章只存一行，读取时按书架/订阅合并
+from django.conf import settings
+
+from . import message_counters
+from .notifications import enqueue_chapter_published
+
+SOURCE_MESSAGE = 'message'
+SOURCE_BROADCAST = 'broadcast'
+
+# 合并排序时同一时间点的先后次序
+SOURCE_RANKS = {SOURCE_MESSAGE: 0, SOURCE_BROADCAST: 1}
+
+# 各分支内与外层排序 (send_time, source_rank, message_id) 一一对应的列表达式，用于下推游标条件
+_MESSAGE_SORT_EXPRS = ('send_time', str(SOURCE_RANKS[SOURCE_MESSAGE]), 'message_id')
+_BROADCAST_SORT_EXPRS = ('b.send_time', str(SOURCE_RANKS[SOURCE_BROADCAST]), 'b.broadcast_id')
+
+_MESSAGES_DEFAULTS = {
+    'WORK_UPDATE_DELIVERY': 'broadcast',
+}
+
+
+def messages_config():
+    config = dict(_MESSAGES_DEFAULTS)
+    config.update(getattr(settings, 'MESSAGES', {}) or {})
+    return config
+
+
+def publish_work_update(cursor, work_id, chapter_id, content, message_type, sender_id=None, exclude_ids=()):
+    """在调用方事务内登记作品更新：默认写一条广播，fanout 模式下交给通知 worker 逐个读者写入"""
+    if messages_config()['WORK_UPDATE_DELIVERY'] == 'fanout':
+        return enqueue_chapter_published(
+            cursor, work_id, chapter_id, content, message_type,
+            sender_id=sender_id, exclude_ids=exclude_ids
+        )
+    cursor.execute(
+        """
+        INSERT INTO broadcast_messages (work_id, chapter_id, sender_id, message_type, content, send_time)
+        VALUES (%s, %s, %s, %s, %s, NOW())
+        """,
+        [work_id, chapter_id, sender_id, message_type, content]
+    )
+    return cursor.lastrowid
+
+
+def _apply_keyset(conditions, params, paginator, exprs):
+    if paginator is not None:
+        sql, extra_params = paginator.condition(exprs)
+        if sql:
+            conditions.append(sql)
+            params.extend(extra_params)
+
+
+def broadcast_source(user_id, message_type=None, paginator=None):
+    """返回 (SQL, params)：用户可见的广播消息，列与 messages 查询对齐
+
+    只包含用户收藏或订阅的作品在关注之后发布的更新；已读状态由水位线与单条回执共同决定。
+    """
+    conditions = ["(rc.is_deleted IS NULL OR rc.is_deleted = 0)", "(b.sender_id IS NULL OR b.sender_id <> %s)"]
+    params = [user_id] * 5
+    if message_type not in (None, ''):
+        conditions.append("b.message_type = %s")
+        params.append(message_type)
+    _apply_keyset(conditions, params, paginator, _BROADCAST_SORT_EXPRS)
+    sql = f"""
+        SELECT b.broadcast_id AS message_id, b.sender_id, b.message_type, b.content,
+               3 AS related_type, b.chapter_id AS related_id,
+               CASE WHEN b.broadcast_id <= COALESCE(st.read_watermark, 0) OR rc.is_read = 1 THEN 1 ELSE 0 END AS is_read,
+               b.send_time, {SOURCE_RANKS[SOURCE_BROADCAST]} AS source_rank
+        FROM (
+            SELECT work_id, MIN(follow_time) AS follow_time
+            FROM (
+                SELECT work_id, collect_time AS follow_time FROM collections WHERE reader_id = %s
+                UNION ALL
+                SELECT work_id, sub_time AS follow_time FROM subscriptions WHERE reader_id = %s
+            ) follows
+            GROUP BY work_id
+        ) f
+        JOIN broadcast_messages b ON b.work_id = f.work_id AND b.send_time >= f.follow_time
+        LEFT JOIN user_broadcast_state st ON st.user_id = %s
+        LEFT JOIN user_broadcast_receipts rc ON rc.user_id = %s AND rc.broadcast_id = b.broadcast_id
+        WHERE {' AND '.join(conditions)}
+    """
+    return sql, params
+
+
+def message_source(user_id, message_type=None, paginator=None):
+    conditions = ["recipient_id = %s"]
+    params = [user_id]
+    if message_type not in (None, ''):
+        conditions.append("message_type = %s")
+        params.append(message_type)
+    _apply_keyset(conditions, params, paginator, _MESSAGE_SORT_EXPRS)
+    sql = f"""
+        SELECT message_id, sender_id, message_type, content, related_type, related_id,
+               is_read, send_time, {SOURCE_RANKS[SOURCE_MESSAGE]} AS source_rank
+        FROM messages
+        WHERE {' AND '.join(conditions)}
+    """
+    return sql, params
+
+
+def inbox_source(user_id, message_type, paginator, row_limit):
+    """个人消息与广播消息的 UNION ALL，供外层合并排序与分页
+
+    MySQL 不会把外层的游标条件和 LIMIT 下推到 UNION 派生表的分支内，
+    因此游标条件与 ORDER BY … LIMIT row_limit 直接写在每个分支里，外层只合并两个有界结果。
+    """
+    message_sql, message_params = message_source(user_id, message_type, paginator)
+    broadcast_sql, broadcast_params = broadcast_source(user_id, message_type, paginator)
+    sql = f"""(
+        ({message_sql} ORDER BY send_time DESC, message_id DESC LIMIT %s)
+        UNION ALL
+        ({broadcast_sql} ORDER BY b.send_time DESC, b.broadcast_id DESC LIMIT %s)
+    )"""
+    return sql, message_params + [row_limit] + broadcast_params + [row_limit]
+
+
+def broadcast_counts(cursor, user_id):
+    """按消息类型统计广播的总数与未读数，一次扫描，返回 {message_type: (total, unread)}"""
+    broadcast_sql, params = broadcast_source(user_id)
+    cursor.execute(
+        f"""
+        SELECT bm.message_type, COUNT(*), COALESCE(SUM(CASE WHEN bm.is_read = 0 THEN 1 ELSE 0 END), 0)
+        FROM ({broadcast_sql}) bm
+        GROUP BY bm.message_type
+        """,
+        params
+    )
+    return {row[0]: (int(row[1] or 0), int(row[2] or 0)) for row in cursor.fetchall()}
+
+
+def cached_broadcast_counts(cursor, user_id):
+    """广播计数走短时缓存，已读/删除时失效；未读角标与消息总数共用同一次统计"""
+    cache = message_counters.get_broadcast_unread_cache()
+    counts = cache.get(int(user_id))
+    if counts is None:
+        counts = broadcast_counts(cursor, user_id)
+        cache.set(int(user_id), counts)
+    return counts
+
+
+def broadcast_total(cursor, user_id, message_type=None):
+    return sum(
+        total for type_value, (total, _) in cached_broadcast_counts(cursor, user_id).items()
+        if message_type in (None, '') or str(type_value) == str(message_type)
+    )
+
+
+def unread_summary(cursor, user_id):
+    """未读角标：个人消息读计数表，广播未读数走短时缓存，返回 (unread_count, type_counts)"""
+    broadcast_unread = {
+        message_type: unread
+        for message_type, (_, unread) in cached_broadcast_counts(cursor, user_id).items()
+    }
+
+    unread_by_type = {}
+    for message_type, (_, unread) in message_counters.fetch_counters(cursor, user_id).items():
+        unread_by_type[message_type] = unread_by_type.get(message_type, 0) + unread
+    for message_type, unread in broadcast_unread.items():
+        unread_by_type[message_type] = unread_by_type.get(message_type, 0) + unread
+
+    type_counts = {
+        str(message_type) if message_type is not None else '': count
+        for message_type, count in unread_by_type.items()
+        if count
+    }
+    return sum(type_counts.values()), type_counts
+
+
+def broadcast_visible(cursor, user_id, broadcast_id):
+    broadcast_sql, params = broadcast_source(user_id)
+    cursor.execute(f"SELECT 1 FROM ({broadcast_sql}) bm WHERE bm.message_id = %s", params + [broadcast_id])
+    return cursor.fetchone() is not None
+
+
+def mark_broadcast_read(cursor, user_id, broadcast_id):
+    cursor.execute(
+        """
+        INSERT INTO user_broadcast_receipts (user_id, broadcast_id, is_read, is_deleted)
+        VALUES (%s, %s, 1, 0)
+        ON DUPLICATE KEY UPDATE is_read = 1
+        """,
+        [user_id, broadcast_id]
+    )
+    message_counters.invalidate_broadcast_unread(user_id)
+
+
+def delete_broadcast(cursor, user_id, broadcast_id):
+    cursor.execute(
+        """
+        INSERT INTO user_broadcast_receipts (user_id, broadcast_id, is_read, is_deleted)
+        VALUES (%s, %s, 1, 1)
+        ON DUPLICATE KEY UPDATE is_read = 1, is_deleted = 1
+        """,
+        [user_id, broadcast_id]
+    )
+    message_counters.invalidate_broadcast_unread(user_id)
+
+
+def mark_all_broadcasts_read(cursor, user_id):
+    """水位线推进到当前最大广播ID，水位线以下的已读回执不再需要"""
+    cursor.execute("SELECT COALESCE(MAX(broadcast_id), 0) FROM broadcast_messages")
+    watermark = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO user_broadcast_state (user_id, read_watermark) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE read_watermark = GREATEST(read_watermark, VALUES(read_watermark))
+        """,
+        [user_id, watermark]
+    )
+    cursor.execute(
+        "DELETE FROM user_broadcast_receipts WHERE user_id = %s AND broadcast_id <= %s AND is_deleted = 0",
+        [user_id, watermark]
+    )
+    message_counters.invalidate_broadcast_unread(user_id)
+    return watermark
@@ -0,0 +1,137 @@
+# 站内信计数：user_message_counters 按 (用户, 消息类型) 维护总数与未读数，广播总数与未读数短时缓存
+from django.conf import settings
+
+from .cache import TieredCache
+
+_MESSAGE_COUNTERS_DEFAULTS = {
+    'BROADCAST_LOCAL_TTL': 2,
+    'BROADCAST_SHARED_TTL': 30,
+    'CACHE_ALIAS': 'default',
+}
+
+_broadcast_unread_cache = None
+
+
+def message_counters_config():
+    config = dict(_MESSAGE_COUNTERS_DEFAULTS)
+    config.update(getattr(settings, 'MESSAGE_COUNTERS', {}) or {})
+    return config
+
+
+def get_broadcast_unread_cache():
+    global _broadcast_unread_cache
+    if _broadcast_unread_cache is None:
+        config = message_counters_config()
+        _broadcast_unread_cache = TieredCache(
+            # 缓存值为 {消息类型: (总数, 未读数)}
+            'broadcast_counts',
+            local_ttl=config['BROADCAST_LOCAL_TTL'],
+            shared_ttl=config['BROADCAST_SHARED_TTL'],
+            cache_alias=config['CACHE_ALIAS'],
+        )
+    return _broadcast_unread_cache
+
+
+def invalidate_broadcast_unread(user_id):
+    if user_id:
+        get_broadcast_unread_cache().delete(int(user_id))
+
+
+def add_messages(cursor, recipients):
+    """recipients: 可迭代的 (user_id, message_type)，每项计一条新的未读消息，合并为一条多行 upsert"""
+    counts = {}
+    for user_id, message_type in recipients:
+        if user_id:
+            key = (user_id, message_type)
+            counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return
+    params = []
+    for (user_id, message_type), count in counts.items():
+        params.extend([user_id, message_type, count, count])
+    cursor.execute(
+        f"""
+        INSERT INTO user_message_counters (user_id, message_type, total_count, unread_count)
+        VALUES {', '.join(['(%s, %s, %s, %s)'] * len(counts))}
+        ON DUPLICATE KEY UPDATE
+            total_count = total_count + VALUES(total_count),
+            unread_count = unread_count + VALUES(unread_count)
+        """,
+        params
+    )
+
+
+def message_read(cursor, user_id, message_type):
+    cursor.execute(
+        """
+        UPDATE user_message_counters
+        SET unread_count = GREATEST(unread_count - 1, 0)
+        WHERE user_id = %s AND message_type = %s
+        """,
+        [user_id, message_type]
+    )
+
+
+def message_deleted(cursor, user_id, message_type, was_unread):
+    cursor.execute(
+        """
+        UPDATE user_message_counters
+        SET total_count = GREATEST(total_count - 1, 0),
+            unread_count = GREATEST(unread_count - %s, 0)
+        WHERE user_id = %s AND message_type = %s
+        """,
+        [1 if was_unread else 0, user_id, message_type]
+    )
+
+
+def clear_unread(cursor, user_id):
+    cursor.execute("UPDATE user_message_counters SET unread_count = 0 WHERE user_id = %s", [user_id])
+
+
+def fetch_counters(cursor, user_id):
+    """返回 {message_type: (total, unread)}，只读取该用户的计数行"""
+    cursor.execute(
+        "SELECT message_type, total_count, unread_count FROM user_message_counters WHERE user_id = %s",
+        [user_id]
+    )
+    return {row[0]: (int(row[1] or 0), int(row[2] or 0)) for row in cursor.fetchall()}
+
+
+def reconcile_counters(cursor, user_ids):
+    """按 messages 表重新统计指定用户的计数"""
+    user_ids = [int(user_id) for user_id in user_ids if user_id]
+    if not user_ids:
+        return 0
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    cursor.execute("START TRANSACTION")
+    try:
+        cursor.execute(f"DELETE FROM user_message_counters WHERE user_id IN ({placeholders})", user_ids)
+        cursor.execute(
+            f"""
+            INSERT INTO user_message_counters (user_id, message_type, total_count, unread_count)
+            SELECT recipient_id, message_type, COUNT(*), SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END)
+            FROM messages
+            WHERE recipient_id IN ({placeholders})
+            GROUP BY recipient_id, message_type
+            """,
+            user_ids
+        )
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    return len(user_ids)
+
+
+def iter_user_id_batches(cursor, batch_size=500):
+    last_user_id = 0
+    while True:
+        cursor.execute(
+            "SELECT user_id FROM users WHERE user_id > %s ORDER BY user_id LIMIT %s",
+            [last_user_id, batch_size]
+        )
+        batch = [row[0] for row in cursor.fetchall()]
+        if not batch:
+            break
+        yield batch
+        last_user_id = batch[-1]
@@ -0,0 +1,229 @@
+# 通知扇出：写路径只写入 notification_events，后台 worker 按读者ID游标分批生成站内信
+import json
+
+from django.conf import settings
+from django.db import connection
+
+from . import message_counters
+
+EVENT_STATUS_PENDING = 0
+EVENT_STATUS_RUNNING = 1
+EVENT_STATUS_DONE = 2
+EVENT_STATUS_FAILED = 3
+
+EVENT_CHAPTER_PUBLISHED = 'chapter_published'
+
+_NOTIFICATIONS_DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    'POLL_INTERVAL': 2,
+    'LEASE_SECONDS': 300,
+    'MAX_ATTEMPTS': 5,
+}
+
+# 收藏与订阅读者合并去重，按 reader_id 升序分批读取
+_WORK_FOLLOWERS_SQL = """
+    SELECT reader_id FROM (
+        SELECT reader_id FROM collections WHERE work_id = %s AND reader_id > %s
+        UNION
+        SELECT reader_id FROM subscriptions WHERE work_id = %s AND reader_id > %s
+    ) followers
+    ORDER BY reader_id
+    LIMIT %s
+"""
+
+
+def notifications_config():
+    config = dict(_NOTIFICATIONS_DEFAULTS)
+    config.update(getattr(settings, 'NOTIFICATIONS', {}) or {})
+    return config
+
+
+def enqueue_chapter_published(cursor, work_id, chapter_id, content, message_type, sender_id=None, exclude_ids=()):
+    """在调用方事务内登记章节发布事件，读者消息由 worker 生成"""
+    cursor.execute(
+        """
+        INSERT INTO notification_events (event_type, work_id, message_type, content,
+                                         related_type, related_id, sender_id, exclude_ids)
+        VALUES (%s, %s, %s, %s, 3, %s, %s, %s)
+        """,
+        [
+            EVENT_CHAPTER_PUBLISHED,
+            work_id,
+            message_type,
+            content,
+            chapter_id,
+            sender_id,
+            json.dumps(sorted({int(user_id) for user_id in exclude_ids if user_id})),
+        ]
+    )
+    return cursor.lastrowid
+
+
+def _claim_event(cursor, event_id, lease_seconds, max_attempts):
+    # 待处理或租约已过期的事件才能被领取，多个 worker 并行时由 UPDATE 保证只有一个成功
+    cursor.execute(
+        """
+        UPDATE notification_events
+        SET status = %s, attempts = attempts + 1,
+            locked_until = DATE_ADD(NOW(), INTERVAL %s SECOND)
+        WHERE event_id = %s AND attempts < %s
+          AND (status = %s OR (status = %s AND locked_until < NOW()))
+        """,
+        [
+            EVENT_STATUS_RUNNING,
+            lease_seconds,
+            event_id,
+            max_attempts,
+            EVENT_STATUS_PENDING,
+            EVENT_STATUS_RUNNING,
+        ]
+    )
+    return cursor.rowcount == 1
+
+
+def _insert_messages(cursor, event, recipient_ids):
+    row_placeholder = '(%s, %s, %s, %s, %s, %s, 0, NOW())'
+    params = []
+    for recipient_id in recipient_ids:
+        params.extend([
+            event['sender_id'],
+            recipient_id,
+            event['message_type'],
+            event['content'],
+            event['related_type'],
+            event['related_id'],
+        ])
+    cursor.execute(
+        f"""
+        INSERT INTO messages (sender_id, recipient_id, message_type, content,
+                              related_type, related_id, is_read, send_time)
+        VALUES {', '.join([row_placeholder] * len(recipient_ids))}
+        """,
+        params
+    )
+
+
+def deliver_event(cursor, event_id, batch_size, lease_seconds):
+    """逐批投递一个已领取的事件；每批消息与进度游标在同一事务提交，中断后可从游标继续"""
+    cursor.execute(
+        """
+        SELECT event_id, work_id, message_type, content, related_type, related_id,
+               sender_id, exclude_ids, last_recipient_id
+        FROM notification_events
+        WHERE event_id = %s
+        """,
+        [event_id]
+    )
+    row = cursor.fetchone()
+    if not row:
+        return 0
+    event = {
+        'work_id': row[1],
+        'message_type': row[2],
+        'content': row[3],
+        'related_type': row[4],
+        'related_id': row[5],
+        'sender_id': row[6],
+    }
+    try:
+        excluded = set(json.loads(row[7] or '[]'))
+    except (TypeError, ValueError):
+        excluded = set()
+    last_recipient_id = row[8] or 0
+    delivered = 0
+
+    while True:
+        cursor.execute(
+            _WORK_FOLLOWERS_SQL,
+            [event['work_id'], last_recipient_id, event['work_id'], last_recipient_id, batch_size]
+        )
+        follower_ids = [follower[0] for follower in cursor.fetchall()]
+        if not follower_ids:
+            break
+
+        recipient_ids = [reader_id for reader_id in follower_ids if reader_id not in excluded]
+        last_recipient_id = follower_ids[-1]
+
+        cursor.execute("START TRANSACTION")
+        try:
+            if recipient_ids:
+                _insert_messages(cursor, event, recipient_ids)
+                message_counters.add_messages(
+                    cursor, [(recipient_id, event['message_type']) for recipient_id in recipient_ids]
+                )
+            cursor.execute(
+                """
+                UPDATE notification_events
+                SET last_recipient_id = %s, delivered_count = delivered_count + %s,
+                    locked_until = DATE_ADD(NOW(), INTERVAL %s SECOND)
+                WHERE event_id = %s
+                """,
+                [last_recipient_id, len(recipient_ids), lease_seconds, event_id]
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        delivered += len(recipient_ids)
+
+        if len(follower_ids) < batch_size:
+            break
+
+    cursor.execute(
+        """
+        UPDATE notification_events
+        SET status = %s, locked_until = NULL, finish_time = NOW(), last_error = NULL
+        WHERE event_id = %s
+        """,
+        [EVENT_STATUS_DONE, event_id]
+    )
+    return delivered
+
+
+def _mark_failed(cursor, event_id, error, max_attempts):
+    # 未达到最大重试次数时退回待处理，下一轮从游标位置继续
+    cursor.execute(
+        """
+        UPDATE notification_events
+        SET status = CASE WHEN attempts >= %s THEN %s ELSE %s END,
+            locked_until = NULL, last_error = %s
+        WHERE event_id = %s
+        """,
+        [max_attempts, EVENT_STATUS_FAILED, EVENT_STATUS_PENDING, str(error)[:1000], event_id]
+    )
+
+
+def process_pending_events(max_events=None, batch_size=None):
+    """处理一轮待投递事件，返回 (处理事件数, 投递消息数)"""
+    config = notifications_config()
+    batch_size = max(1, int(batch_size or config['BATCH_SIZE']))
+    lease_seconds = max(1, int(config['LEASE_SECONDS']))
+    max_attempts = max(1, int(config['MAX_ATTEMPTS']))
+
+    events_done = 0
+    messages_sent = 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT event_id
+            FROM notification_events
+            WHERE attempts < %s
+              AND (status = %s OR (status = %s AND locked_until < NOW()))
+            ORDER BY event_id
+            LIMIT %s
+            """,
+            [max_attempts, EVENT_STATUS_PENDING, EVENT_STATUS_RUNNING, int(max_events or 100)]
+        )
+        event_ids = [row[0] for row in cursor.fetchall()]
+
+        for event_id in event_ids:
+            if not _claim_event(cursor, event_id, lease_seconds, max_attempts):
+                continue
+            try:
+                messages_sent += deliver_event(cursor, event_id, batch_size, lease_seconds)
+                events_done += 1
+            except Exception as exc:
+                _mark_failed(cursor, event_id, exc, max_attempts)
+
+    return events_done, messages_sent
+
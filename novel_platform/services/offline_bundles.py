@@ -0,0 +1,138 @@
+# 离线下载包：把一段章节范围内用户有权阅读的章节写成 gzip 压缩的 NDJSON，边读边压缩边发送
+#
+# 第一行为作品信息，之后每行一个章节；正文按章节顺序分批读取，内存占用与下载范围大小无关。
+# 内容相同的下载包（作品及其标题、章节范围、目录版本号、可读章节集合都相同）写入 MEDIA_ROOT 下的缓存文件，
+# 后续请求直接发送文件；目录版本号随章节增删改递增，编辑过的章节不会命中旧的下载包
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+
+from django.conf import settings
+from django.db import connection
+
+from . import chapter_bodies
+
+logger = logging.getLogger(__name__)
+
+_OFFLINE_BUNDLE_DEFAULTS = {
+    'DIRECTORY': 'offline_bundles',
+    # 是否缓存生成的下载包；目录缓存未启用（没有目录版本号）时不缓存
+    'CACHE_ENABLED': True,
+    'MAX_CHAPTERS': 2000,
+    'BATCH_SIZE': 50,
+    'COMPRESS_LEVEL': 6,
+    # 下载包缓存文件的保留时间，由 prune_offline_bundles 命令清理
+    'MAX_AGE_SECONDS': 7 * 24 * 3600,
+}
+
+# 调整下载包格式时递增，旧格式的缓存文件不再被使用
+BUNDLE_FORMAT = 1
+
+
+def offline_bundle_config():
+    config = dict(_OFFLINE_BUNDLE_DEFAULTS)
+    config.update(getattr(settings, 'OFFLINE_BUNDLE', {}) or {})
+    return config
+
+
+def bundle_key(work_id, work_title, first_chapter_id, last_chapter_id, toc_version, chapter_ids):
+    """下载包内容只由这些因素决定；可读章节集合相同的用户共用同一个下载包"""
+    # 作品标题写在下载包首行，改名不会使目录版本号递增，需要单独计入
+    signature = '|'.join([
+        str(BUNDLE_FORMAT), str(work_id), work_title or '', str(first_chapter_id), str(last_chapter_id),
+        str(toc_version),
+        ','.join(str(chapter_id) for chapter_id in chapter_ids),
+    ])
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+
+def bundle_path(work_id, key):
+    directory = offline_bundle_config()['DIRECTORY']
+    return os.path.join(settings.MEDIA_ROOT, directory, str(work_id), f'{key}.ndjson.gz')
+
+
+def _line(record):
+    return (json.dumps(record, ensure_ascii=False, default=str, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def generate_bundle(header, chapters, batch_size=None, compress_level=None):
+    """按章节顺序分批读取正文，逐块产出 gzip 压缩后的 NDJSON 字节；chapters 为目录中的章节元数据"""
+    config = offline_bundle_config()
+    batch_size = max(1, int(batch_size or config['BATCH_SIZE']))
+    level = int(config['COMPRESS_LEVEL'] if compress_level is None else compress_level)
+    # wbits=31 输出带 gzip 头的数据流，可以直接用 gunzip 解压
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    pending = [compressor.compress(_line(header))]
+    for start in range(0, len(chapters), batch_size):
+        batch = chapters[start:start + batch_size]
+        # 每批单独获取游标，流式响应期间不长时间占用同一个查询结果集
+        with connection.cursor() as cursor:
+            bodies = chapter_bodies.load_bodies(cursor, [chapter['chapter_id'] for chapter in batch])
+        for chapter in batch:
+            if chapter['chapter_id'] not in bodies:
+                # 生成期间被删除的章节
+                continue
+            record = {'type': 'chapter', **chapter, 'content': bodies[chapter['chapter_id']]}
+            pending.append(compressor.compress(_line(record)))
+        chunk = b''.join(pending)
+        pending = []
+        if chunk:
+            yield chunk
+    yield b''.join(pending) + compressor.flush()
+
+
+def open_cached_bundle(path):
+    """打开已缓存的下载包，不存在时返回 None"""
+    try:
+        handle = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    # 命中时刷新修改时间，常用的下载包不会被过期清理
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return handle
+
+
+def caching_stream(chunks, path):
+    """把生成的数据块原样转发，同时写入临时文件；完整生成后才替换为缓存文件，中途断开则丢弃"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.{time.time_ns()}.tmp'
+    completed = False
+    try:
+        with open(temp_path, 'wb') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                yield chunk
+        os.replace(temp_path, path)
+        completed = True
+    finally:
+        if not completed:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                logger.warning('failed to remove partial offline bundle %s', temp_path)
+
+
+def prune_bundles(max_age_seconds=None, directory=None):
+    """删除超过保留时间未被使用的下载包与遗留的临时文件，返回删除的文件数"""
+    config = offline_bundle_config()
+    max_age_seconds = config['MAX_AGE_SECONDS'] if max_age_seconds is None else max_age_seconds
+    root = os.path.join(settings.MEDIA_ROOT, directory or config['DIRECTORY'])
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max(0, max_age_seconds)
+    removed = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+    return removed
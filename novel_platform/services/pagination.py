@@ -0,0 +1,137 @@
+# 游标（keyset）分页：游标中编码排序键与唯一ID，翻页代价与页深无关
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+class CursorError(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['dec', str(value)]
+    return ['v', value]
+
+
+def _decode_value(item):
+    try:
+        kind, value = item
+    except (TypeError, ValueError):
+        raise CursorError('游标格式无效')
+    if kind == 'dt':
+        return datetime.fromisoformat(value)
+    if kind == 'd':
+        return date.fromisoformat(value)
+    if kind == 'dec':
+        return Decimal(value)
+    if kind == 'v':
+        return value
+    raise CursorError('游标格式无效')
+
+
+def encode_cursor(values, fingerprint):
+    payload = {'k': [_encode_value(value) for value in values], 'f': fingerprint}
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, fingerprint):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise CursorError('游标格式无效')
+    if not isinstance(payload, dict) or payload.get('f') != fingerprint:
+        raise CursorError('游标与当前排序方式不匹配')
+    values = payload.get('k')
+    if not isinstance(values, list):
+        raise CursorError('游标格式无效')
+    return [_decode_value(item) for item in values]
+
+
+class KeysetPaginator:
+    """sort_fields 为 [(SQL表达式, 'ASC'/'DESC'), ...]，最后一项必须唯一（通常为主键）
+
+    排序表达式对应的列应为 NOT NULL，取值通过 row_key 从结果行中取出。
+    """
+
+    def __init__(self, name, sort_fields, page_size, cursor_token=None, include_total=False):
+        self.sort_fields = [(expr, direction.upper()) for expr, direction in sort_fields]
+        self.page_size = page_size
+        self.include_total = include_total
+        spec = name + '|' + ','.join(f'{expr} {direction}' for expr, direction in self.sort_fields)
+        self.fingerprint = hashlib.sha1(spec.encode('utf-8')).hexdigest()[:12]
+        self.after = None
+        if cursor_token:
+            self.after = decode_cursor(cursor_token, self.fingerprint)
+            if len(self.after) != len(self.sort_fields):
+                raise CursorError('游标格式无效')
+
+    @classmethod
+    def from_request(cls, request, name, sort_fields, page_size):
+        """请求中带 cursor 参数（可为空表示第一页）时启用游标分页，否则返回 None"""
+        if 'cursor' not in request.GET:
+            return None
+        include_total = (request.GET.get('include_total') or '').lower() in ('1', 'true', 'yes')
+        return cls(name, sort_fields, page_size, request.GET.get('cursor') or None, include_total)
+
+    @property
+    def order_by(self):
+        return ', '.join(f'{expr} {direction}' for expr, direction in self.sort_fields)
+
+    @property
+    def limit(self):
+        # 多取一行用于判断是否还有下一页
+        return self.page_size + 1
+
+    def condition(self, exprs=None):
+        """返回 (SQL, params)，展开为 (a < x) OR (a = x AND b < y) ... 形式以便使用复合索引；
+        exprs 按排序字段顺序替换列表达式，用于把同一游标条件下推到 UNION 的各个分支"""
+        if self.after is None:
+            return None, []
+        exprs = list(exprs) if exprs is not None else [expr for expr, _ in self.sort_fields]
+        if len(exprs) != len(self.sort_fields):
+            raise ValueError('exprs must match sort_fields')
+        clauses = []
+        params = []
+        for index, (_, direction) in enumerate(self.sort_fields):
+            expr = exprs[index]
+            parts = []
+            for prev_expr in exprs[:index]:
+                parts.append(f'{prev_expr} = %s')
+            operator = '<' if direction == 'DESC' else '>'
+            parts.append(f'{expr} {operator} %s')
+            clauses.append('(' + ' AND '.join(parts) + ')')
+            params.extend(self.after[:index])
+            params.append(self.after[index])
+        return '(' + ' OR '.join(clauses) + ')', params
+
+    def apply(self, conditions, params):
+        sql, extra_params = self.condition()
+        if sql:
+            conditions.append(sql)
+            params.extend(extra_params)
+
+    def paginate(self, rows, row_key):
+        rows = list(rows)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = encode_cursor(list(row_key(rows[-1])), self.fingerprint)
+        return rows, {'next_cursor': next_cursor, 'has_more': has_more, 'page_size': self.page_size}
+
+
+def page_window(paginator, default_order, page_size, offset):
+    """返回 (ORDER BY 子句, LIMIT 子句, LIMIT 参数)，未启用游标时保持原有偏移分页"""
+    if paginator is None:
+        return default_order, 'LIMIT %s OFFSET %s', [page_size, offset]
+    return paginator.order_by, 'LIMIT %s', [paginator.limit]
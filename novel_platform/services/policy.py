@@ -0,0 +1,207 @@
+# 权限与管控策略：用户权限、作品管控按ID缓存，读路径只查询不写入，缺失的记录按默认值处理
+from django.conf import settings
+
+from .cache import TieredCache
+
+# 权限字段 -> user_permissions 列名；缺失记录时全部视为允许
+USER_PERMISSION_COLUMNS = {
+    'can_publish': 'can_publish',
+    'can_subscribe': 'can_subscribe',
+    'can_recharge': 'can_recharge',
+    'can_comment': 'can_comment',
+    'can_vote': 'can_vote',
+}
+
+# 管控字段 -> work_moderations 列名；缺失记录时视为未做任何限制
+WORK_MODERATION_COLUMNS = {
+    'is_hidden': 'is_hidden',
+    'chapters_blocked': 'chapters_blocked',
+    'updates_blocked': 'updates_blocked',
+    'subscriptions_blocked': 'subscriptions_blocked',
+    'votes_blocked': 'votes_blocked',
+    'note': 'note',
+}
+
+_POLICY_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    'LOCAL_TTL': 10,
+    'LOCAL_MAX_ENTRIES': 20000,
+    'SHARED_TTL': 600,
+    'CACHE_ALIAS': 'default',
+}
+
+_permission_cache = None
+_moderation_cache = None
+
+
+def policy_cache_config():
+    config = dict(_POLICY_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'POLICY_CACHE', {}) or {})
+    return config
+
+
+def _build_cache(namespace):
+    config = policy_cache_config()
+    return TieredCache(
+        namespace,
+        local_ttl=config['LOCAL_TTL'],
+        local_max_entries=config['LOCAL_MAX_ENTRIES'],
+        shared_ttl=config['SHARED_TTL'],
+        cache_alias=config['CACHE_ALIAS'],
+    )
+
+
+def get_permission_cache():
+    global _permission_cache
+    if _permission_cache is None:
+        _permission_cache = _build_cache('user_permissions')
+    return _permission_cache
+
+
+def get_moderation_cache():
+    global _moderation_cache
+    if _moderation_cache is None:
+        _moderation_cache = _build_cache('work_moderation')
+    return _moderation_cache
+
+
+def default_user_permissions():
+    return {key: True for key in USER_PERMISSION_COLUMNS}
+
+
+def default_work_moderation():
+    moderation = {key: False for key in WORK_MODERATION_COLUMNS}
+    moderation['note'] = ''
+    return moderation
+
+
+def load_user_permissions(cursor, user_id):
+    cursor.execute(
+        f"SELECT {', '.join(USER_PERMISSION_COLUMNS.values())} FROM user_permissions WHERE user_id = %s",
+        [user_id]
+    )
+    row = cursor.fetchone()
+    if not row:
+        return default_user_permissions()
+    return {key: bool(value) for key, value in zip(USER_PERMISSION_COLUMNS, row)}
+
+
+def load_work_moderation(cursor, work_id):
+    cursor.execute(
+        f"SELECT {', '.join(WORK_MODERATION_COLUMNS.values())} FROM work_moderations WHERE work_id = %s",
+        [work_id]
+    )
+    row = cursor.fetchone()
+    if not row:
+        return default_work_moderation()
+    moderation = {key: bool(value) for key, value in zip(WORK_MODERATION_COLUMNS, row)}
+    moderation['note'] = row[-1] or ''
+    return moderation
+
+
+def _cached(cache, key, loader, cursor):
+    if not policy_cache_config()['ENABLED']:
+        return loader(cursor, key)
+    value = cache.get(key)
+    if value is None:
+        value = loader(cursor, key)
+        cache.set(key, value)
+    return dict(value)
+
+
+def get_user_permissions(cursor, user_id):
+    return _cached(get_permission_cache(), int(user_id), load_user_permissions, cursor)
+
+
+def get_work_moderation(cursor, work_id):
+    return _cached(get_moderation_cache(), int(work_id), load_work_moderation, cursor)
+
+
+def invalidate_user_permissions(user_id):
+    if user_id:
+        get_permission_cache().delete(int(user_id))
+
+
+def invalidate_work_moderation(work_id):
+    if work_id:
+        get_moderation_cache().delete(int(work_id))
+
+
+def save_user_permissions(cursor, user_id, permissions):
+    """写入完整的权限状态，记录不存在时创建，随后失效缓存"""
+    columns = list(USER_PERMISSION_COLUMNS.values())
+    values = [1 if permissions.get(key, True) else 0 for key in USER_PERMISSION_COLUMNS]
+    cursor.execute(
+        f"""
+        INSERT INTO user_permissions (user_id, {', '.join(columns)}, create_time, update_time)
+        VALUES (%s, {', '.join(['%s'] * len(columns))}, NOW(), NOW())
+        ON DUPLICATE KEY UPDATE
+            {', '.join(f'{column} = VALUES({column})' for column in columns)},
+            update_time = NOW()
+        """,
+        [user_id] + values
+    )
+    invalidate_user_permissions(user_id)
+
+
+def save_work_moderation(cursor, work_id, moderation, updated_by=None):
+    """写入完整的管控状态，记录不存在时创建，随后失效缓存"""
+    columns = list(WORK_MODERATION_COLUMNS.values())
+    values = []
+    for key in WORK_MODERATION_COLUMNS:
+        if key == 'note':
+            values.append(moderation.get('note') or '')
+        else:
+            values.append(1 if moderation.get(key) else 0)
+    cursor.execute(
+        f"""
+        INSERT INTO work_moderations (work_id, {', '.join(columns)}, updated_by, update_time, create_time)
+        VALUES (%s, {', '.join(['%s'] * len(columns))}, %s, NOW(), NOW())
+        ON DUPLICATE KEY UPDATE
+            {', '.join(f'{column} = VALUES({column})' for column in columns)},
+            updated_by = VALUES(updated_by),
+            update_time = NOW()
+        """,
+        [work_id] + values + [updated_by]
+    )
+    invalidate_work_moderation(work_id)
+
+
+def backfill_user_permissions(cursor, start_id, batch_size):
+    """为 start_id 之后的一批用户补齐默认权限记录，返回 (本批最大用户ID, 新增行数)"""
+    cursor.execute(
+        "SELECT user_id FROM users WHERE user_id > %s ORDER BY user_id LIMIT %s",
+        [start_id, batch_size]
+    )
+    user_ids = [row[0] for row in cursor.fetchall()]
+    if not user_ids:
+        return None, 0
+    cursor.execute(
+        f"""
+        INSERT IGNORE INTO user_permissions (user_id, {', '.join(USER_PERMISSION_COLUMNS.values())},
+                                             create_time, update_time)
+        VALUES {', '.join(['(%s, 1, 1, 1, 1, 1, NOW(), NOW())'] * len(user_ids))}
+        """,
+        user_ids
+    )
+    return user_ids[-1], cursor.rowcount
+
+
+def backfill_work_moderations(cursor, start_id, batch_size):
+    """为 start_id 之后的一批作品补齐默认管控记录，返回 (本批最大作品ID, 新增行数)"""
+    cursor.execute(
+        "SELECT work_id FROM works WHERE work_id > %s ORDER BY work_id LIMIT %s",
+        [start_id, batch_size]
+    )
+    work_ids = [row[0] for row in cursor.fetchall()]
+    if not work_ids:
+        return None, 0
+    cursor.execute(
+        f"""
+        INSERT IGNORE INTO work_moderations (work_id, {', '.join(WORK_MODERATION_COLUMNS.values())},
+                                             updated_by, update_time, create_time)
+        VALUES {', '.join(["(%s, 0, 0, 0, 0, 0, '', NULL, NOW(), NOW())"] * len(work_ids))}
+        """,
+        work_ids
+    )
+    return work_ids[-1], cursor.rowcount
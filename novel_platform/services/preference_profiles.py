@@ -0,0 +1,384 @@
+# 用户偏好画像：user_preference_profiles 每个用户一行，保存按半衰期衰减的分类/标签得分
+# 写路径在收藏、阅读、投票、订阅、推荐反馈时增量累加，推荐接口只读取一行；缺失的画像按历史行为重建一次
+import json
+import math
+
+from django.conf import settings
+from django.utils import timezone
+
+from .tags import normalize_tag, parse_tags_field
+
+FEEDBACK_EVENT_CLICK = 1
+FEEDBACK_EVENT_VIEW = 2
+FEEDBACK_EVENT_COLLECT = 3
+FEEDBACK_EVENT_READ = 4
+FEEDBACK_EVENT_SUBSCRIBE = 5
+FEEDBACK_EVENT_VOTE = 6
+
+FEEDBACK_EVENT_WEIGHTS = {
+    FEEDBACK_EVENT_CLICK: 1.0,
+    FEEDBACK_EVENT_VIEW: 1.2,
+    FEEDBACK_EVENT_COLLECT: 3.0,
+    FEEDBACK_EVENT_READ: 1.8,
+    FEEDBACK_EVENT_SUBSCRIBE: 2.5,
+    FEEDBACK_EVENT_VOTE: 2.8,
+}
+
+PREFERENCE_WEIGHT_MAP = {
+    'collection': 3.0,
+    'reading': 1.5,
+    'vote': 2.5,
+    'subscription': 3.0,
+    'feedback': 1.0,
+}
+
+_PREFERENCE_PROFILES_DEFAULTS = {
+    'HALF_LIFE_DAYS': 60,
+    'MIN_SCORE': 0.01,
+    'MAX_TAGS': 200,
+    'MAX_RETRIES': 3,
+    'DECAY_BATCH_SIZE': 500,
+    'DECAY_INTERVAL_SECONDS': 86400,
+}
+
+
+def preference_profiles_config():
+    config = dict(_PREFERENCE_PROFILES_DEFAULTS)
+    config.update(getattr(settings, 'PREFERENCE_PROFILES', {}) or {})
+    return config
+
+
+def _now():
+    # 与 MySQL NOW() 一致的本地无时区时间
+    return timezone.localtime().replace(tzinfo=None, microsecond=0)
+
+
+def decay_factor(since, now, half_life_days=None):
+    if since is None:
+        return 1.0
+    if half_life_days is None:
+        half_life_days = float(preference_profiles_config()['HALF_LIFE_DAYS'])
+    if half_life_days <= 0:
+        return 1.0
+    if timezone.is_aware(since):
+        since = timezone.localtime(since).replace(tzinfo=None)
+    elapsed_days = max(0.0, (now - since).total_seconds() / 86400.0)
+    return math.pow(0.5, elapsed_days / half_life_days)
+
+
+def reading_score(chapter_count):
+    """阅读得分随同一作品已读章节数开方增长"""
+    return PREFERENCE_WEIGHT_MAP['reading'] * math.sqrt(chapter_count) if chapter_count > 0 else 0.0
+
+
+def feedback_score(event_type, weight):
+    return FEEDBACK_EVENT_WEIGHTS.get(int(event_type or 0), 0.0) * weight * PREFERENCE_WEIGHT_MAP['feedback']
+
+
+class PreferenceProfile:
+    """内存中的画像：category_scores / tag_scores 均为相对 decayed_at 时刻的得分"""
+
+    def __init__(self, category_scores=None, tag_scores=None, tag_labels=None,
+                 signal_count=0, decayed_at=None, version=0):
+        self.category_scores = dict(category_scores or {})
+        self.tag_scores = dict(tag_scores or {})
+        self.tag_labels = dict(tag_labels or {})
+        self.signal_count = int(signal_count or 0)
+        self.decayed_at = decayed_at
+        self.version = int(version or 0)
+
+    @classmethod
+    def from_row(cls, row):
+        category_scores, tag_scores, tag_labels, signal_count, decayed_at, version = row
+        return cls(
+            category_scores={int(key): float(value) for key, value in _load_json(category_scores).items()},
+            tag_scores={key: float(value) for key, value in _load_json(tag_scores).items()},
+            tag_labels=_load_json(tag_labels),
+            signal_count=signal_count,
+            decayed_at=decayed_at,
+            version=version,
+        )
+
+    def decay_to(self, now, half_life_days=None):
+        factor = decay_factor(self.decayed_at, now, half_life_days)
+        if factor != 1.0:
+            self.category_scores = {key: value * factor for key, value in self.category_scores.items()}
+            self.tag_scores = {key: value * factor for key, value in self.tag_scores.items()}
+        self.decayed_at = now
+
+    def add(self, category_id, tags, score):
+        if not score:
+            return
+        self.signal_count += 1
+        if category_id is not None:
+            try:
+                category_key = int(category_id)
+            except (TypeError, ValueError):
+                category_key = None
+            if category_key is not None:
+                self.category_scores[category_key] = self.category_scores.get(category_key, 0.0) + score
+        for tag in parse_tags_field(tags):
+            normalized = normalize_tag(tag)
+            if normalized:
+                self.tag_scores[normalized] = self.tag_scores.get(normalized, 0.0) + score
+                self.tag_labels.setdefault(normalized, tag)
+
+    def prune(self, min_score, max_tags):
+        self.category_scores = {key: value for key, value in self.category_scores.items() if value >= min_score}
+        tags = sorted(
+            ((key, value) for key, value in self.tag_scores.items() if value >= min_score),
+            key=lambda item: -item[1]
+        )[:max_tags]
+        self.tag_scores = dict(tags)
+        self.tag_labels = {key: self.tag_labels.get(key, key) for key in self.tag_scores}
+
+    def dump(self):
+        return (
+            json.dumps({str(key): round(value, 6) for key, value in self.category_scores.items()}),
+            json.dumps({key: round(value, 6) for key, value in self.tag_scores.items()}, ensure_ascii=False),
+            json.dumps(self.tag_labels, ensure_ascii=False),
+        )
+
+
+def _load_json(value):
+    if not value:
+        return {}
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def load_profile(cursor, user_id):
+    cursor.execute(
+        """
+        SELECT category_scores, tag_scores, tag_labels, signal_count, decayed_at, version
+        FROM user_preference_profiles WHERE user_id = %s
+        """,
+        [user_id]
+    )
+    row = cursor.fetchone()
+    return PreferenceProfile.from_row(row) if row else None
+
+
+def _insert_profile(cursor, user_id, profile):
+    category_json, tag_json, label_json = profile.dump()
+    cursor.execute(
+        """
+        INSERT IGNORE INTO user_preference_profiles (
+            user_id, category_scores, tag_scores, tag_labels, signal_count,
+            decayed_at, version, update_time
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, 1, NOW())
+        """,
+        [user_id, category_json, tag_json, label_json, profile.signal_count, profile.decayed_at]
+    )
+    return cursor.rowcount == 1
+
+
+def _update_profile(cursor, user_id, profile):
+    # 以 version 做乐观锁，调用方可能处于外层事务中，这里不单独开启事务
+    category_json, tag_json, label_json = profile.dump()
+    cursor.execute(
+        """
+        UPDATE user_preference_profiles
+        SET category_scores = %s, tag_scores = %s, tag_labels = %s, signal_count = %s,
+            decayed_at = %s, version = version + 1, update_time = NOW()
+        WHERE user_id = %s AND version = %s
+        """,
+        [category_json, tag_json, label_json, profile.signal_count, profile.decayed_at, user_id, profile.version]
+    )
+    return cursor.rowcount == 1
+
+
+def add_work_signal(cursor, user_id, work_id, score):
+    """把一次行为得分按作品的分类与标签累加到用户画像"""
+    if not work_id or not score:
+        return
+    add_work_signals(cursor, user_id, {work_id: score})
+
+
+def add_work_signals(cursor, user_id, work_scores):
+    """把同一用户对多部作品的行为得分一次累加到画像，只读写画像一次"""
+    work_scores = {work_id: score for work_id, score in (work_scores or {}).items() if work_id and score}
+    if not user_id or not work_scores:
+        return
+    placeholders = ','.join(['%s'] * len(work_scores))
+    cursor.execute(
+        f"SELECT work_id, category_id, tags FROM works WHERE work_id IN ({placeholders})",
+        list(work_scores)
+    )
+    work_rows = cursor.fetchall()
+    if not work_rows:
+        return
+
+    config = preference_profiles_config()
+    for _ in range(max(1, int(config['MAX_RETRIES']))):
+        now = _now()
+        profile = load_profile(cursor, user_id)
+        if profile is None:
+            # 画像尚未建立：先按历史行为重建（已包含本次写入的记录），不再重复累加
+            profile = compute_profile_from_history(cursor, user_id, now)
+            if _insert_profile(cursor, user_id, profile):
+                return
+            continue
+        profile.decay_to(now, float(config['HALF_LIFE_DAYS']))
+        for work_id, category_id, tags_field in work_rows:
+            profile.add(category_id, tags_field, work_scores[work_id])
+        profile.prune(float(config['MIN_SCORE']), int(config['MAX_TAGS']))
+        if _update_profile(cursor, user_id, profile):
+            return
+
+
+def get_profile(cursor, user_id):
+    """读取画像并衰减到当前时刻；不存在时按历史行为重建并保存"""
+    now = _now()
+    profile = load_profile(cursor, user_id)
+    if profile is None:
+        profile = rebuild_profile(cursor, user_id, now)
+    profile.decay_to(now)
+    return profile
+
+
+def compute_profile_from_history(cursor, user_id, now=None):
+    now = now or _now()
+    half_life_days = float(preference_profiles_config()['HALF_LIFE_DAYS'])
+    profile = PreferenceProfile(decayed_at=now)
+
+    def add_rows(rows, score_of):
+        for category_id, tags_field, value, event_time in rows:
+            score = score_of(value)
+            if score > 0:
+                profile.add(category_id, tags_field, score * decay_factor(event_time, now, half_life_days))
+
+    cursor.execute(
+        """
+        SELECT w.category_id, w.tags, 1, c.collect_time
+        FROM collections c
+        JOIN works w ON c.work_id = w.work_id
+        WHERE c.reader_id = %s
+        """,
+        [user_id]
+    )
+    add_rows(cursor.fetchall(), lambda _: PREFERENCE_WEIGHT_MAP['collection'])
+
+    cursor.execute(
+        """
+        SELECT w.category_id, w.tags, COUNT(DISTINCT rr.chapter_id), MAX(rr.read_time)
+        FROM reading_records rr
+        JOIN chapters ch ON rr.chapter_id = ch.chapter_id
+        JOIN works w ON ch.work_id = w.work_id
+        WHERE rr.reader_id = %s
+        GROUP BY w.work_id, w.category_id, w.tags
+        """,
+        [user_id]
+    )
+    add_rows(cursor.fetchall(), lambda cnt: reading_score(max(1, int(cnt or 1))))
+
+    cursor.execute(
+        """
+        SELECT w.category_id, w.tags, COALESCE(SUM(v.count), 0), MAX(v.vote_time)
+        FROM votes v
+        JOIN works w ON v.work_id = w.work_id
+        WHERE v.reader_id = %s
+        GROUP BY w.work_id, w.category_id, w.tags
+        """,
+        [user_id]
+    )
+    add_rows(cursor.fetchall(), lambda cnt: PREFERENCE_WEIGHT_MAP['vote'] * max(1.0, float(cnt or 1)))
+
+    cursor.execute(
+        """
+        SELECT w.category_id, w.tags, COUNT(*), MAX(s.sub_time)
+        FROM subscriptions s
+        JOIN works w ON s.work_id = w.work_id
+        WHERE s.reader_id = %s
+        GROUP BY w.work_id, w.category_id, w.tags
+        """,
+        [user_id]
+    )
+    add_rows(cursor.fetchall(), lambda cnt: PREFERENCE_WEIGHT_MAP['subscription'] * max(1.0, float(cnt or 1)))
+
+    cursor.execute(
+        """
+        SELECT w.category_id, w.tags, f.event_type, f.weight, f.event_time
+        FROM user_recommendation_feedback f
+        JOIN works w ON f.work_id = w.work_id
+        WHERE f.user_id = %s
+        """,
+        [user_id]
+    )
+    feedback_rows = []
+    for category_id, tags_field, event_type, weight_value, event_time in cursor.fetchall():
+        try:
+            weight_float = float(weight_value or 0.0)
+        except (TypeError, ValueError):
+            weight_float = 0.0
+        if weight_float > 0:
+            feedback_rows.append((category_id, tags_field, feedback_score(event_type, weight_float), event_time))
+    add_rows(feedback_rows, lambda score: score)
+
+    config = preference_profiles_config()
+    profile.prune(float(config['MIN_SCORE']), int(config['MAX_TAGS']))
+    return profile
+
+
+def rebuild_profile(cursor, user_id, now=None):
+    profile = compute_profile_from_history(cursor, user_id, now)
+    category_json, tag_json, label_json = profile.dump()
+    cursor.execute(
+        """
+        INSERT INTO user_preference_profiles (
+            user_id, category_scores, tag_scores, tag_labels, signal_count,
+            decayed_at, version, update_time
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, 1, NOW())
+        ON DUPLICATE KEY UPDATE
+            category_scores = VALUES(category_scores), tag_scores = VALUES(tag_scores),
+            tag_labels = VALUES(tag_labels), signal_count = VALUES(signal_count),
+            decayed_at = VALUES(decayed_at), version = version + 1, update_time = NOW()
+        """,
+        [user_id, category_json, tag_json, label_json, profile.signal_count, profile.decayed_at]
+    )
+    return profile
+
+
+def decay_profiles(cursor, batch_size=None, min_age_seconds=None):
+    """批量把衰减落到存储并裁剪低分标签，只处理 decayed_at 早于 min_age_seconds 的画像，返回更新行数"""
+    config = preference_profiles_config()
+    batch_size = max(1, int(batch_size or config['DECAY_BATCH_SIZE']))
+    if min_age_seconds is None:
+        min_age_seconds = int(config['DECAY_INTERVAL_SECONDS'])
+    half_life_days = float(config['HALF_LIFE_DAYS'])
+    min_score = float(config['MIN_SCORE'])
+    max_tags = int(config['MAX_TAGS'])
+
+    updated = 0
+    last_user_id = 0
+    while True:
+        now = _now()
+        cursor.execute(
+            """
+            SELECT user_id, category_scores, tag_scores, tag_labels, signal_count, decayed_at, version
+            FROM user_preference_profiles
+            WHERE user_id > %s AND decayed_at < DATE_SUB(NOW(), INTERVAL %s SECOND)
+            ORDER BY user_id
+            LIMIT %s
+            """,
+            [last_user_id, int(min_age_seconds), batch_size]
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for row in rows:
+            profile = PreferenceProfile.from_row(row[1:])
+            profile.decay_to(now, half_life_days)
+            profile.prune(min_score, max_tags)
+            # 与增量写入冲突时跳过，本行已由写入方衰减到更新的时刻
+            if _update_profile(cursor, row[0], profile):
+                updated += 1
+        last_user_id = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+    return updated
@@ -0,0 +1,278 @@
+# 榜单引擎：定期计算日/周/月/总榜并写入 rankings / ranking_details 快照
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+
+RANKING_TYPES = ('read', 'vote', 'subscribe')
+RANKING_PERIODS = {
+    'day': 1,
+    'week': 2,
+    'month': 3,
+    'total': 4,
+}
+TOTAL_WINDOW_START = datetime(1970, 1, 1)
+PERIOD_WINDOWS = {
+    'day': timedelta(days=1),
+    'week': timedelta(days=7),
+    'month': timedelta(days=30),
+}
+
+RANKING_TYPE_NAMES = {'read': '阅读', 'vote': '月票', 'subscribe': '订阅'}
+RANKING_PERIOD_NAMES = {'day': '日榜', 'week': '周榜', 'month': '月榜', 'total': '总榜'}
+
+_RANKING_ENGINE_DEFAULTS = {
+    'DISPLAY_LIMIT': 100,
+    'RETENTION_DAYS': 30,
+    'INTERVAL_SECONDS': 600,
+}
+
+# 总榜直接读取 work_stats 汇总值，其余周期按时间窗口聚合
+_WINDOW_SCORE_SQL = {
+    'read': """
+        SELECT ch.work_id, COUNT(*)
+        FROM reading_records rr
+        JOIN chapters ch ON rr.chapter_id = ch.chapter_id
+        WHERE rr.read_time >= %s
+        GROUP BY ch.work_id
+    """,
+    'vote': """
+        SELECT work_id, SUM(count)
+        FROM votes
+        WHERE vote_time >= %s
+        GROUP BY work_id
+    """,
+    'subscribe': """
+        SELECT work_id, SUM(amount)
+        FROM subscriptions
+        WHERE sub_time >= %s
+        GROUP BY work_id
+    """,
+}
+_TOTAL_SCORE_SQL = {
+    'read': "SELECT work_id, total_reads FROM work_stats",
+    'vote': "SELECT work_id, vote_count FROM work_stats",
+    'subscribe': "SELECT work_id, subscription_income FROM work_stats",
+}
+
+
+def ranking_engine_config():
+    config = dict(_RANKING_ENGINE_DEFAULTS)
+    config.update(getattr(settings, 'RANKING_ENGINE', {}) or {})
+    return config
+
+
+def ranking_source_type(ranking_type):
+    return json.dumps({'type': ranking_type})
+
+
+def _ranking_name(ranking_type, period, category_name=None):
+    scope = category_name or '全站'
+    return f"{scope}{RANKING_TYPE_NAMES[ranking_type]}{RANKING_PERIOD_NAMES[period]}"
+
+
+def _load_ranking_ids(cursor):
+    cursor.execute("SELECT ranking_id, category_id, period, source_type FROM rankings")
+    ranking_ids = {}
+    for ranking_id, category_id, period_value, source_type in cursor.fetchall():
+        try:
+            ranking_type = json.loads(source_type or '{}').get('type')
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if ranking_type in RANKING_TYPES:
+            ranking_ids[(ranking_type, period_value, category_id)] = ranking_id
+    return ranking_ids
+
+
+def _ensure_ranking(cursor, ranking_ids, ranking_type, period, category_id, category_name, window_start, display_limit):
+    period_value = RANKING_PERIODS[period]
+    key = (ranking_type, period_value, category_id)
+    ranking_id = ranking_ids.get(key)
+    if ranking_id:
+        cursor.execute(
+            "UPDATE rankings SET start_time = %s, end_time = NOW(), display_limit = %s WHERE ranking_id = %s",
+            [window_start, display_limit, ranking_id]
+        )
+        return ranking_id
+
+    cursor.execute(
+        """
+        INSERT INTO rankings (name, category_id, period, start_time, end_time, source_type, status, sort_rule, display_limit)
+        VALUES (%s, %s, %s, %s, NOW(), %s, 1, 'score DESC', %s)
+        """,
+        [
+            _ranking_name(ranking_type, period, category_name),
+            category_id,
+            period_value,
+            window_start,
+            ranking_source_type(ranking_type),
+            display_limit,
+        ]
+    )
+    ranking_id = cursor.lastrowid
+    ranking_ids[key] = ranking_id
+    return ranking_id
+
+
+def _fetch_scores(cursor, ranking_type, period, window_start):
+    if period == 'total':
+        cursor.execute(_TOTAL_SCORE_SQL[ranking_type])
+    else:
+        cursor.execute(_WINDOW_SCORE_SQL[ranking_type], [window_start])
+    return {row[0]: row[1] or 0 for row in cursor.fetchall()}
+
+
+def _build_board(works, scores, display_limit):
+    # 排序规则与实时榜单一致：得分降序、更新时间降序、作品ID升序
+    ordered = sorted(
+        works,
+        key=lambda work: (
+            -(scores.get(work[0]) or 0),
+            -(work[2].timestamp() if work[2] else 0),
+            work[0],
+        )
+    )
+    return [(work[0], scores.get(work[0]) or 0) for work in ordered[:display_limit]]
+
+
+def _write_snapshot(cursor, ranking_id, stat_date, board, ranking_type, period):
+    cursor.execute(
+        "DELETE FROM ranking_details WHERE ranking_id = %s AND stat_date = %s",
+        [ranking_id, stat_date]
+    )
+    if not board:
+        return
+    source_data = json.dumps({'type': ranking_type, 'period': period})
+    cursor.executemany(
+        """
+        INSERT INTO ranking_details (ranking_id, work_id, stat_date, `rank`, score, source_data)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        [
+            [ranking_id, work_id, stat_date, index + 1, Decimal(str(score)), source_data]
+            for index, (work_id, score) in enumerate(board)
+        ]
+    )
+
+
+def run_ranking_engine(ranking_types=None, periods=None):
+    """计算一轮榜单快照，返回写入的榜单数量"""
+    config = ranking_engine_config()
+    display_limit = max(1, int(config['DISPLAY_LIMIT']))
+    retention_days = int(config['RETENTION_DAYS'])
+    ranking_types = [t for t in (ranking_types or RANKING_TYPES) if t in RANKING_TYPES]
+    periods = [p for p in (periods or RANKING_PERIODS) if p in RANKING_PERIODS]
+
+    boards_written = 0
+    with connection.cursor() as cursor:
+        # 以数据库时钟为准，避免应用服务器与数据库时区不一致
+        cursor.execute("SELECT NOW(), CURDATE()")
+        db_now, stat_date = cursor.fetchone()
+
+        cursor.execute("""
+            SELECT w.work_id, w.category_id, w.update_time
+            FROM works w
+            WHERE w.status IN (1, 2)
+        """)
+        works = cursor.fetchall()
+        works_by_category = {}
+        for work in works:
+            works_by_category.setdefault(work[1], []).append(work)
+
+        cursor.execute("SELECT category_id, name FROM categories")
+        category_names = {row[0]: row[1] for row in cursor.fetchall()}
+
+        ranking_ids = _load_ranking_ids(cursor)
+
+        for ranking_type in ranking_types:
+            for period in periods:
+                window = PERIOD_WINDOWS.get(period)
+                window_start = db_now - window if window else TOTAL_WINDOW_START
+                scores = _fetch_scores(cursor, ranking_type, period, window_start)
+
+                scopes = [(None, works)]
+                scopes.extend(
+                    (category_id, works_by_category.get(category_id, []))
+                    for category_id in category_names
+                )
+
+                cursor.execute("START TRANSACTION")
+                try:
+                    for category_id, scope_works in scopes:
+                        ranking_id = _ensure_ranking(
+                            cursor,
+                            ranking_ids,
+                            ranking_type,
+                            period,
+                            category_id,
+                            category_names.get(category_id),
+                            window_start,
+                            display_limit
+                        )
+                        board = _build_board(scope_works, scores, display_limit)
+                        _write_snapshot(cursor, ranking_id, stat_date, board, ranking_type, period)
+                        boards_written += 1
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+
+        if retention_days > 0:
+            cursor.execute(
+                "DELETE FROM ranking_details WHERE stat_date < %s",
+                [stat_date - timedelta(days=retention_days)]
+            )
+
+    return boards_written
+
+
+def fetch_ranking_snapshot(cursor, ranking_type, period, category_id=None, limit=50):
+    """读取最新榜单快照，没有快照时返回 None"""
+    params = [ranking_source_type(ranking_type), RANKING_PERIODS[period]]
+    if category_id is None:
+        category_condition = "category_id IS NULL"
+    else:
+        category_condition = "category_id = %s"
+        params.append(category_id)
+
+    cursor.execute(
+        f"""
+        SELECT ranking_id, end_time, TIMESTAMPDIFF(SECOND, end_time, NOW())
+        FROM rankings
+        WHERE source_type = %s AND period = %s AND {category_condition} AND status = 1
+        ORDER BY ranking_id DESC
+        LIMIT 1
+        """,
+        params
+    )
+    ranking_row = cursor.fetchone()
+    if not ranking_row:
+        return None
+    ranking_id, generated_at, age_seconds = ranking_row
+
+    cursor.execute("SELECT MAX(stat_date) FROM ranking_details WHERE ranking_id = %s", [ranking_id])
+    stat_row = cursor.fetchone()
+    stat_date = stat_row[0] if stat_row else None
+    if stat_date is None:
+        return None
+
+    cursor.execute(
+        """
+        SELECT w.work_id, w.title, w.cover_url, a.pen_name, rd.score
+        FROM ranking_details rd
+        JOIN works w ON rd.work_id = w.work_id
+        LEFT JOIN authors a ON w.author_id = a.author_id
+        WHERE rd.ranking_id = %s AND rd.stat_date = %s AND w.status IN (1, 2)
+        ORDER BY rd.`rank` ASC
+        LIMIT %s
+        """,
+        [ranking_id, stat_date, limit]
+    )
+    return {
+        'rows': cursor.fetchall(),
+        'stat_date': stat_date,
+        'generated_at': generated_at,
+        'age_seconds': int(age_seconds) if age_seconds is not None else None,
+    }
@@ -0,0 +1,185 @@
+# 推荐候选打分：候选作品按列载入 NumPy 数组，偏好、热度与新鲜度得分一次向量化算出
+#
+# 得分与逐条打分的规则一致：
+#   分类偏好分 + 命中标签的偏好分之和
+#   + min(投票/5, 20) + min(收藏/10, 15) + min(阅读/2000, 15)
+#   + max(0, 10 - 距上次更新的天数)
+# 距上次更新的秒数由数据库按 NOW() 计算，与 update_time 的写入时区一致
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+
+from .work_tags import tag_filter_condition
+
+_RECOMMENDATION_SCORING_DEFAULTS = {
+    # 参与打分的候选作品数（按热度预取）
+    'CANDIDATE_POOL': 20000,
+}
+
+_SECONDS_PER_DAY = 86400
+# 缺少更新时间时使用的“年龄”，足够大以保证新鲜度分为 0
+_UNKNOWN_AGE_SECONDS = 10 ** 9
+
+
+def recommendation_scoring_config():
+    config = dict(_RECOMMENDATION_SCORING_DEFAULTS)
+    config.update(getattr(settings, 'RECOMMENDATION_SCORING', {}) or {})
+    return config
+
+
+class CandidateColumns:
+    """候选作品的列式表示；标签以稀疏形式保存为 (行号, 标签ID) 对"""
+
+    def __init__(self, work_ids, category_ids, read_counts, collect_counts, vote_counts, age_seconds,
+                 tag_rows=None, tag_ids=None, tag_vocab=None):
+        self.work_ids = np.asarray(work_ids, dtype=np.int64)
+        self.category_ids = np.asarray(category_ids, dtype=np.int64)
+        self.read_counts = np.asarray(read_counts, dtype=np.float64)
+        self.collect_counts = np.asarray(collect_counts, dtype=np.float64)
+        self.vote_counts = np.asarray(vote_counts, dtype=np.float64)
+        self.age_seconds = np.asarray(age_seconds, dtype=np.float64)
+        self.tag_rows = np.asarray(tag_rows if tag_rows is not None else [], dtype=np.int64)
+        self.tag_ids = np.asarray(tag_ids if tag_ids is not None else [], dtype=np.int64)
+        self.tag_vocab = list(tag_vocab or [])
+
+    def __len__(self):
+        return int(self.work_ids.size)
+
+    @classmethod
+    def from_rows(cls, rows, tag_pairs=()):
+        """rows 为 (work_id, category_id, read, collect, vote, 距上次更新的秒数)；tag_pairs 为 (work_id, tag_norm)"""
+        if not rows:
+            return cls.empty()
+        # 各列均为数值，一次转换为二维数组后按列切片
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), 6)
+        columns = cls(data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4], data[:, 5])
+        columns._attach_tags(tag_pairs)
+        return columns
+
+    @classmethod
+    def from_works(cls, works, normalize=None, now=None):
+        """由推荐卡片字典构造（update_time 为 ISO 字符串，标签为展示文本，需要传入规范化函数）"""
+        now = now or datetime.now()
+        rows = []
+        for work in works:
+            age = _UNKNOWN_AGE_SECONDS
+            if work.get('update_time'):
+                try:
+                    age = (now - datetime.fromisoformat(work['update_time'])).total_seconds()
+                except ValueError:
+                    pass
+            rows.append((work['work_id'], work.get('category_id') or 0, work.get('read_count') or 0,
+                         work.get('collect_count') or 0, work.get('vote_count') or 0, age))
+        normalize = normalize or (lambda tag: tag)
+        tag_pairs = [
+            (work['work_id'], normalize(tag))
+            for work in works for tag in (work.get('tags') or [])
+        ]
+        return cls.from_rows(rows, tag_pairs)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [], [])
+
+    def _attach_tags(self, tag_pairs):
+        tag_pairs = [(work_id, tag) for work_id, tag in tag_pairs if tag]
+        if not tag_pairs or not len(self):
+            return
+        vocab = {}
+        tag_ids = np.fromiter(
+            (vocab.setdefault(tag, len(vocab)) for _, tag in tag_pairs), dtype=np.int64, count=len(tag_pairs)
+        )
+        pair_work_ids = np.fromiter((work_id for work_id, _ in tag_pairs), dtype=np.int64, count=len(tag_pairs))
+        # 标签对按作品ID映射回候选行号，不在候选集中的作品丢弃
+        order = np.argsort(self.work_ids, kind='stable')
+        sorted_ids = self.work_ids[order]
+        positions = np.minimum(np.searchsorted(sorted_ids, pair_work_ids), sorted_ids.size - 1)
+        found = sorted_ids[positions] == pair_work_ids
+        self.tag_rows = order[positions[found]]
+        self.tag_ids = tag_ids[found]
+        self.tag_vocab = list(vocab)
+
+    def tag_totals(self, tag_scores):
+        """每个候选命中的标签偏好分之和"""
+        if not self.tag_ids.size or not tag_scores:
+            return np.zeros(len(self))
+        weights = np.array([float(tag_scores.get(tag, 0.0)) for tag in self.tag_vocab])
+        return np.bincount(self.tag_rows, weights=weights[self.tag_ids], minlength=len(self))
+
+    def category_totals(self, category_scores):
+        if not len(self) or not category_scores:
+            return np.zeros(len(self))
+        unique_ids, inverse = np.unique(self.category_ids, return_inverse=True)
+        weights = np.array([float(category_scores.get(int(category_id), 0.0)) for category_id in unique_ids])
+        return weights[inverse.reshape(-1)]
+
+
+def score_candidates(columns, category_scores, tag_scores):
+    """一次算出全部候选的得分，返回与候选行对齐的 float64 数组"""
+    if not len(columns):
+        return np.zeros(0)
+    scores = columns.category_totals(category_scores)
+    scores += columns.tag_totals(tag_scores)
+    scores += np.minimum(columns.vote_counts / 5.0, 20)
+    scores += np.minimum(columns.collect_counts / 10.0, 15)
+    scores += np.minimum(columns.read_counts / 2000.0, 15)
+    # 与 timedelta.days 一致向下取整
+    scores += np.maximum(0, 10 - np.floor(columns.age_seconds / _SECONDS_PER_DAY))
+    return scores
+
+
+def top_work_ids(columns, scores, limit):
+    """按得分从高到低取前 limit 个作品ID，同分保持候选顺序"""
+    if not len(columns) or limit <= 0:
+        return []
+    order = np.argsort(-scores, kind='stable')[:limit]
+    return [int(work_id) for work_id in columns.work_ids[order]]
+
+
+def fetch_candidate_columns(cursor, category_ids=None, limit=None, tag_norms=None, score_tags=()):
+    """按热度预取候选作品的打分列；tag_norms 非空时只取带有这些标签的作品，score_tags 为需要载入的偏好标签"""
+    limit = int(limit or recommendation_scoring_config()['CANDIDATE_POOL'])
+    conditions = ["w.status IN (1, 2)"]
+    params = []
+    if category_ids:
+        conditions.append(f"w.category_id IN ({', '.join(['%s'] * len(category_ids))})")
+        params.extend(category_ids)
+    if tag_norms:
+        tag_condition, tag_params = tag_filter_condition(tag_norms)
+        conditions.append(tag_condition)
+        params.extend(tag_params)
+    where_clause = ' AND '.join(conditions)
+
+    cursor.execute(
+        f"""
+        SELECT w.work_id, COALESCE(w.category_id, 0),
+               COALESCE(w.read_count, 0), COALESCE(w.collect_count, 0), COALESCE(w.vote_count, 0),
+               COALESCE(TIMESTAMPDIFF(SECOND, w.update_time, NOW()), %s)
+        FROM works w
+        WHERE {where_clause}
+        ORDER BY w.vote_count DESC, w.collect_count DESC, w.read_count DESC, w.update_time DESC
+        LIMIT %s
+        """,
+        [_UNKNOWN_AGE_SECONDS] + params + [limit]
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return CandidateColumns.empty()
+
+    tag_pairs = []
+    score_tags = sorted({tag for tag in score_tags if tag})
+    if score_tags:
+        # 只载入用户有偏好分的标签，其余标签不影响得分
+        cursor.execute(
+            f"""
+            SELECT wt.work_id, wt.tag_norm
+            FROM work_tags wt
+            JOIN works w ON w.work_id = wt.work_id
+            WHERE wt.tag_norm IN ({', '.join(['%s'] * len(score_tags))})
+              AND {where_clause}
+            """,
+            score_tags + params
+        )
+        tag_pairs = cursor.fetchall()
+    return CandidateColumns.from_rows(rows, tag_pairs)
@@ -0,0 +1,206 @@
+# 首页推荐结果缓存：按用户缓存组装好的各推荐栏目，过期或失效后先返回旧结果，由后台线程单飞刷新
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from .cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+_RECOMMENDATION_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    # 在 FRESH_TTL 内直接返回；超过后仍可在 STALE_TTL 内返回旧结果并触发后台刷新
+    'FRESH_TTL': 120,
+    'STALE_TTL': 1800,
+    'LOCAL_MAX_ENTRIES': 5000,
+    'CACHE_ALIAS': 'default',
+    'REFRESH_WORKERS': 2,
+    # 跨进程刷新锁的过期时间，防止刷新线程异常退出后锁无法释放
+    'REFRESH_LOCK_TTL': 30,
+    # 冷启动时等待同进程内进行中计算的最长秒数
+    'COMPUTE_WAIT_TIMEOUT': 10,
+}
+
+_lock = threading.Lock()
+_entry_cache = None
+_invalidation_cache = None
+_executor = None
+_executor_pid = None
+_inflight = {}
+
+
+def recommendation_cache_config():
+    config = dict(_RECOMMENDATION_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'RECOMMENDATION_CACHE', {}) or {})
+    return config
+
+
+def _caches():
+    global _entry_cache, _invalidation_cache
+    if _entry_cache is None:
+        config = recommendation_cache_config()
+        # 本地层只做短时缓冲，失效标记需要尽快在各进程间可见
+        _entry_cache = TieredCache(
+            'recommendations',
+            local_ttl=min(5, int(config['FRESH_TTL'])),
+            local_max_entries=config['LOCAL_MAX_ENTRIES'],
+            shared_ttl=config['STALE_TTL'],
+            cache_alias=config['CACHE_ALIAS'],
+        )
+        _invalidation_cache = TieredCache(
+            'recommendations_invalidated',
+            local_ttl=1,
+            shared_ttl=config['STALE_TTL'],
+            cache_alias=config['CACHE_ALIAS'],
+        )
+    return _entry_cache, _invalidation_cache
+
+
+def _get_executor():
+    # fork 出的子进程不继承线程池，按 pid 重新创建
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                workers = max(1, int(recommendation_cache_config()['REFRESH_WORKERS']))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rec-refresh')
+                _executor_pid = os.getpid()
+                _inflight.clear()
+    return _executor
+
+
+def invalidate(user_id):
+    """新的反馈/搜索行为发生后调用：保留旧结果用于过渡，下次访问触发刷新"""
+    if not user_id:
+        return
+    _, invalidation_cache = _caches()
+    invalidation_cache.set(int(user_id), time.time())
+
+
+def clear(user_id):
+    if not user_id:
+        return
+    entry_cache, invalidation_cache = _caches()
+    entry_cache.delete(int(user_id))
+    invalidation_cache.delete(int(user_id))
+
+
+def _is_fresh(entry, invalidated_at, fresh_ttl):
+    computed_at = entry.get('computed_at', 0)
+    if invalidated_at is not None and computed_at <= invalidated_at:
+        return False
+    return time.time() - computed_at < fresh_ttl
+
+
+def _store(user_id, payload, started_at):
+    entry_cache, _ = _caches()
+    # computed_at 取计算开始时间：计算期间发生的失效不会被这次结果覆盖
+    entry_cache.set(user_id, {'payload': payload, 'computed_at': started_at})
+
+
+def _run_compute(user_id, compute):
+    started_at = time.time()
+    payload = compute(user_id)
+    _store(user_id, payload, started_at)
+    return payload
+
+
+def _shared_lock_key(user_id):
+    return f'recommendations_refresh:{user_id}'
+
+
+def _acquire_shared_lock(user_id, config):
+    try:
+        shared = caches[config['CACHE_ALIAS']] if config['CACHE_ALIAS'] else None
+    except Exception:
+        shared = None
+    if shared is None:
+        return True
+    try:
+        return shared.add(_shared_lock_key(user_id), 1, timeout=int(config['REFRESH_LOCK_TTL']))
+    except Exception:
+        return True
+
+
+def _release_shared_lock(user_id, config):
+    try:
+        caches[config['CACHE_ALIAS']].delete(_shared_lock_key(user_id))
+    except Exception:
+        pass
+
+
+def _background_refresh(user_id, compute, config):
+    try:
+        _run_compute(user_id, compute)
+    except Exception:
+        logger.exception('background recommendation refresh failed for user %s', user_id)
+    finally:
+        _release_shared_lock(user_id, config)
+        with _lock:
+            _inflight.pop(user_id, None)
+        # 后台线程使用独立的数据库连接，用完即关闭
+        connection.close()
+
+
+def _schedule_refresh(user_id, compute, config):
+    executor = _get_executor()
+    with _lock:
+        if user_id in _inflight:
+            return
+        if not _acquire_shared_lock(user_id, config):
+            return
+        _inflight[user_id] = executor.submit(_background_refresh, user_id, compute, config)
+
+
+def _compute_single_flight(user_id, compute, config):
+    # 同一进程内并发的冷启动请求只计算一次，其余请求等待这次结果
+    _get_executor()
+    with _lock:
+        pending = _inflight.get(user_id)
+        if pending is None:
+            owner = threading.Event()
+            _inflight[user_id] = owner
+    if pending is not None:
+        if isinstance(pending, threading.Event):
+            pending.wait(float(config['COMPUTE_WAIT_TIMEOUT']))
+        else:
+            try:
+                pending.result(timeout=float(config['COMPUTE_WAIT_TIMEOUT']))
+            except Exception:
+                pass
+        entry_cache, _ = _caches()
+        entry = entry_cache.get(user_id)
+        if entry is not None:
+            return entry['payload']
+        return _run_compute(user_id, compute)
+
+    try:
+        return _run_compute(user_id, compute)
+    finally:
+        with _lock:
+            if _inflight.get(user_id) is owner:
+                _inflight.pop(user_id, None)
+        owner.set()
+
+
+def get_or_compute(user_id, compute):
+    """返回 user_id 的推荐结果；compute(user_id) 负责实际组装"""
+    config = recommendation_cache_config()
+    if not config['ENABLED']:
+        return compute(user_id)
+
+    user_id = int(user_id)
+    entry_cache, invalidation_cache = _caches()
+    entry = entry_cache.get(user_id)
+    if entry is None:
+        return _compute_single_flight(user_id, compute, config)
+
+    if not _is_fresh(entry, invalidation_cache.get(user_id), float(config['FRESH_TTL'])):
+        _schedule_refresh(user_id, compute, config)
+    return entry['payload']
@@ -0,0 +1,148 @@
+# 运行期依赖的附加表：建表语句集中登记，由迁移创建；进程内首次建立数据库连接时核对一次，不再在请求路径上执行DDL
+import logging
+import threading
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# 表名 -> 建表语句，按外键依赖顺序排列；迁移 0013_runtime_tables 中固定了建表时的副本，修改这里不影响已有迁移
+RUNTIME_TABLES = {
+    'point_transactions': """
+CREATE TABLE IF NOT EXISTS point_transactions (
+    transaction_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    transaction_type VARCHAR(50) NOT NULL,
+    amount DECIMAL(12,2) NOT NULL,
+    description VARCHAR(255),
+    create_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_user_time (user_id, create_time)
+)
+""",
+    'user_tickets': """
+CREATE TABLE IF NOT EXISTS user_tickets (
+    user_id BIGINT PRIMARY KEY,
+    ticket_balance INT NOT NULL DEFAULT 0,
+    progress DECIMAL(12,2) NOT NULL DEFAULT 0,
+    total_earned INT NOT NULL DEFAULT 0,
+    total_spent INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+)
+""",
+    'comment_likes': """
+CREATE TABLE IF NOT EXISTS comment_likes (
+    like_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    comment_id BIGINT NOT NULL,
+    reader_id BIGINT NOT NULL,
+    like_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_comment_reader (comment_id, reader_id),
+    FOREIGN KEY (comment_id) REFERENCES comments(comment_id) ON DELETE CASCADE,
+    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
+    INDEX idx_comment (comment_id),
+    INDEX idx_reader (reader_id)
+)
+""",
+    'search_records': """
+CREATE TABLE IF NOT EXISTS search_records (
+    search_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    reader_id BIGINT NOT NULL,
+    keyword VARCHAR(100) NOT NULL,
+    search_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    search_type TINYINT NOT NULL DEFAULT 1 COMMENT '1=作品搜索，2=作者搜索，3=标签搜索',
+    click_work_id BIGINT,
+    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
+    FOREIGN KEY (click_work_id) REFERENCES works(work_id) ON DELETE SET NULL,
+    INDEX idx_reader_time (reader_id, search_time)
+)
+""",
+    'user_recommendation_feedback': """
+CREATE TABLE IF NOT EXISTS user_recommendation_feedback (
+    feedback_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    work_id BIGINT NOT NULL,
+    event_type TINYINT NOT NULL,
+    weight DECIMAL(10,4) NOT NULL DEFAULT 1.0,
+    event_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    metadata TEXT,
+    UNIQUE KEY uniq_user_work_event (user_id, work_id, event_type),
+    INDEX idx_feedback_user_time (user_id, event_time),
+    INDEX idx_feedback_user_event (user_id, event_type, event_time),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE
+)
+""",
+}
+
+# 附加表依赖的基础表，基础结构尚未初始化（例如首次执行 migrate）时不做补建
+_BASE_TABLES = ('users', 'readers', 'works', 'comments')
+
+_SCHEMA_BOOTSTRAP_DEFAULTS = {
+    'VERIFY_ON_CONNECT': True,
+    'CREATE_MISSING': True,
+}
+
+_DISPATCH_UID = 'novel_platform.schema_check'
+
+_verify_lock = threading.Lock()
+_verified = False
+
+
+def schema_bootstrap_config():
+    config = dict(_SCHEMA_BOOTSTRAP_DEFAULTS)
+    config.update(getattr(settings, 'SCHEMA_BOOTSTRAP', {}) or {})
+    return config
+
+
+def missing_runtime_tables(connection):
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+    return [table for table in RUNTIME_TABLES if table not in existing], existing
+
+
+def verify_runtime_schema(connection):
+    """核对附加表是否存在，按配置补建缺失的表，返回仍缺失的表名列表"""
+    missing, existing = missing_runtime_tables(connection)
+    if not missing:
+        return []
+
+    config = schema_bootstrap_config()
+    if not config['CREATE_MISSING'] or connection.vendor != 'mysql' or not existing.issuperset(_BASE_TABLES):
+        logger.warning('数据库缺少附加表 %s，请执行 python manage.py migrate', ', '.join(missing))
+        return missing
+
+    still_missing = []
+    with connection.cursor() as cursor:
+        for table in missing:
+            try:
+                cursor.execute(RUNTIME_TABLES[table])
+            except Exception:
+                logger.exception('创建附加表 %s 失败', table)
+                still_missing.append(table)
+            else:
+                logger.warning('已补建缺失的附加表 %s，请执行 python manage.py migrate 同步迁移记录', table)
+    return still_missing
+
+
+def _verify_on_connect(sender, connection, **kwargs):
+    global _verified
+    if _verified or connection.alias != 'default':
+        return
+    with _verify_lock:
+        if _verified:
+            return
+        # 先置位再核对，核对过程中打开的游标不会重复触发
+        _verified = True
+        try:
+            verify_runtime_schema(connection)
+        except Exception:
+            logger.exception('附加表结构核对失败')
+    connection_created.disconnect(dispatch_uid=_DISPATCH_UID)
+
+
+def install_schema_check():
+    """在 AppConfig.ready 中调用：每个进程首次连接数据库时核对一次附加表"""
+    if schema_bootstrap_config()['VERIFY_ON_CONNECT']:
+        connection_created.connect(_verify_on_connect, dispatch_uid=_DISPATCH_UID)
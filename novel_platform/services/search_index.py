@@ -0,0 +1,277 @@
+# 作品全文检索索引：基于 SQLite FTS5 的倒排索引，中文按单字+二元组预分词，bm25 排序
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_INDEX_DEFAULTS = {
+    'ENABLED': True,
+    'PATH': None,
+    'MAX_CANDIDATES': 1000,
+    'BATCH_SIZE': 1000,
+}
+
+# 各字段的 bm25 权重，顺序与 FTS 表列顺序一致
+FIELD_WEIGHTS = (10.0, 2.0, 5.0, 3.0)
+
+_CJK_RANGES = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_TOKEN_RE = re.compile(f'[{_CJK_RANGES}]+|[^\\W_{_CJK_RANGES}]+')
+_CJK_RE = re.compile(f'[{_CJK_RANGES}]')
+
+_SCHEMA_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS work_fts USING fts5(
+        title, intro, author, tags,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def tokenize(text):
+    """将文本切分为索引词：中文输出单字与相邻二元组，其余按单词小写输出"""
+    tokens = []
+    if not text:
+        return tokens
+    for match in _TOKEN_RE.finditer(str(text).lower()):
+        segment = match.group()
+        if _CJK_RE.match(segment):
+            tokens.extend(segment)
+            tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            tokens.append(segment)
+    return tokens
+
+
+def build_match_query(keyword):
+    """将用户输入转换为 FTS5 MATCH 表达式，所有词项需同时命中"""
+    terms = []
+    for match in _TOKEN_RE.finditer(str(keyword or '').lower()):
+        segment = match.group()
+        if _CJK_RE.match(segment):
+            if len(segment) == 1:
+                terms.append(f'"{segment}"')
+            else:
+                terms.extend(f'"{segment[i:i + 2]}"' for i in range(len(segment) - 1))
+        else:
+            terms.append(f'"{segment}"*')
+    if not terms:
+        return None
+    # 去重后保持顺序，避免重复词项拉长查询
+    return ' AND '.join(dict.fromkeys(terms))
+
+
+def _tags_text(tags_value):
+    if not tags_value:
+        return ''
+    if isinstance(tags_value, str):
+        try:
+            tags_value = json.loads(tags_value)
+        except (TypeError, ValueError):
+            return tags_value
+    if isinstance(tags_value, (list, tuple)):
+        return ' '.join(str(tag) for tag in tags_value if tag)
+    return str(tags_value)
+
+
+def build_document(title, intro, author_names, tags):
+    return (
+        ' '.join(tokenize(title)),
+        ' '.join(tokenize(intro)),
+        ' '.join(tokenize(' '.join(name for name in author_names if name))),
+        ' '.join(tokenize(_tags_text(tags))),
+    )
+
+
+class SearchIndex:
+    """单个 SQLite 文件承载的倒排索引，每个线程持有独立连接"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in _SCHEMA_SQL:
+                conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def is_built(self):
+        if not os.path.exists(self.path):
+            return False
+        row = self._connect().execute(
+            "SELECT value FROM index_meta WHERE key = 'built_at'"
+        ).fetchone()
+        return row is not None
+
+    def upsert_documents(self, documents):
+        """documents: 可迭代的 (work_id, (title, intro, author, tags)) 已分词文档"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for work_id, fields in documents:
+                conn.execute("DELETE FROM work_fts WHERE rowid = ?", [work_id])
+                conn.execute(
+                    "INSERT INTO work_fts (rowid, title, intro, author, tags) VALUES (?, ?, ?, ?, ?)",
+                    [work_id, *fields]
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete_documents(self, work_ids):
+        conn = self._connect()
+        conn.executemany("DELETE FROM work_fts WHERE rowid = ?", [[work_id] for work_id in work_ids])
+
+    def rebuild(self, document_batches):
+        """在单个事务内清空并重建索引，重建期间读请求仍看到旧索引"""
+        conn = self._connect()
+        total = 0
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("DELETE FROM work_fts")
+            for batch in document_batches:
+                conn.executemany(
+                    "INSERT INTO work_fts (rowid, title, intro, author, tags) VALUES (?, ?, ?, ?, ?)",
+                    [[work_id, *fields] for work_id, fields in batch]
+                )
+                total += len(batch)
+            conn.execute(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('built_at', datetime('now'))"
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute("INSERT INTO work_fts (work_fts) VALUES ('optimize')")
+        return total
+
+    def search(self, keyword, limit=1000, offset=0):
+        """返回按相关度排序的 work_id 列表；offset 用于从指定名次继续分批读取"""
+        match_query = build_match_query(keyword)
+        if not match_query:
+            return []
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS)
+        rows = self._connect().execute(
+            f"""
+            SELECT rowid FROM work_fts
+            WHERE work_fts MATCH ?
+            ORDER BY bm25(work_fts, {weights}), rowid
+            LIMIT ? OFFSET ?
+            """,
+            [match_query, limit, offset]
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+def search_index_config():
+    config = dict(_SEARCH_INDEX_DEFAULTS)
+    config.update(getattr(settings, 'SEARCH_INDEX', {}) or {})
+    if not config['PATH']:
+        config['PATH'] = os.path.join(str(settings.BASE_DIR), 'search_index.sqlite3')
+    return config
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex(search_index_config()['PATH'])
+    return _search_index
+
+
+_WORK_DOCUMENT_SQL = """
+    SELECT w.work_id, w.title, w.intro, w.tags,
+           a.pen_name, r.nickname, u.username
+    FROM works w
+    LEFT JOIN authors a ON w.author_id = a.author_id
+    LEFT JOIN readers r ON w.author_id = r.reader_id
+    LEFT JOIN users u ON w.author_id = u.user_id
+"""
+
+
+def _row_to_document(row):
+    return row[0], build_document(row[1], row[2], (row[4], row[5], row[6]), row[3])
+
+
+def iter_work_documents(cursor, batch_size=1000):
+    """按 work_id 游标分批读取作品文档，避免一次性加载全表"""
+    last_work_id = 0
+    while True:
+        cursor.execute(
+            _WORK_DOCUMENT_SQL + " WHERE w.work_id > %s ORDER BY w.work_id LIMIT %s",
+            [last_work_id, batch_size]
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        yield [_row_to_document(row) for row in rows]
+        last_work_id = rows[-1][0]
+
+
+def index_works(cursor, work_ids):
+    """写路径调用：重新索引指定作品，失败不影响主流程"""
+    config = search_index_config()
+    work_ids = [int(work_id) for work_id in work_ids if work_id]
+    if not config['ENABLED'] or not work_ids:
+        return
+    try:
+        placeholders = ', '.join(['%s'] * len(work_ids))
+        cursor.execute(_WORK_DOCUMENT_SQL + f" WHERE w.work_id IN ({placeholders})", work_ids)
+        documents = [_row_to_document(row) for row in cursor.fetchall()]
+        index = get_search_index()
+        if documents:
+            index.upsert_documents(documents)
+        missing = set(work_ids) - {doc[0] for doc in documents}
+        if missing:
+            index.delete_documents(missing)
+    except Exception:
+        logger.exception('search index update failed for works %s', work_ids)
+
+
+def index_author_works(cursor, author_id):
+    cursor.execute("SELECT work_id FROM works WHERE author_id = %s", [author_id])
+    index_works(cursor, [row[0] for row in cursor.fetchall()])
+
+
+def search_work_ids(keyword, limit=None, offset=0):
+    """返回相关度排序的作品ID，从第 offset 名起最多 limit 个（默认 MAX_CANDIDATES）；
+    索引不可用时返回 None，由调用方退回 LIKE 查询"""
+    config = search_index_config()
+    if not config['ENABLED']:
+        return None
+    try:
+        index = get_search_index()
+        if not index.is_built():
+            return None
+        return index.search(keyword, limit=int(limit or config['MAX_CANDIDATES']), offset=max(0, int(offset)))
+    except Exception:
+        logger.exception('search index query failed')
+        return None
@@ -0,0 +1,38 @@
+# 作品标签解析：works.tags 可能是 JSON 数组或以常见分隔符拼接的字符串
+import json
+
+_TAG_SEPARATORS = [',', '，', ';', '；', '|', '/', ' ']
+
+
+def parse_tags_field(tags_field):
+    if not tags_field:
+        return []
+
+    if isinstance(tags_field, list):
+        return [str(tag).strip() for tag in tags_field if str(tag).strip()]
+
+    if isinstance(tags_field, str):
+        try:
+            parsed = json.loads(tags_field)
+            if isinstance(parsed, list):
+                return [str(tag).strip() for tag in parsed if str(tag).strip()]
+        except (json.JSONDecodeError, TypeError):
+            pass
+
+        fragments = [tags_field]
+        for sep in _TAG_SEPARATORS:
+            temp = []
+            for fragment in fragments:
+                temp.extend(fragment.split(sep))
+            fragments = temp
+        return [frag.strip() for frag in fragments if frag.strip()]
+
+    return []
+
+
+def normalize_tag(tag):
+    if tag is None:
+        return ''
+    if not isinstance(tag, str):
+        tag = str(tag)
+    return tag.strip().lower()
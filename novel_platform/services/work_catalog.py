@@ -0,0 +1,420 @@
+# 进程内作品目录：上架作品（status 1/2）的推荐卡片字段以并行数组常驻内存，
+# 按分类取热门、分类热度排行和按ID取卡片都在内存中完成，不再每次请求关联 works/authors/categories
+#
+# 刷新方式：
+#   - 首次使用时按 work_id 分批全量载入；
+#   - 之后每隔 REFRESH_SECONDS 按 update_time 水位增量拉取变化的作品（works.update_time 带 ON UPDATE，
+#     计数、状态和内容的修改都会推进它），不再上架的作品从目录移除；
+#   - 作者笔名、分类名称的修改以及被删除的作品不推进水位，由 FULL_RELOAD_SECONDS 的全量重载兜底。
+# 刷新在副本上完成后整体替换引用，读请求始终看到一致的快照，不需要加锁。
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .tags import parse_tags_field
+
+logger = logging.getLogger(__name__)
+
+_WORK_CATALOG_DEFAULTS = {
+    'ENABLED': True,
+    'REFRESH_SECONDS': 30,
+    'FULL_RELOAD_SECONDS': 1800,
+    # 增量刷新时水位向前回退的秒数，覆盖提交晚于语句时间的长事务
+    'WATERMARK_OVERLAP_SECONDS': 5,
+    'LOAD_BATCH_SIZE': 5000,
+    # 为 True 时在 AppConfig.ready 中启动后台线程预先载入，否则在第一次使用时载入
+    'WARM_ON_START': False,
+}
+
+_CARD_COLUMNS = """
+    SELECT w.work_id, w.status, w.title, w.cover_url, w.intro, w.tags,
+           COALESCE(w.category_id, 0), COALESCE(c.name, ''),
+           w.author_id, COALESCE(a.pen_name, r.nickname, u.username, ''),
+           COALESCE(w.read_count, 0), COALESCE(w.collect_count, 0), COALESCE(w.vote_count, 0),
+           w.update_time
+    FROM works w
+    LEFT JOIN authors a ON w.author_id = a.author_id
+    LEFT JOIN readers r ON w.author_id = r.reader_id
+    LEFT JOIN users u ON w.author_id = u.user_id
+    LEFT JOIN categories c ON w.category_id = c.category_id
+"""
+
+_PUBLIC_STATUSES = (1, 2)
+_EPOCH = datetime(1970, 1, 1)
+# update_time 为空时的占位秒数
+_NO_TIME = -(2 ** 62)
+
+
+def work_catalog_config():
+    config = dict(_WORK_CATALOG_DEFAULTS)
+    config.update(getattr(settings, 'WORK_CATALOG', {}) or {})
+    return config
+
+
+def _as_numpy(column, dtype=np.int64):
+    # array 与 NumPy 共享缓冲区，不复制
+    if not len(column):
+        return np.zeros(0, dtype=dtype)
+    return np.frombuffer(column, dtype=dtype)
+
+
+def _to_seconds(value):
+    if value is None:
+        return _NO_TIME
+    if value.tzinfo is not None:
+        return int(value.timestamp())
+    return int((value - _EPOCH).total_seconds())
+
+
+def _from_seconds(seconds, tzinfo=None):
+    # USE_TZ 时数据库返回带时区的时间，还原时保留时区，与 _serialize_work_row 的输出一致
+    if seconds == _NO_TIME:
+        return None
+    if tzinfo is not None:
+        return datetime.fromtimestamp(seconds, tzinfo)
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+class WorkCatalog:
+    """上架作品的列式快照：数值列为 array 紧凑存储，字符串列为列表，作者名和分类名按ID去重保存"""
+
+    __slots__ = (
+        'work_ids', 'category_ids', 'author_ids', 'read_counts', 'collect_counts', 'vote_counts',
+        'update_times', 'alive', 'titles', 'cover_urls', 'intros', 'tags', 'positions',
+        'category_names', 'author_names', 'tzinfo', 'watermark', 'loaded_at', 'refreshed_at', '_ranked',
+    )
+
+    def __init__(self):
+        self.work_ids = array('q')
+        self.category_ids = array('q')
+        self.author_ids = array('q')
+        self.read_counts = array('q')
+        self.collect_counts = array('q')
+        self.vote_counts = array('q')
+        self.update_times = array('q')
+        # 被移除的行只打标记，全量重载时压实
+        self.alive = array('b')
+        self.titles = []
+        self.cover_urls = []
+        self.intros = []
+        self.tags = []
+        self.positions = {}
+        self.category_names = {}
+        self.author_names = {}
+        self.tzinfo = None
+        self.watermark = None
+        self.loaded_at = 0.0
+        self.refreshed_at = 0.0
+        self._ranked = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def copy(self):
+        clone = WorkCatalog()
+        for name in ('work_ids', 'category_ids', 'author_ids', 'read_counts', 'collect_counts',
+                     'vote_counts', 'update_times', 'alive'):
+            setattr(clone, name, array(getattr(self, name).typecode, getattr(self, name)))
+        clone.titles = list(self.titles)
+        clone.cover_urls = list(self.cover_urls)
+        clone.intros = list(self.intros)
+        clone.tags = list(self.tags)
+        clone.positions = dict(self.positions)
+        clone.category_names = dict(self.category_names)
+        clone.author_names = dict(self.author_names)
+        clone.tzinfo = self.tzinfo
+        clone.watermark = self.watermark
+        clone.loaded_at = self.loaded_at
+        clone.refreshed_at = self.refreshed_at
+        return clone
+
+    def apply_rows(self, rows):
+        """写入 _CARD_COLUMNS 查询结果：上架作品新增或覆盖，其余状态的作品移除；返回 (写入数, 移除数)"""
+        upserted = removed = 0
+        for (work_id, status, title, cover_url, intro, tags_field, category_id, category_name,
+             author_id, author_name, read_count, collect_count, vote_count, update_time) in rows:
+            if update_time is not None and (self.watermark is None or update_time > self.watermark):
+                self.watermark = update_time
+                self.tzinfo = update_time.tzinfo
+            row = self.positions.get(work_id)
+            if status not in _PUBLIC_STATUSES:
+                if row is not None:
+                    del self.positions[work_id]
+                    self.alive[row] = 0
+                    removed += 1
+                continue
+
+            category_id = int(category_id or 0)
+            author_id = int(author_id or 0)
+            if category_id:
+                self.category_names[category_id] = sys.intern(category_name or '')
+            self.author_names[author_id] = author_name or ''
+            values = (category_id, author_id, int(read_count or 0), int(collect_count or 0),
+                      int(vote_count or 0), _to_seconds(update_time))
+            tags = tuple(sys.intern(tag) for tag in parse_tags_field(tags_field))
+            if row is None:
+                self.positions[work_id] = len(self.work_ids)
+                self.work_ids.append(work_id)
+                for column, value in zip(self._numeric_columns(), values):
+                    column.append(value)
+                self.alive.append(1)
+                self.titles.append(title)
+                self.cover_urls.append(cover_url)
+                self.intros.append(intro or '')
+                self.tags.append(tags)
+            else:
+                for column, value in zip(self._numeric_columns(), values):
+                    column[row] = value
+                self.titles[row] = title
+                self.cover_urls[row] = cover_url
+                self.intros[row] = intro or ''
+                self.tags[row] = tags
+            upserted += 1
+        if upserted or removed:
+            self._ranked = None
+        return upserted, removed
+
+    def _numeric_columns(self):
+        return (self.category_ids, self.author_ids, self.read_counts, self.collect_counts,
+                self.vote_counts, self.update_times)
+
+    def card(self, row):
+        """与 views._serialize_work_row 相同结构的推荐卡片"""
+        update_time = _from_seconds(self.update_times[row], self.tzinfo)
+        category_id = self.category_ids[row]
+        return {
+            'work_id': self.work_ids[row],
+            'title': self.titles[row],
+            'cover_url': self.cover_urls[row],
+            'intro': self.intros[row],
+            'tags': list(self.tags[row]),
+            'category_id': category_id or None,
+            'category_name': self.category_names.get(category_id, ''),
+            'read_count': self.read_counts[row],
+            'collect_count': self.collect_counts[row],
+            'vote_count': self.vote_counts[row],
+            'update_time': update_time.isoformat() if update_time else None,
+            'author_name': self.author_names.get(self.author_ids[row], ''),
+            'rating': None,
+        }
+
+    def cards(self, work_ids):
+        """按给定顺序返回卡片，不在目录中的作品跳过"""
+        positions = self.positions
+        return [self.card(positions[work_id]) for work_id in work_ids if work_id in positions]
+
+    def update_seconds(self, work_id):
+        row = self.positions.get(work_id)
+        return self.update_times[row] if row is not None else _NO_TIME
+
+    def _ranking(self):
+        """热度顺序（投票、收藏、阅读、更新时间降序）与分类热度，快照内只计算一次"""
+        ranked = self._ranked
+        if ranked is not None:
+            return ranked
+        rows = np.flatnonzero(_as_numpy(self.alive, np.int8))
+        votes = _as_numpy(self.vote_counts)[rows]
+        collects = _as_numpy(self.collect_counts)[rows]
+        reads = _as_numpy(self.read_counts)[rows]
+        categories = _as_numpy(self.category_ids)[rows]
+        # lexsort 以最后一个键为主键；全部相同时按行号保持稳定
+        order = rows[np.lexsort((rows, -_as_numpy(self.update_times)[rows], -reads, -collects, -votes))]
+
+        by_category = {}
+        if order.size:
+            ordered_categories = _as_numpy(self.category_ids)[order]
+            sort_index = np.argsort(ordered_categories, kind='stable')
+            boundaries = np.flatnonzero(np.diff(ordered_categories[sort_index])) + 1
+            for chunk in np.split(sort_index, boundaries):
+                by_category[int(ordered_categories[chunk[0]])] = order[chunk].tolist()
+
+        popularity = []
+        if rows.size:
+            unique_ids, inverse = np.unique(categories, return_inverse=True)
+            totals = np.bincount(inverse.reshape(-1), weights=votes * 3.0 + collects * 2.0 + reads)
+            popularity = [int(unique_ids[index]) for index in np.argsort(-totals, kind='stable')
+                          if unique_ids[index]]
+
+        rank_of = np.zeros(len(self.alive), dtype=np.int64)
+        rank_of[order] = np.arange(order.size)
+        ranked = self._ranked = (order.tolist(), by_category, popularity, rank_of.tolist())
+        return ranked
+
+    def top_work_ids(self, category_ids=None, limit=30, exclude_ids=None):
+        """按热度返回作品ID，可限定分类；与原 SQL 的 ORDER BY 一致"""
+        exclude_ids = exclude_ids or ()
+        order, by_category, _, rank_of = self._ranking()
+        if category_ids:
+            lists = [by_category.get(int(category_id), []) for category_id in set(category_ids)]
+            if len(lists) == 1:
+                candidates = lists[0]
+            else:
+                # 各分类内已按热度排好，按全局名次惰性归并，只消费需要的前几项
+                candidates = heapq.merge(*lists, key=rank_of.__getitem__)
+        else:
+            candidates = order
+
+        result = []
+        work_ids = self.work_ids
+        for row in candidates:
+            work_id = work_ids[row]
+            if work_id in exclude_ids:
+                continue
+            result.append(work_id)
+            if len(result) >= limit:
+                break
+        return result
+
+    def top_categories(self, limit=3):
+        """按 投票*3 + 收藏*2 + 阅读 汇总的分类热度排行"""
+        return self._ranking()[2][:limit]
+
+    def memory_bytes(self):
+        """估算目录占用的内存（数组缓冲区 + 字符串与容器对象）"""
+        total = sum(column.buffer_info()[1] * column.itemsize for column in (
+            self.work_ids, self.category_ids, self.author_ids, self.read_counts, self.collect_counts,
+            self.vote_counts, self.update_times, self.alive,
+        ))
+        for values in (self.titles, self.cover_urls, self.intros, self.tags):
+            total += sys.getsizeof(values)
+        seen = set()
+        for values in (self.titles, self.cover_urls, self.intros):
+            for value in values:
+                if value is not None and id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+        for tags in self.tags:
+            total += sys.getsizeof(tags)
+            for tag in tags:
+                if id(tag) not in seen:
+                    seen.add(id(tag))
+                    total += sys.getsizeof(tag)
+        total += sys.getsizeof(self.positions) + len(self.positions) * sys.getsizeof(2 ** 40)
+        for names in (self.category_names, self.author_names):
+            total += sys.getsizeof(names) + sum(sys.getsizeof(name) for name in names.values())
+        return total
+
+
+def load_catalog(cursor, batch_size=None):
+    """按 work_id 分批全量载入上架作品"""
+    batch_size = max(1, int(batch_size or work_catalog_config()['LOAD_BATCH_SIZE']))
+    catalog = WorkCatalog()
+    last_id = 0
+    while True:
+        cursor.execute(
+            _CARD_COLUMNS + """
+            WHERE w.status IN (1, 2) AND w.work_id > %s
+            ORDER BY w.work_id
+            LIMIT %s
+            """,
+            [last_id, batch_size]
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        catalog.apply_rows(rows)
+        last_id = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+    catalog.loaded_at = catalog.refreshed_at = time.monotonic()
+    return catalog
+
+
+def refresh_catalog(cursor, catalog, overlap_seconds=None):
+    """在副本上应用 update_time 水位之后的变化，返回 (新目录, 写入数, 移除数)"""
+    if overlap_seconds is None:
+        overlap_seconds = work_catalog_config()['WATERMARK_OVERLAP_SECONDS']
+    if catalog.watermark is None:
+        fresh = load_catalog(cursor)
+        return fresh, len(fresh), 0
+    cursor.execute(
+        _CARD_COLUMNS + """
+        WHERE w.update_time >= %s
+        ORDER BY w.update_time, w.work_id
+        """,
+        [catalog.watermark - timedelta(seconds=max(0, int(overlap_seconds)))]
+    )
+    rows = cursor.fetchall()
+    updated = catalog.copy()
+    upserted, removed = updated.apply_rows(rows)
+    updated.refreshed_at = time.monotonic()
+    if not upserted and not removed:
+        # 没有变化时沿用已算好的热度排行
+        updated._ranked = catalog._ranked
+    return updated, upserted, removed
+
+
+_state_lock = threading.Lock()
+_state = {'pid': None, 'catalog': None}
+
+
+def get_catalog():
+    """返回当前进程的作品目录；未启用或载入失败时返回 None，调用方回退到 SQL"""
+    config = work_catalog_config()
+    if not config['ENABLED']:
+        return None
+    pid = os.getpid()
+    catalog = _state['catalog'] if _state['pid'] == pid else None
+    now = time.monotonic()
+
+    if catalog is None:
+        with _state_lock:
+            if _state['pid'] == pid and _state['catalog'] is not None:
+                return _state['catalog']
+            try:
+                with connection.cursor() as cursor:
+                    catalog = load_catalog(cursor)
+            except Exception:
+                logger.exception('work catalog load failed')
+                return None
+            _state.update(pid=pid, catalog=catalog)
+            return catalog
+
+    if now - catalog.refreshed_at < float(config['REFRESH_SECONDS']):
+        return catalog
+    # 只有一个线程负责刷新，其余请求继续使用当前快照
+    if not _state_lock.acquire(blocking=False):
+        return catalog
+    try:
+        if _state['catalog'] is not catalog:
+            return _state['catalog']
+        try:
+            with connection.cursor() as cursor:
+                if now - catalog.loaded_at >= float(config['FULL_RELOAD_SECONDS']):
+                    updated = load_catalog(cursor)
+                else:
+                    updated, _, _ = refresh_catalog(cursor, catalog, config['WATERMARK_OVERLAP_SECONDS'])
+        except Exception:
+            logger.exception('work catalog refresh failed')
+            # 推迟下一次刷新，避免数据库异常时每个请求都重试
+            catalog.refreshed_at = now
+            return catalog
+        _state['catalog'] = updated
+        return updated
+    finally:
+        _state_lock.release()
+
+
+def _warm():
+    try:
+        get_catalog()
+    finally:
+        connection.close()
+
+
+def start_warmup():
+    """在 AppConfig.ready 中调用：WARM_ON_START 时用后台线程预先载入目录"""
+    config = work_catalog_config()
+    if not config['ENABLED'] or not config['WARM_ON_START']:
+        return False
+    threading.Thread(target=_warm, name='work-catalog-warmup', daemon=True).start()
+    return True
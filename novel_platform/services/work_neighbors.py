@@ -0,0 +1,70 @@
+# 相似作品读取：work_neighbors 由 build_work_neighbors 命令离线生成，这里只做按索引的查询
+_SEED_SQL = """
+    SELECT work_id, MAX(seen_time) AS last_seen FROM (
+        SELECT work_id, collect_time AS seen_time FROM collections WHERE reader_id = %s
+        UNION ALL
+        SELECT work_id, sub_time AS seen_time FROM subscriptions WHERE reader_id = %s
+        UNION ALL
+        SELECT ch.work_id, rr.read_time AS seen_time
+        FROM reading_records rr
+        JOIN chapters ch ON rr.chapter_id = ch.chapter_id
+        WHERE rr.reader_id = %s
+    ) seen
+    GROUP BY work_id
+    ORDER BY last_seen DESC
+    LIMIT %s
+"""
+
+
+def similar_work_ids(cursor, work_id, limit=6):
+    """按得分顺序返回一部作品的相似作品ID"""
+    cursor.execute(
+        """
+        SELECT neighbor_id
+        FROM work_neighbors
+        WHERE work_id = %s
+        ORDER BY position
+        LIMIT %s
+        """,
+        [work_id, limit]
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def neighbors_build_time(cursor, work_id):
+    """一部作品相似作品列表的生成时间，没有相似作品时返回 None"""
+    cursor.execute("SELECT MAX(build_time) FROM work_neighbors WHERE work_id = %s", [work_id])
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def recent_seed_work_ids(cursor, user_id, limit=10):
+    """读者最近收藏、订阅或阅读过的作品，作为相似作品召回的种子"""
+    cursor.execute(_SEED_SQL, [user_id, user_id, user_id, limit])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def also_read_work_ids(cursor, seed_ids, limit=8, exclude_ids=None):
+    """汇总多个种子作品的相似作品得分，返回排除已读作品后得分最高的作品ID"""
+    if not seed_ids:
+        return []
+    exclude_ids = set(exclude_ids or []) | set(seed_ids)
+    cursor.execute(
+        f"""
+        SELECT neighbor_id, SUM(score) AS total_score
+        FROM work_neighbors
+        WHERE work_id IN ({', '.join(['%s'] * len(seed_ids))})
+        GROUP BY neighbor_id
+        ORDER BY total_score DESC
+        LIMIT %s
+        """,
+        list(seed_ids) + [limit + len(exclude_ids)]
+    )
+    result = []
+    for neighbor_id, _ in cursor.fetchall():
+        if neighbor_id in exclude_ids:
+            continue
+        result.append(neighbor_id)
+        if len(result) >= limit:
+            break
+    return result
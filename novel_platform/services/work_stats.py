@@ -0,0 +1,207 @@
+# 作品统计汇总表 work_stats：写路径在各自事务中增量维护，rebuild_work_stats 命令全量重建
+
+WORK_STATS_COUNTERS = (
+    'total_reads',
+    'unique_readers',
+    'collect_count',
+    'subscription_count',
+    'subscription_income',
+    'vote_count',
+    'chapter_count',
+    'published_chapter_count',
+    'total_words',
+)
+
+_REFRESH_SQL_TEMPLATE = """
+    INSERT INTO work_stats (
+        work_id, total_reads, unique_readers, collect_count,
+        subscription_count, subscription_income, vote_count,
+        chapter_count, published_chapter_count, total_words
+    )
+    SELECT w.work_id,
+           COALESCE(rr.read_total, 0),
+           COALESCE(rr.reader_total, 0),
+           COALESCE(col.collect_total, 0),
+           COALESCE(sub.subscriber_total, 0),
+           COALESCE(sub.income_total, 0),
+           COALESCE(v.vote_total, 0),
+           COALESCE(ch.chapter_total, 0),
+           COALESCE(ch.published_total, 0),
+           COALESCE(ch.words_total, 0)
+    FROM works w
+    LEFT JOIN (
+        SELECT c.work_id,
+               COUNT(*) AS read_total,
+               COUNT(DISTINCT r.reader_id) AS reader_total
+        FROM reading_records r
+        JOIN chapters c ON r.chapter_id = c.chapter_id
+        WHERE c.work_id IN ({placeholders})
+        GROUP BY c.work_id
+    ) rr ON rr.work_id = w.work_id
+    LEFT JOIN (
+        SELECT work_id, COUNT(*) AS collect_total
+        FROM collections
+        WHERE work_id IN ({placeholders})
+        GROUP BY work_id
+    ) col ON col.work_id = w.work_id
+    LEFT JOIN (
+        SELECT work_id,
+               COUNT(DISTINCT reader_id) AS subscriber_total,
+               SUM(amount) AS income_total
+        FROM subscriptions
+        WHERE work_id IN ({placeholders})
+        GROUP BY work_id
+    ) sub ON sub.work_id = w.work_id
+    LEFT JOIN (
+        SELECT work_id, SUM(count) AS vote_total
+        FROM votes
+        WHERE work_id IN ({placeholders})
+        GROUP BY work_id
+    ) v ON v.work_id = w.work_id
+    LEFT JOIN (
+        SELECT work_id,
+               COUNT(*) AS chapter_total,
+               SUM(CASE WHEN status = 1 THEN 1 ELSE 0 END) AS published_total,
+               SUM(CASE WHEN status = 1 THEN word_count ELSE 0 END) AS words_total
+        FROM chapters
+        WHERE work_id IN ({placeholders})
+        GROUP BY work_id
+    ) ch ON ch.work_id = w.work_id
+    WHERE w.work_id IN ({placeholders})
+    ON DUPLICATE KEY UPDATE
+        total_reads = VALUES(total_reads),
+        unique_readers = VALUES(unique_readers),
+        collect_count = VALUES(collect_count),
+        subscription_count = VALUES(subscription_count),
+        subscription_income = VALUES(subscription_income),
+        vote_count = VALUES(vote_count),
+        chapter_count = VALUES(chapter_count),
+        published_chapter_count = VALUES(published_chapter_count),
+        total_words = VALUES(total_words),
+        update_time = NOW()
+"""
+
+_REFRESH_SUBQUERY_COUNT = 6
+
+
+def refresh_work_stats(cursor, work_ids):
+    """按基础表重新汇总指定作品的统计行"""
+    if isinstance(work_ids, (int, str)):
+        work_ids = [work_ids]
+    work_ids = [int(work_id) for work_id in work_ids if work_id is not None]
+    if not work_ids:
+        return 0
+
+    placeholders = ', '.join(['%s'] * len(work_ids))
+    cursor.execute(
+        _REFRESH_SQL_TEMPLATE.format(placeholders=placeholders),
+        work_ids * _REFRESH_SUBQUERY_COUNT
+    )
+    return len(work_ids)
+
+
+def apply_delta(cursor, work_id, **deltas):
+    """在调用方的事务中增量更新统计行，统计行缺失时回退为按作品重新汇总"""
+    if not work_id:
+        return
+
+    assignments = []
+    params = []
+    for field, delta in deltas.items():
+        if field not in WORK_STATS_COUNTERS:
+            raise ValueError(f'未知的统计字段: {field}')
+        if not delta:
+            continue
+        assignments.append(f"{field} = GREATEST({field} + %s, 0)")
+        params.append(delta)
+
+    if not assignments:
+        return
+
+    params.append(work_id)
+    cursor.execute(
+        f"UPDATE work_stats SET {', '.join(assignments)}, update_time = NOW() WHERE work_id = %s",
+        params
+    )
+    if cursor.rowcount == 0:
+        # 作品尚未建立统计行（例如历史数据未重建），直接按当前数据汇总
+        refresh_work_stats(cursor, [work_id])
+
+
+def ensure_work_stats_row(cursor, work_id):
+    cursor.execute("INSERT IGNORE INTO work_stats (work_id) VALUES (%s)", [work_id])
+
+
+def fetch_work_stats(cursor, work_id):
+    cursor.execute(
+        f"SELECT {', '.join(WORK_STATS_COUNTERS)} FROM work_stats WHERE work_id = %s",
+        [work_id]
+    )
+    row = cursor.fetchone()
+    if not row:
+        refresh_work_stats(cursor, [work_id])
+        cursor.execute(
+            f"SELECT {', '.join(WORK_STATS_COUNTERS)} FROM work_stats WHERE work_id = %s",
+            [work_id]
+        )
+        row = cursor.fetchone()
+    return serialize_work_stats(row)
+
+
+def serialize_work_stats(row):
+    stats = {}
+    for index, field in enumerate(WORK_STATS_COUNTERS):
+        value = row[index] if row else None
+        if field == 'subscription_income':
+            stats[field] = float(value) if value is not None else 0.0
+        else:
+            stats[field] = int(value) if value is not None else 0
+    return stats
+
+
+def refresh_total_words(cursor, work_ids):
+    """仅重算已发布章节总字数，缺少统计行的作品做完整汇总"""
+    work_ids = [int(work_id) for work_id in work_ids if work_id is not None]
+    if not work_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(work_ids))
+    cursor.execute(
+        f"""
+        UPDATE work_stats ws
+        LEFT JOIN (
+            SELECT work_id, SUM(word_count) AS words_total
+            FROM chapters
+            WHERE status = 1 AND work_id IN ({placeholders})
+            GROUP BY work_id
+        ) cw ON cw.work_id = ws.work_id
+        SET ws.total_words = COALESCE(cw.words_total, 0)
+        WHERE ws.work_id IN ({placeholders})
+        """,
+        work_ids * 2
+    )
+    cursor.execute(
+        f"""
+        SELECT w.work_id
+        FROM works w
+        LEFT JOIN work_stats ws ON w.work_id = ws.work_id
+        WHERE w.work_id IN ({placeholders}) AND ws.work_id IS NULL
+        """,
+        work_ids
+    )
+    missing = [row[0] for row in cursor.fetchall()]
+    if missing:
+        refresh_work_stats(cursor, missing)
+
+
+def iter_work_id_batches(cursor, batch_size=500):
+    last_work_id = 0
+    while True:
+        cursor.execute(
+            "SELECT work_id FROM works WHERE work_id > %s ORDER BY work_id LIMIT %s",
+            [last_work_id, batch_size]
+        )
+        batch = [row[0] for row in cursor.fetchall()]
+        if not batch:
+            break
+        yield batch
+        last_work_id = batch[-1]
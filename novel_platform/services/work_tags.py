@@ -0,0 +1,110 @@
+# 作品标签索引：works.tags 拆分为 work_tags 行，标签筛选、标签统计与按标签召回走 tag_norm 索引
+from .tags import normalize_tag, parse_tags_field
+
+# 与 work_tags.tag_norm / tag_display 列宽一致
+MAX_TAG_LENGTH = 64
+
+
+def tag_rows(tags_field):
+    """解析作品标签，返回去重后的 (tag_norm, tag_display) 列表，保持原有顺序"""
+    rows = []
+    seen = set()
+    for tag in parse_tags_field(tags_field):
+        display = tag[:MAX_TAG_LENGTH]
+        tag_norm = normalize_tag(display)
+        if not tag_norm or tag_norm in seen:
+            continue
+        seen.add(tag_norm)
+        rows.append((tag_norm, display))
+    return rows
+
+
+def _insert_rows(cursor, rows):
+    if not rows:
+        return 0
+    params = []
+    for work_id, tag_norm, tag_display in rows:
+        params.extend([work_id, tag_norm, tag_display])
+    cursor.execute(
+        f"""
+        INSERT INTO work_tags (work_id, tag_norm, tag_display)
+        VALUES {', '.join(['(%s, %s, %s)'] * len(rows))}
+        """,
+        params
+    )
+    return len(rows)
+
+
+def sync_work_tags(cursor, work_id, tags_field):
+    """在调用方的写入之后同步一部作品的标签行；需在调用方写入 works 的同一事务内执行，先删后插不会被单独提交"""
+    cursor.execute("DELETE FROM work_tags WHERE work_id = %s", [work_id])
+    return _insert_rows(cursor, [(work_id, tag_norm, display) for tag_norm, display in tag_rows(tags_field)])
+
+
+def backfill_work_tags(cursor, start_id, batch_size):
+    """按 works.tags 重建 start_id 之后一批作品的标签行，返回 (本批最大作品ID, 写入行数)"""
+    cursor.execute(
+        "SELECT work_id, tags FROM works WHERE work_id > %s ORDER BY work_id LIMIT %s",
+        [start_id, batch_size]
+    )
+    works = cursor.fetchall()
+    if not works:
+        return None, 0
+
+    work_ids = [row[0] for row in works]
+    rows = []
+    for work_id, tags_field in works:
+        rows.extend((work_id, tag_norm, display) for tag_norm, display in tag_rows(tags_field))
+
+    cursor.execute("START TRANSACTION")
+    try:
+        cursor.execute(
+            f"DELETE FROM work_tags WHERE work_id IN ({', '.join(['%s'] * len(work_ids))})",
+            work_ids
+        )
+        inserted = _insert_rows(cursor, rows)
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    return work_ids[-1], inserted
+
+
+def normalize_tag_filter(values):
+    """把请求中的标签参数（列表或逗号分隔字符串）规范化为去重后的 tag_norm 列表"""
+    if values is None:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    result = []
+    for value in values:
+        for fragment in str(value or '').replace('，', ',').split(','):
+            tag_norm = normalize_tag(fragment.lstrip('#'))[:MAX_TAG_LENGTH]
+            if tag_norm and tag_norm not in result:
+                result.append(tag_norm)
+    return result
+
+
+def tag_filter_condition(tag_norms, column='w.work_id'):
+    """返回 (条件SQL, 参数)：作品包含任一给定标签"""
+    placeholders = ', '.join(['%s'] * len(tag_norms))
+    return f"{column} IN (SELECT work_id FROM work_tags WHERE tag_norm IN ({placeholders}))", list(tag_norms)
+
+
+def tag_facets(cursor, works_subquery, params, limit=20):
+    """统计 works_subquery 选出的作品中各标签出现的作品数，按数量倒序"""
+    cursor.execute(
+        f"""
+        SELECT wt.tag_norm, MAX(wt.tag_display), COUNT(*) AS work_count
+        FROM work_tags wt
+        WHERE wt.work_id IN ({works_subquery})
+        GROUP BY wt.tag_norm
+        ORDER BY work_count DESC, wt.tag_norm
+        LIMIT %s
+        """,
+        list(params) + [limit]
+    )
+    return [
+        {'tag': tag_norm, 'name': display or tag_norm, 'count': int(count or 0)}
+        for tag_norm, display, count in cursor.fetchall()
+    ]
@@ -0,0 +1,77 @@
+import unittest
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from . import views
+from .authentication import User as Principal
+from .models import Author, Category, Chapter, Reader, User, Work
+
+
+@unittest.skipUnless(connection.vendor == 'mysql', '视图中的原生 SQL 使用 MySQL 语法')
+class RuntimeTableDDLTests(TransactionTestCase):
+    """附加表由迁移创建，请求路径上不应再执行建表语句"""
+
+    # 视图自行执行 START TRANSACTION/COMMIT，会提前提交 TestCase 的外层事务，因此每个用例结束后清表
+    def setUp(self):
+        reader_user = User.objects.create(username='reader', password='x', role=1)
+        author_user = User.objects.create(username='author', password='x', role=2)
+        Reader.objects.create(reader_id=reader_user.user_id, nickname='reader', balance=100)
+        Author.objects.create(author_id=author_user.user_id, pen_name='author')
+        category = Category.objects.create(name='玄幻')
+        self.work = Work.objects.create(
+            author_id=author_user.user_id, category_id=category.category_id,
+            title='测试作品', tags=['升级'], status=1,
+        )
+        self.chapter = Chapter.objects.create(
+            work_id=self.work.work_id, title='第一章', content='正文' * 100, word_count=200,
+            is_free=0, chapter_order=1, status=1,
+        )
+        self.principal = Principal(reader_user.user_id, reader_user.username, reader_user.role, reader_user.status)
+        self.factory = APIRequestFactory()
+
+    def assertNoCreateTable(self, context):
+        statements = [query['sql'] for query in context.captured_queries]
+        self.assertTrue(statements)
+        self.assertFalse(
+            [sql for sql in statements if 'CREATE TABLE' in sql.upper()],
+            '请求路径上执行了建表语句',
+        )
+
+    def call(self, view, method, path, *args, data=None):
+        if method == 'post':
+            request = self.factory.post(path, data or {}, format='json')
+        else:
+            request = self.factory.get(path, data or {})
+        force_authenticate(request, user=self.principal)
+        with CaptureQueriesContext(connection) as context:
+            response = view(request, *args)
+        self.assertLess(response.status_code, 500, getattr(response, 'data', None))
+        self.assertNoCreateTable(context)
+        return response
+
+    def test_search_works(self):
+        self.call(views.search_works, 'get', '/api/search/', data={'keyword': '测试'})
+
+    def test_get_recommendations(self):
+        self.call(views.get_recommendations, 'get', '/api/recommendations/')
+
+    def test_subscribe_chapter(self):
+        work_id, chapter_id = self.work.work_id, self.chapter.chapter_id
+        self.call(
+            views.subscribe_chapter, 'post', f'/api/works/{work_id}/chapters/{chapter_id}/subscribe/',
+            work_id, chapter_id,
+        )
+
+    def test_public_comments(self):
+        work_id = self.work.work_id
+        self.call(views.get_work_comments, 'get', f'/api/works/{work_id}/comments/', work_id)
+
+    def test_record_recommendation_feedback(self):
+        with CaptureQueriesContext(connection) as context:
+            views._record_recommendation_feedback(
+                self.principal.user_id, self.work.work_id, views.FEEDBACK_EVENT_CLICK
+            )
+        self.assertNoCreateTable(context)
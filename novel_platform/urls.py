@@ -39,6 +39,9 @@ urlpatterns = [
     path('works/<int:work_id>/chapters/create/', views.create_chapter, name='create_chapter'),
     path('works/<int:work_id>/chapters/<int:chapter_id>/', views.update_chapter, name='update_chapter'),
     path('works/<int:work_id>/chapters/<int:chapter_id>/delete/', views.delete_chapter, name='delete_chapter'),
+    path('works/<int:work_id>/chapters/reads/', views.record_chapter_reads, name='record_chapter_reads'),
+    path('works/<int:work_id>/download/', views.download_chapters, name='download_chapters'),
+    path('works/<int:work_id>/chapters/<int:chapter_id>/ahead/', views.read_chapters_ahead, name='read_chapters_ahead'),
     path('works/<int:work_id>/chapters/<int:chapter_id>/subscribe/', views.subscribe_chapter, name='subscribe_chapter'),
     
     # 评论与互动
@@ -69,13 +72,17 @@ urlpatterns = [
     
     # 消息通知
     path('messages/', views.get_messages, name='get_messages'),
+    path('messages/unread-summary/', views.get_unread_summary, name='get_unread_summary'),
     path('messages/<int:message_id>/read/', views.mark_message_read, name='mark_message_read'),
     path('messages/mark-all-read/', views.mark_all_messages_read, name='mark_all_messages_read'),
     path('messages/<int:message_id>/delete/', views.delete_message, name='delete_message'),
+    path('messages/broadcasts/<int:broadcast_id>/read/', views.mark_broadcast_message_read, name='mark_broadcast_message_read'),
+    path('messages/broadcasts/<int:broadcast_id>/delete/', views.delete_broadcast_message, name='delete_broadcast_message'),
     
     # 推荐
     path('recommendations/', views.get_recommendations, name='get_recommendations'),
     path('recommendations/feedback/', views.record_recommendation_feedback, name='record_recommendation_feedback'),
+    path('recommendations/feedback/batch/', views.record_recommendation_feedback_batch, name='record_recommendation_feedback_batch'),
 
     # 搜索
     path('search/', views.search_works, name='search_works'),
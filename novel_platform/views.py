@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
 from django.conf import settings
 from django.db import connection
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.core.files.storage import FileSystemStorage
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
@@ -21,6 +21,51 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from .authentication import invalidate_cached_principal
+from .services import (
+    chapter_bodies,
+    chapter_toc,
+    conditional,
+    message_counters,
+    offline_bundles,
+    policy,
+    preference_profiles,
+    rec_scoring,
+    recommendation_cache,
+    work_catalog,
+    work_neighbors,
+    work_stats,
+    work_tags,
+)
+from .services.preference_profiles import (
+    FEEDBACK_EVENT_CLICK,
+    FEEDBACK_EVENT_COLLECT,
+    FEEDBACK_EVENT_READ,
+    FEEDBACK_EVENT_SUBSCRIBE,
+    FEEDBACK_EVENT_VIEW,
+    FEEDBACK_EVENT_VOTE,
+    FEEDBACK_EVENT_WEIGHTS,
+    PREFERENCE_WEIGHT_MAP,
+)
+from .services.ranking_engine import RANKING_PERIODS, fetch_ranking_snapshot, ranking_source_type
+from .services.search_index import index_author_works, index_works, search_index_config, search_work_ids
+from .services.tags import normalize_tag as _normalize_tag, parse_tags_field as _parse_tags_field
+from .services.inbox import (
+    SOURCE_BROADCAST,
+    SOURCE_MESSAGE,
+    SOURCE_RANKS,
+    broadcast_total,
+    broadcast_visible,
+    delete_broadcast,
+    inbox_source,
+    mark_all_broadcasts_read,
+    mark_broadcast_read,
+    publish_work_update,
+    unread_summary,
+)
+from .services.audit_log import log_timestamp, record_admin_action_row, record_user_action_row
+from .services.pagination import CursorError, KeysetPaginator, page_window
+
 ALLOWED_IMAGE_TYPES = {
     'image/jpeg': '.jpg',
     'image/jpg': '.jpg',
@@ -66,13 +111,7 @@ USER_ACTION_TARGET_PROFILE = 4
 USER_ACTION_TARGET_BOOKSHELF = 5
 USER_ACTION_TARGET_SUBSCRIPTION = 6
 
-USER_PERMISSION_FIELDS = {
-    'can_publish': 'can_publish',
-    'can_subscribe': 'can_subscribe',
-    'can_recharge': 'can_recharge',
-    'can_comment': 'can_comment',
-    'can_vote': 'can_vote'
-}
+USER_PERMISSION_FIELDS = policy.USER_PERMISSION_COLUMNS
 
 USER_PERMISSION_LABELS = {
     'can_publish': '发表作品',
@@ -82,13 +121,6 @@ USER_PERMISSION_LABELS = {
     'can_vote': '参与投票'
 }
 
-FEEDBACK_EVENT_CLICK = 1
-FEEDBACK_EVENT_VIEW = 2
-FEEDBACK_EVENT_COLLECT = 3
-FEEDBACK_EVENT_READ = 4
-FEEDBACK_EVENT_SUBSCRIBE = 5
-FEEDBACK_EVENT_VOTE = 6
-
 FEEDBACK_EVENT_ALIASES = {
     'click': FEEDBACK_EVENT_CLICK,
     'view': FEEDBACK_EVENT_VIEW,
@@ -98,30 +130,17 @@ FEEDBACK_EVENT_ALIASES = {
     'vote': FEEDBACK_EVENT_VOTE,
 }
 
-FEEDBACK_EVENT_WEIGHTS = {
-    FEEDBACK_EVENT_CLICK: 1.0,
-    FEEDBACK_EVENT_VIEW: 1.2,
-    FEEDBACK_EVENT_COLLECT: 3.0,
-    FEEDBACK_EVENT_READ: 1.8,
-    FEEDBACK_EVENT_SUBSCRIBE: 2.5,
-    FEEDBACK_EVENT_VOTE: 2.8,
-}
-
 FEEDBACK_DEFAULT_WEIGHT = 1.0
 FEEDBACK_MAX_WEIGHT_DELTA = 5.0
 FEEDBACK_MIN_WEIGHT_DELTA = 0.05
 FEEDBACK_MAX_AGG_WEIGHT = 60.0
-FEEDBACK_RETENTION_DAYS = 180
-FEEDBACK_DECAY_DAYS = 60
-
-WORK_MODERATION_FIELDS = {
-    'is_hidden': 'is_hidden',
-    'chapters_blocked': 'chapters_blocked',
-    'updates_blocked': 'updates_blocked',
-    'subscriptions_blocked': 'subscriptions_blocked',
-    'votes_blocked': 'votes_blocked',
-    'note': 'note'
-}
+FEEDBACK_BATCH_MAX_EVENTS = 200
+
+# 连续阅读预取：一次返回的章节数
+READ_AHEAD_DEFAULT_CHAPTERS = 3
+READ_AHEAD_MAX_CHAPTERS = 10
+
+WORK_MODERATION_FIELDS = policy.WORK_MODERATION_COLUMNS
 
 WORK_MODERATION_LABELS = {
     'is_hidden': '作品可见性',
@@ -305,100 +324,22 @@ def _ensure_user_permission_record(cursor, user_id):
         )
 
 
-def _ensure_user_permission_exists(user_id):
-    with connection.cursor() as cursor:
-        _ensure_user_permission_record(cursor, user_id)
-
-
 def _get_user_permissions(user_id):
+    # 读路径只查询，缺失记录按默认权限处理，结果进入策略缓存
     with connection.cursor() as cursor:
-        _ensure_user_permission_record(cursor, user_id)
-        cursor.execute(
-            """
-            SELECT can_publish, can_subscribe, can_recharge, can_comment, can_vote
-            FROM user_permissions WHERE user_id = %s
-            """,
-            [user_id]
-        )
-        row = cursor.fetchone()
-
-    if not row:
-        return {key: True for key in USER_PERMISSION_FIELDS}
-
-    return {
-        'can_publish': bool(row[0]),
-        'can_subscribe': bool(row[1]),
-        'can_recharge': bool(row[2]),
-        'can_comment': bool(row[3]),
-        'can_vote': bool(row[4])
-    }
+        return policy.get_user_permissions(cursor, user_id)
 
 
 def _user_permission_allowed(user_id, field):
-    column = USER_PERMISSION_FIELDS.get(field)
-    if not column:
+    if field not in USER_PERMISSION_FIELDS:
         raise ValueError('Invalid permission field')
 
-    with connection.cursor() as cursor:
-        _ensure_user_permission_record(cursor, user_id)
-        cursor.execute(f"SELECT {column} FROM user_permissions WHERE user_id = %s", [user_id])
-        row = cursor.fetchone()
-
-    return bool(row and row[0])
-
-
-def _ensure_work_moderation_record(cursor, work_id):
-    cursor.execute("SELECT work_id FROM work_moderations WHERE work_id = %s", [work_id])
-    if cursor.fetchone() is None:
-        cursor.execute(
-            """
-            INSERT INTO work_moderations (
-                work_id, is_hidden, chapters_blocked, updates_blocked,
-                subscriptions_blocked, votes_blocked, note, updated_by,
-                update_time, create_time
-            )
-            VALUES (%s, 0, 0, 0, 0, 0, '', NULL, NOW(), NOW())
-            """,
-            [work_id]
-        )
-
-
-def _ensure_work_moderation_exists(work_id):
-    with connection.cursor() as cursor:
-        _ensure_work_moderation_record(cursor, work_id)
+    return bool(_get_user_permissions(user_id).get(field))
 
 
 def _get_work_moderation(work_id):
     with connection.cursor() as cursor:
-        _ensure_work_moderation_record(cursor, work_id)
-        cursor.execute(
-            """
-            SELECT is_hidden, chapters_blocked, updates_blocked,
-                   subscriptions_blocked, votes_blocked, note
-            FROM work_moderations WHERE work_id = %s
-            """,
-            [work_id]
-        )
-        row = cursor.fetchone()
-
-    if not row:
-        return {
-            'is_hidden': False,
-            'chapters_blocked': False,
-            'updates_blocked': False,
-            'subscriptions_blocked': False,
-            'votes_blocked': False,
-            'note': ''
-        }
-
-    return {
-        'is_hidden': bool(row[0]),
-        'chapters_blocked': bool(row[1]),
-        'updates_blocked': bool(row[2]),
-        'subscriptions_blocked': bool(row[3]),
-        'votes_blocked': bool(row[4]),
-        'note': row[5] or ''
-    }
+        return policy.get_work_moderation(cursor, work_id)
 
 
 def _get_user_display_name(user_id):
@@ -442,6 +383,7 @@ def _create_message(recipient_id, message_type, content, related_type=None, rela
             """,
             [sender_id, recipient_id, message_type, resolved_content, related_type, related_id]
         )
+        message_counters.add_messages(cursor, [(recipient_id, message_type)])
 
 
 def _send_admin_message(recipient_id, message_type, content, related_type=None, related_id=None, sender_id=None):
@@ -462,7 +404,8 @@ def _is_admin(user):
     return user and getattr(user, 'role', None) == ADMIN_ROLE
 
 
-def _record_admin_action(admin_id, target_type, target_id, action, detail=None, request=None, extra=None):
+def _record_admin_action(admin_id, target_type, target_id, action, detail=None, request=None, extra=None, sync=None):
+    """sync=None 时按 AUDIT_LOG['ADMIN_SYNC'] 决定是否在请求内同步写入"""
     if not admin_id or not action:
         return
 
@@ -477,23 +420,20 @@ def _record_admin_action(admin_id, target_type, target_id, action, detail=None,
     resolved_target_type = target_type if target_type is not None else ADMIN_ACTION_TARGET_SYSTEM
     resolved_target_id = target_id if target_id is not None else admin_id
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            INSERT INTO admin_action_logs (admin_id, target_type, target_id, action, detail, extra_data, ip_address, user_agent, create_time)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-            """,
-            [
-                admin_id,
-                resolved_target_type,
-                resolved_target_id,
-                action,
-                detail or '',
-                serialized_extra,
-                ip_address,
-                user_agent
-            ]
-        )
+    record_admin_action_row(
+        [
+            admin_id,
+            resolved_target_type,
+            resolved_target_id,
+            action,
+            detail or '',
+            serialized_extra,
+            ip_address,
+            user_agent,
+            log_timestamp()
+        ],
+        sync=sync
+    )
 
 
 def _record_user_action(user_id, action, target_type=None, target_id=None, detail=None, request=None, extra=None):
@@ -508,23 +448,18 @@ def _record_user_action(user_id, action, target_type=None, target_id=None, detai
 
     serialized_extra = _serialize_extra(extra)
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            INSERT INTO user_action_logs (user_id, action, target_type, target_id, detail, extra_data, ip_address, user_agent, create_time)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-            """,
-            [
-                user_id,
-                action,
-                target_type,
-                target_id,
-                detail or '',
-                serialized_extra,
-                ip_address,
-                user_agent
-            ]
-        )
+    # 默认只入队，由后台线程批量写入
+    record_user_action_row([
+        user_id,
+        action,
+        target_type,
+        target_id,
+        detail or '',
+        serialized_extra,
+        ip_address,
+        user_agent,
+        log_timestamp()
+    ])
 
 def _calculate_word_count(content):
     if not content:
@@ -582,129 +517,98 @@ def _user_has_subscription(user_id, work_id, chapter_id):
 
 
 def _record_chapter_reading(user_id, work_id, chapter_id):
-    if not user_id:
+    _record_chapter_readings(user_id, work_id, [chapter_id])
+
+
+def _record_chapter_readings(user_id, work_id, chapter_ids):
+    """记录同一作品若干章节的阅读进度：已读章节一条语句刷新，新读章节一条多行插入，统计与反馈各写一次"""
+    chapter_ids = list(dict.fromkeys(chapter_ids))
+    if not user_id or not chapter_ids:
         return
 
     with connection.cursor() as cursor:
+        placeholders = ', '.join(['%s'] * len(chapter_ids))
         cursor.execute(
-            "SELECT record_id, progress FROM reading_records WHERE reader_id = %s AND chapter_id = %s",
-            [user_id, chapter_id]
+            f"SELECT record_id, chapter_id FROM reading_records WHERE reader_id = %s AND chapter_id IN ({placeholders})",
+            [user_id] + chapter_ids
         )
-        existing = cursor.fetchone()
+        rows = cursor.fetchall()
+        record_ids = [row[0] for row in rows]
+        read_chapter_ids = {row[1] for row in rows}
 
-        if existing:
-            record_id, progress = existing
+        if record_ids:
             cursor.execute(
-                "UPDATE reading_records SET read_time = NOW(), progress = GREATEST(progress, %s), is_finished = CASE WHEN %s >= 100 THEN 1 ELSE is_finished END WHERE record_id = %s",
-                [100, 100, record_id]
+                f"""
+                UPDATE reading_records
+                SET read_time = NOW(), progress = GREATEST(progress, 100), is_finished = 1
+                WHERE record_id IN ({', '.join(['%s'] * len(record_ids))})
+                """,
+                record_ids
             )
+
+        new_chapter_ids = [chapter_id for chapter_id in chapter_ids if chapter_id not in read_chapter_ids]
+        if not new_chapter_ids:
             return
 
-        cursor.execute(
-            """
-            INSERT INTO reading_records (reader_id, chapter_id, read_time, progress, is_finished)
-            VALUES (%s, %s, NOW(), 100, 1)
-            """,
-            [user_id, chapter_id]
-        )
+        cursor.execute("START TRANSACTION")
+        try:
+            cursor.execute(
+                """
+                SELECT COUNT(*)
+                FROM reading_records rr
+                JOIN chapters ch ON rr.chapter_id = ch.chapter_id
+                WHERE rr.reader_id = %s AND ch.work_id = %s
+                """,
+                [user_id, work_id]
+            )
+            read_chapters = int(cursor.fetchone()[0] or 0)
+            is_new_reader = read_chapters == 0
 
-        cursor.execute(
-            "UPDATE works SET read_count = COALESCE(read_count, 0) + 1 WHERE work_id = %s",
-            [work_id]
-        )
+            values_sql = ', '.join(['(%s, %s, NOW(), 100, 1)'] * len(new_chapter_ids))
+            params = []
+            for chapter_id in new_chapter_ids:
+                params.extend([user_id, chapter_id])
+            cursor.execute(
+                f"""
+                INSERT INTO reading_records (reader_id, chapter_id, read_time, progress, is_finished)
+                VALUES {values_sql}
+                """,
+                params
+            )
+
+            cursor.execute(
+                "UPDATE works SET read_count = COALESCE(read_count, 0) + %s WHERE work_id = %s",
+                [len(new_chapter_ids), work_id]
+            )
 
+            work_stats.apply_delta(
+                cursor,
+                work_id,
+                total_reads=len(new_chapter_ids),
+                unique_readers=1 if is_new_reader else 0
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    if len(new_chapter_ids) == 1:
+        metadata = {'chapter_id': new_chapter_ids[0]}
+    else:
+        metadata = {'chapter_ids': new_chapter_ids}
     _record_recommendation_feedback(
         user_id,
         work_id,
         FEEDBACK_EVENT_READ,
-        weight_delta=1.0,
-        metadata={'chapter_id': chapter_id}
+        weight_delta=float(len(new_chapter_ids)),
+        metadata=metadata,
+        profile_score=(
+            preference_profiles.reading_score(read_chapters + len(new_chapter_ids))
+            - preference_profiles.reading_score(read_chapters)
+        )
     )
 
 
-POINT_TRANSACTIONS_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS point_transactions (
-    transaction_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-    user_id BIGINT NOT NULL,
-    transaction_type VARCHAR(50) NOT NULL,
-    amount DECIMAL(12,2) NOT NULL,
-    description VARCHAR(255),
-    create_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-    INDEX idx_user_time (user_id, create_time)
-)
-"""
-
-
-TICKET_WALLET_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS user_tickets (
-    user_id BIGINT PRIMARY KEY,
-    ticket_balance INT NOT NULL DEFAULT 0,
-    progress DECIMAL(12,2) NOT NULL DEFAULT 0,
-    total_earned INT NOT NULL DEFAULT 0,
-    total_spent INT NOT NULL DEFAULT 0,
-    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-)
-"""
-
-COMMENT_LIKES_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS comment_likes (
-    like_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-    comment_id BIGINT NOT NULL,
-    reader_id BIGINT NOT NULL,
-    like_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE KEY unique_comment_reader (comment_id, reader_id),
-    FOREIGN KEY (comment_id) REFERENCES comments(comment_id) ON DELETE CASCADE,
-    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
-    INDEX idx_comment (comment_id),
-    INDEX idx_reader (reader_id)
-)
-"""
-
-
-SEARCH_RECORDS_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS search_records (
-    search_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-    reader_id BIGINT NOT NULL,
-    keyword VARCHAR(100) NOT NULL,
-    search_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    search_type TINYINT NOT NULL DEFAULT 1 COMMENT '1=作品搜索，2=作者搜索，3=标签搜索',
-    click_work_id BIGINT,
-    FOREIGN KEY (reader_id) REFERENCES readers(reader_id) ON DELETE CASCADE,
-    FOREIGN KEY (click_work_id) REFERENCES works(work_id) ON DELETE SET NULL,
-    INDEX idx_reader_time (reader_id, search_time)
-)
-"""
-
-RECOMMENDATION_FEEDBACK_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS user_recommendation_feedback (
-    feedback_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-    user_id BIGINT NOT NULL,
-    work_id BIGINT NOT NULL,
-    event_type TINYINT NOT NULL,
-    weight DECIMAL(10,4) NOT NULL DEFAULT 1.0,
-    event_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    metadata TEXT,
-    UNIQUE KEY uniq_user_work_event (user_id, work_id, event_type),
-    INDEX idx_user_event_time (user_id, event_time),
-    INDEX idx_user_event_type (user_id, event_type, event_time),
-    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-    FOREIGN KEY (work_id) REFERENCES works(work_id) ON DELETE CASCADE
-)
-"""
-
-
-def _ensure_point_transactions_table():
-    with connection.cursor() as cursor:
-        cursor.execute(POINT_TRANSACTIONS_TABLE_SQL)
-
-
-def _ensure_user_tickets_table():
-    with connection.cursor() as cursor:
-        cursor.execute(TICKET_WALLET_TABLE_SQL)
-
-
 def _ensure_user_ticket_wallet(cursor, user_id):
     cursor.execute("SELECT user_id FROM user_tickets WHERE user_id = %s", [user_id])
     if cursor.fetchone() is None:
@@ -717,21 +621,6 @@ def _ensure_user_ticket_wallet(cursor, user_id):
         )
 
 
-def _ensure_comment_likes_table():
-    with connection.cursor() as cursor:
-        cursor.execute(COMMENT_LIKES_TABLE_SQL)
-
-
-def _ensure_search_records_table():
-    with connection.cursor() as cursor:
-        cursor.execute(SEARCH_RECORDS_TABLE_SQL)
-
-
-def _ensure_recommendation_feedback_table():
-    with connection.cursor() as cursor:
-        cursor.execute(RECOMMENDATION_FEEDBACK_TABLE_SQL)
-
-
 def _normalize_feedback_weight(value):
     if value is None:
         return FEEDBACK_DEFAULT_WEIGHT
@@ -748,7 +637,19 @@ def _normalize_feedback_weight(value):
     return abs_value if numeric > 0 else -abs_value
 
 
-def _record_recommendation_feedback(user_id, work_id, event_type, weight_delta=None, metadata=None):
+_FEEDBACK_UPSERT_ROW = '(%s, %s, %s, %s, NOW(), %s)'
+
+_FEEDBACK_UPSERT_SQL = """
+    INSERT INTO user_recommendation_feedback (user_id, work_id, event_type, weight, event_time, metadata)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE
+        weight = LEAST(weight + VALUES(weight), %s),
+        event_time = CASE WHEN VALUES(weight) > 0 THEN GREATEST(event_time, VALUES(event_time)) ELSE event_time END,
+        metadata = CASE WHEN VALUES(weight) > 0 THEN COALESCE(VALUES(metadata), metadata) ELSE metadata END
+"""
+
+
+def _record_recommendation_feedback(user_id, work_id, event_type, weight_delta=None, metadata=None, profile_score=0.0):
     if not user_id or not work_id or not event_type:
         return
 
@@ -760,34 +661,65 @@ def _record_recommendation_feedback(user_id, work_id, event_type, weight_delta=N
     if metadata not in (None, {}, ''):
         metadata_value = _serialize_extra(metadata)
 
-    _ensure_recommendation_feedback_table()
-
     with connection.cursor() as cursor:
         cursor.execute(
-            """
-            INSERT INTO user_recommendation_feedback (user_id, work_id, event_type, weight, event_time, metadata)
-            VALUES (%s, %s, %s, %s, NOW(), %s)
-            ON DUPLICATE KEY UPDATE
-                weight = LEAST(weight + VALUES(weight), %s),
-                event_time = CASE WHEN VALUES(weight) > 0 THEN GREATEST(event_time, VALUES(event_time)) ELSE event_time END,
-                metadata = CASE WHEN VALUES(weight) > 0 THEN COALESCE(VALUES(metadata), metadata) ELSE metadata END
-            """,
+            _FEEDBACK_UPSERT_SQL.format(rows=_FEEDBACK_UPSERT_ROW),
             [user_id, work_id, event_type, normalized_delta, metadata_value, FEEDBACK_MAX_AGG_WEIGHT]
         )
 
-        cutoff_time = datetime.utcnow() - timedelta(days=FEEDBACK_RETENTION_DAYS)
+        # 行为本身的得分（收藏/阅读/投票/订阅）与反馈得分一起累加到偏好画像
+        preference_profiles.add_work_signal(
+            cursor,
+            user_id,
+            work_id,
+            profile_score + preference_profiles.feedback_score(event_type, normalized_delta)
+        )
+
+    recommendation_cache.invalidate(user_id)
+
+
+def _record_recommendation_feedback_batch(user_id, events):
+    """批量写入一个用户的反馈事件：同一 (作品, 反馈类型) 先在内存中合并，再用一条多行 upsert 写入"""
+    merged = {}
+    for event in events:
+        key = (event['work_id'], event['event_type'])
+        entry = merged.get(key)
+        if entry is None:
+            merged[key] = {'weight': event['weight'], 'metadata': event['metadata']}
+            continue
+        entry['weight'] = min(entry['weight'] + event['weight'], FEEDBACK_MAX_AGG_WEIGHT)
+        if isinstance(event['metadata'], dict) and isinstance(entry['metadata'], dict):
+            entry['metadata'] = {**entry['metadata'], **event['metadata']}
+        elif event['metadata'] not in (None, {}, ''):
+            entry['metadata'] = event['metadata']
+
+    if not merged:
+        return 0
+
+    # 按唯一键顺序写入，并发批次加锁顺序一致，降低死锁概率
+    params = []
+    work_scores = defaultdict(float)
+    for (work_id, event_type), entry in sorted(merged.items()):
+        metadata_value = None
+        if entry['metadata'] not in (None, {}, ''):
+            metadata_value = _serialize_extra(entry['metadata'])
+        params.extend([user_id, work_id, event_type, entry['weight'], metadata_value])
+        work_scores[work_id] += preference_profiles.feedback_score(event_type, entry['weight'])
+    params.append(FEEDBACK_MAX_AGG_WEIGHT)
+
+    with connection.cursor() as cursor:
         cursor.execute(
-            """
-            DELETE FROM user_recommendation_feedback
-            WHERE user_id = %s AND event_time < %s
-            """,
-            [user_id, cutoff_time]
+            _FEEDBACK_UPSERT_SQL.format(rows=', '.join([_FEEDBACK_UPSERT_ROW] * len(merged))),
+            params
         )
+        preference_profiles.add_work_signals(cursor, user_id, work_scores)
+
+    recommendation_cache.invalidate(user_id)
+    return len(merged)
 
 
 def _fetch_user_search_history(user_id, limit=20):
     limit_value = max(1, min(int(limit or 20), 100))
-    _ensure_search_records_table()
     with connection.cursor() as cursor:
         cursor.execute(
             """
@@ -814,50 +746,6 @@ def _fetch_user_search_history(user_id, limit=20):
         return history
 
 
-PREFERENCE_WEIGHT_MAP = {
-    'collection': 3.0,
-    'reading': 1.5,
-    'vote': 2.5,
-    'subscription': 3.0,
-    'feedback': 1.0,
-}
-
-
-def _parse_tags_field(tags_field):
-    if not tags_field:
-        return []
-
-    if isinstance(tags_field, list):
-        return [str(tag).strip() for tag in tags_field if str(tag).strip()]
-
-    if isinstance(tags_field, str):
-        try:
-            parsed = json.loads(tags_field)
-            if isinstance(parsed, list):
-                return [str(tag).strip() for tag in parsed if str(tag).strip()]
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-        separators = [',', '，', ';', '；', '|', '/', ' ']
-        fragments = [tags_field]
-        for sep in separators:
-            temp = []
-            for fragment in fragments:
-                temp.extend(fragment.split(sep))
-            fragments = temp
-        return [frag.strip() for frag in fragments if frag.strip()]
-
-    return []
-
-
-def _normalize_tag(tag):
-    if tag is None:
-        return ''
-    if not isinstance(tag, str):
-        tag = str(tag)
-    return tag.strip().lower()
-
-
 def _get_top_keys(score_map, limit=3):
     sorted_items = sorted(score_map.items(), key=lambda item: (-item[1], item[0]))
     return [item[0] for item in sorted_items[:limit]]
@@ -874,6 +762,9 @@ def _get_category_names(category_ids):
 
 
 def _get_top_categories_by_popularity(limit=3):
+    catalog = work_catalog.get_catalog()
+    if catalog is not None:
+        return catalog.top_categories(limit)
     with connection.cursor() as cursor:
         cursor.execute(
             """
@@ -893,152 +784,14 @@ def _get_top_categories_by_popularity(limit=3):
 
 
 def _get_user_preference_scores(user_id):
-    category_scores = defaultdict(float)
-    tag_scores = defaultdict(float)
-    tag_display_map = {}
-    has_personal_signal = False
-
+    # 读取物化的偏好画像（一行），不再逐次聚合收藏/阅读/投票/订阅/反馈历史
     with connection.cursor() as cursor:
-        # 收藏偏好
-        cursor.execute(
-            """
-            SELECT w.category_id, w.tags
-            FROM collections c
-            JOIN works w ON c.work_id = w.work_id
-            WHERE c.reader_id = %s
-            """,
-            [user_id]
-        )
-        for category_id, tags_field in cursor.fetchall():
-            has_personal_signal = True
-            score = PREFERENCE_WEIGHT_MAP['collection']
-            if category_id is not None:
-                category_scores[int(category_id)] += score
-            for tag in _parse_tags_field(tags_field):
-                normalized = _normalize_tag(tag)
-                if normalized:
-                    tag_scores[normalized] += score
-                    tag_display_map.setdefault(normalized, tag)
-
-        # 阅读偏好
-        cursor.execute(
-            """
-            SELECT w.category_id, w.tags, COUNT(DISTINCT rr.chapter_id) AS cnt
-            FROM reading_records rr
-            JOIN chapters ch ON rr.chapter_id = ch.chapter_id
-            JOIN works w ON ch.work_id = w.work_id
-            WHERE rr.reader_id = %s
-            GROUP BY w.work_id, w.category_id, w.tags
-            """,
-            [user_id]
-        )
-        for category_id, tags_field, cnt in cursor.fetchall():
-            has_personal_signal = True
-            base = PREFERENCE_WEIGHT_MAP['reading']
-            score = base * max(1.0, math.sqrt(float(cnt) if cnt else 1.0))
-            if category_id is not None:
-                category_scores[int(category_id)] += score
-            for tag in _parse_tags_field(tags_field):
-                normalized = _normalize_tag(tag)
-                if normalized:
-                    tag_scores[normalized] += score
-                    tag_display_map.setdefault(normalized, tag)
-
-        # 投票偏好
-        cursor.execute(
-            """
-            SELECT w.category_id, w.tags, COALESCE(SUM(v.count), 0) AS cnt
-            FROM votes v
-            JOIN works w ON v.work_id = w.work_id
-            WHERE v.reader_id = %s
-            GROUP BY w.work_id, w.category_id, w.tags
-            """,
-            [user_id]
-        )
-        for category_id, tags_field, cnt in cursor.fetchall():
-            has_personal_signal = True
-            base = PREFERENCE_WEIGHT_MAP['vote']
-            score = base * max(1.0, float(cnt) if cnt else 1.0)
-            if category_id is not None:
-                category_scores[int(category_id)] += score
-            for tag in _parse_tags_field(tags_field):
-                normalized = _normalize_tag(tag)
-                if normalized:
-                    tag_scores[normalized] += score
-                    tag_display_map.setdefault(normalized, tag)
-
-        # 订阅偏好
-        cursor.execute(
-            """
-            SELECT w.category_id, w.tags, COUNT(*) AS cnt
-            FROM subscriptions s
-            JOIN works w ON s.work_id = w.work_id
-            WHERE s.reader_id = %s
-            GROUP BY w.work_id, w.category_id, w.tags
-            """,
-            [user_id]
-        )
-        for category_id, tags_field, cnt in cursor.fetchall():
-            has_personal_signal = True
-            base = PREFERENCE_WEIGHT_MAP['subscription']
-            score = base * max(1.0, float(cnt) if cnt else 1.0)
-            if category_id is not None:
-                category_scores[int(category_id)] += score
-            for tag in _parse_tags_field(tags_field):
-                normalized = _normalize_tag(tag)
-                if normalized:
-                    tag_scores[normalized] += score
-                    tag_display_map.setdefault(normalized, tag)
-
-        _ensure_recommendation_feedback_table()
-        cursor.execute(
-            """
-            SELECT w.category_id, w.tags, f.event_type, f.weight, f.event_time
-            FROM user_recommendation_feedback f
-            JOIN works w ON f.work_id = w.work_id
-            WHERE f.user_id = %s
-            """,
-            [user_id]
-        )
-        for category_id, tags_field, event_type, weight_value, event_time in cursor.fetchall():
-            has_personal_signal = True
-            event_type_int = int(event_type or 0)
-            base = FEEDBACK_EVENT_WEIGHTS.get(event_type_int)
-            if not base:
-                continue
-
-            try:
-                weight_float = float(weight_value or 0.0)
-            except (TypeError, ValueError, InvalidOperation):
-                weight_float = 0.0
-
-            if weight_float <= 0:
-                continue
-
-            decay = 1.0
-            event_dt = event_time
-            if isinstance(event_dt, datetime):
-                if timezone.is_aware(event_dt):
-                    event_dt = timezone.make_naive(event_dt)
-                age_days = max(0, (datetime.utcnow() - event_dt.replace(tzinfo=None)).days)
-                if FEEDBACK_DECAY_DAYS > 0 and age_days > 0:
-                    decay = max(0.2, 1.0 - age_days / FEEDBACK_DECAY_DAYS)
-
-            score = base * weight_float * decay * PREFERENCE_WEIGHT_MAP['feedback']
-
-            if category_id is not None:
-                try:
-                    category_scores[int(category_id)] += score
-                except (TypeError, ValueError):
-                    pass
-
-            for tag in _parse_tags_field(tags_field):
-                normalized = _normalize_tag(tag)
-                if normalized:
-                    tag_scores[normalized] += score
-                    tag_display_map.setdefault(normalized, tag)
+        profile = preference_profiles.get_profile(cursor, user_id)
 
-    return category_scores, tag_scores, tag_display_map, has_personal_signal
+    category_scores = defaultdict(float, profile.category_scores)
+    tag_scores = defaultdict(float, profile.tag_scores)
+    has_personal_signal = profile.signal_count > 0
+    return category_scores, tag_scores, dict(profile.tag_labels), has_personal_signal
 
 
 def _serialize_work_row(row):
@@ -1063,6 +816,10 @@ def _serialize_work_row(row):
 def _fetch_candidate_works(category_ids=None, limit=30, exclude_ids=None):
     params = []
     exclude_ids = set(exclude_ids or [])
+    catalog = work_catalog.get_catalog()
+    if catalog is not None:
+        return catalog.cards(catalog.top_work_ids(category_ids, limit=limit, exclude_ids=exclude_ids))
+
     query = """
         SELECT w.work_id, w.title, w.cover_url, w.intro, w.tags,
                w.category_id, COALESCE(c.name, '') AS category_name,
@@ -1102,32 +859,43 @@ def _fetch_candidate_works(category_ids=None, limit=30, exclude_ids=None):
         return results
 
 
-def _score_work_for_preferences(work, category_scores, tag_scores):
-    score = category_scores.get(int(work.get('category_id') or 0), 0.0)
-    work_tags = work.get('tags') or []
-    tag_score = 0.0
-    for tag in work_tags:
-        normalized = _normalize_tag(tag)
-        if normalized in tag_scores:
-            tag_score += tag_scores[normalized]
-    score += tag_score
-
-    # 结合作品热度
-    score += min(work.get('vote_count', 0) / 5.0, 20)
-    score += min(work.get('collect_count', 0) / 10.0, 15)
-    score += min(work.get('read_count', 0) / 2000.0, 15)
+def _fetch_works_by_ids(work_ids):
+    """按给定顺序返回上架作品的推荐卡片数据，下架或不存在的作品会被跳过"""
+    if not work_ids:
+        return []
+    catalog = work_catalog.get_catalog()
+    if catalog is not None:
+        return catalog.cards(work_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT w.work_id, w.title, w.cover_url, w.intro, w.tags,
+                   w.category_id, COALESCE(c.name, '') AS category_name,
+                   COALESCE(w.read_count, 0) AS read_count,
+                   COALESCE(w.collect_count, 0) AS collect_count,
+                   COALESCE(w.vote_count, 0) AS vote_count,
+                   w.update_time,
+                   COALESCE(a.pen_name, r.nickname, u.username, '') AS author_name
+            FROM works w
+            LEFT JOIN authors a ON w.author_id = a.author_id
+            LEFT JOIN readers r ON w.author_id = r.reader_id
+            LEFT JOIN users u ON w.author_id = u.user_id
+            LEFT JOIN categories c ON w.category_id = c.category_id
+            WHERE w.status IN (1, 2)
+              AND w.work_id IN ({', '.join(['%s'] * len(work_ids))})
+            """,
+            list(work_ids)
+        )
+        works = {row[0]: _serialize_work_row(row) for row in cursor.fetchall()}
+    return [works[work_id] for work_id in work_ids if work_id in works]
 
-    # 更新时间加权
-    if work.get('update_time'):
-        try:
-            update_dt = datetime.fromisoformat(work['update_time'])
-            age_days = (datetime.utcnow() - update_dt).days
-            freshness_bonus = max(0, 10 - age_days)
-            score += freshness_bonus
-        except ValueError:
-            pass
 
-    return score
+def _build_also_read_recommendations(user_id, limit=8, exclude_ids=None):
+    """“读过的人也在读”：以最近读过的作品为种子汇总离线相似作品"""
+    with connection.cursor() as cursor:
+        seed_ids = work_neighbors.recent_seed_work_ids(cursor, user_id)
+        candidate_ids = work_neighbors.also_read_work_ids(cursor, seed_ids, limit=limit * 2, exclude_ids=exclude_ids)
+    return _fetch_works_by_ids(candidate_ids)[:limit]
 
 
 def _build_favorite_type_recommendations(category_scores, tag_scores, fallback_categories, top_tags=None, limit=9):
@@ -1152,41 +920,33 @@ def _build_favorite_type_recommendations(category_scores, tag_scores, fallback_c
         effective_tag_scores[key] += float(value)
 
     active_category_ids = list(effective_category_scores.keys()) or fallback_categories
-    candidates = _fetch_candidate_works(active_category_ids, limit=60)
-    if not candidates:
-        candidates = _fetch_candidate_works(None, limit=60)
-
-    filtered_candidates = candidates
-    normalized_top_tags = set(_normalize_tag(tag) for tag in (top_tags or []) if tag)
-    if normalized_top_tags:
-        tagged = []
-        for work in candidates:
-            work_tags = {_normalize_tag(tag) for tag in (work.get('tags') or []) if tag}
-            if work_tags & normalized_top_tags:
-                tagged.append(work)
-        if tagged:
-            filtered_candidates = tagged
-
-    scored = []
-    for work in filtered_candidates:
-        work_score = _score_work_for_preferences(work, effective_category_scores, effective_tag_scores)
-        scored.append((work_score, work))
-
-    scored.sort(key=lambda item: item[0], reverse=True)
-    unique = OrderedDict()
-    for _, work in scored:
-        unique.setdefault(work['work_id'], work)
-        if len(unique) >= limit:
-            break
+    # 偏好标签的候选作品通过 work_tags 索引直接召回，没有命中时再按分类取热门作品；
+    # 候选只载入打分所需的列，整池向量化打分后再取前 limit 个的完整信息
+    normalized_top_tags = sorted({_normalize_tag(tag) for tag in (top_tags or []) if tag})
+    score_tags = list(effective_tag_scores.keys())
+    with connection.cursor() as cursor:
+        candidates = rec_scoring.CandidateColumns.empty()
+        if normalized_top_tags:
+            candidates = rec_scoring.fetch_candidate_columns(
+                cursor, active_category_ids, tag_norms=normalized_top_tags, score_tags=score_tags
+            )
+            if not len(candidates) and active_category_ids:
+                candidates = rec_scoring.fetch_candidate_columns(
+                    cursor, None, tag_norms=normalized_top_tags, score_tags=score_tags
+                )
+        if not len(candidates):
+            candidates = rec_scoring.fetch_candidate_columns(cursor, active_category_ids, score_tags=score_tags)
+        if not len(candidates):
+            candidates = rec_scoring.fetch_candidate_columns(cursor, None, score_tags=score_tags)
 
-    results = list(unique.values())
+    scores = rec_scoring.score_candidates(candidates, effective_category_scores, effective_tag_scores)
+    results = _fetch_works_by_ids(rec_scoring.top_work_ids(candidates, scores, limit))
     if not results:
         results = _fetch_candidate_works(None, limit=limit, exclude_ids=set())
     return results
 
 
 def _fetch_search_based_recommendations(user_id, fallback_categories, limit=8, exclude_ids=None):
-    _ensure_search_records_table()
     exclude_ids = set(exclude_ids or [])
     with connection.cursor() as cursor:
         cursor.execute(
@@ -1209,9 +969,25 @@ def _fetch_search_based_recommendations(user_id, fallback_categories, limit=8, e
         for index, (keyword, _search_time) in enumerate(keyword_rows):
             if not keyword:
                 continue
-            like_keyword = f"%{keyword}%"
+            candidate_ids = search_work_ids(keyword)
+            if candidate_ids is None:
+                like_keyword = f"%{keyword}%"
+                tag_condition, tag_params = work_tags.tag_filter_condition([_normalize_tag(keyword.lstrip('#'))])
+                match_condition = f"""(
+                        w.title LIKE %s OR
+                        w.intro LIKE %s OR
+                        COALESCE(a.pen_name, r.nickname, u.username, '') LIKE %s OR
+                        {tag_condition}
+                  )"""
+                match_params = [like_keyword, like_keyword, like_keyword] + tag_params
+            elif not candidate_ids:
+                continue
+            else:
+                candidate_ids = candidate_ids[:200]
+                match_condition = f"w.work_id IN ({', '.join(['%s'] * len(candidate_ids))})"
+                match_params = candidate_ids
             cursor.execute(
-                """
+                f"""
                 SELECT w.work_id, w.title, w.cover_url, w.intro, w.tags,
                        w.category_id, COALESCE(c.name, '') AS category_name,
                        COALESCE(w.read_count, 0) AS read_count,
@@ -1225,16 +1001,11 @@ def _fetch_search_based_recommendations(user_id, fallback_categories, limit=8, e
                 LEFT JOIN users u ON w.author_id = u.user_id
                 LEFT JOIN categories c ON w.category_id = c.category_id
                 WHERE w.status IN (1, 2)
-                  AND (
-                        w.title LIKE %s OR
-                        w.intro LIKE %s OR
-                        COALESCE(a.pen_name, r.nickname, u.username, '') LIKE %s OR
-                        COALESCE(w.tags, '') LIKE %s
-                  )
+                  AND {match_condition}
                 ORDER BY w.vote_count DESC, w.read_count DESC, w.update_time DESC
                 LIMIT 8
                 """,
-                [like_keyword, like_keyword, like_keyword, like_keyword]
+                match_params
             )
             weight = max(1, 5 - index)
             for row in cursor.fetchall():
@@ -1292,17 +1063,46 @@ def _build_favorite_rank_recommendations(category_ids, limit_per_category=4, exc
 
     expected_total = limit_per_category * max(1, len(ordered_categories) or 1)
 
+    catalog = work_catalog.get_catalog()
+
     with connection.cursor() as cursor:
         general_rank_rows = None
 
         def fetch_ranking_rows(target_category_id, fetch_limit):
-            params = []
+            params = [ranking_source_type('read'), RANKING_PERIODS['week']]
             if target_category_id is None:
                 category_condition = "AND rk.category_id IS NULL"
             else:
                 category_condition = "AND rk.category_id = %s"
                 params.append(target_category_id)
 
+            if catalog is not None:
+                # 只查榜单明细，作品卡片与上架状态取自内存目录；多取一倍以抵消已下架的作品
+                cursor.execute(
+                    f"""
+                    SELECT rd.work_id, rd.rank, rd.score
+                    FROM rankings rk
+                    JOIN ranking_details rd ON rk.ranking_id = rd.ranking_id
+                    WHERE rk.status = 1
+                      AND rk.source_type = %s
+                      AND rk.period = %s
+                      AND rd.stat_date = (
+                          SELECT MAX(rd2.stat_date)
+                          FROM ranking_details rd2
+                          WHERE rd2.ranking_id = rk.ranking_id
+                      )
+                      {category_condition}
+                    ORDER BY rd.rank ASC, rd.score DESC
+                    LIMIT %s
+                    """,
+                    params + [fetch_limit * 2]
+                )
+                ranked = sorted(
+                    (row for row in cursor.fetchall() if row[0] in catalog.positions),
+                    key=lambda row: (row[1], -(row[2] or 0), -catalog.update_seconds(row[0]))
+                )
+                return catalog.cards([row[0] for row in ranked[:fetch_limit]])
+
             query = f"""
                 SELECT w.work_id, w.title, w.cover_url, w.intro, w.tags,
                        w.category_id, COALESCE(c.name, '') AS category_name,
@@ -1320,6 +1120,8 @@ def _build_favorite_rank_recommendations(category_ids, limit_per_category=4, exc
                 LEFT JOIN categories c ON w.category_id = c.category_id
                 WHERE w.status IN (1, 2)
                   AND rk.status = 1
+                  AND rk.source_type = %s
+                  AND rk.period = %s
                   AND rd.stat_date = (
                       SELECT MAX(rd2.stat_date)
                       FROM ranking_details rd2
@@ -1331,7 +1133,7 @@ def _build_favorite_rank_recommendations(category_ids, limit_per_category=4, exc
             """
             params.append(fetch_limit)
             cursor.execute(query, params)
-            return cursor.fetchall()
+            return [_serialize_work_row(row) for row in cursor.fetchall()]
 
         for raw_category_id in ordered_categories:
             rows = fetch_ranking_rows(raw_category_id, limit_per_category * 3)
@@ -1348,8 +1150,8 @@ def _build_favorite_rank_recommendations(category_ids, limit_per_category=4, exc
             except (TypeError, ValueError):
                 display_name = ''
 
-            for row in rows:
-                work = _serialize_work_row(row)
+            for ranked_work in rows:
+                work = dict(ranked_work)
                 work_id = work['work_id']
                 if work_id in seen_ids:
                     continue
@@ -1644,6 +1446,13 @@ def admin_list_users(request):
     page_size = min(max(page_size, 1), 100)
     offset = (page - 1) * page_size
 
+    try:
+        paginator = KeysetPaginator.from_request(
+            request, 'admin_users', [('u.create_time', 'DESC'), ('u.user_id', 'DESC')], page_size
+        )
+    except CursorError as exc:
+        return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
     conditions = ['u.role <> %s']
     params = [ADMIN_ROLE]
 
@@ -1672,11 +1481,19 @@ def admin_list_users(request):
             pass
 
     where_clause = ' AND '.join(conditions) if conditions else '1=1'
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if paginator:
+        paginator.apply(page_conditions, page_params)
+    page_where = ' AND '.join(page_conditions) if page_conditions else '1=1'
+    order_clause, limit_clause, limit_params = page_window(paginator, 'u.create_time DESC', page_size, offset)
 
     with connection.cursor() as cursor:
-        cursor.execute(f"SELECT COUNT(*) FROM users u WHERE {where_clause}", params)
-        total_row = cursor.fetchone()
-        total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+        total = None
+        if paginator is None or paginator.include_total:
+            cursor.execute(f"SELECT COUNT(*) FROM users u WHERE {where_clause}", params)
+            total_row = cursor.fetchone()
+            total = int(total_row[0]) if total_row and total_row[0] is not None else 0
 
         cursor.execute(
             f"""
@@ -1689,15 +1506,20 @@ def admin_list_users(request):
                    COALESCE(up.can_vote, 1) AS can_vote
             FROM users u
             LEFT JOIN user_permissions up ON u.user_id = up.user_id
-            WHERE {where_clause}
-            ORDER BY u.create_time DESC
-            LIMIT %s OFFSET %s
+            WHERE {page_where}
+            ORDER BY {order_clause}
+            {limit_clause}
             """,
-            params + [page_size, offset]
+            page_params + limit_params
         )
 
+        rows = cursor.fetchall()
+        page_info = {}
+        if paginator:
+            rows, page_info = paginator.paginate(rows, lambda row: (row[4], row[0]))
+
         users = []
-        for row in cursor.fetchall():
+        for row in rows:
             users.append({
                 'user_id': row[0],
                 'username': row[1],
@@ -1716,7 +1538,11 @@ def admin_list_users(request):
                 }
             })
 
-    return Response({'success': True, 'users': users, 'total': total})
+    response_data = {'success': True, 'users': users}
+    if total is not None:
+        response_data['total'] = total
+    response_data.update(page_info)
+    return Response(response_data)
 
 
 @api_view(['PUT', 'PATCH'])
@@ -1725,11 +1551,6 @@ def admin_update_user_permissions(request, user_id):
     if not _is_admin(request.user):
         return Response({'success': False, 'error': '需要管理员权限'}, status=status.HTTP_403_FORBIDDEN)
 
-    try:
-        target_permissions = _get_user_permissions(user_id)
-    except Exception:
-        target_permissions = {key: True for key in USER_PERMISSION_FIELDS}
-
     data = request.data or {}
     reason = (data.get('reason') or '').strip()
     status_value = data.get('status')
@@ -1761,27 +1582,20 @@ def admin_update_user_permissions(request, user_id):
         if user_row[1] == ADMIN_ROLE:
             return Response({'success': False, 'error': '无法直接修改管理员账号'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # 管理端以数据库为准，不读缓存；记录不存在时按默认权限比较并在保存时创建
+        target_permissions = policy.load_user_permissions(cursor, user_id)
+        new_permissions = dict(target_permissions)
         messages = []
-        permission_sql_parts = []
-        permission_params = []
 
         for key, enabled in permission_updates.items():
-            column = USER_PERMISSION_FIELDS[key]
-            new_value = 1 if enabled else 0
             if target_permissions.get(key) == enabled:
                 continue
-            permission_sql_parts.append(f"{column} = %s")
-            permission_params.append(new_value)
+            new_permissions[key] = enabled
             action_text = '已恢复' if enabled else '已暂停'
             messages.append(f"{USER_PERMISSION_LABELS[key]}权限{action_text}")
 
-        if permission_sql_parts:
-            permission_sql_parts.append("update_time = NOW()")
-            update_sql = ", ".join(permission_sql_parts)
-            cursor.execute(
-                f"UPDATE user_permissions SET {update_sql} WHERE user_id = %s",
-                permission_params + [user_id]
-            )
+        if new_permissions != target_permissions:
+            policy.save_user_permissions(cursor, user_id, new_permissions)
 
         status_changed = False
         if status_value is not None and status_value != user_row[2]:
@@ -1793,6 +1607,7 @@ def admin_update_user_permissions(request, user_id):
                 messages.append('账号状态已被禁用')
 
     if messages:
+        invalidate_cached_principal(user_id)
         message_lines = ['管理员已调整您的账号权限：']
         for msg in messages:
             message_lines.append(f"- {msg}")
@@ -1950,54 +1765,25 @@ def admin_update_work_moderation(request, work_id):
 
         work_title, author_id, current_status, author_name = work_row
 
-        _ensure_work_moderation_record(cursor, work_id)
-        cursor.execute(
-            """
-            SELECT is_hidden, chapters_blocked, updates_blocked,
-                   subscriptions_blocked, votes_blocked, note
-            FROM work_moderations WHERE work_id = %s
-            """,
-            [work_id]
-        )
-        moderation_row = cursor.fetchone()
-        current_moderation = {
-            'is_hidden': bool(moderation_row[0]),
-            'chapters_blocked': bool(moderation_row[1]),
-            'updates_blocked': bool(moderation_row[2]),
-            'subscriptions_blocked': bool(moderation_row[3]),
-            'votes_blocked': bool(moderation_row[4]),
-            'note': moderation_row[5] or ''
-        }
-
-        set_parts = []
-        params = []
+        # 记录不存在时按默认管控状态比较，只有实际变更时才写入
+        current_moderation = policy.load_work_moderation(cursor, work_id)
+        new_moderation = dict(current_moderation)
 
         for key, value in moderation_updates.items():
-            column = WORK_MODERATION_FIELDS[key]
             if key == 'note':
                 if value == current_moderation.get(key, ''):
                     continue
-                set_parts.append("note = %s")
-                params.append(value)
+                new_moderation[key] = value
                 messages.append('备注信息已更新')
             else:
-                bool_value = 1 if value else 0
                 if current_moderation.get(key) == value:
                     continue
-                set_parts.append(f"{column} = %s")
-                params.append(bool_value)
+                new_moderation[key] = value
                 action_text = '已开放' if value is False else '已限制'
                 messages.append(f"{WORK_MODERATION_LABELS[key]} {action_text}")
 
-        if set_parts:
-            set_parts.append("updated_by = %s")
-            params.append(request.user.user_id)
-            set_parts.append("update_time = NOW()")
-            update_sql = ", ".join(set_parts)
-            cursor.execute(
-                f"UPDATE work_moderations SET {update_sql} WHERE work_id = %s",
-                params + [work_id]
-            )
+        if new_moderation != current_moderation:
+            policy.save_work_moderation(cursor, work_id, new_moderation, updated_by=request.user.user_id)
 
         status_changed = False
         if status_value is not None and status_value != current_status:
@@ -2050,7 +1836,7 @@ def admin_update_chapter_status(request, chapter_id):
         cursor.execute(
             """
             SELECT ch.chapter_id, ch.work_id, ch.title, ch.status,
-                   w.author_id, w.title AS work_title
+                   w.author_id, w.title AS work_title, ch.word_count
             FROM chapters ch
             JOIN works w ON ch.work_id = w.work_id
             WHERE ch.chapter_id = %s
@@ -2061,15 +1847,30 @@ def admin_update_chapter_status(request, chapter_id):
         if not chapter_row:
             return Response({'success': False, 'error': '章节不存在'}, status=status.HTTP_404_NOT_FOUND)
 
-        _, work_id, chapter_title, current_status, author_id, work_title = chapter_row
+        _, work_id, chapter_title, current_status, author_id, work_title, chapter_words = chapter_row
+        chapter_words = chapter_words or 0
 
         if status_value == current_status:
             return Response({'success': True, 'message': '章节状态未发生变化'})
 
-        cursor.execute(
-            "UPDATE chapters SET status = %s, update_time = NOW() WHERE chapter_id = %s",
-            [status_value, chapter_id]
-        )
+        cursor.execute("START TRANSACTION")
+        try:
+            cursor.execute(
+                "UPDATE chapters SET status = %s, update_time = NOW() WHERE chapter_id = %s",
+                [status_value, chapter_id]
+            )
+            published_delta = int(status_value == 1) - int(current_status == 1)
+            work_stats.apply_delta(
+                cursor,
+                work_id,
+                published_chapter_count=published_delta,
+                total_words=published_delta * chapter_words
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        chapter_toc.invalidate(work_id)
 
     status_text_map = {0: '草稿', 1: '已发布', 2: '已下架'}
     message_lines = [f"章节《{chapter_title}》的状态已调整为 {status_text_map.get(status_value, status_value)}。"]
@@ -2216,6 +2017,13 @@ def admin_list_action_logs(request):
     page_size = max(1, min(int(request.GET.get('page_size', 20) or 20), 100))
     offset = (page - 1) * page_size
 
+    try:
+        paginator = KeysetPaginator.from_request(
+            request, 'admin_action_logs', [('create_time', 'DESC'), ('log_id', 'DESC')], page_size
+        )
+    except CursorError as exc:
+        return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
     admin_id = request.GET.get('admin_id')
     target_type = request.GET.get('target_type')
     action = request.GET.get('action')
@@ -2260,29 +2068,41 @@ def admin_list_action_logs(request):
         params.append(end_time)
 
     where_clause = ' AND '.join(conditions) if conditions else '1=1'
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if paginator:
+        paginator.apply(page_conditions, page_params)
+    page_where = ' AND '.join(page_conditions) if page_conditions else '1=1'
+    order_clause, limit_clause, limit_params = page_window(paginator, 'create_time DESC', page_size, offset)
 
     with connection.cursor() as cursor:
-        cursor.execute(f"SELECT COUNT(*) FROM admin_action_logs WHERE {where_clause}", params)
-        total_row = cursor.fetchone()
-        total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+        total = None
+        if paginator is None or paginator.include_total:
+            cursor.execute(f"SELECT COUNT(*) FROM admin_action_logs WHERE {where_clause}", params)
+            total_row = cursor.fetchone()
+            total = int(total_row[0]) if total_row and total_row[0] is not None else 0
 
-        query_params = list(params)
-        query_params.extend([page_size, offset])
+        query_params = page_params + limit_params
 
         cursor.execute(
             f"""
             SELECT log_id, admin_id, target_type, target_id, action, detail,
                    extra_data, ip_address, user_agent, create_time
             FROM admin_action_logs
-            WHERE {where_clause}
-            ORDER BY create_time DESC
-            LIMIT %s OFFSET %s
+            WHERE {page_where}
+            ORDER BY {order_clause}
+            {limit_clause}
             """,
             query_params
         )
 
+        rows = cursor.fetchall()
+        page_info = {}
+        if paginator:
+            rows, page_info = paginator.paginate(rows, lambda row: (row[9], row[0]))
+
         logs = []
-        for row in cursor.fetchall():
+        for row in rows:
             logs.append({
                 'log_id': row[0],
                 'admin_id': row[1],
@@ -2296,7 +2116,11 @@ def admin_list_action_logs(request):
                 'create_time': row[9].isoformat() if row[9] else None
             })
 
-    return Response({'success': True, 'logs': logs, 'total': total})
+    response_data = {'success': True, 'logs': logs}
+    if total is not None:
+        response_data['total'] = total
+    response_data.update(page_info)
+    return Response(response_data)
 
 
 @api_view(['GET'])
@@ -2309,6 +2133,13 @@ def admin_list_user_action_logs(request):
     page_size = max(1, min(int(request.GET.get('page_size', 20) or 20), 100))
     offset = (page - 1) * page_size
 
+    try:
+        paginator = KeysetPaginator.from_request(
+            request, 'user_action_logs', [('create_time', 'DESC'), ('log_id', 'DESC')], page_size
+        )
+    except CursorError as exc:
+        return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
     user_id = request.GET.get('user_id')
     target_type = request.GET.get('target_type')
     action = request.GET.get('action')
@@ -2353,29 +2184,41 @@ def admin_list_user_action_logs(request):
         params.append(end_time)
 
     where_clause = ' AND '.join(conditions) if conditions else '1=1'
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if paginator:
+        paginator.apply(page_conditions, page_params)
+    page_where = ' AND '.join(page_conditions) if page_conditions else '1=1'
+    order_clause, limit_clause, limit_params = page_window(paginator, 'create_time DESC', page_size, offset)
 
     with connection.cursor() as cursor:
-        cursor.execute(f"SELECT COUNT(*) FROM user_action_logs WHERE {where_clause}", params)
-        total_row = cursor.fetchone()
-        total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+        total = None
+        if paginator is None or paginator.include_total:
+            cursor.execute(f"SELECT COUNT(*) FROM user_action_logs WHERE {where_clause}", params)
+            total_row = cursor.fetchone()
+            total = int(total_row[0]) if total_row and total_row[0] is not None else 0
 
-        query_params = list(params)
-        query_params.extend([page_size, offset])
+        query_params = page_params + limit_params
 
         cursor.execute(
             f"""
             SELECT log_id, user_id, action, target_type, target_id, detail,
                    extra_data, ip_address, user_agent, create_time
             FROM user_action_logs
-            WHERE {where_clause}
-            ORDER BY create_time DESC
-            LIMIT %s OFFSET %s
+            WHERE {page_where}
+            ORDER BY {order_clause}
+            {limit_clause}
             """,
             query_params
         )
 
+        rows = cursor.fetchall()
+        page_info = {}
+        if paginator:
+            rows, page_info = paginator.paginate(rows, lambda row: (row[9], row[0]))
+
         logs = []
-        for row in cursor.fetchall():
+        for row in rows:
             logs.append({
                 'log_id': row[0],
                 'user_id': row[1],
@@ -2389,7 +2232,11 @@ def admin_list_user_action_logs(request):
                 'create_time': row[9].isoformat() if row[9] else None
             })
 
-    return Response({'success': True, 'logs': logs, 'total': total})
+    response_data = {'success': True, 'logs': logs}
+    if total is not None:
+        response_data['total'] = total
+    response_data.update(page_info)
+    return Response(response_data)
 
 
 @api_view(['GET', 'PUT'])
@@ -2452,6 +2299,10 @@ def user_profile(request):
                     params
                 )
 
+            if nickname is not None:
+                # 作者名参与作品检索，昵称变化后需要重新索引其作品
+                index_author_works(cursor, user_id)
+
         profile = _fetch_user_profile(user_id)
         return Response({'success': True, 'profile': profile})
 
@@ -2515,139 +2366,162 @@ def get_search_history(request):
 def get_recommendations(request):
     try:
         user_id = request.user.user_id
+        return Response(recommendation_cache.get_or_compute(user_id, _build_recommendations))
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        category_scores, tag_scores, tag_display_map, has_personal_signal = _get_user_preference_scores(user_id)
-        popular_categories = _get_top_categories_by_popularity(limit=3)
 
-        top_categories = _get_top_keys(category_scores, limit=3) if has_personal_signal else []
-        top_tag_keys = _get_top_keys(tag_scores, limit=5) if has_personal_signal else []
+def _build_recommendations(user_id):
+    """组装首页各推荐栏目，结果由 recommendation_cache 按用户缓存"""
+    category_scores, tag_scores, tag_display_map, has_personal_signal = _get_user_preference_scores(user_id)
+    popular_categories = _get_top_categories_by_popularity(limit=3)
 
-        favorite_type_works = []
-        used_ids = set()
+    top_categories = _get_top_keys(category_scores, limit=3) if has_personal_signal else []
+    top_tag_keys = _get_top_keys(tag_scores, limit=5) if has_personal_signal else []
 
-        if has_personal_signal:
-            favorite_type_works = _build_favorite_type_recommendations(
-                category_scores,
-                tag_scores,
-                top_categories,
-                top_tag_keys,
-                limit=9
-            )
-            if not favorite_type_works:
-                fallback_categories = top_categories or popular_categories or None
-                favorite_type_works = _fetch_candidate_works(fallback_categories, limit=9)
-            if not favorite_type_works:
-                favorite_type_works = _fetch_candidate_works(None, limit=9)
-            used_ids.update({work['work_id'] for work in favorite_type_works})
-
-        search_fallback_categories = top_categories or popular_categories or None
-        search_similar_works, has_search_history = _fetch_search_based_recommendations(
-            user_id,
-            search_fallback_categories,
-            limit=8,
-            exclude_ids=used_ids
+    favorite_type_works = []
+    used_ids = set()
+
+    if has_personal_signal:
+        favorite_type_works = _build_favorite_type_recommendations(
+            category_scores,
+            tag_scores,
+            top_categories,
+            top_tag_keys,
+            limit=9
         )
-        if has_search_history:
-            used_ids.update({work['work_id'] for work in search_similar_works})
-        else:
-            search_similar_works = []
+        if not favorite_type_works:
+            fallback_categories = top_categories or popular_categories or None
+            favorite_type_works = _fetch_candidate_works(fallback_categories, limit=9)
+        if not favorite_type_works:
+            favorite_type_works = _fetch_candidate_works(None, limit=9)
+        used_ids.update({work['work_id'] for work in favorite_type_works})
+
+    also_read_works = _build_also_read_recommendations(user_id, limit=8, exclude_ids=used_ids)
+    used_ids.update({work['work_id'] for work in also_read_works})
+
+    search_fallback_categories = top_categories or popular_categories or None
+    search_similar_works, has_search_history = _fetch_search_based_recommendations(
+        user_id,
+        search_fallback_categories,
+        limit=8,
+        exclude_ids=used_ids
+    )
+    if has_search_history:
+        used_ids.update({work['work_id'] for work in search_similar_works})
+    else:
+        search_similar_works = []
 
-        rank_categories = top_categories if top_categories else (popular_categories or [])
-        favorite_rank_works = _build_favorite_rank_recommendations(rank_categories, limit_per_category=3, exclude_ids=used_ids)
-        if not favorite_rank_works:
-            fallback_categories = rank_categories or popular_categories or None
-            favorite_rank_works = _fetch_candidate_works(fallback_categories, limit=9, exclude_ids=used_ids)
-        if not favorite_rank_works:
-            favorite_rank_works = _fetch_candidate_works(None, limit=9, exclude_ids=used_ids)
+    rank_categories = top_categories if top_categories else (popular_categories or [])
+    favorite_rank_works = _build_favorite_rank_recommendations(rank_categories, limit_per_category=3, exclude_ids=used_ids)
+    if not favorite_rank_works:
+        fallback_categories = rank_categories or popular_categories or None
+        favorite_rank_works = _fetch_candidate_works(fallback_categories, limit=9, exclude_ids=used_ids)
+    if not favorite_rank_works:
+        favorite_rank_works = _fetch_candidate_works(None, limit=9, exclude_ids=used_ids)
 
-        category_name_map = _get_category_names(top_categories)
-        rank_category_name_map = _get_category_names(rank_categories)
-        top_tags = [tag_display_map.get(tag, tag) for tag in top_tag_keys] if has_personal_signal else []
+    category_name_map = _get_category_names(top_categories)
+    rank_category_name_map = _get_category_names(rank_categories)
+    top_tags = [tag_display_map.get(tag, tag) for tag in top_tag_keys] if has_personal_signal else []
 
-        return Response({
-            'success': True,
-            'favorite_type_works': favorite_type_works,
-            'search_similar_works': search_similar_works,
-            'favorite_rank_works': favorite_rank_works,
-            'meta': {
-                'is_personalized': has_personal_signal,
-                'has_search_history': has_search_history,
-                'top_categories': [
-                    {'category_id': cid, 'name': category_name_map.get(cid, '') or '未分类'}
-                    for cid in top_categories
-                ],
-                'popular_categories': [
-                    {'category_id': cid, 'name': rank_category_name_map.get(cid, '') or '未分类'}
-                    for cid in rank_categories
-                ],
-                'top_tags': top_tags,
-            }
-        })
+    return {
+        'success': True,
+        'favorite_type_works': favorite_type_works,
+        'also_read_works': also_read_works,
+        'search_similar_works': search_similar_works,
+        'favorite_rank_works': favorite_rank_works,
+        'meta': {
+            'is_personalized': has_personal_signal,
+            'has_search_history': has_search_history,
+            'top_categories': [
+                {'category_id': cid, 'name': category_name_map.get(cid, '') or '未分类'}
+                for cid in top_categories
+            ],
+            'popular_categories': [
+                {'category_id': cid, 'name': rank_category_name_map.get(cid, '') or '未分类'}
+                for cid in rank_categories
+            ],
+            'top_tags': top_tags,
+        }
+    }
 
-    except Exception as e:
-        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _parse_feedback_event(data):
+    """解析一条反馈事件，返回 (事件, 错误信息)"""
+    if not isinstance(data, dict):
+        return None, '反馈格式无效'
+
+    work_id = data.get('work_id')
+    if work_id in (None, ''):
+        return None, '缺少作品ID'
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def record_recommendation_feedback(request):
     try:
-        user_id = request.user.user_id
-        data = request.data or {}
+        work_id = int(work_id)
+    except (TypeError, ValueError):
+        return None, '作品ID无效'
 
-        work_id = data.get('work_id')
-        if work_id in (None, ''):
-            return Response({'success': False, 'error': '缺少作品ID'}, status=status.HTTP_400_BAD_REQUEST)
+    raw_event = data.get('event') or data.get('event_type') or ''
+    event_key = str(raw_event).strip().lower()
 
+    event_type = FEEDBACK_EVENT_ALIASES.get(event_key)
+    if event_type is None:
         try:
-            work_id = int(work_id)
+            event_type = int(raw_event)
         except (TypeError, ValueError):
-            return Response({'success': False, 'error': '作品ID无效'}, status=status.HTTP_400_BAD_REQUEST)
+            event_type = None
 
-        raw_event = data.get('event') or data.get('event_type') or ''
-        event_key = str(raw_event).strip().lower()
+    if event_type not in FEEDBACK_EVENT_WEIGHTS:
+        return None, '未知的反馈类型'
 
-        event_type = FEEDBACK_EVENT_ALIASES.get(event_key)
-        if event_type is None:
-            try:
-                event_type = int(raw_event)
-            except (TypeError, ValueError):
-                event_type = None
+    weight_value = data.get('weight', FEEDBACK_DEFAULT_WEIGHT)
+    normalized_weight = _normalize_feedback_weight(weight_value)
+    if normalized_weight <= 0:
+        normalized_weight = FEEDBACK_DEFAULT_WEIGHT
 
-        if event_type not in FEEDBACK_EVENT_WEIGHTS:
-            return Response({'success': False, 'error': '未知的反馈类型'}, status=status.HTTP_400_BAD_REQUEST)
+    metadata = data.get('metadata')
+    if isinstance(metadata, str):
+        try:
+            metadata_candidate = json.loads(metadata)
+            if isinstance(metadata_candidate, dict):
+                metadata = metadata_candidate
+        except (json.JSONDecodeError, TypeError, ValueError):
+            metadata = {'raw': metadata}
+
+    extra_fields = {}
+    for candidate_key in ('source', 'slot', 'section', 'position', 'query'):
+        if candidate_key in data and data[candidate_key] not in (None, ''):
+            extra_fields[candidate_key] = data[candidate_key]
+
+    if isinstance(metadata, dict):
+        extra_fields.update(metadata)
+        metadata_payload = extra_fields
+    else:
+        metadata_payload = extra_fields or None
 
-        weight_value = data.get('weight', FEEDBACK_DEFAULT_WEIGHT)
-        normalized_weight = _normalize_feedback_weight(weight_value)
-        if normalized_weight <= 0:
-            normalized_weight = FEEDBACK_DEFAULT_WEIGHT
+    return {
+        'work_id': work_id,
+        'event_type': event_type,
+        'weight': normalized_weight,
+        'metadata': metadata_payload,
+    }, None
 
-        metadata = data.get('metadata')
-        if isinstance(metadata, str):
-            try:
-                metadata_candidate = json.loads(metadata)
-                if isinstance(metadata_candidate, dict):
-                    metadata = metadata_candidate
-            except (json.JSONDecodeError, TypeError, ValueError):
-                metadata = {'raw': metadata}
-
-        extra_fields = {}
-        for candidate_key in ('source', 'slot', 'section', 'position', 'query'):
-            if candidate_key in data and data[candidate_key] not in (None, ''):
-                extra_fields[candidate_key] = data[candidate_key]
-
-        if isinstance(metadata, dict):
-            extra_fields.update(metadata)
-            metadata_payload = extra_fields
-        else:
-            metadata_payload = extra_fields or None
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def record_recommendation_feedback(request):
+    try:
+        user_id = request.user.user_id
+        event, error = _parse_feedback_event(request.data or {})
+        if error:
+            return Response({'success': False, 'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
         _record_recommendation_feedback(
             user_id,
-            work_id,
-            event_type,
-            weight_delta=normalized_weight,
-            metadata=metadata_payload
+            event['work_id'],
+            event['event_type'],
+            weight_delta=event['weight'],
+            metadata=event['metadata']
         )
 
         return Response({'success': True})
@@ -2656,6 +2530,62 @@ def record_recommendation_feedback(request):
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def record_recommendation_feedback_batch(request):
+    """批量上报推荐反馈：逐条校验后合并写入，按提交顺序返回每条事件是否被接受"""
+    try:
+        user_id = request.user.user_id
+        data = request.data
+        raw_events = data.get('events') if isinstance(data, dict) else data
+        if not isinstance(raw_events, list) or not raw_events:
+            return Response({'success': False, 'error': '缺少反馈事件列表'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_events) > FEEDBACK_BATCH_MAX_EVENTS:
+            return Response(
+                {'success': False, 'error': f'单次最多提交{FEEDBACK_BATCH_MAX_EVENTS}条反馈'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = []
+        parsed_events = []
+        for index, raw_event in enumerate(raw_events):
+            event, error = _parse_feedback_event(raw_event)
+            if error:
+                results.append({'index': index, 'accepted': False, 'error': error})
+                continue
+            results.append({'index': index, 'accepted': True})
+            parsed_events.append((index, event))
+
+        # 不存在的作品单独拒绝，避免外键错误导致整批写入失败
+        if parsed_events:
+            work_ids = sorted({event['work_id'] for _, event in parsed_events})
+            placeholders = ','.join(['%s'] * len(work_ids))
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT work_id FROM works WHERE work_id IN ({placeholders})", work_ids)
+                existing_work_ids = {row[0] for row in cursor.fetchall()}
+            valid_events = []
+            for index, event in parsed_events:
+                if event['work_id'] in existing_work_ids:
+                    valid_events.append(event)
+                else:
+                    results[index] = {'index': index, 'accepted': False, 'error': '作品不存在'}
+            written = _record_recommendation_feedback_batch(user_id, valid_events)
+        else:
+            written = 0
+
+        accepted = sum(1 for item in results if item['accepted'])
+        return Response({
+            'success': True,
+            'accepted': accepted,
+            'rejected': len(results) - accepted,
+            'written': written,
+            'results': results,
+        })
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_profile_stats(request):
@@ -2795,8 +2725,6 @@ def recharge_user_balance(request):
         if amount_value <= 0:
             return Response({'success': False, 'error': '充值金额必须大于0'}, status=status.HTTP_400_BAD_REQUEST)
 
-        _ensure_point_transactions_table()
-
         with connection.cursor() as cursor:
             cursor.execute("START TRANSACTION")
             try:
@@ -2872,20 +2800,46 @@ def get_works(request):
                 'read_count': 'w.read_count DESC',
                 'collect_count': 'w.collect_count DESC'
             }
-            order_clause = order_mapping.get(sort_by, 'w.create_time DESC')
+            if sort_by not in order_mapping:
+                sort_by = 'create_time'
+            order_clause = order_mapping[sort_by]
+
+            # 游标模式下的排序键及其在结果行中的位置；阅读量、收藏量随阅读和收藏实时变化且没有 (计数, work_id) 索引，
+            # 按它们翻页会跳过或重复作品，也无法走索引，只支持页码分页
+            keyset_columns = {
+                'create_time': 5,
+                'update_time': 11
+            }
+            if 'cursor' in request.GET and sort_by not in keyset_columns:
+                return Response({'success': False, 'error': '按阅读量或收藏量排序时不支持游标分页，请使用页码分页'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            try:
+                paginator = KeysetPaginator.from_request(
+                    request, 'works', [(f'w.{sort_by}', 'DESC'), ('w.work_id', 'DESC')], page_size
+                )
+            except CursorError as exc:
+                return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
             filter_params = params.copy()
 
-            cursor.execute(
-                f"""
-                SELECT COUNT(*)
-                FROM works w
-                WHERE {where_clause}
-                """,
-                filter_params
-            )
-            total_count_row = cursor.fetchone()
-            total_count = int(total_count_row[0]) if total_count_row else 0
+            total_count = None
+            if paginator is None or paginator.include_total:
+                cursor.execute(
+                    f"""
+                    SELECT COUNT(*)
+                    FROM works w
+                    WHERE {where_clause}
+                    """,
+                    filter_params
+                )
+                total_count_row = cursor.fetchone()
+                total_count = int(total_count_row[0]) if total_count_row else 0
+
+            page_conditions = list(where_conditions)
+            page_params = list(params)
+            if paginator:
+                paginator.apply(page_conditions, page_params)
+            order_clause, limit_clause, limit_params = page_window(paginator, order_clause, page_size, offset)
 
             cursor.execute(
                 f"""
@@ -2893,19 +2847,26 @@ def get_works(request):
                        a.pen_name, c.name as category_name,
                        COALESCE(w.read_count, 0) AS read_count,
                        COALESCE(w.collect_count, 0) AS collect_count,
-                       COALESCE(w.vote_count, 0) AS vote_count
+                       COALESCE(w.vote_count, 0) AS vote_count,
+                       w.update_time
                 FROM works w
                 LEFT JOIN authors a ON w.author_id = a.author_id
                 LEFT JOIN categories c ON w.category_id = c.category_id
-                WHERE {where_clause}
+                WHERE {' AND '.join(page_conditions)}
                 ORDER BY {order_clause}
-                LIMIT %s OFFSET %s
+                {limit_clause}
                 """,
-                params + [page_size, offset]
+                page_params + limit_params
             )
-            
+
+            rows = cursor.fetchall()
+            page_info = {}
+            if paginator:
+                key_index = keyset_columns[sort_by]
+                rows, page_info = paginator.paginate(rows, lambda row: (row[key_index], row[0]))
+
             works = []
-            for row in cursor.fetchall():
+            for row in rows:
                 works.append({
                     'work_id': row[0],
                     'title': row[1],
@@ -2920,7 +2881,11 @@ def get_works(request):
                     'vote_count': int(row[10] or 0)
                 })
             
-            return Response({'success': True, 'works': works, 'total': total_count})
+            response_data = {'success': True, 'works': works}
+            if total_count is not None:
+                response_data['total'] = total_count
+            response_data.update(page_info)
+            return Response(response_data)
             
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -2936,19 +2901,29 @@ def create_work(request):
             return Response({'success': False, 'error': '您的账号已被限制发表作品，请联系管理员'}, status=status.HTTP_403_FORBIDDEN)
 
         with connection.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO works (author_id, category_id, title, cover_url, intro, tags, status, is_signed, create_time, update_time)
-                VALUES (%s, %s, %s, %s, %s, %s, 0, 0, NOW(), NOW())
-            """, [
-                user_id,
-                data.get('category_id'),
-                data.get('title'),
-                data.get('cover_url', ''),
-                data.get('intro', ''),
-                json.dumps(data.get('tags', [])),
-            ])
-            
-            work_id = cursor.lastrowid
+            # 作品、统计行与标签行一并提交，标签行不会与 works.tags 不一致
+            cursor.execute("START TRANSACTION")
+            try:
+                cursor.execute("""
+                    INSERT INTO works (author_id, category_id, title, cover_url, intro, tags, status, is_signed, create_time, update_time)
+                    VALUES (%s, %s, %s, %s, %s, %s, 0, 0, NOW(), NOW())
+                """, [
+                    user_id,
+                    data.get('category_id'),
+                    data.get('title'),
+                    data.get('cover_url', ''),
+                    data.get('intro', ''),
+                    json.dumps(data.get('tags', [])),
+                ])
+
+                work_id = cursor.lastrowid
+                work_stats.ensure_work_stats_row(cursor, work_id)
+                work_tags.sync_work_tags(cursor, work_id, data.get('tags', []))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            index_works(cursor, [work_id])
             detail = f"创建作品《{data.get('title') or ''}》"
             _record_user_action(
                 user_id,
@@ -2981,16 +2956,12 @@ def get_my_works(request):
                 SELECT w.work_id, w.title, w.cover_url, w.intro, w.status,
                        w.read_count, w.collect_count, w.vote_count,
                        c.name as category_name, w.create_time, w.update_time,
-                       COALESCE((SELECT SUM(amount) FROM subscriptions s WHERE s.work_id = w.work_id), 0) AS subscription_income,
-                       COALESCE((SELECT COUNT(DISTINCT reader_id) FROM subscriptions s WHERE s.work_id = w.work_id), 0) AS subscription_count,
-                       COALESCE((
-                           SELECT COUNT(DISTINCT rr.reader_id)
-                           FROM reading_records rr
-                           JOIN chapters ch ON rr.chapter_id = ch.chapter_id
-                           WHERE ch.work_id = w.work_id
-                       ), 0) AS unique_readers
+                       COALESCE(ws.subscription_income, 0) AS subscription_income,
+                       COALESCE(ws.subscription_count, 0) AS subscription_count,
+                       COALESCE(ws.unique_readers, 0) AS unique_readers
                 FROM works w
                 LEFT JOIN categories c ON w.category_id = c.category_id
+                LEFT JOIN work_stats ws ON w.work_id = ws.work_id
                 WHERE w.author_id = %s
                 ORDER BY w.update_time DESC
             """, [user_id])
@@ -3056,12 +3027,17 @@ def get_work_detail(request, work_id):
                        w.create_time, w.update_time, c.name AS category_name,
                        w.author_id, a.pen_name, a.intro AS author_intro,
                        r.nickname AS reader_nickname, r.avatar_url AS reader_avatar,
-                       u.username AS author_username
+                       u.username AS author_username,
+                       ws.total_reads, ws.unique_readers, ws.collect_count,
+                       ws.subscription_count, ws.subscription_income, ws.vote_count,
+                       ws.chapter_count, ws.published_chapter_count, ws.total_words,
+                       ws.work_id AS stats_work_id, a.total_income, ws.update_time AS stats_update_time
                 FROM works w
                 LEFT JOIN categories c ON w.category_id = c.category_id
                 LEFT JOIN authors a ON w.author_id = a.author_id
                 LEFT JOIN readers r ON w.author_id = r.reader_id
                 LEFT JOIN users u ON w.author_id = u.user_id
+                LEFT JOIN work_stats ws ON w.work_id = ws.work_id
                 WHERE w.work_id = %s
             """, [work_id])
 
@@ -3133,57 +3109,20 @@ def get_work_detail(request, work_id):
                 'author_avatar_url': reader_avatar_url
             }
 
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM reading_records rr
-                JOIN chapters ch ON rr.chapter_id = ch.chapter_id
-                WHERE ch.work_id = %s
-            """, [work_id])
-            read_count_row = cursor.fetchone()
-            aggregated_read_count = int(read_count_row[0]) if read_count_row and read_count_row[0] is not None else 0
-            work['read_count'] = max(work['read_count'], aggregated_read_count)
-
-            cursor.execute("SELECT COUNT(*) FROM collections WHERE work_id = %s", [work_id])
-            collect_row = cursor.fetchone()
-            aggregated_collect_count = int(collect_row[0]) if collect_row and collect_row[0] is not None else 0
-            work['collect_count'] = max(work['collect_count'], aggregated_collect_count)
-
-            cursor.execute("""
-                SELECT COUNT(DISTINCT reader_id), COALESCE(SUM(amount), 0)
-                FROM subscriptions
-                WHERE work_id = %s
-            """, [work_id])
-            subscription_row = cursor.fetchone()
-            work['subscription_count'] = int(subscription_row[0]) if subscription_row and subscription_row[0] is not None else 0
-            work['subscription_income'] = float(subscription_row[1]) if subscription_row and subscription_row[1] is not None else 0.0
-
-            cursor.execute("SELECT COALESCE(SUM(count), 0) FROM votes WHERE work_id = %s", [work_id])
-            vote_row = cursor.fetchone()
-            aggregated_vote_count = int(vote_row[0]) if vote_row and vote_row[0] is not None else 0
-            work['vote_count'] = max(work['vote_count'], aggregated_vote_count)
-
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) AS total_count,
-                    SUM(CASE WHEN status = 1 THEN 1 ELSE 0 END) AS published_count
-                FROM chapters
-                WHERE work_id = %s
-            """, [work_id])
-            chapter_counts = cursor.fetchone()
-            total_count = chapter_counts[0] if chapter_counts and chapter_counts[0] else 0
-            published_count = chapter_counts[1] if chapter_counts and chapter_counts[1] else 0
-
-            work['chapter_count'] = total_count
-            work['published_chapter_count'] = published_count
-
-            cursor.execute("""
-                SELECT COUNT(DISTINCT rr.reader_id)
-                FROM reading_records rr
-                JOIN chapters ch ON rr.chapter_id = ch.chapter_id
-                WHERE ch.work_id = %s
-            """, [work_id])
-            unique_reader_row = cursor.fetchone()
-            work['unique_readers'] = int(unique_reader_row[0]) if unique_reader_row and unique_reader_row[0] is not None else 0
+            if work_data[28] is not None:
+                stats = work_stats.serialize_work_stats(work_data[19:28])
+            else:
+                stats = work_stats.fetch_work_stats(cursor, work_id)
+
+            work['read_count'] = max(work['read_count'], stats['total_reads'])
+            work['collect_count'] = max(work['collect_count'], stats['collect_count'])
+            work['vote_count'] = max(work['vote_count'], stats['vote_count'])
+            work['subscription_count'] = stats['subscription_count']
+            work['subscription_income'] = stats['subscription_income']
+            work['chapter_count'] = stats['chapter_count']
+            work['published_chapter_count'] = stats['published_chapter_count']
+            work['total_words'] = stats['total_words']
+            work['unique_readers'] = stats['unique_readers']
 
             is_collected = False
             if user_id:
@@ -3193,26 +3132,64 @@ def get_work_detail(request, work_id):
                 """, [user_id, work_id])
                 is_collected = cursor.fetchone() is not None
 
+            # 校验值由本作品的行（含统计行的计数与更新时间）、当前用户的作者/收藏状态和相似作品的生成时间组成，
+            # 在作者汇总、投票记录、相似作品等聚合查询之前比较；作者其他作品的汇总数据随本作品的变化一起刷新
+            etag = conditional.make_etag(
+                *work_data,
+                *(stats[key] for key in sorted(stats)),
+                is_author,
+                is_collected,
+                work_neighbors.neighbors_build_time(cursor, work_id),
+            )
+
+            if user_id:
+                detail = f"查看作品《{work.get('title', '')}》详情"
+                _record_user_action(
+                    user_id,
+                    'view_work_detail',
+                    USER_ACTION_TARGET_WORK,
+                    work_id,
+                    detail=detail,
+                    request=request,
+                    extra={'is_author': is_author}
+                )
+
+                if not is_author:
+                    metadata_payload = {}
+                    source_param = request.GET.get('source') or request.GET.get('from')
+                    if source_param:
+                        metadata_payload['source'] = source_param
+                    slot_param = request.GET.get('slot') or request.GET.get('section')
+                    if slot_param:
+                        metadata_payload['slot'] = slot_param
+                    if is_collected:
+                        metadata_payload['is_collected'] = True
+
+                    _record_recommendation_feedback(
+                        user_id,
+                        work_id,
+                        FEEDBACK_EVENT_VIEW,
+                        weight_delta=1.0,
+                        metadata=metadata_payload or None
+                    )
+
+            cached = conditional.not_modified(request, etag)
+            if cached is not None:
+                return cached
+
             cursor.execute("""
                 SELECT COUNT(*), 
-                       COALESCE(SUM(read_count), 0),
-                       COALESCE(SUM(collect_count), 0),
-                       COALESCE(SUM(vote_count), 0)
-                FROM works
-                WHERE author_id = %s
+                       COALESCE(SUM(w.read_count), 0),
+                       COALESCE(SUM(w.collect_count), 0),
+                       COALESCE(SUM(w.vote_count), 0),
+                       COALESCE(SUM(ws.subscription_income), 0)
+                FROM works w
+                LEFT JOIN work_stats ws ON w.work_id = ws.work_id
+                WHERE w.author_id = %s
             """, [author_id])
             author_stats = cursor.fetchone()
-
-            cursor.execute(
-                "SELECT COALESCE(SUM(amount), 0) FROM subscriptions WHERE work_id IN (SELECT work_id FROM works WHERE author_id = %s)",
-                [author_id]
-            )
-            author_income_row = cursor.fetchone()
-            author_subscription_income = float(author_income_row[0]) if author_income_row and author_income_row[0] is not None else 0.0
-
-            cursor.execute("SELECT COALESCE(total_income, 0) FROM authors WHERE author_id = %s", [author_id])
-            author_total_income_row = cursor.fetchone()
-            author_total_income = float(author_total_income_row[0]) if author_total_income_row and author_total_income_row[0] is not None else 0.0
+            author_subscription_income = float(author_stats[4]) if author_stats and author_stats[4] is not None else 0.0
+            author_total_income = float(work_data[29]) if work_data[29] is not None else 0.0
 
             cursor.execute("""
                 SELECT COUNT(DISTINCT reader_id)
@@ -3276,46 +3253,19 @@ def get_work_detail(request, work_id):
                     'vote_time': row[4].isoformat() if row[4] else None
                 })
 
-            if user_id:
-                detail = f"查看作品《{work.get('title', '')}》详情"
-                _record_user_action(
-                    user_id,
-                    'view_work_detail',
-                    USER_ACTION_TARGET_WORK,
-                    work_id,
-                    detail=detail,
-                    request=request,
-                    extra={'is_author': is_author}
-                )
-
-                if not is_author:
-                    metadata_payload = {}
-                    source_param = request.GET.get('source') or request.GET.get('from')
-                    if source_param:
-                        metadata_payload['source'] = source_param
-                    slot_param = request.GET.get('slot') or request.GET.get('section')
-                    if slot_param:
-                        metadata_payload['slot'] = slot_param
-                    if is_collected:
-                        metadata_payload['is_collected'] = True
-
-                    _record_recommendation_feedback(
-                        user_id,
-                        work_id,
-                        FEEDBACK_EVENT_VIEW,
-                        weight_delta=1.0,
-                        metadata=metadata_payload or None
-                    )
+            similar_works = _fetch_works_by_ids(work_neighbors.similar_work_ids(cursor, work_id, limit=6))
 
-            return Response({
+            payload = {
                 'success': True,
                 'work': work,
                 'is_author': is_author,
                 'is_collected': is_collected,
                 'author_info': author_info,
                 'author_works': author_works,
+                'similar_works': similar_works,
                 'vote_records': vote_records
-            })
+            }
+            return conditional.apply_validators(Response(payload), etag)
 
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3343,52 +3293,17 @@ def get_work_metrics(request, work_id):
             if author_id != user_id:
                 return Response({'success': False, 'error': '无权查看该作品数据'}, status=status.HTTP_403_FORBIDDEN)
 
-            cursor.execute("""
-                SELECT COUNT(*) AS total_reads,
-                       COUNT(DISTINCT rr.reader_id) AS unique_readers
-                FROM reading_records rr
-                JOIN chapters ch ON rr.chapter_id = ch.chapter_id
-                WHERE ch.work_id = %s
-            """, [work_id])
-            reading_row = cursor.fetchone()
-            total_reads = int(reading_row[0]) if reading_row and reading_row[0] is not None else 0
-            unique_readers = int(reading_row[1]) if reading_row and reading_row[1] is not None else 0
-
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM collections
-                WHERE work_id = %s
-            """, [work_id])
-            collect_row = cursor.fetchone()
-            collect_count = int(collect_row[0]) if collect_row and collect_row[0] is not None else 0
-
-            cursor.execute("""
-                SELECT COALESCE(SUM(amount), 0),
-                       COUNT(DISTINCT reader_id)
-                FROM subscriptions
-                WHERE work_id = %s
-            """, [work_id])
-            subscription_row = cursor.fetchone()
-            subscription_income = float(subscription_row[0]) if subscription_row and subscription_row[0] is not None else 0.0
-            subscription_count = int(subscription_row[1]) if subscription_row and subscription_row[1] is not None else 0
-
-            cursor.execute("""
-                SELECT COALESCE(SUM(count), 0)
-                FROM votes
-                WHERE work_id = %s
-            """, [work_id])
-            vote_row = cursor.fetchone()
-            vote_count = int(vote_row[0]) if vote_row and vote_row[0] is not None else 0
+            stats = work_stats.fetch_work_stats(cursor, work_id)
 
             metrics = {
                 'work_id': work_id,
                 'title': work_title,
-                'total_reads': total_reads,
-                'unique_readers': unique_readers,
-                'collect_count': collect_count,
-                'subscription_count': subscription_count,
-                'subscription_income': subscription_income,
-                'vote_count': vote_count
+                'total_reads': stats['total_reads'],
+                'unique_readers': stats['unique_readers'],
+                'collect_count': stats['collect_count'],
+                'subscription_count': stats['subscription_count'],
+                'subscription_income': stats['subscription_income'],
+                'vote_count': stats['vote_count']
             }
 
             _record_user_action(
@@ -3441,21 +3356,29 @@ def update_work(request, work_id):
                 return Response({'success': False, 'error': '已发布作品无法恢复为草稿状态'},
                                 status=status.HTTP_400_BAD_REQUEST)
 
-            # 更新作品信息
-            cursor.execute("""
-                UPDATE works 
-                SET title = %s, category_id = %s, intro = %s, tags = %s, 
-                    cover_url = %s, status = %s, update_time = NOW()
-                WHERE work_id = %s
-            """, [
-                data.get('title'),
-                data.get('category_id'),
-                data.get('intro'),
-                json.dumps(data.get('tags', [])),
-                data.get('cover_url', ''),
-                new_status,
-                work_id
-            ])
+            # 更新作品信息，标签行在同一事务内重建
+            cursor.execute("START TRANSACTION")
+            try:
+                cursor.execute("""
+                    UPDATE works 
+                    SET title = %s, category_id = %s, intro = %s, tags = %s, 
+                        cover_url = %s, status = %s, update_time = NOW()
+                    WHERE work_id = %s
+                """, [
+                    data.get('title'),
+                    data.get('category_id'),
+                    data.get('intro'),
+                    json.dumps(data.get('tags', [])),
+                    data.get('cover_url', ''),
+                    new_status,
+                    work_id
+                ])
+                work_tags.sync_work_tags(cursor, work_id, data.get('tags', []))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            index_works(cursor, [work_id])
             
             detail = f"更新作品《{data.get('title') or ''}》"
             _record_user_action(
@@ -3502,6 +3425,15 @@ def get_categories(request):
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # 章节管理API
+def _chapter_toc_etag(toc_version, work_id, work_title, is_author, has_full_subscription, subscribed_chapters):
+    if toc_version is None:
+        return None
+    return conditional.make_etag(
+        'toc', work_id, toc_version, work_title, is_author, has_full_subscription,
+        ','.join(str(chapter_id) for chapter_id in sorted(subscribed_chapters))
+    )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_chapters(request, work_id):
@@ -3527,61 +3459,26 @@ def get_chapters(request, work_id):
             subscribed_chapters = set()
             if not is_author:
                 has_full_subscription, subscribed_chapters = _get_user_subscription_status(user_id, work_id)
- 
-            if is_author:
-                cursor.execute("""
-                    SELECT chapter_id, title, content, intro, word_count, is_free, status,
-                           chapter_order, create_time, publish_time
-                    FROM chapters 
-                    WHERE work_id = %s 
-                    ORDER BY chapter_order ASC, create_time ASC
-                """, [work_id])
-            else:
-                cursor.execute("""
-                    SELECT chapter_id, title, intro, word_count, is_free, status,
-                           chapter_order, publish_time
-                    FROM chapters 
-                    WHERE work_id = %s AND status = 1
-                    ORDER BY chapter_order ASC, publish_time ASC, chapter_id ASC
-                """, [work_id])
- 
+
+            # 目录版本号与当前用户的订阅状态共同决定响应内容，客户端缓存有效时不再组装目录
+            etag_state = (work_id, work_title, is_author, has_full_subscription, subscribed_chapters)
+            etag = _chapter_toc_etag(chapter_toc.current_version(work_id), *etag_state)
+            cached = conditional.not_modified(request, etag) if etag else None
+
             chapters = []
-            for row in cursor.fetchall():
-                if is_author:
-                    chapter_word_count = row[4] or 0
-                    cost = calculate_chapter_cost(chapter_word_count)
-                    chapters.append({
-                        'chapter_id': row[0],
-                        'title': row[1],
-                        'content': row[2],
-                        'intro': row[3],
-                        'word_count': chapter_word_count,
-                        'is_free': bool(row[5]),
-                        'status': row[6],
-                        'chapter_order': row[7],
-                        'create_time': row[8].isoformat() if row[8] else None,
-                        'publish_time': row[9].isoformat() if row[9] else None,
-                        'cost': cost,
-                        'is_subscribed': True
-                    })
-                else:
-                    chapter_word_count = row[3] or 0
-                    is_free = bool(row[4])
-                    is_subscribed = has_full_subscription or row[0] in subscribed_chapters
-                    cost = calculate_chapter_cost(chapter_word_count)
-                    chapters.append({
-                        'chapter_id': row[0],
-                        'title': row[1],
-                        'intro': row[2],
-                        'word_count': chapter_word_count,
-                        'is_free': is_free,
-                        'status': row[5],
-                        'chapter_order': row[6],
-                        'publish_time': row[7].isoformat() if row[7] else None,
-                        'cost': cost,
-                        'is_subscribed': is_subscribed
-                    })
- 
+            if cached is None:
+                # 目录只含章节元数据，正文通过章节详情接口按需获取
+                toc_version, toc = chapter_toc.get_toc(cursor, work_id, include_unpublished=is_author)
+                # 期间有章节写入时版本号已变化，校验值以实际返回的目录为准
+                etag = _chapter_toc_etag(toc_version, *etag_state)
+                for entry in toc:
+                    chapter = dict(entry)
+                    chapter['cost'] = calculate_chapter_cost(chapter['word_count'])
+                    chapter['is_subscribed'] = (
+                        is_author or has_full_subscription or chapter['chapter_id'] in subscribed_chapters
+                    )
+                    chapters.append(chapter)
+
             _record_user_action(
                 user_id,
                 'view_chapter_list',
@@ -3592,14 +3489,17 @@ def get_chapters(request, work_id):
                 extra={'is_author': is_author}
             )
 
-            return Response({
+            if cached is not None:
+                return cached
+            return conditional.apply_validators(Response({
                 'success': True,
                 'chapters': chapters,
                 'work_title': work_title,
                 'is_author': is_author,
                 'has_full_subscription': has_full_subscription,
-                'subscribed_chapter_ids': list(subscribed_chapters)
-            })
+                'subscribed_chapter_ids': list(subscribed_chapters),
+                'toc_version': toc_version
+            }), etag)
              
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3642,21 +3542,30 @@ def create_chapter(request, work_id):
             word_count = _calculate_word_count(content)
             is_free = 1 if _to_bool(data.get('is_free'), True) else 0
 
-            cursor.execute("""
-                INSERT INTO chapters (work_id, title, content, intro, word_count, is_free,
-                                    chapter_order, status, create_time)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, 0, NOW())
-            """, [
-                work_id,
-                data.get('title'),
-                content,
-                data.get('intro', ''),
-                word_count,
-                is_free,
-                next_order
-            ])
+            cursor.execute("START TRANSACTION")
+            try:
+                # 正文写入正文存储，chapters 行只保存元数据
+                cursor.execute("""
+                    INSERT INTO chapters (work_id, title, content, intro, word_count, is_free,
+                                        chapter_order, status, create_time)
+                    VALUES (%s, %s, '', %s, %s, %s, %s, 0, NOW())
+                """, [
+                    work_id,
+                    data.get('title'),
+                    data.get('intro', ''),
+                    word_count,
+                    is_free,
+                    next_order
+                ])
+                chapter_id = cursor.lastrowid
+                chapter_bodies.save_body(cursor, chapter_id, content)
+                work_stats.apply_delta(cursor, work_id, chapter_count=1)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            chapter_toc.invalidate(work_id)
  
-            chapter_id = cursor.lastrowid
             detail = f"创建章节《{data.get('title') or ''}》"
             _record_user_action(
                 user_id,
@@ -3681,7 +3590,6 @@ def create_chapter(request, work_id):
 def update_chapter(request, work_id, chapter_id):
     try:
         user_id = request.user.user_id
-        update_recipient_ids = set()
         chapter_title_new = None
         chapter_published_now = False
  
@@ -3700,11 +3608,13 @@ def update_chapter(request, work_id, chapter_id):
             work_title, author_id = work_row
             is_author = (author_id == user_id)
  
+            # 正文哈希只取自正文存储的元数据列，用于阅读端的条件请求校验，不读取正文
             cursor.execute("""
-                SELECT chapter_id, title, content, intro, word_count, is_free, status,
-                       chapter_order, create_time, publish_time
-                FROM chapters
-                WHERE chapter_id = %s AND work_id = %s
+                SELECT ch.chapter_id, ch.title, ch.intro, ch.word_count, ch.is_free, ch.status,
+                       ch.chapter_order, ch.create_time, ch.publish_time, ch.update_time, cb.content_hash
+                FROM chapters ch
+                LEFT JOIN chapter_bodies cb ON cb.chapter_id = ch.chapter_id
+                WHERE ch.chapter_id = %s AND ch.work_id = %s
             """, [chapter_id, work_id])
  
             chapter_row = cursor.fetchone()
@@ -3712,9 +3622,9 @@ def update_chapter(request, work_id, chapter_id):
                 return Response({'success': False, 'error': '章节不存在'},
                                 status=status.HTTP_404_NOT_FOUND)
  
-            chapter_status = chapter_row[6]
-            is_free = bool(chapter_row[5])
-            word_count = chapter_row[4] or 0
+            chapter_status = chapter_row[5]
+            is_free = bool(chapter_row[4])
+            word_count = chapter_row[3] or 0
             moderation = _get_work_moderation(work_id)
  
             if request.method == 'GET':
@@ -3728,31 +3638,46 @@ def update_chapter(request, work_id, chapter_id):
  
                 cost = calculate_chapter_cost(word_count)
                 can_read = is_author or is_free or is_subscribed
- 
-                chapter = {
-                    'chapter_id': chapter_row[0],
-                    'title': chapter_row[1],
-                    'content': chapter_row[2] if can_read else '',
-                    'intro': chapter_row[3],
-                    'word_count': word_count,
-                    'is_free': is_free,
-                    'status': chapter_status,
-                    'chapter_order': chapter_row[7],
-                    'create_time': chapter_row[8].isoformat() if chapter_row[8] else None,
-                    'publish_time': chapter_row[9].isoformat() if chapter_row[9] else None
-                }
- 
-                response_payload = {
-                    'success': True,
-                    'chapter': chapter,
-                    'is_author': is_author,
-                    'is_subscribed': is_author or is_subscribed,
-                    'can_read': can_read,
-                    'cost': cost
-                }
- 
+
+                # 订阅校验已完成；校验值包含阅读权限，订阅后旧的缓存不会被当作有效。
+                # 修改时间只精确到秒，同一秒内的两次编辑由正文哈希区分
+                chapter_update_time = chapter_row[9]
+                etag = conditional.make_etag(
+                    'chapter', chapter_id, chapter_update_time.isoformat() if chapter_update_time else '',
+                    chapter_row[10] or '', is_author, can_read, is_subscribed
+                )
+                # 付费章节的内容随订阅状态变化，只有作者与免费章节的响应可以按修改时间验证
+                last_modified = chapter_update_time if (is_author or is_free) else None
+                cached = conditional.not_modified(request, etag, last_modified)
+
+                response_payload = None
+                if cached is None:
+                    chapter = {
+                        'chapter_id': chapter_row[0],
+                        'title': chapter_row[1],
+                        # 正文只在有权阅读且客户端缓存失效时从正文存储读取
+                        'content': chapter_bodies.load_body(cursor, chapter_id) if can_read else '',
+                        'intro': chapter_row[2],
+                        'word_count': word_count,
+                        'is_free': is_free,
+                        'status': chapter_status,
+                        'chapter_order': chapter_row[6],
+                        'create_time': chapter_row[7].isoformat() if chapter_row[7] else None,
+                        'publish_time': chapter_row[8].isoformat() if chapter_row[8] else None
+                    }
+
+                    response_payload = {
+                        'success': True,
+                        'chapter': chapter,
+                        'is_author': is_author,
+                        'is_subscribed': is_author or is_subscribed,
+                        'can_read': can_read,
+                        'cost': cost
+                    }
+
                 if not can_read and not is_free:
-                    response_payload['message'] = '该章节为付费章节，请先订阅后再阅读'
+                    if response_payload is not None:
+                        response_payload['message'] = '该章节为付费章节，请先订阅后再阅读'
                 elif not is_author and can_read:
                     _record_chapter_reading(user_id, work_id, chapter_id)
  
@@ -3767,11 +3692,14 @@ def update_chapter(request, work_id, chapter_id):
                     extra={
                         'work_id': work_id,
                         'can_read': can_read,
-                        'is_author': is_author
+                        'is_author': is_author,
+                        'not_modified': cached is not None
                     }
                 )
 
-                return Response(response_payload)
+                if cached is not None:
+                    return cached
+                return conditional.apply_validators(Response(response_payload), etag, last_modified)
  
             # PUT 请求权限与限制校验
             if not is_author:
@@ -3797,84 +3725,355 @@ def update_chapter(request, work_id, chapter_id):
             except (TypeError, ValueError):
                 new_status_int = chapter_status
             new_content = data.get('content')
-            if new_content is None:
-                new_content = chapter_row[2]
-            new_word_count = _calculate_word_count(new_content)
+            # 未提交正文时保留原正文，字数不变
+            new_word_count = word_count if new_content is None else _calculate_word_count(new_content)
             new_is_free = 1 if _to_bool(data.get('is_free'), is_free) else 0
             chapter_title_new = data.get('title', chapter_row[1])
  
+            cursor.execute("START TRANSACTION")
+            try:
+                # 正文写入正文存储；chapters.content 只保留给尚未回填的旧章节，提交新正文时一并清空
+                cursor.execute("""
+                    UPDATE chapters 
+                    SET title = %s, content = CASE WHEN %s = 1 THEN '' ELSE content END, intro = %s, word_count = %s,
+                        is_free = %s, status = %s, update_time = NOW(),
+                        publish_time = CASE WHEN %s = 1 THEN COALESCE(publish_time, NOW()) ELSE publish_time END
+                    WHERE chapter_id = %s AND work_id = %s
+                """, [
+                    chapter_title_new,
+                    int(new_content is not None),
+                    data.get('intro', chapter_row[2] or ''),
+                    new_word_count,
+                    new_is_free,
+                    new_status_int,
+                    new_status_int,
+                    chapter_id,
+                    work_id
+                ])
+                if new_content is not None:
+                    chapter_bodies.save_body(cursor, chapter_id, new_content)
+                work_stats.apply_delta(
+                    cursor,
+                    work_id,
+                    published_chapter_count=int(new_status_int == 1) - int(chapter_status == 1),
+                    total_words=(new_word_count if new_status_int == 1 else 0) - (word_count if chapter_status == 1 else 0)
+                )
+
+                chapter_published_now = (chapter_status != 1 and new_status_int == 1)
+                if chapter_published_now:
+                    # 作品更新只写一条广播（或 fanout 模式下的通知事件），不再逐个读者写消息
+                    work_title_display = work_title or f'作品{work_id}'
+                    chapter_title_display = chapter_title_new or chapter_row[1] or f'章节{chapter_id}'
+                    publish_work_update(
+                        cursor,
+                        work_id,
+                        chapter_id,
+                        f"您关注的作品《{work_title_display}》更新了新章节《{chapter_title_display}》，快去阅读吧！",
+                        MESSAGE_TYPE_WORK_UPDATE,
+                        sender_id=user_id,
+                        exclude_ids=(user_id, author_id)
+                    )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            chapter_toc.invalidate(work_id)
+ 
+        detail = f"更新章节《{chapter_title_new or chapter_row[1]}》"
+        _record_user_action(
+            user_id,
+            'update_chapter',
+            USER_ACTION_TARGET_CHAPTER,
+            chapter_id,
+            detail=detail,
+            request=request,
+            extra={
+                'work_id': work_id,
+                'status': new_status_int,
+                'is_free': bool(new_is_free),
+                'word_count': new_word_count
+            }
+        )
+
+        return Response({'success': True, 'message': '章节更新成功'})
+ 
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def read_chapters_ahead(request, work_id, chapter_id):
+    """从指定章节起按阅读顺序返回后续若干章，供客户端连续阅读时预取；
+    订阅状态只查询一次，正文批量读取。只有起始章节记为已读，
+    预取的章节由客户端实际展示后通过 record_chapter_reads 批量上报"""
+    try:
+        user_id = request.user.user_id
+        try:
+            count = int(request.GET.get('count', READ_AHEAD_DEFAULT_CHAPTERS) or READ_AHEAD_DEFAULT_CHAPTERS)
+        except (TypeError, ValueError):
+            count = READ_AHEAD_DEFAULT_CHAPTERS
+        count = max(1, min(count, READ_AHEAD_MAX_CHAPTERS))
+
+        with connection.cursor() as cursor:
             cursor.execute("""
-                UPDATE chapters 
-                SET title = %s, content = %s, intro = %s, word_count = %s,
-                    is_free = %s, status = %s, update_time = NOW(),
-                    publish_time = CASE WHEN %s = 1 THEN COALESCE(publish_time, NOW()) ELSE publish_time END
-                WHERE chapter_id = %s AND work_id = %s
-            """, [
-                chapter_title_new,
-                new_content,
-                data.get('intro', chapter_row[3] or ''),
-                new_word_count,
-                new_is_free,
-                new_status_int,
-                new_status_int,
-                chapter_id,
-                work_id
-            ])
+                SELECT title, author_id 
+                FROM works 
+                WHERE work_id = %s
+            """, [work_id])
 
-            chapter_published_now = (chapter_status != 1 and new_status_int == 1)
-            if chapter_published_now:
-                cursor.execute(
-                    "SELECT DISTINCT reader_id FROM collections WHERE work_id = %s",
-                    [work_id]
+            work_row = cursor.fetchone()
+            if not work_row:
+                return Response({'success': False, 'error': '作品不存在'},
+                                status=status.HTTP_404_NOT_FOUND)
+
+            work_title, author_id = work_row
+            is_author = (author_id == user_id)
+
+            # 读者按已发布章节的阅读顺序预取，作者可以连续查看草稿
+            toc_version, toc = chapter_toc.get_toc(cursor, work_id, include_unpublished=is_author)
+            position = next(
+                (index for index, entry in enumerate(toc) if entry['chapter_id'] == chapter_id),
+                None
+            )
+            if position is None:
+                return Response({'success': False, 'error': '章节不存在或未发布'},
+                                status=status.HTTP_404_NOT_FOUND)
+            window = toc[position:position + count]
+            next_chapter_id = toc[position + count]['chapter_id'] if position + count < len(toc) else None
+
+            has_full_subscription = False
+            subscribed_chapters = set()
+            if not is_author:
+                has_full_subscription, subscribed_chapters = _get_user_subscription_status(user_id, work_id)
+
+            readable_ids = []
+            results = []
+            for entry in window:
+                is_free = entry['is_free']
+                is_subscribed = not is_author and not is_free and (
+                    has_full_subscription or entry['chapter_id'] in subscribed_chapters
                 )
-                for row in cursor.fetchall():
-                    recipient_id = row[0]
-                    if recipient_id and recipient_id not in (user_id, author_id):
-                        update_recipient_ids.add(recipient_id)
+                can_read = is_author or is_free or is_subscribed
+                if can_read:
+                    readable_ids.append(entry['chapter_id'])
+                result = {
+                    'chapter': dict(entry),
+                    'is_subscribed': is_author or is_subscribed,
+                    'can_read': can_read,
+                    'cost': calculate_chapter_cost(entry['word_count'])
+                }
+                if not can_read:
+                    result['message'] = '该章节为付费章节，请先订阅后再阅读'
+                results.append(result)
+
+            bodies = chapter_bodies.load_bodies(cursor, readable_ids)
+            for result in results:
+                result['chapter']['content'] = bodies.get(result['chapter']['chapter_id'], '') if result['can_read'] else ''
+
+        if not is_author and chapter_id in readable_ids:
+            _record_chapter_reading(user_id, work_id, chapter_id)
+
+        _record_user_action(
+            user_id,
+            'read_chapters_ahead',
+            USER_ACTION_TARGET_CHAPTER,
+            chapter_id,
+            detail=f"连续阅读作品《{work_title}》{len(results)} 个章节",
+            request=request,
+            extra={
+                'work_id': work_id,
+                'chapter_ids': [result['chapter']['chapter_id'] for result in results],
+                'readable_count': len(readable_ids),
+                'is_author': is_author
+            }
+        )
+
+        return Response({
+            'success': True,
+            'work_title': work_title,
+            'is_author': is_author,
+            'chapters': results,
+            'next_chapter_id': next_chapter_id,
+            'toc_version': toc_version
+        })
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def record_chapter_reads(request, work_id):
+    """客户端展示了预取的章节后批量上报阅读进度；只记录已发布且有权阅读的章节"""
+    try:
+        user_id = request.user.user_id
+        chapter_ids = request.data.get('chapter_ids') if isinstance(request.data, dict) else None
+        if not isinstance(chapter_ids, list) or not chapter_ids:
+            return Response({'success': False, 'error': 'chapter_ids 不能为空'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            chapter_ids = list(dict.fromkeys(int(chapter_id) for chapter_id in chapter_ids))
+        except (TypeError, ValueError):
+            return Response({'success': False, 'error': '章节ID无效'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(chapter_ids) > READ_AHEAD_MAX_CHAPTERS:
+            return Response({'success': False, 'error': f'单次最多上报 {READ_AHEAD_MAX_CHAPTERS} 个章节'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT author_id FROM works WHERE work_id = %s", [work_id])
+            work_row = cursor.fetchone()
+            if not work_row:
+                return Response({'success': False, 'error': '作品不存在'},
+                                status=status.HTTP_404_NOT_FOUND)
+            if work_row[0] == user_id:
+                # 作者查看自己的章节不计入阅读
+                return Response({'success': True, 'recorded': 0})
+
+            cursor.execute(
+                f"""
+                SELECT chapter_id, is_free
+                FROM chapters
+                WHERE work_id = %s AND status = 1 AND chapter_id IN ({', '.join(['%s'] * len(chapter_ids))})
+                """,
+                [work_id] + chapter_ids
+            )
+            chapter_rows = cursor.fetchall()
+
+        has_full_subscription, subscribed_chapters = _get_user_subscription_status(user_id, work_id)
+        readable = {
+            row[0] for row in chapter_rows
+            if row[1] or has_full_subscription or row[0] in subscribed_chapters
+        }
+        readable_ids = [chapter_id for chapter_id in chapter_ids if chapter_id in readable]
+        _record_chapter_readings(user_id, work_id, readable_ids)
+
+        return Response({'success': True, 'recorded': len(readable_ids)})
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_chapters(request, work_id):
+    """离线下载：以 gzip 压缩的 NDJSON 流式返回章节范围内用户有权阅读的章节；
+    订阅状态只查询一次，相同内容的下载包直接复用缓存文件"""
+    try:
+        user_id = request.user.user_id
+        config = offline_bundles.offline_bundle_config()
+
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT title, author_id 
+                FROM works 
+                WHERE work_id = %s
+            """, [work_id])
+
+            work_row = cursor.fetchone()
+            if not work_row:
+                return Response({'success': False, 'error': '作品不存在'},
+                                status=status.HTTP_404_NOT_FOUND)
+
+            work_title, author_id = work_row
+            is_author = (author_id == user_id)
+            toc_version, toc = chapter_toc.get_toc(cursor, work_id, include_unpublished=is_author)
+
+        if not toc:
+            return Response({'success': False, 'error': '作品暂无可下载的章节'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        positions = {entry['chapter_id']: index for index, entry in enumerate(toc)}
+        try:
+            start_chapter_id = int(request.GET.get('start_chapter_id') or toc[0]['chapter_id'])
+            end_chapter_id = int(request.GET.get('end_chapter_id') or toc[-1]['chapter_id'])
+        except (TypeError, ValueError):
+            return Response({'success': False, 'error': '章节范围参数无效'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if start_chapter_id not in positions or end_chapter_id not in positions:
+            return Response({'success': False, 'error': '章节不存在或未发布'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        start, end = positions[start_chapter_id], positions[end_chapter_id]
+        if start > end:
+            return Response({'success': False, 'error': '起始章节不能晚于结束章节'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if end - start + 1 > config['MAX_CHAPTERS']:
+            return Response({'success': False, 'error': f"单次最多下载 {config['MAX_CHAPTERS']} 个章节"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        has_full_subscription = False
+        subscribed_chapters = set()
+        if not is_author:
+            has_full_subscription, subscribed_chapters = _get_user_subscription_status(user_id, work_id)
+
+        chapters = [
+            {
+                'chapter_id': entry['chapter_id'],
+                'title': entry['title'],
+                'chapter_order': entry['chapter_order'],
+                'word_count': entry['word_count'],
+                'is_free': entry['is_free'],
+                'publish_time': entry['publish_time'],
+            }
+            for entry in toc[start:end + 1]
+            if is_author or entry['is_free'] or has_full_subscription or entry['chapter_id'] in subscribed_chapters
+        ]
+        if not chapters:
+            return Response({'success': False, 'error': '所选范围内没有可阅读的章节，请先订阅'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        header = {
+            'type': 'work',
+            'format': offline_bundles.BUNDLE_FORMAT,
+            'work_id': work_id,
+            'title': work_title,
+            'toc_version': toc_version,
+            'start_chapter_id': start_chapter_id,
+            'end_chapter_id': end_chapter_id,
+            'chapter_count': len(chapters),
+        }
+        filename = f'work_{work_id}_{start_chapter_id}-{end_chapter_id}.ndjson.gz'
+
+        cache_state = 'bypass'
+        cached_handle = None
+        bundle_path = None
+        if config['CACHE_ENABLED'] and toc_version is not None:
+            key = offline_bundles.bundle_key(
+                work_id, work_title, start_chapter_id, end_chapter_id, toc_version,
+                [chapter['chapter_id'] for chapter in chapters]
+            )
+            bundle_path = offline_bundles.bundle_path(work_id, key)
+            cached_handle = offline_bundles.open_cached_bundle(bundle_path)
+            cache_state = 'hit' if cached_handle is not None else 'miss'
 
-                cursor.execute(
-                    "SELECT DISTINCT reader_id FROM subscriptions WHERE work_id = %s",
-                    [work_id]
-                )
-                for row in cursor.fetchall():
-                    recipient_id = row[0]
-                    if recipient_id and recipient_id not in (user_id, author_id):
-                        update_recipient_ids.add(recipient_id)
- 
-        detail = f"更新章节《{chapter_title_new or chapter_row[1]}》"
         _record_user_action(
             user_id,
-            'update_chapter',
-            USER_ACTION_TARGET_CHAPTER,
-            chapter_id,
-            detail=detail,
+            'download_chapters',
+            USER_ACTION_TARGET_WORK,
+            work_id,
+            detail=f"离线下载作品《{work_title}》{len(chapters)} 个章节",
             request=request,
             extra={
-                'work_id': work_id,
-                'status': new_status_int,
-                'is_free': bool(new_is_free),
-                'word_count': new_word_count
+                'start_chapter_id': start_chapter_id,
+                'end_chapter_id': end_chapter_id,
+                'chapter_count': len(chapters),
+                'cache': cache_state
             }
         )
 
-        if chapter_published_now and update_recipient_ids:
-            work_title_display = work_title or f'作品{work_id}'
-            chapter_title_display = chapter_title_new or chapter_row[1] or f'章节{chapter_id}'
-            message_content = (
-                f"您关注的作品《{work_title_display}》更新了新章节《{chapter_title_display}》，快去阅读吧！"
-            )
-            for recipient_id in update_recipient_ids:
-                _create_message(
-                    recipient_id=recipient_id,
-                    message_type=MESSAGE_TYPE_WORK_UPDATE,
-                    content=message_content,
-                    related_type=3,
-                    related_id=chapter_id,
-                    sender_id=user_id
-                )
+        if cached_handle is not None:
+            response = FileResponse(cached_handle, content_type='application/gzip', as_attachment=True, filename=filename)
+        else:
+            stream = offline_bundles.generate_bundle(header, chapters)
+            if bundle_path is not None:
+                stream = offline_bundles.caching_stream(stream, bundle_path)
+            response = StreamingHttpResponse(stream, content_type='application/gzip')
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['X-Bundle-Cache'] = cache_state
+        return response
 
-        return Response({'success': True, 'message': '章节更新成功'})
- 
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -3888,9 +4087,6 @@ def subscribe_chapter(request, work_id, chapter_id):
         if not _user_permission_allowed(user_id, 'can_subscribe'):
             return Response({'success': False, 'error': '您的账号已被限制订阅付费内容'}, status=status.HTTP_403_FORBIDDEN)
 
-        _ensure_point_transactions_table()
-        _ensure_user_tickets_table()
-
         with connection.cursor() as cursor:
             cursor.execute("""
                 SELECT c.chapter_id, c.title, c.word_count, c.is_free, c.status,
@@ -3955,6 +4151,12 @@ def subscribe_chapter(request, work_id, chapter_id):
                     [cost_decimal, user_id]
                 )
 
+                cursor.execute(
+                    "SELECT 1 FROM subscriptions WHERE reader_id = %s AND work_id = %s LIMIT 1",
+                    [user_id, work_id]
+                )
+                is_new_subscriber = cursor.fetchone() is None
+
                 cursor.execute(
                     """
                     INSERT INTO subscriptions (reader_id, work_id, chapter_id, sub_time, amount)
@@ -3963,6 +4165,13 @@ def subscribe_chapter(request, work_id, chapter_id):
                     [user_id, work_id, chapter_id, cost_decimal]
                 )
 
+                work_stats.apply_delta(
+                    cursor,
+                    work_id,
+                    subscription_count=1 if is_new_subscriber else 0,
+                    subscription_income=cost_decimal
+                )
+
                 cursor.execute(
                     """
                     INSERT INTO point_transactions (user_id, transaction_type, amount, description, create_time)
@@ -4026,12 +4235,7 @@ def subscribe_chapter(request, work_id, chapter_id):
             ticket_balance_row = cursor.fetchone()
             ticket_balance = int(ticket_balance_row[0]) if ticket_balance_row and ticket_balance_row[0] is not None else 0
 
-            cursor.execute(
-                "SELECT COALESCE(SUM(amount), 0) FROM subscriptions WHERE work_id = %s",
-                [work_id]
-            )
-            work_income_row = cursor.fetchone()
-            work_income = float(work_income_row[0]) if work_income_row and work_income_row[0] is not None else 0.0
+            work_income = work_stats.fetch_work_stats(cursor, work_id)['subscription_income']
 
             cursor.execute(
                 "SELECT COALESCE(total_income, 0) FROM authors WHERE author_id = %s",
@@ -4070,7 +4274,8 @@ def subscribe_chapter(request, work_id, chapter_id):
                     'chapter_id': chapter_id,
                     'cost': cost,
                     'ticket_reward': ticket_reward
-                }
+                },
+                profile_score=PREFERENCE_WEIGHT_MAP['subscription']
             )
 
             if author_id and author_id != user_id:
@@ -4123,18 +4328,28 @@ def delete_chapter(request, work_id, chapter_id):
                 return Response({'success': False, 'error': '章节不存在或无权限'}, 
                               status=status.HTTP_404_NOT_FOUND)
             
-            # 删除章节
-            cursor.execute("DELETE FROM chapters WHERE chapter_id = %s", [chapter_id])
-            
-            cursor.execute("""
-                DELETE FROM collections 
-                WHERE reader_id = %s AND work_id = %s
-            """, [user_id, work_id])
- 
-            cursor.execute(
-                "UPDATE works SET collect_count = GREATEST(COALESCE(collect_count, 0) - 1, 0) WHERE work_id = %s",
-                [work_id]
-            )
+            cursor.execute("START TRANSACTION")
+            try:
+                # 删除章节
+                cursor.execute("DELETE FROM chapters WHERE chapter_id = %s", [chapter_id])
+
+                cursor.execute("""
+                    DELETE FROM collections 
+                    WHERE reader_id = %s AND work_id = %s
+                """, [user_id, work_id])
+
+                cursor.execute(
+                    "UPDATE works SET collect_count = GREATEST(COALESCE(collect_count, 0) - 1, 0) WHERE work_id = %s",
+                    [work_id]
+                )
+
+                # 阅读记录随章节级联删除，无法简单增量计算，按作品重新汇总
+                work_stats.refresh_work_stats(cursor, [work_id])
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            chapter_toc.invalidate(work_id)
             
             detail = f"删除章节 {chapter_id}"
             _record_user_action(
@@ -4262,31 +4477,53 @@ def _get_public_comments(request, work_id, user_id, comment_type, page, page_siz
 
     offset = (page - 1) * page_size
 
-    _ensure_comment_likes_table()
+    try:
+        paginator = KeysetPaginator.from_request(
+            request, 'comments', [('c.create_time', 'DESC'), ('c.comment_id', 'DESC')], page_size
+        )
+    except CursorError as exc:
+        return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
     with connection.cursor() as cursor:
-        cursor.execute(f"SELECT COUNT(*) FROM comments c WHERE {root_where}", params)
-        total_row = cursor.fetchone()
-        total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+        total = None
+        if paginator is None or paginator.include_total:
+            cursor.execute(f"SELECT COUNT(*) FROM comments c WHERE {root_where}", params)
+            total_row = cursor.fetchone()
+            total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+
+        page_conditions = list(root_conditions)
+        page_params = list(params)
+        if paginator:
+            paginator.apply(page_conditions, page_params)
+        order_clause, limit_clause, limit_params = page_window(
+            paginator, "c.create_time DESC, c.comment_id DESC", page_size, offset
+        )
 
         cursor.execute(
             f"""
-            SELECT c.comment_id
+            SELECT c.comment_id, c.create_time
             FROM comments c
-            WHERE {root_where}
-            ORDER BY c.create_time DESC, c.comment_id DESC
-            LIMIT %s OFFSET %s
+            WHERE {' AND '.join(page_conditions)}
+            ORDER BY {order_clause}
+            {limit_clause}
             """,
-            params + [page_size, offset]
+            page_params + limit_params
         )
-        root_ids = [row[0] for row in cursor.fetchall()]
+        root_rows = cursor.fetchall()
+        page_info = {}
+        if paginator:
+            root_rows, page_info = paginator.paginate(root_rows, lambda row: (row[1], row[0]))
+        root_ids = [row[0] for row in root_rows]
 
         if not root_ids:
-            return Response({
+            response_data = {
                 'success': True,
-                'comments': [],
-                'total': total
-            })
+                'comments': []
+            }
+            if total is not None:
+                response_data['total'] = total
+            response_data.update(page_info)
+            return Response(response_data)
 
         placeholders = ','.join(['%s'] * len(root_ids))
         data_params = [user_id] + root_ids + root_ids
@@ -4317,14 +4554,19 @@ def _get_public_comments(request, work_id, user_id, comment_type, page, page_siz
         rows = cursor.fetchall()
 
     comments = _build_comment_tree(rows, root_ids)
-    has_more = (offset + len(root_ids)) < total
 
-    return Response({
+    response_data = {
         'success': True,
-        'comments': comments,
-        'total': total,
-        'has_more': has_more
-    })
+        'comments': comments
+    }
+    if paginator:
+        if total is not None:
+            response_data['total'] = total
+        response_data.update(page_info)
+    else:
+        response_data['total'] = total
+        response_data['has_more'] = (offset + len(root_ids)) < total
+    return Response(response_data)
 
 
 def _get_manage_comments(request, work_id, user_id, author_id, work_title, page, page_size):
@@ -4342,10 +4584,27 @@ def _get_manage_comments(request, work_id, user_id, author_id, work_title, page,
     where_clause = " AND ".join(conditions)
     offset = (page - 1) * page_size
 
+    try:
+        paginator = KeysetPaginator.from_request(
+            request, 'manage_comments', [('c.create_time', 'DESC'), ('c.comment_id', 'DESC')], page_size
+        )
+    except CursorError as exc:
+        return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
     with connection.cursor() as cursor:
-        cursor.execute(f"SELECT COUNT(*) FROM comments c WHERE {where_clause}", params)
-        total_row = cursor.fetchone()
-        total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+        total = None
+        if paginator is None or paginator.include_total:
+            cursor.execute(f"SELECT COUNT(*) FROM comments c WHERE {where_clause}", params)
+            total_row = cursor.fetchone()
+            total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+
+        page_conditions = list(conditions)
+        page_params = list(params)
+        if paginator:
+            paginator.apply(page_conditions, page_params)
+        order_clause, limit_clause, limit_params = page_window(
+            paginator, "c.create_time DESC, c.comment_id DESC", page_size, offset
+        )
 
         cursor.execute(
             f"""
@@ -4357,15 +4616,20 @@ def _get_manage_comments(request, work_id, user_id, author_id, work_title, page,
             FROM comments c
             LEFT JOIN readers r ON c.reader_id = r.reader_id
             LEFT JOIN users u ON c.reader_id = u.user_id
-            WHERE {where_clause}
-            ORDER BY c.create_time DESC, c.comment_id DESC
-            LIMIT %s OFFSET %s
+            WHERE {' AND '.join(page_conditions)}
+            ORDER BY {order_clause}
+            {limit_clause}
             """,
-            params + [page_size, offset]
+            page_params + limit_params
         )
 
+        rows = cursor.fetchall()
+        page_info = {}
+        if paginator:
+            rows, page_info = paginator.paginate(rows, lambda row: (row[3], row[0]))
+
         comments = []
-        for row in cursor.fetchall():
+        for row in rows:
             comments.append({
                 'comment_id': row[0],
                 'content': row[1],
@@ -4377,12 +4641,15 @@ def _get_manage_comments(request, work_id, user_id, author_id, work_title, page,
                 'parent_id': row[7]
             })
 
-    return Response({
+    response_data = {
         'success': True,
         'comments': comments,
-        'total': total,
         'work_title': work_title
-    })
+    }
+    if total is not None:
+        response_data['total'] = total
+    response_data.update(page_info)
+    return Response(response_data)
 
 
 @api_view(['POST'])
@@ -4543,8 +4810,6 @@ def create_comment(request, work_id):
 def like_comment(request, work_id, comment_id):
     try:
         user_id = request.user.user_id
-        _ensure_comment_likes_table()
-
         with connection.cursor() as cursor:
             cursor.execute("""
                 SELECT comment_id
@@ -4859,8 +5124,6 @@ def get_comment_history(request):
 def get_comment_thread(request, comment_id):
     try:
         user_id = request.user.user_id
-        _ensure_comment_likes_table()
-
         with connection.cursor() as cursor:
             cursor.execute("""
                 SELECT comment_id, reader_id, work_id, chapter_id, content, parent_id, create_time
@@ -4955,8 +5218,6 @@ def get_comment_thread(request, comment_id):
 def delete_user_comment(request, comment_id):
     try:
         user_id = request.user.user_id
-        _ensure_comment_likes_table()
-
         with connection.cursor() as cursor:
             cursor.execute("""
                 SELECT comment_id, COALESCE(parent_id, comment_id) AS root_id
@@ -5037,16 +5298,23 @@ def add_to_bookshelf(request):
             if cursor.fetchone():
                 return Response({'success': False, 'error': '已收藏该作品'})
             
-            # 添加收藏
-            cursor.execute("""
-                INSERT INTO collections (reader_id, work_id, collect_time)
-                VALUES (%s, %s, NOW())
-            """, [user_id, work_id])
- 
-            cursor.execute(
-                "UPDATE works SET collect_count = COALESCE(collect_count, 0) + 1 WHERE work_id = %s",
-                [work_id]
-            )
+            cursor.execute("START TRANSACTION")
+            try:
+                # 添加收藏
+                cursor.execute("""
+                    INSERT INTO collections (reader_id, work_id, collect_time)
+                    VALUES (%s, %s, NOW())
+                """, [user_id, work_id])
+
+                cursor.execute(
+                    "UPDATE works SET collect_count = COALESCE(collect_count, 0) + 1 WHERE work_id = %s",
+                    [work_id]
+                )
+                work_stats.apply_delta(cursor, work_id, collect_count=1)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
  
             _record_user_action(
                 user_id,
@@ -5062,7 +5330,8 @@ def add_to_bookshelf(request):
                 work_id,
                 FEEDBACK_EVENT_COLLECT,
                 weight_delta=1.0,
-                metadata={'source': 'bookshelf'}
+                metadata={'source': 'bookshelf'},
+                profile_score=PREFERENCE_WEIGHT_MAP['collection']
             )
 
             return Response({'success': True, 'message': '收藏成功'})
@@ -5086,16 +5355,23 @@ def remove_from_bookshelf(request, work_id):
             if not cursor.fetchone():
                 return Response({'success': False, 'error': '未收藏该作品'})
             
-            # 移除收藏
-            cursor.execute("""
-                DELETE FROM collections 
-                WHERE reader_id = %s AND work_id = %s
-            """, [user_id, work_id])
- 
-            cursor.execute(
-                "UPDATE works SET collect_count = GREATEST(COALESCE(collect_count, 0) - 1, 0) WHERE work_id = %s",
-                [work_id]
-            )
+            cursor.execute("START TRANSACTION")
+            try:
+                # 移除收藏
+                cursor.execute("""
+                    DELETE FROM collections 
+                    WHERE reader_id = %s AND work_id = %s
+                """, [user_id, work_id])
+
+                cursor.execute(
+                    "UPDATE works SET collect_count = GREATEST(COALESCE(collect_count, 0) - 1, 0) WHERE work_id = %s",
+                    [work_id]
+                )
+                work_stats.apply_delta(cursor, work_id, collect_count=-1)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
  
             _record_user_action(
                 user_id,
@@ -5177,95 +5453,116 @@ def get_rankings(request):
             start_time = now - timedelta(days=30)
 
         with connection.cursor() as cursor:
-            base_conditions = ["w.status IN (1, 2)"]
-            main_params = []
-
-            if category_id is not None:
-                base_conditions.append("w.category_id = %s")
-                main_params.append(category_id)
-
-            where_clause = " AND ".join(base_conditions)
-
-            query = ""
-            query_params = []
-
-            if ranking_type == 'read':
-                time_condition = ""
-                time_params = []
-                if start_time:
-                    time_condition = "WHERE rr.read_time >= %s"
-                    time_params.append(start_time)
-                query = f"""
-                    SELECT w.work_id, w.title, w.cover_url, a.pen_name,
-                           COALESCE(r.read_count, 0) AS score
-                    FROM works w
-                    LEFT JOIN authors a ON w.author_id = a.author_id
-                    LEFT JOIN (
-                        SELECT ch.work_id, COUNT(*) AS read_count
-                        FROM reading_records rr
-                        JOIN chapters ch ON rr.chapter_id = ch.chapter_id
-                        {time_condition}
-                        GROUP BY ch.work_id
-                    ) r ON w.work_id = r.work_id
-                    WHERE {where_clause}
-                    ORDER BY score DESC, w.update_time DESC, w.work_id ASC
-                    LIMIT 50
-                """
-                query_params = time_params + main_params
-            elif ranking_type == 'vote':
-                time_condition = ""
-                time_params = []
-                if start_time:
-                    time_condition = "WHERE v.vote_time >= %s"
-                    time_params.append(start_time.date())
-                query = f"""
-                    SELECT w.work_id, w.title, w.cover_url, a.pen_name,
-                           COALESCE(vt.vote_count, 0) AS score
-                    FROM works w
-                    LEFT JOIN authors a ON w.author_id = a.author_id
-                    LEFT JOIN (
-                        SELECT work_id, SUM(count) AS vote_count
-                        FROM votes v
-                        {time_condition}
-                        GROUP BY work_id
-                    ) vt ON w.work_id = vt.work_id
-                    WHERE {where_clause}
-                    ORDER BY score DESC, w.update_time DESC, w.work_id ASC
-                    LIMIT 50
-                """
-                query_params = time_params + main_params
-            else:  # subscribe
-                time_condition = ""
-                time_params = []
-                if start_time:
-                    time_condition = "WHERE s.sub_time >= %s"
-                    time_params.append(start_time)
-                query = f"""
-                    SELECT w.work_id, w.title, w.cover_url, a.pen_name,
-                           COALESCE(st.sub_amount, 0) AS score
-                    FROM works w
-                    LEFT JOIN authors a ON w.author_id = a.author_id
-                    LEFT JOIN (
-                        SELECT work_id, SUM(amount) AS sub_amount
-                        FROM subscriptions s
-                        {time_condition}
-                        GROUP BY work_id
-                    ) st ON w.work_id = st.work_id
-                    WHERE {where_clause}
-                    ORDER BY score DESC, w.update_time DESC, w.work_id ASC
-                    LIMIT 50
-                """
-                query_params = time_params + main_params
-
-            cursor.execute(query, query_params)
+            snapshot = fetch_ranking_snapshot(cursor, ranking_type, period, category_id, limit=50)
+            if snapshot is not None:
+                ranking_rows = snapshot['rows']
+                snapshot_info = {
+                    'source': 'snapshot',
+                    'stat_date': snapshot['stat_date'].isoformat() if snapshot['stat_date'] else None,
+                    'generated_at': snapshot['generated_at'].isoformat() if snapshot['generated_at'] else None,
+                    'age_seconds': snapshot['age_seconds']
+                }
+            else:
+                # 榜单引擎尚未生成快照时退回实时计算
+                base_conditions = ["w.status IN (1, 2)"]
+                main_params = []
+
+                if category_id is not None:
+                    base_conditions.append("w.category_id = %s")
+                    main_params.append(category_id)
+
+                where_clause = " AND ".join(base_conditions)
+
+                query = ""
+                query_params = []
+
+                if ranking_type == 'read':
+                    time_condition = ""
+                    time_params = []
+                    if start_time:
+                        time_condition = "WHERE rr.read_time >= %s"
+                        time_params.append(start_time)
+                    query = f"""
+                        SELECT w.work_id, w.title, w.cover_url, a.pen_name,
+                               COALESCE(r.read_count, 0) AS score
+                        FROM works w
+                        LEFT JOIN authors a ON w.author_id = a.author_id
+                        LEFT JOIN (
+                            SELECT ch.work_id, COUNT(*) AS read_count
+                            FROM reading_records rr
+                            JOIN chapters ch ON rr.chapter_id = ch.chapter_id
+                            {time_condition}
+                            GROUP BY ch.work_id
+                        ) r ON w.work_id = r.work_id
+                        WHERE {where_clause}
+                        ORDER BY score DESC, w.update_time DESC, w.work_id ASC
+                        LIMIT 50
+                    """
+                    query_params = time_params + main_params
+                elif ranking_type == 'vote':
+                    time_condition = ""
+                    time_params = []
+                    if start_time:
+                        time_condition = "WHERE v.vote_time >= %s"
+                        time_params.append(start_time.date())
+                    query = f"""
+                        SELECT w.work_id, w.title, w.cover_url, a.pen_name,
+                               COALESCE(vt.vote_count, 0) AS score
+                        FROM works w
+                        LEFT JOIN authors a ON w.author_id = a.author_id
+                        LEFT JOIN (
+                            SELECT work_id, SUM(count) AS vote_count
+                            FROM votes v
+                            {time_condition}
+                            GROUP BY work_id
+                        ) vt ON w.work_id = vt.work_id
+                        WHERE {where_clause}
+                        ORDER BY score DESC, w.update_time DESC, w.work_id ASC
+                        LIMIT 50
+                    """
+                    query_params = time_params + main_params
+                else:  # subscribe
+                    time_condition = ""
+                    time_params = []
+                    if start_time:
+                        time_condition = "WHERE s.sub_time >= %s"
+                        time_params.append(start_time)
+                    query = f"""
+                        SELECT w.work_id, w.title, w.cover_url, a.pen_name,
+                               COALESCE(st.sub_amount, 0) AS score
+                        FROM works w
+                        LEFT JOIN authors a ON w.author_id = a.author_id
+                        LEFT JOIN (
+                            SELECT work_id, SUM(amount) AS sub_amount
+                            FROM subscriptions s
+                            {time_condition}
+                            GROUP BY work_id
+                        ) st ON w.work_id = st.work_id
+                        WHERE {where_clause}
+                        ORDER BY score DESC, w.update_time DESC, w.work_id ASC
+                        LIMIT 50
+                    """
+                    query_params = time_params + main_params
+
+                cursor.execute(query, query_params)
+                ranking_rows = cursor.fetchall()
+                snapshot_info = {
+                    'source': 'live',
+                    'stat_date': None,
+                    'generated_at': now.isoformat(),
+                    'age_seconds': 0
+                }
 
             rankings = []
-            for row in cursor.fetchall():
+            for row in ranking_rows:
                 raw_score = row[4]
                 if raw_score is None:
                     score = 0
                 elif isinstance(raw_score, Decimal):
-                    score = float(raw_score)
+                    if ranking_type != 'subscribe' and raw_score == raw_score.to_integral_value():
+                        score = int(raw_score)
+                    else:
+                        score = float(raw_score)
                 elif isinstance(raw_score, float):
                     score = int(raw_score) if raw_score.is_integer() else raw_score
                 else:
@@ -5278,7 +5575,7 @@ def get_rankings(request):
                     'score': score
                 })
 
-            return Response({'success': True, 'rankings': rankings})
+            return Response({'success': True, 'rankings': rankings, 'snapshot': snapshot_info})
             
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -5296,62 +5593,57 @@ def get_messages(request):
         offset = (page - 1) * page_size
         
         with connection.cursor() as cursor:
-            where_conditions = ["recipient_id = %s"]
-            params = [user_id]
-            
-            if message_type:
-                where_conditions.append("message_type = %s")
-                params.append(message_type)
-            
-            where_clause = " AND ".join(where_conditions)
-
-            cursor.execute(
-                f"SELECT COUNT(*) FROM messages WHERE {where_clause}",
-                params
-            )
-            total_row = cursor.fetchone()
-            total_count = int(total_row[0]) if total_row and total_row[0] is not None else 0
+            try:
+                paginator = KeysetPaginator.from_request(
+                    request,
+                    'inbox',
+                    [('m.send_time', 'DESC'), ('m.source_rank', 'DESC'), ('m.message_id', 'DESC')],
+                    page_size
+                )
+            except CursorError as exc:
+                return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+            # 个人消息与关注作品的广播更新在读取时合并；游标条件与行数上限在两个分支内分别生效
+            row_limit = paginator.limit if paginator else offset + page_size
+            inbox_sql, inbox_params = inbox_source(user_id, message_type or None, paginator, row_limit)
+
+            total_count = None
+            if paginator is None or paginator.include_total:
+                # 个人消息总数取自计数表，只有广播部分需要实时统计
+                counters = message_counters.fetch_counters(cursor, user_id)
+                total_count = sum(
+                    total for type_value, (total, _) in counters.items()
+                    if not message_type or str(type_value) == str(message_type)
+                )
+                total_count += broadcast_total(cursor, user_id, message_type or None)
 
-            cursor.execute(
-                """
-                SELECT COUNT(*)
-                FROM messages
-                WHERE recipient_id = %s AND is_read = 0
-                """,
-                [user_id]
+            unread_count, type_counts = unread_summary(cursor, user_id)
+            
+            page_params = list(inbox_params)
+            order_clause, limit_clause, limit_params = page_window(
+                paginator, "m.send_time DESC, m.source_rank DESC, m.message_id DESC", page_size, offset
             )
-            unread_row = cursor.fetchone()
-            unread_count = int(unread_row[0]) if unread_row and unread_row[0] is not None else 0
 
-            cursor.execute(
-                """
-                SELECT message_type, COUNT(*)
-                FROM messages
-                WHERE recipient_id = %s AND is_read = 0
-                GROUP BY message_type
-                """,
-                [user_id]
-            )
-            type_counts = {}
-            for row in cursor.fetchall():
-                type_key = str(row[0]) if row[0] is not None else ''
-                type_counts[type_key] = int(row[1] or 0)
-            
             cursor.execute(f"""
-                SELECT message_id, sender_id, message_type, content, 
-                       related_type, related_id, is_read, send_time
-                FROM messages
-                WHERE {where_clause}
-                ORDER BY send_time DESC
-                LIMIT %s OFFSET %s
-            """, params + [page_size, offset])
+                SELECT m.message_id, m.sender_id, m.message_type, m.content,
+                       m.related_type, m.related_id, m.is_read, m.send_time, m.source_rank
+                FROM {inbox_sql} m
+                ORDER BY {order_clause}
+                {limit_clause}
+            """, page_params + limit_params)
+
+            rows = cursor.fetchall()
+            page_info = {}
+            if paginator:
+                rows, page_info = paginator.paginate(rows, lambda row: (row[7], row[8], row[0]))
             
             messages = []
-            for row in cursor.fetchall():
+            for row in rows:
                 message_type_value = row[2]
                 message_type_str = str(message_type_value) if message_type_value is not None else ''
                 messages.append({
                     'message_id': row[0],
+                    'source': SOURCE_BROADCAST if row[8] == SOURCE_RANKS[SOURCE_BROADCAST] else SOURCE_MESSAGE,
                     'sender_id': row[1],
                     'message_type': message_type_str,
                     'content': row[3],
@@ -5361,13 +5653,16 @@ def get_messages(request):
                     'send_time': row[7].isoformat() if row[7] else None
                 })
             
-            return Response({
+            response_data = {
                 'success': True,
                 'messages': messages,
-                'total': total_count,
                 'unread_count': unread_count,
                 'type_counts': type_counts
-            })
+            }
+            if total_count is not None:
+                response_data['total'] = total_count
+            response_data.update(page_info)
+            return Response(response_data)
             
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -5386,13 +5681,14 @@ def search_works(request):
         page_size = int(request.GET.get('page_size', 20) or 20)
         page_size = max(1, min(page_size, 50))
         offset = (page - 1) * page_size
+        tag_filter = work_tags.normalize_tag_filter(request.GET.getlist('tags') or request.GET.get('tag'))
+        include_facets = str(request.GET.get('facets') or '').lower() in ('1', 'true')
         user = getattr(request, 'user', None)
         user_id = getattr(user, 'user_id', None) if getattr(user, 'is_authenticated', False) else None
 
         with connection.cursor() as cursor:
             search_term = keyword if keyword else author_name
             if user_id and search_term:
-                _ensure_search_records_table()
                 search_type = 1
                 if author_name and search_term == author_name and not keyword:
                     search_type = 2
@@ -5427,14 +5723,47 @@ def search_works(request):
                     """,
                     [user_id, user_id]
                 )
+                # 搜索历史影响"搜索相似"推荐栏目
+                recommendation_cache.invalidate(user_id)
 
             where_conditions = ["w.status IN (1, 2)"]
             params = []
+            relevance_ids = None
+            relevance_capped = False
+
+            # "#标签" 形式的关键词按标签精确匹配，不再做全文检索
+            if keyword.startswith('#'):
+                for tag_norm in work_tags.normalize_tag_filter(keyword):
+                    if tag_norm not in tag_filter:
+                        tag_filter.append(tag_norm)
+                keyword = ''
+
+            # 多个标签需同时命中，每个标签都是 work_tags 上的索引查找
+            for tag_norm in tag_filter:
+                tag_condition, tag_params = work_tags.tag_filter_condition([tag_norm])
+                where_conditions.append(tag_condition)
+                params.extend(tag_params)
 
             if keyword:
-                like_keyword = f'%{keyword}%'
-                where_conditions.append("(w.title LIKE %s OR w.intro LIKE %s OR COALESCE(a.pen_name, '') LIKE %s OR COALESCE(u.username, '') LIKE %s)")
-                params.extend([like_keyword, like_keyword, like_keyword, like_keyword])
+                # 先取相关度最高的一批候选用于统计总数与标签分面；分页时按需继续向后读取，筛选条件不会漏掉后面的匹配
+                candidate_limit = int(search_index_config()['MAX_CANDIDATES'])
+                relevance_ids = search_work_ids(keyword, limit=candidate_limit + 1)
+                if relevance_ids is not None:
+                    relevance_capped = len(relevance_ids) > candidate_limit
+                    relevance_ids = relevance_ids[:candidate_limit]
+                if relevance_ids is None:
+                    # 检索索引不可用时退回 LIKE 查询
+                    like_keyword = f'%{keyword}%'
+                    where_conditions.append("(w.title LIKE %s OR w.intro LIKE %s OR COALESCE(a.pen_name, '') LIKE %s OR COALESCE(u.username, '') LIKE %s)")
+                    params.extend([like_keyword, like_keyword, like_keyword, like_keyword])
+                elif not relevance_ids:
+                    return Response({
+                        'success': True,
+                        'results': [],
+                        'total': 0,
+                        'page': page,
+                        'page_size': page_size
+                    })
 
             if category_id not in (None, '', 'all'):
                 try:
@@ -5462,7 +5791,7 @@ def search_works(request):
                 try:
                     min_words = int(word_count_min)
                     if min_words >= 0:
-                        where_conditions.append("COALESCE(cw.total_words, 0) >= %s")
+                        where_conditions.append("COALESCE(ws.total_words, 0) >= %s")
                         params.append(min_words)
                 except (TypeError, ValueError):
                     pass
@@ -5471,55 +5800,137 @@ def search_works(request):
                 try:
                     max_words = int(word_count_max)
                     if max_words >= 0:
-                        where_conditions.append("COALESCE(cw.total_words, 0) <= %s")
+                        where_conditions.append("COALESCE(ws.total_words, 0) <= %s")
                         params.append(max_words)
                 except (TypeError, ValueError):
                     pass
 
-            where_clause = " AND ".join(where_conditions) if where_conditions else "1 = 1"
+            try:
+                if relevance_ids:
+                    # 相关度模式下游标记录最后一条在候选列表中的位置
+                    paginator = KeysetPaginator.from_request(
+                        request, f'search:{keyword}', [('relevance', 'ASC')], page_size
+                    )
+                else:
+                    paginator = KeysetPaginator.from_request(
+                        request,
+                        'search',
+                        [('w.update_time', 'DESC'), ('w.create_time', 'DESC'), ('w.work_id', 'DESC')],
+                        page_size
+                    )
+            except CursorError as exc:
+                return Response({'success': False, 'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+            start_rank = 0
+            if relevance_ids and paginator and paginator.after is not None:
+                try:
+                    start_rank = int(paginator.after[0]) + 1
+                except (TypeError, ValueError):
+                    return Response({'success': False, 'error': '游标格式无效'}, status=status.HTTP_400_BAD_REQUEST)
 
-            base_query = f"""
+            def build_base_query(conditions):
+                return f"""
                 FROM works w
                 LEFT JOIN authors a ON w.author_id = a.author_id
                 LEFT JOIN readers r ON w.author_id = r.reader_id
                 LEFT JOIN users u ON w.author_id = u.user_id
                 LEFT JOIN categories c ON w.category_id = c.category_id
-                LEFT JOIN (
-                    SELECT work_id, SUM(word_count) AS total_words
-                    FROM chapters
-                    WHERE status = 1
-                    GROUP BY work_id
-                ) cw ON w.work_id = cw.work_id
-                WHERE {where_clause}
+                LEFT JOIN work_stats ws ON w.work_id = ws.work_id
+                WHERE {" AND ".join(conditions)}
             """
 
-            count_query = f"SELECT COUNT(*) {base_query}"
-            cursor.execute(count_query, params.copy())
-            total_row = cursor.fetchone()
-            total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+            def collect_relevance_page(skip, needed):
+                """从 start_rank 名起分批读取检索结果并在 MySQL 中套用全部筛选条件，直到凑够本页；返回 [(名次, 作品ID)]"""
+                matched = []
+                rank = start_rank
+                while len(matched) < skip + needed:
+                    if rank < len(relevance_ids):
+                        batch = relevance_ids[rank:]
+                    elif relevance_capped:
+                        batch = search_work_ids(keyword, limit=candidate_limit, offset=rank) or []
+                    else:
+                        batch = []
+                    if not batch:
+                        break
+                    batch_conditions = where_conditions + [f"w.work_id IN ({', '.join(['%s'] * len(batch))})"]
+                    cursor.execute(f"SELECT w.work_id {build_base_query(batch_conditions)}", params + batch)
+                    kept = {row[0] for row in cursor.fetchall()}
+                    matched.extend((rank + index, work_id) for index, work_id in enumerate(batch) if work_id in kept)
+                    rank += len(batch)
+                return matched[skip:skip + needed]
+
+            page_ids = None
+            page_ranks = []
+            if relevance_ids:
+                if paginator:
+                    page_ranks = collect_relevance_page(0, paginator.limit)
+                else:
+                    page_ranks = collect_relevance_page(offset, page_size)
+                page_ids = [work_id for _, work_id in page_ranks]
+
+            count_conditions = list(where_conditions)
+            count_params = params.copy()
+            if relevance_ids:
+                count_conditions.append(f"w.work_id IN ({', '.join(['%s'] * len(relevance_ids))})")
+                count_params.extend(relevance_ids)
+
+            total = None
+            if paginator is None or paginator.include_total:
+                cursor.execute(f"SELECT COUNT(*) {build_base_query(count_conditions)}", count_params)
+                total_row = cursor.fetchone()
+                total = int(total_row[0]) if total_row and total_row[0] is not None else 0
+
+            page_conditions = list(where_conditions)
+            data_params = params.copy()
+            if relevance_ids:
+                if page_ids:
+                    page_conditions.append(f"w.work_id IN ({', '.join(['%s'] * len(page_ids))})")
+                    data_params.extend(page_ids)
+                else:
+                    page_conditions.append("1 = 0")
+                # 本页作品已按相关度选出，只需按检索索引的名次排序
+                order_clause = f"FIELD(w.work_id, {', '.join(['%s'] * len(page_ids))})" if page_ids else "w.work_id"
+                limit_clause, limit_params = 'LIMIT %s', [len(page_ids) or 1]
+            else:
+                if paginator:
+                    paginator.apply(page_conditions, data_params)
+                order_clause, limit_clause, limit_params = page_window(
+                    paginator, "w.update_time DESC, w.create_time DESC", page_size, offset
+                )
+            base_query = build_base_query(page_conditions)
 
             data_query = f"""
                 SELECT w.work_id, w.title, w.cover_url, w.intro, w.create_time,
                        COALESCE(a.pen_name, r.nickname, u.username, '') AS author_name,
                        COALESCE(c.name, '') AS category_name,
                        w.status,
-                       COALESCE(cw.total_words, 0) AS total_words,
+                       COALESCE(ws.total_words, 0) AS total_words,
                        w.update_time,
                        COALESCE(w.read_count, 0) AS read_count,
                        COALESCE(w.collect_count, 0) AS collect_count,
                        COALESCE(w.vote_count, 0) AS vote_count,
                        w.category_id
                 {base_query}
-                ORDER BY w.update_time DESC, w.create_time DESC
-                LIMIT %s OFFSET %s
+                ORDER BY {order_clause}
+                {limit_clause}
             """
 
-            data_params = params.copy()
-            data_params.extend([page_size, offset])
+            if relevance_ids and page_ids:
+                data_params.extend(page_ids)
+            data_params.extend(limit_params)
             cursor.execute(data_query, data_params)
 
+            rows = cursor.fetchall()
+            page_info = {}
+            if paginator:
+                if relevance_ids:
+                    relevance_rank = {work_id: rank for rank, work_id in page_ranks}
+                    rows, page_info = paginator.paginate(rows, lambda row: (relevance_rank[row[0]],))
+                else:
+                    rows, page_info = paginator.paginate(rows, lambda row: (row[9], row[4], row[0]))
+
             results = []
-            for row in cursor.fetchall():
+            for row in rows:
                 results.append({
                     'work_id': row[0],
                     'title': row[1],
@@ -5537,13 +5948,37 @@ def search_works(request):
                     'category_id': row[13]
                 })
 
-            return Response({
+            response_data = {
                 'success': True,
                 'results': results,
-                'total': total,
                 'page': page,
                 'page_size': page_size
-            })
+            }
+            if total is not None:
+                response_data['total'] = total
+                # 匹配数超过候选上限时总数只统计了相关度最高的候选，是实际匹配数的下限
+                response_data['total_is_lower_bound'] = relevance_capped
+            if include_facets:
+                # 标签统计覆盖全部匹配作品，不受分页影响
+                response_data['tag_facets'] = work_tags.tag_facets(
+                    cursor, f"SELECT w.work_id {build_base_query(count_conditions)}", count_params
+                )
+            response_data.update(page_info)
+            return Response(response_data)
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_unread_summary(request):
+    try:
+        user_id = request.user.user_id
+
+        with connection.cursor() as cursor:
+            unread_count, type_counts = unread_summary(cursor, user_id)
+
+        return Response({'success': True, 'unread_count': unread_count, 'type_counts': type_counts})
 
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -5557,20 +5992,23 @@ def mark_message_read(request, message_id):
         with connection.cursor() as cursor:
             # 检查消息是否属于当前用户
             cursor.execute("""
-                SELECT message_id FROM messages 
+                SELECT message_id, message_type FROM messages 
                 WHERE message_id = %s AND recipient_id = %s
             """, [message_id, user_id])
             
-            if not cursor.fetchone():
+            message_row = cursor.fetchone()
+            if not message_row:
                 return Response({'success': False, 'error': '消息不存在或无权限'}, 
                               status=status.HTTP_404_NOT_FOUND)
             
-            # 标记为已读
+            # 标记为已读，只有未读变为已读时才调整计数
             cursor.execute("""
                 UPDATE messages 
                 SET is_read = 1
-                WHERE message_id = %s
+                WHERE message_id = %s AND is_read = 0
             """, [message_id])
+            if cursor.rowcount:
+                message_counters.message_read(cursor, user_id, message_row[1])
             
             return Response({'success': True, 'message': '消息已标记为已读'})
             
@@ -5590,6 +6028,8 @@ def mark_all_messages_read(request):
                 SET is_read = 1
                 WHERE recipient_id = %s AND is_read = 0
             """, [user_id])
+            message_counters.clear_unread(cursor, user_id)
+            mark_all_broadcasts_read(cursor, user_id)
             
             return Response({'success': True, 'message': '所有消息已标记为已读'})
             
@@ -5605,22 +6045,60 @@ def delete_message(request, message_id):
         with connection.cursor() as cursor:
             # 检查消息是否属于当前用户
             cursor.execute("""
-                SELECT message_id FROM messages 
+                SELECT message_id, message_type, is_read FROM messages 
                 WHERE message_id = %s AND recipient_id = %s
             """, [message_id, user_id])
             
-            if not cursor.fetchone():
+            message_row = cursor.fetchone()
+            if not message_row:
                 return Response({'success': False, 'error': '消息不存在或无权限'}, 
                               status=status.HTTP_404_NOT_FOUND)
             
             # 删除消息
             cursor.execute("DELETE FROM messages WHERE message_id = %s", [message_id])
+            if cursor.rowcount:
+                message_counters.message_deleted(cursor, user_id, message_row[1], not message_row[2])
             
             return Response({'success': True, 'message': '消息删除成功'})
             
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def mark_broadcast_message_read(request, broadcast_id):
+    try:
+        user_id = request.user.user_id
+
+        with connection.cursor() as cursor:
+            if not broadcast_visible(cursor, user_id, broadcast_id):
+                return Response({'success': False, 'error': '消息不存在或无权限'},
+                              status=status.HTTP_404_NOT_FOUND)
+
+            mark_broadcast_read(cursor, user_id, broadcast_id)
+            return Response({'success': True, 'message': '消息已标记为已读'})
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def delete_broadcast_message(request, broadcast_id):
+    try:
+        user_id = request.user.user_id
+
+        with connection.cursor() as cursor:
+            if not broadcast_visible(cursor, user_id, broadcast_id):
+                return Response({'success': False, 'error': '消息不存在或无权限'},
+                              status=status.HTTP_404_NOT_FOUND)
+
+            # 广播只对当前用户隐藏
+            delete_broadcast(cursor, user_id, broadcast_id)
+            return Response({'success': True, 'message': '消息删除成功'})
+
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # 点券和投票系统API
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -5628,9 +6106,6 @@ def get_user_points(request):
     try:
         user_id = request.user.user_id
 
-        _ensure_point_transactions_table()
-        _ensure_user_tickets_table()
-
         with connection.cursor() as cursor:
             cursor.execute("SELECT balance FROM readers WHERE reader_id = %s", [user_id])
             balance_row = cursor.fetchone()
@@ -5690,8 +6165,6 @@ def vote_work(request, work_id):
         if not _user_permission_allowed(user_id, 'can_vote'):
             return Response({'success': False, 'error': '您的账号投票权限已被暂停'}, status=status.HTTP_403_FORBIDDEN)
 
-        _ensure_user_tickets_table()
-
         author_id = None
         work_title = ''
 
@@ -5764,6 +6237,8 @@ def vote_work(request, work_id):
                     WHERE work_id = %s
                 """, [ticket_count, work_id])
 
+                work_stats.apply_delta(cursor, work_id, vote_count=ticket_count)
+
                 cursor.execute("COMMIT")
 
                 cursor.execute("SELECT ticket_balance FROM user_tickets WHERE user_id = %s", [user_id])
@@ -5779,7 +6254,8 @@ def vote_work(request, work_id):
                     work_id,
                     FEEDBACK_EVENT_VOTE,
                     weight_delta=1.0,
-                    metadata={'ticket_count': ticket_count, 'message': vote_message}
+                    metadata={'ticket_count': ticket_count, 'message': vote_message},
+                    profile_score=PREFERENCE_WEIGHT_MAP['vote'] * ticket_count
                 )
 
                 if author_id and author_id != user_id:
@@ -5828,8 +6304,6 @@ def purchase_points(request):
         if not _user_permission_allowed(user_id, 'can_recharge'):
             return Response({'success': False, 'error': '您的账号充值功能已被管理员暂停'}, status=status.HTTP_403_FORBIDDEN)
         
-        _ensure_point_transactions_table()
-
         with connection.cursor() as cursor:
             amount_decimal = Decimal(str(amount))
             cursor.execute("START TRANSACTION")
@@ -68,6 +68,10 @@ export const deleteWork = (id) => api.delete(`/works/${id}/`)
 // 章节相关
 export const getChapters = (workId) => api.get(`/works/${workId}/chapters/`)
 export const getChapterDetail = (workId, chapterId) => api.get(`/works/${workId}/chapters/${chapterId}/`)
+export const getChaptersAhead = (workId, chapterId, count) => api.get(`/works/${workId}/chapters/${chapterId}/ahead/`, { params: { count } })
+export const recordChapterReads = (workId, chapterIds) => api.post(`/works/${workId}/chapters/reads/`, { chapter_ids: chapterIds })
+// 离线下载包体积较大，不受默认超时限制
+export const downloadChapters = (workId, params) => api.get(`/works/${workId}/download/`, { params, responseType: 'blob', timeout: 0 })
 export const createChapter = (workId, data) => api.post(`/works/${workId}/chapters/create/`, data)
 export const updateChapter = (workId, chapterId, data) => api.put(`/works/${workId}/chapters/${chapterId}/`, data)
 export const deleteChapter = (workId, chapterId) => api.delete(`/works/${workId}/chapters/${chapterId}/delete/`)
@@ -99,6 +103,7 @@ export const getRankings = (params) => {
 // 推荐
 export const getRecommendations = () => api.get('/recommendations/')
 export const sendRecommendationFeedback = (data) => api.post('/recommendations/feedback/', data)
+export const sendRecommendationFeedbackBatch = (events) => api.post('/recommendations/feedback/batch/', { events })
 
 // 搜索
 export const searchWorks = (params) => api.get('/search/', { params })
@@ -119,9 +124,12 @@ export const getCommentThread = (commentId) => api.get(`/comments/${commentId}/`
 
 // 消息
 export const getMessages = (params) => api.get('/messages/', { params })
+export const getUnreadSummary = () => api.get('/messages/unread-summary/')
 export const markMessageRead = (messageId) => api.put(`/messages/${messageId}/read/`)
 export const markAllMessagesRead = () => api.put('/messages/mark-all-read/')
 export const deleteMessage = (messageId) => api.delete(`/messages/${messageId}/delete/`)
+export const markBroadcastRead = (broadcastId) => api.put(`/messages/broadcasts/${broadcastId}/read/`)
+export const deleteBroadcastMessage = (broadcastId) => api.delete(`/messages/broadcasts/${broadcastId}/delete/`)
 
 // 点券和投票系统
 export const getUserPoints = () => api.get('/points/')
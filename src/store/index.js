@@ -140,9 +140,7 @@ export default createStore({
         return { success: false, error: '未登录' }
       }
       try {
-        const response = await api.get('/messages/', {
-          params: { page: 1, page_size: 1 }
-        })
+        const response = await api.get('/messages/unread-summary/')
         if (response.data && response.data.success) {
           const count = response.data.unread_count ?? 0
           commit('SET_UNREAD_COUNT', count)